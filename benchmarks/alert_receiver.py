@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Récepteur de webhook de test pour les alertes de LogLens.
+
+Reçoit les POST JSON envoyés par ``--alert-webhook`` (ou ``--alert-slack``),
+en HTTP/1.1 avec connexions maintenues ouvertes, et affiche pour chaque
+envoi le nombre d'alertes reçues. ``--delay`` simule un destinataire lent :
+la détection ne doit pas en être ralentie. À l'arrêt (Ctrl+C), un bilan
+donne le nombre d'envois, d'alertes et de connexions.
+
+Exemple :
+    python3 benchmarks/alert_receiver.py --port 8600 --delay 2
+    python3 loglens.py --logfile auth.log --alert-webhook http://127.0.0.1:8600/hook
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class ReceiverHandler(BaseHTTPRequestHandler):
+    """Compte les alertes reçues et répond après le délai configuré."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = json.loads(body or b"{}")
+        alerts = payload.get("alerts")
+        count = len(alerts) if alerts is not None else len(payload.get("text", "").splitlines())
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.posts += 1
+            self.server.alerts += count
+        if not self.server.quiet:
+            print(f"[✓] {count} alerte(s) reçue(s) sur {self.path}")
+            for alert in alerts or []:
+                repeated = f" (x{alert['count']}, synthèse)" if alert.get("summary") else ""
+                print(f"    [{alert['type']}]{repeated} {alert['entry']}")
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def main(argv=None):
+    parser_cli = argparse.ArgumentParser(description="Récepteur de webhook de test pour les alertes de LogLens")
+    parser_cli.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute (défaut: 127.0.0.1)")
+    parser_cli.add_argument("--port", type=int, default=8600, help="Port d'écoute (défaut: 8600)")
+    parser_cli.add_argument("--delay", type=float, default=0, help="Délai de réponse en secondes (défaut: 0)")
+    parser_cli.add_argument("--status", type=int, default=200, help="Code HTTP des réponses (défaut: 200)")
+    parser_cli.add_argument("--quiet", action="store_true", help="N'afficher que le bilan")
+    args = parser_cli.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), ReceiverHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.delay = args.delay
+    server.status = args.status
+    server.quiet = args.quiet
+    server.posts = server.alerts = server.connections = 0
+    print(f"[👁] Réception des alertes sur http://{args.host}:{args.port}/, Ctrl+C pour arrêter.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f"\n[✓] {server.alerts} alerte(s) en {server.posts} envoi(s), {server.connections} connexion(s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmarks des étapes de LogLens.
+
+Mesure, pour chaque fichier de corpus, le débit (lignes/s, Mo/s) et le pic
+de mémoire (RSS) de quatre étapes prises séparément : ``parse_log``,
+``detect_anomalies``, ``detect_brute_force`` et ``generate_summary``.
+
+Chaque mesure tourne dans un processus dédié : le pic de mémoire d'une
+étape n'est pas faussé par les précédentes. Les étapes de détection et de
+résumé reçoivent leurs entrées déjà préparées en mémoire, hors mesure ;
+la mémoire de ces entrées est indiquée à part.
+
+Les résultats sont écrits en JSON et comparés à une référence enregistrée :
+un débit inférieur ou un pic de mémoire supérieur à la référence, au-delà
+de la tolérance, est signalé comme régression (code de sortie 1).
+
+Exemple :
+    python3 benchmarks/corpus.py --format auth --size 1G --output corpus/auth.log
+    python3 benchmarks/bench.py corpus/auth.log --save-baseline benchmarks/baseline.json
+    python3 benchmarks/bench.py corpus/auth.log --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from itertools import islice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Étapes mesurées, dans l'ordre du pipeline
+STAGES = ("parse_log", "detect_anomalies", "detect_brute_force", "generate_summary")
+
+# Version du format des résultats
+RESULTS_VERSION = 1
+
+# Tolérance par défaut avant de signaler une régression (10 %)
+DEFAULT_TOLERANCE = 0.10
+
+# Nombre maximal d'entrées préparées en mémoire pour les étapes de détection
+DEFAULT_MAX_RECORDS = 2000000
+
+def _peak_rss_kb():
+    """Pic de mémoire résidente du processus courant, en Ko."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS compte en octets, Linux en Ko
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def _count_lines(filepath):
+    """Nombre de lignes d'un fichier, lu par grands blocs."""
+    count = 0
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            count += block.count(b"\n")
+    return count
+
+def run_stage(stage, filepath, max_records):
+    """
+    Mesure une étape sur un fichier, dans le processus courant.
+
+    Args:
+        stage (str): Étape mesurée (voir ``STAGES``)
+        filepath (str): Fichier de corpus
+        max_records (int): Nombre maximal d'entrées préparées pour les étapes
+            de détection et de résumé
+
+    Returns:
+        dict: Mesure (lignes, octets, durées, mémoire)
+    """
+    from core import parser, detector, summarizer
+
+    # Les messages de progression ne font pas partie de la mesure
+    logging.getLogger("LogLens").setLevel(logging.WARNING)
+
+    if stage == "parse_log":
+        setup_rss = _peak_rss_kb()
+        lines = _count_lines(filepath)
+        size = os.path.getsize(filepath)
+        wall, cpu = time.perf_counter(), time.process_time()
+        kept = sum(1 for _ in parser.parse_log(filepath))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        return {"lines": lines, "bytes": size, "kept": kept, "wall": wall, "cpu": cpu,
+                "setup_rss_kb": setup_rss, "peak_rss_kb": _peak_rss_kb()}
+
+    # Entrées préparées hors mesure
+    records = list(islice(parser.parse_log(filepath), max_records))
+    if stage == "generate_summary":
+        inputs = detector.detect_anomalies(records)
+        del records
+    else:
+        inputs = records
+    size = sum(len(entry["entry"] if isinstance(entry, dict) else entry.line) + 1 for entry in inputs)
+    setup_rss = _peak_rss_kb()
+
+    function = {
+        "detect_anomalies": detector.detect_anomalies,
+        "detect_brute_force": detector.detect_brute_force,
+        "generate_summary": summarizer.generate_summary,
+    }[stage]
+    wall, cpu = time.perf_counter(), time.process_time()
+    output = function(inputs)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return {"lines": len(inputs), "bytes": size, "kept": len(output), "wall": wall, "cpu": cpu,
+            "setup_rss_kb": setup_rss, "peak_rss_kb": _peak_rss_kb()}
+
+def measure(stage, filepath, max_records, repeat):
+    """
+    Mesure une étape dans des processus dédiés et garde la meilleure durée.
+
+    Args:
+        stage (str): Étape mesurée
+        filepath (str): Fichier de corpus
+        max_records (int): Nombre maximal d'entrées préparées
+        repeat (int): Nombre de mesures
+
+    Returns:
+        dict: Meilleure mesure, complétée des débits
+    """
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--stage", stage,
+             "--max-records", str(max_records), filepath],
+            check=True, stdout=subprocess.PIPE, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None or result["wall"] < best["wall"]:
+            best = result
+    wall = max(best["wall"], 1e-9)
+    best["lines_per_sec"] = best["lines"] / wall
+    best["mb_per_sec"] = best["bytes"] / 1024 ** 2 / wall
+    return best
+
+def compare(results, baseline, tolerance):
+    """
+    Compare des résultats à une référence.
+
+    Args:
+        results (dict): Résultats par fichier puis par étape
+        baseline (dict): Résultats de référence, même structure
+        tolerance (float): Écart relatif toléré (0.1 pour 10 %)
+
+    Returns:
+        list: Régressions, tuples (fichier, étape, mesure, référence, valeur)
+    """
+    regressions = []
+    for name, stages in results.items():
+        for stage, result in stages.items():
+            reference = baseline.get(name, {}).get(stage)
+            if reference is None:
+                continue
+            if result["lines_per_sec"] < reference["lines_per_sec"] * (1 - tolerance):
+                regressions.append((name, stage, "lignes/s", reference["lines_per_sec"], result["lines_per_sec"]))
+            if result["peak_rss_kb"] > reference["peak_rss_kb"] * (1 + tolerance):
+                regressions.append((name, stage, "RSS Ko", reference["peak_rss_kb"], result["peak_rss_kb"]))
+    return regressions
+
+def print_table(results, baseline):
+    """Affiche les résultats, avec l'écart de débit par rapport à la référence."""
+    print(f"\n{'fichier':<20} {'étape':<20} {'lignes/s':>12} {'Mo/s':>8} {'RSS Mo':>8} {'vs réf.':>8}")
+    for name, stages in results.items():
+        for stage, result in stages.items():
+            reference = baseline.get(name, {}).get(stage)
+            delta = ""
+            if reference is not None and reference["lines_per_sec"]:
+                delta = f"{(result['lines_per_sec'] / reference['lines_per_sec'] - 1) * 100:+.1f}%"
+            print(f"{name:<20} {stage:<20} {result['lines_per_sec']:>12,.0f} {result['mb_per_sec']:>8.1f} "
+                  f"{result['peak_rss_kb'] / 1024:>8.1f} {delta:>8}")
+
+def main(argv=None):
+    parser_cli = argparse.ArgumentParser(description="Benchmarks des étapes de LogLens sur des fichiers de corpus")
+    parser_cli.add_argument("corpus", nargs="+", help="Fichiers de corpus (voir benchmarks/corpus.py)")
+    parser_cli.add_argument("--stages", default=",".join(STAGES),
+                            help=f"Étapes mesurées, séparées par des virgules (défaut: {','.join(STAGES)})")
+    parser_cli.add_argument("--repeat", type=int, default=3, help="Mesures par étape, la meilleure est gardée (défaut: 3)")
+    parser_cli.add_argument("--max-records", type=int, default=DEFAULT_MAX_RECORDS,
+                            help=f"Entrées préparées en mémoire pour la détection (défaut: {DEFAULT_MAX_RECORDS})")
+    parser_cli.add_argument("--output", help="Fichier JSON des résultats")
+    parser_cli.add_argument("--baseline", help="Résultats de référence à comparer")
+    parser_cli.add_argument("--save-baseline", help="Enregistrer les résultats comme nouvelle référence")
+    parser_cli.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                            help="Écart relatif toléré avant de signaler une régression (défaut: 0.10)")
+    parser_cli.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    args = parser_cli.parse_args(argv)
+
+    if args.stage:
+        # Processus de mesure lancé par measure()
+        print(json.dumps(run_stage(args.stage, args.corpus[0], args.max_records)))
+        return 0
+
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print(f"[❌] Étapes inconnues : {', '.join(unknown)}")
+        return 2
+
+    baseline = {}
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f).get("results", {})
+        except (OSError, ValueError) as e:
+            print(f"[❌] Référence illisible {args.baseline}: {str(e)}")
+            return 2
+
+    results = {}
+    for filepath in args.corpus:
+        name = os.path.basename(filepath)
+        results[name] = {}
+        for stage in stages:
+            print(f"[🔍] {name} : {stage}...")
+            results[name][stage] = measure(stage, filepath, args.max_records, args.repeat)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"[✓] Résultats enregistrés dans {path}")
+
+    print_table(results, baseline)
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[❌] {len(regressions)} régression(s) au-delà de {args.tolerance:.0%} :")
+        for name, stage, metric, reference, value in regressions:
+            print(f" - {name} / {stage} : {metric} {reference:,.0f} → {value:,.0f}")
+        return 1
+    if baseline:
+        print(f"\n[✓] Aucune régression au-delà de {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Générateur de corpus de logs synthétiques pour les benchmarks de LogLens.
+
+Produit des fichiers réalistes (auth.log, syslog, journal Windows exporté
+en texte, NDJSON journald) de taille quelconque. La sortie est
+entièrement déterminée par la graine : deux exécutions avec les mêmes
+paramètres produisent des fichiers identiques octet pour octet.
+
+Les anomalies (échecs d'authentification, blocages firewall, scans...)
+représentent une part réglable des lignes. Elles viennent d'un ensemble
+d'IPs d'attaquants tirées selon une loi de Zipf : quelques IPs
+concentrent la plupart des attaques, par rafales, comme lors d'un brute
+force réel.
+
+Exemple :
+    python3 benchmarks/corpus.py --format auth --size 2G --output corpus/auth.log
+"""
+
+import argparse
+import bisect
+import json
+import os
+import random
+import sys
+import time
+
+# Formats de corpus disponibles
+FORMATS = ("auth", "syslog", "windows", "ndjson")
+
+# Date de la première ligne (epoch) : 16 mai 2024, 00:00:00 UTC
+DEFAULT_START = 1715817600
+
+# Taille des lots de lignes écrits d'un coup
+WRITE_BATCH_LINES = 20000
+
+PORTS = range(1024, 65536)
+PIDS = range(300, 65001)
+
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+USERS = ("root", "admin", "alice", "bob", "carol", "deploy", "backup", "postgres", "www-data", "jenkins")
+ATTACK_USERS = ("root", "admin", "test", "oracle", "ubuntu", "guest", "user", "pi", "ftpuser", "support")
+HOSTS = ("web01", "web02", "db01", "bastion", "mail01")
+WINDOWS_HOSTS = ("DC01.corp.local", "DC02.corp.local", "FS01.corp.local")
+COMMANDS = ("/usr/bin/systemctl status nginx", "/usr/bin/apt update", "/bin/journalctl -u ssh",
+            "/usr/bin/tail /var/log/syslog", "/usr/sbin/service postgresql restart")
+DOMAINS = ("update.example.com", "cdn.example.net", "api.example.org", "mirror.example.com")
+BAD_DOMAINS = ("x7f3k2.top", "c2-relay.xyz", "dl.malware-cdn.ru", "qq9z0.biz")
+
+def parse_size(text):
+    """
+    Convertit une taille lisible (500M, 2G, 10k) en octets.
+
+    Args:
+        text (str): Taille, suffixe k/M/G optionnel (puissances de 1024)
+
+    Returns:
+        int: Nombre d'octets
+    """
+    text = text.strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+class CorpusGenerator:
+    """
+    Générateur déterministe de lignes de logs d'un format donné.
+
+    Les lignes sont produites dans l'ordre chronologique ; l'intervalle
+    moyen entre deux lignes est fixé par ``rate`` (lignes par seconde).
+    """
+
+    def __init__(self, log_format, seed=42, anomaly_rate=0.05, attackers=200, skew=1.2,
+                 burst=6, rate=50.0, start=DEFAULT_START):
+        """
+        Args:
+            log_format (str): Format des lignes ('auth', 'syslog', 'windows', 'ndjson')
+            seed (int): Graine du générateur pseudo-aléatoire
+            anomaly_rate (float): Part des lignes qui sont des anomalies (0 à 1)
+            attackers (int): Nombre d'IPs d'attaquants distinctes
+            skew (float): Exposant de la loi de Zipf des attaquants (0 : uniforme)
+            burst (int): Taille moyenne d'une rafale d'attaques d'une même IP
+            rate (float): Nombre moyen de lignes par seconde
+            start (int): Horodatage epoch de la première ligne
+        """
+        if log_format not in FORMATS:
+            raise ValueError(f"format inconnu : {log_format}")
+        self.format = log_format
+        self.rng = random.Random(seed)
+        self.anomaly_rate = anomaly_rate
+        self.burst = max(1, burst)
+        self.interval = 1.0 / rate
+        self.clock = float(start)
+        self.sequence = 0
+        self._second = None
+        self._stamp = None
+        self._burst_ip = None
+        self._burst_left = 0
+
+        rng = self.rng
+        self.attackers = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+                          for _ in range(max(1, attackers))]
+        # Loi de Zipf : poids 1/rang^skew, tirage par poids cumulés
+        total = 0.0
+        self.attacker_weights = []
+        for rank in range(1, len(self.attackers) + 1):
+            total += 1.0 / rank ** skew
+            self.attacker_weights.append(total)
+        self.clients = [f"10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}" for _ in range(500)]
+
+        self.render = {
+            "auth": self._render_syslog,
+            "syslog": self._render_syslog,
+            "windows": self._render_windows,
+            "ndjson": self._render_ndjson,
+        }[log_format]
+        self.events = self._windows_event if log_format == "windows" else (
+            self._syslog_event if log_format == "syslog" else self._auth_event)
+
+    def _pick(self, items):
+        """Élément tiré au hasard (plus rapide que ``random.choice``, même déterminisme)."""
+        return items[int(self.rng.random() * len(items))]
+
+    def _attacker(self):
+        """IP de l'attaquant de la ligne anormale courante (rafales d'une même IP)."""
+        if self._burst_left <= 0:
+            weights = self.attacker_weights
+            index = bisect.bisect_left(weights, self.rng.random() * weights[-1])
+            self._burst_ip = self.attackers[min(index, len(self.attackers) - 1)]
+            self._burst_left = int(self.rng.expovariate(1.0 / self.burst)) + 1
+        self._burst_left -= 1
+        return self._burst_ip
+
+    def _tick(self):
+        """Avance l'horloge de la durée séparant deux lignes."""
+        self.clock += self.rng.expovariate(1.0) * self.interval
+        self.sequence += 1
+
+    def _syslog_stamp(self):
+        """Horodatage syslog (RFC 3164) de la ligne courante, formaté une fois par seconde."""
+        second = int(self.clock)
+        if second != self._second:
+            t = time.gmtime(second)
+            self._second = second
+            self._stamp = f"{_MONTHS[t.tm_mon - 1]} {t.tm_mday:2d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        return self._stamp
+
+    def _iso_stamp(self):
+        """Horodatage AAAA-MM-JJ HH:MM:SS de la ligne courante."""
+        second = int(self.clock)
+        if second != self._second:
+            self._second = second
+            self._stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(second))
+        return self._stamp
+
+    def _auth_event(self, anomalous):
+        """Événement d'authentification : (programme, pid, message)."""
+        port = self._pick(PORTS)
+        pid = self._pick(PIDS)
+        if anomalous:
+            ip = self._attacker()
+            user = self._pick(ATTACK_USERS)
+            kind = self.rng.random()
+            if kind < 0.45:
+                return "sshd", pid, f"Failed password for {user} from {ip} port {port} ssh2"
+            if kind < 0.7:
+                return "sshd", pid, f"Failed password for invalid user {user} from {ip} port {port} ssh2"
+            if kind < 0.85:
+                return "sshd", pid, (f"pam_unix(sshd:auth): authentication failure; logname= uid=0 euid=0 "
+                                     f"tty=ssh ruser= rhost={ip}  user={user}")
+            if kind < 0.95:
+                return "sshd", pid, f"Invalid user {user} from {ip} port {port}"
+            return "sshd", pid, (f"error: maximum authentication attempts exceeded for {user} "
+                                 f"from {ip} port {port} ssh2 [preauth]")
+        ip = self._pick(self.clients)
+        user = self._pick(USERS)
+        kind = self.rng.random()
+        if kind < 0.2:
+            return "sshd", pid, f"Accepted publickey for {user} from {ip} port {port} ssh2: RSA SHA256:{self.rng.getrandbits(64):016x}"
+        if kind < 0.3:
+            return "sshd", pid, f"Accepted password for {user} from {ip} port {port} ssh2"
+        if kind < 0.45:
+            return "sshd", pid, f"pam_unix(sshd:session): session opened for user {user} by (uid=0)"
+        if kind < 0.6:
+            return "sshd", pid, f"pam_unix(sshd:session): session closed for user {user}"
+        if kind < 0.7:
+            return "sshd", pid, f"Connection closed by {ip} port {port}"
+        if kind < 0.85:
+            return "CRON", pid, "pam_unix(cron:session): session opened for user root by (uid=0)"
+        if kind < 0.93:
+            return "systemd-logind", 812, f"New session {self.sequence % 100000} of user {user}."
+        return "sudo", pid, f"{user} : TTY=pts/{pid % 8} ; PWD=/home/{user} ; USER=root ; COMMAND={self._pick(COMMANDS)}"
+
+    def _syslog_event(self, anomalous):
+        """Événement système : (programme, pid, message)."""
+        pid = self._pick(PIDS)
+        if anomalous:
+            ip = self._attacker()
+            kind = self.rng.random()
+            if kind < 0.5:
+                return "kernel", None, (f"[{self.clock - DEFAULT_START:.6f}] firewall BLOCK IN=eth0 OUT= SRC={ip} "
+                                        f"DST=10.0.0.1 LEN=60 PROTO=TCP SPT={self._pick(PORTS)} "
+                                        f"DPT={self._pick((22, 23, 445, 3389, 5432))} SYN")
+            if kind < 0.7:
+                return "psad", pid, f"port scan detected from {ip} (TCP, {self._pick(range(20, 901))} ports)"
+            if kind < 0.85:
+                return "named", pid, f"dns query for {self._pick(BAD_DOMAINS)} from {ip} flagged suspicious"
+            if kind < 0.95:
+                return "sshd", pid, f"Failed password for root from {ip} port {self._pick(PORTS)} ssh2"
+            return "kernel", None, f"TCP: request_sock_TCP: Possible SYN flooding on port 80. Dropped packet from {ip}"
+        kind = self.rng.random()
+        if kind < 0.25:
+            return "systemd", 1, f"Started Session {self.sequence % 100000} of user {self._pick(USERS)}."
+        if kind < 0.4:
+            return "CRON", pid, "(root) CMD (run-parts --report /etc/cron.hourly)"
+        if kind < 0.55:
+            return "dhclient", pid, f"DHCPACK of {self._pick(self.clients)} from 10.0.0.254"
+        if kind < 0.7:
+            return "named", pid, (f"client @0x7f{self.rng.getrandbits(32):08x} {self._pick(self.clients)}#"
+                                  f"{self._pick(PORTS)}: query: {self._pick(DOMAINS)} IN A +")
+        if kind < 0.8:
+            return "kernel", None, f"[{self.clock - DEFAULT_START:.6f}] e1000e: eth0 NIC Link is Up 1000 Mbps Full Duplex"
+        if kind < 0.9:
+            return "nginx", pid, f"connection from {self._pick(self.clients)} accepted"
+        return "rsyslogd", pid, "[origin software=\"rsyslogd\"] rsyslogd was HUPed"
+
+    def _windows_event(self, anomalous):
+        """Événement de sécurité Windows : (identifiant, message)."""
+        if anomalous:
+            ip = self._attacker()
+            user = self._pick(ATTACK_USERS)
+            kind = self.rng.random()
+            if kind < 0.6:
+                return 4625, (f"An account failed to log on (authentication failure). Account Name: {user} "
+                              f"Source Network Address: {ip} Logon Type: 3 Status: 0xC000006D")
+            if kind < 0.8:
+                return 1149, (f"Remote Desktop Services: RDP logon failed. Account Name: {user} "
+                              f"Source Network Address: {ip} Logon Type: 10")
+            return 4771, (f"Kerberos pre-authentication failed. Account Name: {user} "
+                          f"Client Address: ::ffff:{ip} Failure Code: 0x18")
+        user = self._pick(USERS)
+        kind = self.rng.random()
+        if kind < 0.5:
+            return 4624, (f"An account was successfully logged on. Account Name: {user} "
+                          f"Source Network Address: {self._pick(self.clients)} Logon Type: {self._pick((2, 3, 10))}")
+        if kind < 0.75:
+            return 4634, f"An account was logged off. Account Name: {user} Logon Type: 3"
+        if kind < 0.9:
+            return 4672, f"Special privileges assigned to new logon. Account Name: {user}"
+        return 5156, (f"The Windows Filtering Platform has permitted a connection. "
+                      f"Source Address: {self._pick(self.clients)} Destination Port: 445")
+
+    def _render_syslog(self, anomalous):
+        program, pid, message = self.events(anomalous)
+        host = HOSTS[self.sequence % len(HOSTS)] if self.format == "syslog" else HOSTS[0]
+        tag = f"{program}[{pid}]" if pid is not None else program
+        return f"{self._syslog_stamp()} {host} {tag}: {message}\n"
+
+    def _render_windows(self, anomalous):
+        event_id, message = self.events(anomalous)
+        host = WINDOWS_HOSTS[self.sequence % len(WINDOWS_HOSTS)]
+        return f"{self._iso_stamp()} {host} Microsoft-Windows-Security-Auditing Event ID: {event_id} {message}\n"
+
+    def _render_ndjson(self, anomalous):
+        program, pid, message = self.events(anomalous)
+        micros = int(self.clock * 1000000)
+        pid_fields = f', "_PID" : "{pid}", "SYSLOG_PID" : "{pid}"' if pid is not None else ""
+        return (f'{{ "__CURSOR" : "s=6f1c;i={self.sequence:x};b=a1;m={micros:x}", '
+                f'"__REALTIME_TIMESTAMP" : "{micros}", "_BOOT_ID" : "a1", "PRIORITY" : "6", '
+                f'"_TRANSPORT" : "syslog", "_HOSTNAME" : "{HOSTS[self.sequence % len(HOSTS)]}", '
+                f'"SYSLOG_IDENTIFIER" : "{program}", "_COMM" : "{program}"{pid_fields}, '
+                f'"MESSAGE" : {json.dumps(message)} }}\n')
+
+    def lines(self):
+        """
+        Produit les lignes du corpus, indéfiniment.
+
+        Yields:
+            str: Ligne de log, fin de ligne comprise
+        """
+        rng = self.rng
+        anomaly_rate = self.anomaly_rate
+        render = self.render
+        while True:
+            self._tick()
+            yield render(rng.random() < anomaly_rate)
+
+    def write(self, path, size):
+        """
+        Écrit un corpus d'au moins ``size`` octets.
+
+        Args:
+            path (str): Fichier de sortie
+            size (int): Taille minimale en octets (la dernière ligne est complète)
+
+        Returns:
+            tuple: (nombre de lignes, nombre d'octets écrits)
+        """
+        written = 0
+        count = 0
+        batch = []
+        with open(path, "w", encoding="ascii", newline="\n") as out:
+            for line in self.lines():
+                batch.append(line)
+                written += len(line)
+                count += 1
+                if written >= size or len(batch) >= WRITE_BATCH_LINES:
+                    out.write("".join(batch))
+                    batch = []
+                    if written >= size:
+                        break
+        return count, written
+
+def main(argv=None):
+    parser_cli = argparse.ArgumentParser(description="Génère un corpus de logs synthétiques pour les benchmarks")
+    parser_cli.add_argument("--format", choices=FORMATS, default="auth", help="Format des lignes (défaut: auth)")
+    parser_cli.add_argument("--size", default="100M", help="Taille du corpus : 500M, 2G... (défaut: 100M)")
+    parser_cli.add_argument("--output", required=True, help="Fichier de sortie")
+    parser_cli.add_argument("--seed", type=int, default=42, help="Graine (défaut: 42)")
+    parser_cli.add_argument("--anomaly-rate", type=float, default=0.05,
+                            help="Part des lignes anormales, entre 0 et 1 (défaut: 0.05)")
+    parser_cli.add_argument("--attackers", type=int, default=200,
+                            help="Nombre d'IPs d'attaquants distinctes (défaut: 200)")
+    parser_cli.add_argument("--skew", type=float, default=1.2,
+                            help="Exposant de Zipf de la répartition des attaques entre IPs, 0 pour uniforme (défaut: 1.2)")
+    parser_cli.add_argument("--burst", type=int, default=6,
+                            help="Taille moyenne des rafales d'une même IP (défaut: 6)")
+    parser_cli.add_argument("--rate", type=float, default=50.0,
+                            help="Nombre moyen de lignes par seconde de log (défaut: 50)")
+    args = parser_cli.parse_args(argv)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    generator = CorpusGenerator(args.format, args.seed, args.anomaly_rate, args.attackers,
+                                args.skew, args.burst, args.rate)
+    started = time.time()
+    count, written = generator.write(args.output, parse_size(args.size))
+    elapsed = time.time() - started
+    print(f"[✓] {args.output} : {count} lignes, {written / 1024 ** 2:.1f} Mo "
+          f"({written / 1024 ** 2 / max(elapsed, 1e-9):.1f} Mo/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge syslog pour ``loglens.py serve``.
+
+Envoie des lignes de corpus synthétique (voir ``corpus.py``) à un serveur
+syslog, en UDP ou en TCP, au format RFC 3164 ou RFC 5424, et mesure le
+débit d'envoi. En TCP, les messages sont préfixés par leur longueur ou
+séparés par des fins de ligne (RFC 6587). Les messages sont préparés
+avant la mesure : le débit mesuré est celui de l'envoi seul.
+
+Les lignes envoyées peuvent être enregistrées dans un fichier, pour
+comparer les anomalies reçues par le serveur à celles de l'analyse du
+même fichier.
+
+Exemple :
+    python3 loglens.py serve --tcp 5514 --output recu.ndjson
+    python3 benchmarks/syslog_load.py --tcp 5514 --count 1000000 --save envoye.log
+    python3 loglens.py --logfile envoye.log --output fichier.ndjson
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import CorpusGenerator
+
+# Priorité des messages envoyés (facility auth, sévérité info)
+PRIORITY = 38
+
+# Année des horodatages RFC 5424 (celle de DEFAULT_START du corpus)
+YEAR = 2024
+
+# Taille des envois TCP (en octets)
+SEND_SIZE = 256 * 1024
+
+def to_rfc5424(line):
+    """
+    Réécrit une ligne syslog RFC 3164 en message RFC 5424 (sans priorité).
+
+    Args:
+        line (str): Ligne ``Mmm jj hh:mm:ss hôte programme[pid]: message``
+
+    Returns:
+        str: Message ``1 horodatage hôte programme pid - - message``
+    """
+    month, day, clock, host, rest = line.split(None, 4)
+    stamp = datetime.strptime(f"{YEAR} {month} {day} {clock}", "%Y %b %d %H:%M:%S")
+    tag, _, message = rest.partition(": ")
+    program, _, pid = tag.partition("[")
+    return f"1 {stamp.isoformat()}Z {host} {program} {pid.rstrip(']') or '-'} - - {message}"
+
+def build_messages(log_format, count, seed, anomaly_rate, rfc5424, save=None):
+    """
+    Prépare les messages à envoyer.
+
+    Args:
+        log_format (str): Format de corpus ('auth' ou 'syslog')
+        count (int): Nombre de messages
+        seed (int): Graine du corpus
+        anomaly_rate (float): Part des lignes anormales
+        rfc5424 (bool): Messages RFC 5424 plutôt que RFC 3164
+        save (str): Fichier où enregistrer les lignes envoyées (optionnel)
+
+    Returns:
+        list: Messages encodés, sans fin de ligne
+    """
+    generator = CorpusGenerator(log_format, seed, anomaly_rate)
+    lines = generator.lines()
+    messages = []
+    out = open(save, "w", encoding="ascii", newline="\n") if save else None
+    try:
+        for _ in range(count):
+            line = next(lines)
+            if out:
+                out.write(line)
+            line = line.rstrip("\n")
+            text = to_rfc5424(line) if rfc5424 else line
+            messages.append(f"<{PRIORITY}>{text}".encode("utf-8"))
+    finally:
+        if out:
+            out.close()
+    return messages
+
+def send_udp(messages, host, port, rate=None):
+    """
+    Envoie les messages en UDP, un datagramme par message.
+
+    Args:
+        messages (list): Messages encodés
+        host (str): Adresse du serveur
+        port (int): Port UDP
+        rate (float): Débit visé en messages par seconde (au plus vite si None)
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        send = sock.sendto
+        address = (host, port)
+        if rate is None:
+            for message in messages:
+                send(message, address)
+            return
+        started = time.perf_counter()
+        step = max(1, int(rate // 100))
+        for i in range(0, len(messages), step):
+            for message in messages[i:i + step]:
+                send(message, address)
+            delay = started + (i + step) / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    finally:
+        sock.close()
+
+def send_tcp(messages, host, port, octet_counting=True):
+    """
+    Envoie les messages sur une connexion TCP.
+
+    Args:
+        messages (list): Messages encodés
+        host (str): Adresse du serveur
+        port (int): Port TCP
+        octet_counting (bool): Préfixer chaque message par sa longueur, sinon
+            terminer chaque message par une fin de ligne
+    """
+    with socket.create_connection((host, port)) as sock:
+        chunk = []
+        size = 0
+        for message in messages:
+            framed = b"%d %s" % (len(message), message) if octet_counting else message + b"\n"
+            chunk.append(framed)
+            size += len(framed)
+            if size >= SEND_SIZE:
+                sock.sendall(b"".join(chunk))
+                chunk = []
+                size = 0
+        if chunk:
+            sock.sendall(b"".join(chunk))
+
+def main(argv=None):
+    parser_cli = argparse.ArgumentParser(description="Envoie des logs syslog synthétiques à loglens.py serve")
+    parser_cli.add_argument("--host", default="127.0.0.1", help="Adresse du serveur (défaut: 127.0.0.1)")
+    target = parser_cli.add_mutually_exclusive_group(required=True)
+    target.add_argument("--udp", type=int, metavar="PORT", help="Envoyer en UDP sur ce port")
+    target.add_argument("--tcp", type=int, metavar="PORT", help="Envoyer en TCP sur ce port")
+    parser_cli.add_argument("--count", type=int, default=100000, help="Nombre de messages (défaut: 100000)")
+    parser_cli.add_argument("--format", choices=("auth", "syslog"), default="auth",
+                            help="Format du corpus envoyé (défaut: auth)")
+    parser_cli.add_argument("--rfc5424", action="store_true", help="Messages RFC 5424 (défaut: RFC 3164)")
+    parser_cli.add_argument("--newline", action="store_true",
+                            help="En TCP, messages séparés par des fins de ligne (défaut: préfixés par leur longueur)")
+    parser_cli.add_argument("--rate", type=float, help="En UDP, débit visé en messages par seconde (défaut: au plus vite)")
+    parser_cli.add_argument("--seed", type=int, default=42, help="Graine du corpus (défaut: 42)")
+    parser_cli.add_argument("--anomaly-rate", type=float, default=0.05,
+                            help="Part des lignes anormales, entre 0 et 1 (défaut: 0.05)")
+    parser_cli.add_argument("--save", help="Enregistrer les lignes envoyées dans ce fichier")
+    args = parser_cli.parse_args(argv)
+
+    print(f"[🔍] Préparation de {args.count} messages...")
+    messages = build_messages(args.format, args.count, args.seed, args.anomaly_rate, args.rfc5424, args.save)
+    size = sum(len(message) for message in messages)
+
+    started = time.perf_counter()
+    try:
+        if args.udp is not None:
+            send_udp(messages, args.host, args.udp, args.rate)
+        else:
+            send_tcp(messages, args.host, args.tcp, not args.newline)
+    except OSError as e:
+        print(f"[❌] Erreur d'envoi vers {args.host}: {str(e)}")
+        return 1
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"[✓] {len(messages)} messages envoyés en {elapsed:.2f} s : {len(messages) / elapsed:,.0f} messages/s, "
+          f"{size / 1024 ** 2 / elapsed:.1f} Mo/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
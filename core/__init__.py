@@ -12,5 +12,16 @@ __version__ = '1.0.0'
 # Importer les modules pour faciliter leur utilisation
 from . import parser
 from . import detector
+from . import correlation
 from . import summarizer
+from . import pipeline
+from . import inputs
+from . import evtx
+from . import journal
+from . import record
+from . import sinks
+from . import sketches
+from . import stats
+from . import templates
+from . import timestamps
 from . import utils
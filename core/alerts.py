@@ -0,0 +1,490 @@
+"""
+Module d'alertes de LogLens.
+
+Les anomalies critiques sont transmises à des destinations externes
+(webhook JSON, Slack, email) sans jamais ralentir la détection :
+``AlertDispatcher.submit`` ne fait que déposer l'anomalie dans une file
+bornée, et un fil dédié s'occupe du reste.
+
+- Regroupement : une même alerte (type, IP ou compte) n'est envoyée
+  qu'une fois par fenêtre ; les répétitions sont comptées et signalées
+  dans une alerte de synthèse à la fin de la fenêtre.
+- Chaque destination a son propre fil, sa propre file et un seau à jetons
+  qui limite le nombre d'envois par minute : un destinataire lent ou
+  indisponible ne retarde que ses propres alertes.
+- Les alertes sont envoyées par lots, sur une connexion HTTP maintenue
+  ouverte (keep-alive) ou une session SMTP réutilisée.
+
+Une file pleine abandonne l'alerte et la compte, plutôt que de bloquer
+l'analyse.
+"""
+
+import http.client
+import json
+import queue
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from urllib.parse import urlsplit
+
+from .correlation import CORRELATION_RULES
+from .sinks import anomaly_record
+from .utils import log_warning, log_error
+
+# Catégories alertées par défaut : les échecs d'authentification isolés et
+# l'activité firewall sont trop fréquents, les attaques brute force et les
+# attaques corrélées les résument
+DEFAULT_ALERT_TYPES = ("Attaque Brute Force", "Tentative d'Élévation de Privilèges", "Injection SQL",
+                       "Scan de Ports", "Requête DNS suspecte", "Échec RDP") + tuple(CORRELATION_RULES)
+
+# Fenêtre de regroupement des alertes identiques (en secondes)
+COALESCE_WINDOW = 300
+
+# Nombre maximal d'alertes en attente de regroupement, puis par destination
+QUEUE_SIZE = 10000
+
+# Nombre maximal d'alertes d'un envoi, et délai maximal avant l'envoi d'un lot incomplet
+BATCH_SIZE = 50
+BATCH_DELAY = 2.0
+
+# Envois par minute autorisés par destination, et envois consécutifs tolérés
+RATE_PER_MINUTE = 30
+BURST = 5
+
+# Délai d'attente des connexions aux destinations (en secondes)
+SEND_TIMEOUT = 10
+
+# Délai maximal accordé aux envois en attente à la fermeture (en secondes)
+CLOSE_TIMEOUT = 30
+
+def alert_key(anomaly):
+    """
+    Clé de regroupement d'une anomalie : son type et sa source.
+
+    Args:
+        anomaly (dict): Anomalie détectée
+
+    Returns:
+        tuple: (type, première IP, ou compte visé, ou None)
+    """
+    ips = anomaly.get("ips")
+    return anomaly["type"], ips[0] if ips else anomaly.get("user")
+
+def format_alert(alert):
+    """
+    Met en forme une alerte sur une ligne.
+
+    Args:
+        alert (dict): Alerte (voir ``AlertDispatcher``)
+
+    Returns:
+        str: Ligne lisible
+    """
+    repeated = f" (x{alert['count']} en {alert['last_received'] - alert['first_received']:.0f} s)" \
+        if alert["summary"] else ""
+    return f"[{alert['type']}]{repeated} {alert['entry']}"
+
+class TokenBucket:
+    """
+    Seau à jetons : ``rate`` jetons par seconde, au plus ``burst`` en réserve.
+    """
+
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate (float): Jetons ajoutés par seconde
+            burst (int): Nombre maximal de jetons en réserve
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def delay(self):
+        """
+        Prend un jeton s'il y en a un.
+
+        Returns:
+            float: 0 si un jeton a été pris, sinon délai avant le prochain jeton
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class Destination:
+    """
+    Destination d'alertes, servie par son propre fil.
+
+    Les sous-classes implémentent ``send`` (un lot d'alertes) et ``close`` ;
+    les erreurs d'envoi sont comptées et le lot abandonné, après une
+    nouvelle tentative sur une connexion neuve.
+    """
+
+    def __init__(self, name, rate_per_minute=RATE_PER_MINUTE, burst=BURST, batch_size=BATCH_SIZE,
+                 queue_size=QUEUE_SIZE):
+        """
+        Args:
+            name (str): Nom affiché dans les messages et les compteurs
+            rate_per_minute (float): Envois autorisés par minute
+            burst (int): Envois consécutifs tolérés
+            batch_size (int): Nombre maximal d'alertes par envoi
+            queue_size (int): Nombre maximal d'alertes en attente
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.batch_size = batch_size
+        self.queue = queue.Queue(queue_size)
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name=f"loglens-alerts-{name}", daemon=True)
+
+    def start(self):
+        """Démarre le fil d'envoi."""
+        self._thread.start()
+
+    def put(self, alert):
+        """
+        Dépose une alerte sans attendre ; abandonnée et comptée si la file est pleine.
+
+        Args:
+            alert (dict): Alerte à envoyer
+        """
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Regroupe les alertes en lots et les envoie au rythme du seau à jetons."""
+        batch = []
+        deadline = None
+        stopping = False
+        while not stopping or batch:
+            if not stopping:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                try:
+                    alert = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    alert = False
+                if alert is None:
+                    stopping = True
+                elif alert:
+                    batch.append(alert)
+                    if deadline is None:
+                        deadline = time.monotonic() + BATCH_DELAY
+                    if len(batch) < self.batch_size and time.monotonic() < deadline:
+                        continue
+                elif time.monotonic() < deadline:
+                    continue
+            if not batch:
+                continue
+
+            # Pas de jeton : le lot continue de grossir jusqu'à batch_size
+            wait = self.bucket.delay()
+            if wait > 0 and not stopping and len(batch) < self.batch_size:
+                deadline = time.monotonic() + wait
+                continue
+            if wait > 0:
+                time.sleep(wait)
+                self.bucket.delay()
+
+            chunk, batch = batch[:self.batch_size], batch[self.batch_size:]
+            deadline = time.monotonic() + BATCH_DELAY if batch else None
+            self._deliver(chunk)
+        self.close()
+
+    def _deliver(self, chunk):
+        """Envoie un lot, avec une nouvelle tentative sur une connexion neuve."""
+        for attempt in (1, 2):
+            try:
+                self.send(chunk)
+                self.sent += len(chunk)
+                self.batches += 1
+                return
+            except Exception as e:
+                self.reset()
+                if attempt == 2:
+                    self.failed += len(chunk)
+                    log_error(f"Échec de l'envoi de {len(chunk)} alerte(s) vers {self.name}: {str(e)}")
+
+    def stop(self, timeout=CLOSE_TIMEOUT):
+        """
+        Envoie les alertes en attente puis arrête le fil.
+
+        Args:
+            timeout (float): Délai maximal d'attente du fil
+        """
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+    def send(self, alerts):
+        """
+        Envoie un lot d'alertes.
+
+        Args:
+            alerts (list): Alertes à envoyer
+
+        Raises:
+            Exception: En cas d'échec de l'envoi
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """Ferme la connexion courante, rouverte au prochain envoi."""
+
+    def close(self):
+        """Libère les connexions de la destination."""
+        self.reset()
+
+class WebhookDestination(Destination):
+    """
+    Webhook HTTP(S) : un POST JSON par lot sur une connexion keep-alive.
+
+    Le corps est ``{"alerts": [...]}`` ; au format ``slack``, il suit le
+    format des webhooks entrants de Slack (``{"text": ...}``).
+    """
+
+    def __init__(self, url, slack=False, **options):
+        """
+        Args:
+            url (str): URL du webhook
+            slack (bool): Corps au format des webhooks entrants de Slack
+            **options: Voir ``Destination``
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"URL de webhook invalide: {url}")
+        super().__init__(parts.hostname if not slack else "slack", **options)
+        self.parts = parts
+        self.slack = slack
+        self._connection = None
+
+    def _connect(self):
+        parts = self.parts
+        if parts.scheme == "https":
+            return http.client.HTTPSConnection(parts.hostname, parts.port, timeout=SEND_TIMEOUT)
+        return http.client.HTTPConnection(parts.hostname, parts.port, timeout=SEND_TIMEOUT)
+
+    def send(self, alerts):
+        if self.slack:
+            payload = {"text": "\n".join(format_alert(alert) for alert in alerts)}
+        else:
+            payload = {"source": "loglens", "alerts": alerts}
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        if self._connection is None:
+            self._connection = self._connect()
+        path = self.parts.path or "/"
+        if self.parts.query:
+            path += "?" + self.parts.query
+        self._connection.request("POST", path, body, {"Content-Type": "application/json; charset=utf-8"})
+        response = self._connection.getresponse()
+        response.read()
+        if response.getheader("Connection", "").lower() == "close":
+            self.reset()
+        if response.status >= 300:
+            raise OSError(f"réponse HTTP {response.status}")
+
+    def reset(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+class EmailDestination(Destination):
+    """Email : un message par lot, sur une session SMTP réutilisée d'un lot à l'autre."""
+
+    def __init__(self, recipients, host="localhost", port=25, sender="loglens@localhost",
+                 starttls=False, username=None, password=None, **options):
+        """
+        Args:
+            recipients (list): Adresses des destinataires
+            host (str): Serveur SMTP
+            port (int): Port SMTP
+            sender (str): Adresse de l'expéditeur
+            starttls (bool): Chiffrer la session par STARTTLS
+            username (str): Compte SMTP (optionnel)
+            password (str): Mot de passe SMTP (optionnel)
+            **options: Voir ``Destination``
+        """
+        super().__init__(f"smtp:{host}", **options)
+        self.recipients = list(recipients)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.starttls = starttls
+        self.username = username
+        self.password = password
+        self._smtp = None
+
+    def send(self, alerts):
+        if self._smtp is None:
+            self._smtp = smtplib.SMTP(self.host, self.port, timeout=SEND_TIMEOUT)
+            if self.starttls:
+                self._smtp.starttls()
+            if self.username:
+                self._smtp.login(self.username, self.password or "")
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        types = sorted({alert["type"] for alert in alerts})
+        message["Subject"] = f"[LogLens] {len(alerts)} alerte(s) : {', '.join(types)}"
+        message.set_content("\n".join(format_alert(alert) for alert in alerts) + "\n")
+        self._smtp.send_message(message)
+
+    def reset(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+class AlertDispatcher:
+    """
+    Répartiteur d'alertes : filtrage, regroupement, puis envoi par les destinations.
+
+    Une alerte transmise aux destinations est un dictionnaire JSON : les
+    champs NDJSON de l'anomalie (voir ``sinks.anomaly_record``), le nombre
+    d'essais des attaques brute force, ``count`` (occurrences de la
+    fenêtre), ``summary`` (vrai pour une synthèse de fin de fenêtre, qui
+    reprend la dernière occurrence) et ``first_received``/``last_received``
+    (heures de réception, en secondes depuis l'epoch).
+    """
+
+    def __init__(self, destinations, types=DEFAULT_ALERT_TYPES, window=COALESCE_WINDOW, queue_size=QUEUE_SIZE):
+        """
+        Args:
+            destinations (list): Destinations (``Destination``)
+            types (iterable): Catégories alertées, None pour toutes
+            window (float): Fenêtre de regroupement en secondes (0 : aucun regroupement)
+            queue_size (int): Nombre maximal d'anomalies en attente de regroupement
+        """
+        self.destinations = list(destinations)
+        self.types = frozenset(types) if types is not None else None
+        self.window = window
+        self.queue = queue.Queue(queue_size)
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # Clé -> [alerte envoyée, fin de fenêtre, répétitions non envoyées, dernière répétition]
+        self._recent = {}
+        self._thread = threading.Thread(target=self._run, name="loglens-alerts", daemon=True)
+        for destination in self.destinations:
+            destination.start()
+        self._thread.start()
+
+    def submit(self, anomaly):
+        """
+        Propose une anomalie ; ne bloque jamais.
+
+        Les anomalies des catégories non alertées sont ignorées ; une file
+        pleine abandonne l'anomalie.
+
+        Args:
+            anomaly (dict): Anomalie détectée
+        """
+        if self.types is not None and anomaly["type"] not in self.types:
+            return
+        self.submitted += 1
+        try:
+            self.queue.put_nowait(anomaly)
+        except queue.Full:
+            self.dropped += 1
+
+    def _alert(self, anomaly, now):
+        """Construit l'alerte envoyée pour une anomalie."""
+        alert = anomaly_record(anomaly)
+        if "attempts" in anomaly:
+            alert["attempts"] = anomaly["attempts"]
+        alert["count"] = 1
+        alert["summary"] = False
+        alert["first_received"] = alert["last_received"] = now
+        return alert
+
+    def _dispatch(self, alert):
+        for destination in self.destinations:
+            destination.put(alert)
+
+    def _coalesce(self, anomaly, now):
+        """Envoie la première occurrence d'une clé par fenêtre, compte les suivantes."""
+        if not self.window:
+            self._dispatch(self._alert(anomaly, now))
+            return
+        key = alert_key(anomaly)
+        recent = self._recent.get(key)
+        if recent is not None and now < recent[1]:
+            recent[2] += 1
+            recent[3] = anomaly
+            self.coalesced += 1
+            return
+        if recent is not None:
+            self._summarize(recent)
+        alert = self._alert(anomaly, now)
+        self._recent[key] = [alert, now + self.window, 0, None]
+        self._dispatch(alert)
+
+    def _summarize(self, recent):
+        """Envoie l'alerte de synthèse des répétitions d'une fenêtre terminée."""
+        alert, _, repeated, last = recent
+        if repeated:
+            summary = self._alert(last, alert["first_received"])
+            summary["count"] = repeated + 1
+            summary["summary"] = True
+            summary["last_received"] = time.time()
+            self._dispatch(summary)
+
+    def _expire(self, now, force=False):
+        """Termine les fenêtres échues (toutes si ``force``)."""
+        for key in [key for key, recent in self._recent.items() if force or now >= recent[1]]:
+            self._summarize(self._recent.pop(key))
+
+    def _run(self):
+        next_sweep = time.monotonic() + 1.0
+        while True:
+            try:
+                anomaly = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                anomaly = False
+            if anomaly is None:
+                break
+            now = time.time()
+            if anomaly:
+                self._coalesce(anomaly, now)
+            if time.monotonic() >= next_sweep:
+                self._expire(now)
+                next_sweep = time.monotonic() + 1.0
+        self._expire(time.time(), force=True)
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Envoie les alertes en attente (synthèses comprises) et arrête les fils.
+
+        Args:
+            timeout (float): Délai maximal accordé aux envois
+
+        Returns:
+            dict: Compteurs (proposées, regroupées, abandonnées, puis par destination)
+        """
+        deadline = time.monotonic() + timeout
+        self.queue.put(None)
+        self._thread.join(max(deadline - time.monotonic(), 0))
+        for destination in self.destinations:
+            destination.stop(max(deadline - time.monotonic(), 0))
+        counters = {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "destinations": {destination.name: {"sent": destination.sent, "batches": destination.batches,
+                                                "dropped": destination.dropped, "failed": destination.failed}
+                             for destination in self.destinations},
+        }
+        stuck = [destination.name for destination in self.destinations if destination._thread.is_alive()]
+        if stuck:
+            log_warning(f"Alertes non envoyées à l'arrêt vers : {', '.join(stuck)}")
+        return counters
@@ -0,0 +1,261 @@
+"""
+Module de points de reprise pour LogLens.
+
+Enregistre, pour chaque fichier analysé, la position atteinte, ainsi que
+l'état de l'analyse (compteurs de brute force, agrégats du résumé), afin
+qu'une nouvelle exécution n'analyse que les données ajoutées depuis.
+"""
+
+import hashlib
+import json
+import os
+
+from .inputs import is_compressed, open_binary
+from .parser import iter_relevant_lines
+from .utils import log_info, log_warning, log_error
+
+# Version du format du fichier d'état
+STATE_VERSION = 2
+
+# Nombre d'octets du début de fichier utilisés pour reconnaître un fichier
+HEAD_SIZE = 1024
+
+def hash_head(f, size=HEAD_SIZE):
+    """
+    Calcule l'empreinte du début d'un fichier.
+
+    Args:
+        f (file): Fichier ouvert en mode binaire
+        size (int): Nombre d'octets à prendre en compte
+
+    Returns:
+        tuple: (empreinte hexadécimale, nombre d'octets effectivement lus)
+    """
+    f.seek(0)
+    head = f.read(size)
+    return hashlib.sha256(head).hexdigest(), len(head)
+
+class StateFile:
+    """
+    Fichier d'état JSON contenant un point de reprise par fichier analysé et
+    l'état cumulé de l'analyse.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Chemin du fichier d'état, None pour un état en mémoire
+                seulement (démon)
+        """
+        self.path = path
+        self.inputs = {}
+        self.pipeline = None
+        self.load()
+
+    def load(self):
+        """Charge le fichier d'état s'il existe."""
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                log_warning(f"Version du fichier d'état {self.path} non supportée, état ignoré")
+                return
+            self.inputs = data.get("inputs", {})
+            self.pipeline = data.get("pipeline")
+        except (OSError, ValueError) as e:
+            log_error(f"Erreur lors de la lecture du fichier d'état {self.path}: {str(e)}")
+
+    def save(self):
+        """Enregistre le fichier d'état de manière atomique."""
+        if self.path is None:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": STATE_VERSION, "inputs": self.inputs, "pipeline": self.pipeline},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log_error(f"Erreur lors de l'enregistrement du fichier d'état {self.path}: {str(e)}")
+
+    def get(self, filepath):
+        """
+        Retourne le point de reprise d'un fichier.
+
+        Args:
+            filepath (str): Chemin du fichier analysé
+
+        Returns:
+            dict or None: Point de reprise enregistré
+        """
+        return self.inputs.get(os.path.abspath(filepath))
+
+    def set(self, filepath, checkpoint):
+        """
+        Enregistre le point de reprise d'un fichier.
+
+        Args:
+            filepath (str): Chemin du fichier analysé
+            checkpoint (dict): Point de reprise
+        """
+        self.inputs[os.path.abspath(filepath)] = checkpoint
+
+    def find_by_content(self, f, size):
+        """
+        Cherche un point de reprise dont le début de fichier correspond.
+
+        Permet de reconnaître un fichier renommé par la rotation
+        (auth.log devenu auth.log.1 ou auth.log.2.gz).
+
+        Args:
+            f (file): Fichier ouvert en mode binaire (décompressé)
+            size (int): Taille du fichier, None si inconnue (fichier compressé)
+
+        Returns:
+            tuple: (chemin enregistré, point de reprise), ou (None, None)
+        """
+        hashes = {}
+        for path, checkpoint in self.inputs.items():
+            head_size = checkpoint.get("head_size", 0)
+            if head_size == 0 or (size is not None and size < head_size):
+                continue
+            if head_size not in hashes:
+                hashes[head_size] = hash_head(f, head_size)
+            head_hash, read = hashes[head_size]
+            if read == head_size and head_hash == checkpoint["head_hash"]:
+                return path, checkpoint
+        return None, None
+
+    def claim(self, old_path, filepath):
+        """
+        Rattache le point de reprise d'un fichier renommé à son nouveau chemin.
+
+        Args:
+            old_path (str): Chemin enregistré (absolu)
+            filepath (str): Nouveau chemin du fichier
+
+        Returns:
+            dict: Point de reprise rattaché
+        """
+        checkpoint = self.inputs.pop(old_path)
+        self.set(filepath, checkpoint)
+        return checkpoint
+
+def _matches(f, checkpoint, size):
+    """
+    Indique si un fichier ouvert est celui décrit par un point de reprise.
+
+    Args:
+        f (file): Fichier ouvert en mode binaire (décompressé)
+        checkpoint (dict): Point de reprise
+        size (int): Taille du fichier, None si inconnue (fichier compressé)
+
+    Returns:
+        bool: True si le début du fichier est inchangé et qu'il n'a pas été tronqué
+    """
+    if size is not None and (size < checkpoint["offset"] or size < checkpoint["head_size"]):
+        return False
+    head_hash, read = hash_head(f, checkpoint["head_size"])
+    return read == checkpoint["head_size"] and head_hash == checkpoint["head_hash"]
+
+def _find_rotated(filepath, checkpoint):
+    """
+    Cherche, dans le répertoire du fichier, l'ancien fichier après rotation.
+
+    Args:
+        filepath (str): Chemin du fichier analysé
+        checkpoint (dict): Point de reprise contenant l'inode de l'ancien fichier
+
+    Returns:
+        str or None: Chemin du fichier renommé (ex. auth.log.1), s'il existe
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    basename = os.path.basename(filepath)
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return None
+    for name in names:
+        if name == basename or not name.startswith(basename):
+            continue
+        candidate = os.path.join(directory, name)
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if st.st_ino == checkpoint.get("inode") and st.st_dev == checkpoint.get("device"):
+            return candidate
+    return None
+
+def iter_new_lines(filepath, state_file, keywords=None):
+    """
+    Lit les lignes ajoutées à un fichier depuis son point de reprise.
+
+    Le fichier est reconnu par son chemin ou, après une rotation, par le
+    début de son contenu. Si le fichier a été remplacé et que l'ancien est
+    retrouvé à côté (ex. auth.log.1), la fin de l'ancien est lue avant le
+    nouveau fichier. Les fichiers compressés, figés après rotation, sont
+    ignorés une fois lus entièrement.
+
+    Args:
+        filepath (str): Chemin du fichier analysé
+        state_file (StateFile): Fichier d'état, mis à jour au fil de la lecture
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+
+    Yields:
+        str: Entrées pertinentes des lignes complètes nouvellement lues
+    """
+    compressed = is_compressed(filepath)
+
+    with open_binary(filepath) as f:
+        size = None if compressed else os.fstat(f.fileno()).st_size
+        checkpoint = state_file.get(filepath)
+        offset = 0
+
+        if checkpoint and _matches(f, checkpoint, size):
+            offset = checkpoint["offset"]
+        else:
+            old_path, moved = state_file.find_by_content(f, size)
+            if moved is not None and (size is None or size >= moved["offset"]):
+                log_info(f"{filepath} reconnu comme {old_path} après rotation")
+                checkpoint = state_file.claim(old_path, filepath)
+                offset = checkpoint["offset"]
+            elif checkpoint and not compressed:
+                rotated = _find_rotated(filepath, checkpoint)
+                if rotated:
+                    log_info(f"Rotation détectée, lecture de la fin de {rotated}")
+                    with open(rotated, "rb") as old:
+                        if _matches(old, checkpoint, os.fstat(old.fileno()).st_size):
+                            old.seek(checkpoint["offset"])
+                            yield from iter_relevant_lines(old, keywords=keywords)
+                else:
+                    log_info(f"{filepath} a changé depuis la dernière exécution, analyse depuis le début")
+                checkpoint = None
+            else:
+                checkpoint = None
+
+        if checkpoint is not None and compressed and checkpoint.get("complete"):
+            log_info(f"{filepath} déjà analysé entièrement, ignoré")
+            return
+        if offset:
+            log_info(f"Reprise de {filepath} à l'octet {offset}")
+
+        head_hash, head_size = hash_head(f)
+        checkpoint = {
+            "inode": None if compressed else os.fstat(f.fileno()).st_ino,
+            "device": None if compressed else os.fstat(f.fileno()).st_dev,
+            "head_hash": head_hash,
+            "head_size": head_size,
+            "offset": offset,
+            "complete": False
+        }
+        state_file.set(filepath, checkpoint)
+
+        # Une dernière ligne sans fin de ligne est laissée pour l'exécution
+        # suivante, sauf pour un fichier compressé, figé après rotation
+        f.seek(offset)
+        consumed = yield from iter_relevant_lines(f, final=compressed, keywords=keywords)
+        checkpoint["offset"] = offset + consumed
+        checkpoint["complete"] = compressed
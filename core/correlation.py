@@ -0,0 +1,327 @@
+"""
+Module de corrélation d'événements de LogLens.
+
+Détecte les attaques en plusieurs étapes (par exemple scan de ports, puis
+échecs d'authentification, puis connexion réussie, puis sudo depuis la
+même IP) au fil du flux. Chaque règle de ``CORRELATION_RULES`` est une
+suite d'étapes à franchir dans une fenêtre de temps ; elle est compilée
+en automate, dont l'état est tenu séparément pour chaque entité (IP,
+compte ou hôte).
+
+Chaque événement coûte un accès par règle concernée par sa catégorie.
+Les correspondances partielles sont oubliées une fois leur fenêtre
+écoulée, et au plus ``max_keys`` entités sont suivies par règle : la
+mémoire reste bornée sur des mois de logs comme en suivi continu. L'état
+est sérialisable en JSON, pour les points de reprise.
+"""
+
+import re
+from collections import OrderedDict
+from .detector import AUTH_FAILURE_TYPE, SUCCESSFUL_LOGON_EVENT, as_record
+from .record import RecordParser
+from .timestamps import format_epoch
+
+# Catégorie des connexions réussies, qui ne sont pas des anomalies
+LOGIN_TYPE = "Connexion Réussie"
+
+# Connexions réussies (plus étroit que detector.LOGIN_PATTERN : les sessions
+# ouvertes par cron ou sudo ne sont pas des connexions)
+LOGIN_PATTERN = re.compile(r"accepted (?:password|publickey|keyboard-interactive)|successful login|logon success",
+                           re.IGNORECASE)
+
+# Compte ayant lancé une commande sudo ("sudo:    bob : TTY=... ; COMMAND=...")
+SUDO_USER_PATTERN = re.compile(r"\bsudo(?:\[\d+\])?:\s+(\S+) : ")
+
+# Mots-clés ajoutés au filtrage des lignes : connexions réussies, commandes
+# sudo et scans de ports ne contiennent souvent aucun des mots-clés de
+# parser.KEYWORDS, mais sont des étapes des règles
+KEYWORDS = ["accepted", "successful login", "logon success", "sudo", "port scan", "sequential ports"]
+
+# Règles de corrélation : nom (type de l'anomalie produite) -> entité
+# suivie ("ip", "user" ou "host"), fenêtre en secondes depuis la première
+# étape, et étapes. Une étape est une catégorie d'anomalie (ou LOGIN_TYPE),
+# éventuellement accompagnée du nombre d'occurrences requises.
+CORRELATION_RULES = {
+    "Intrusion Multi-étapes": {
+        "key": "ip",
+        "window": 3600,
+        "steps": ["Scan de Ports", (AUTH_FAILURE_TYPE, 3), LOGIN_TYPE, "Tentative d'Élévation de Privilèges"]
+    },
+    "Compte Compromis": {
+        "key": "user",
+        "window": 1800,
+        "steps": [(AUTH_FAILURE_TYPE, 5), LOGIN_TYPE, "Tentative d'Élévation de Privilèges"]
+    }
+}
+
+# Nombre maximal d'entités suivies simultanément par règle (les moins
+# récemment vues sont oubliées au-delà), et de comptes associés à une IP
+CORRELATION_MAX_KEYS = 100000
+
+class PartialMatch:
+    """
+    Progression d'une entité dans une règle.
+
+    ``step`` est l'étape attendue, ``hits`` le nombre d'occurrences déjà vues
+    de cette étape ; la première entrée de chaque étape franchie est gardée
+    en exemple.
+    """
+
+    __slots__ = ("step", "hits", "started", "last", "examples")
+
+    def __init__(self, started):
+        self.step = 0
+        self.hits = 0
+        self.started = started
+        self.last = started
+        self.examples = []
+
+    def to_list(self):
+        """Sérialise l'état en liste JSON."""
+        return [self.step, self.hits, self.started, self.last, self.examples]
+
+    @classmethod
+    def from_list(cls, data):
+        """Restaure un état produit par ``to_list``."""
+        match = cls(data[2])
+        match.step, match.hits, _, match.last, match.examples = data
+        return match
+
+class CompiledRule:
+    """
+    Règle compilée : table des étapes (catégorie, occurrences requises).
+    """
+
+    def __init__(self, name, key, window, steps):
+        """
+        Args:
+            name (str): Nom de la règle, type des anomalies produites
+            key (str): Entité suivie ("ip", "user" ou "host")
+            window (int): Durée maximale de la séquence en secondes
+            steps (list): Catégories, ou tuples (catégorie, occurrences requises)
+
+        Raises:
+            ValueError: Si l'entité ou les étapes sont invalides
+        """
+        if key not in ("ip", "user", "host"):
+            raise ValueError(f"Entité de corrélation inconnue pour '{name}': {key}")
+        self.name = name
+        self.key = key
+        self.window = window
+        self.steps = tuple((step, 1) if isinstance(step, str) else (step[0], int(step[1])) for step in steps)
+        if not self.steps or any(count < 1 for _, count in self.steps):
+            raise ValueError(f"Étapes de corrélation invalides pour '{name}'")
+        # Correspondances partielles, de la moins récemment vue à la plus récemment vue
+        self.matches = OrderedDict()
+
+def compile_rules(rules):
+    """
+    Compile des règles de corrélation.
+
+    Args:
+        rules (dict): Règles au format de ``CORRELATION_RULES``
+
+    Returns:
+        tuple: (règles compilées, index catégorie -> règles ayant une étape de cette catégorie)
+    """
+    compiled = [CompiledRule(name, rule["key"], rule["window"], rule["steps"]) for name, rule in rules.items()]
+    by_type = {}
+    for rule in compiled:
+        for step_type in dict.fromkeys(step_type for step_type, _ in rule.steps):
+            by_type.setdefault(step_type, []).append(rule)
+    return compiled, by_type
+
+class Correlator:
+    """
+    Moteur de corrélation en flux.
+
+    Reçoit chaque entrée avec sa classification (``observe``) et produit
+    une anomalie par séquence complète. L'entité d'un événement est la
+    première IP de l'entrée, son compte ou son hôte ; une commande sudo,
+    sans IP, est rattachée à l'IP de la dernière connexion réussie de ce
+    compte sur cet hôte.
+    """
+
+    def __init__(self, rules=None, max_keys=CORRELATION_MAX_KEYS):
+        """
+        Args:
+            rules (dict): Règles au format de ``CORRELATION_RULES`` (défaut: CORRELATION_RULES)
+            max_keys (int): Nombre maximal d'entités suivies par règle
+        """
+        self.rules, self.by_type = compile_rules(CORRELATION_RULES if rules is None else rules)
+        self.max_keys = max_keys
+        self.records = RecordParser()
+        # (hôte, compte) -> IP de la dernière connexion réussie
+        self.sessions = OrderedDict()
+        # Dernier horodatage vu, utilisé pour les entrées sans horodatage
+        self.clock = 0
+
+    def observe(self, entry, anomaly):
+        """
+        Fait avancer les règles concernées par une entrée.
+
+        Args:
+            entry (LogRecord or str): Entrée de log analysée
+            anomaly (dict): Anomalie détectée pour cette entrée, ou None
+
+        Returns:
+            list: Anomalies des séquences complétées par cette entrée (souvent vide)
+        """
+        if anomaly is not None:
+            event_type = anomaly["type"]
+            rules = self.by_type.get(event_type)
+            if rules is None:
+                return []
+            record = as_record(entry, self.records)
+        else:
+            record = as_record(entry, self.records)
+            if record.event_id is not None:
+                if record.event_id != SUCCESSFUL_LOGON_EVENT:
+                    return []
+            elif LOGIN_PATTERN.search(record.line) is None:
+                return []
+            event_type = LOGIN_TYPE
+            rules = self.by_type.get(LOGIN_TYPE)
+
+        timestamp = record.timestamp
+        if timestamp is not None:
+            self.clock = timestamp
+        now = self.clock
+
+        ip = record.ips[0] if record.ips else None
+        user = record.user
+        if user is None and record.program == "sudo":
+            match = SUDO_USER_PATTERN.search(record.line)
+            if match is not None:
+                user = match.group(1)
+        if event_type == LOGIN_TYPE and ip and user:
+            self._bind(record.host, user, ip)
+        elif ip is None and user is not None:
+            ip = self.sessions.get((record.host, user))
+
+        if not rules:
+            return []
+        entities = {"ip": ip, "user": user, "host": record.host}
+        completed = []
+        for rule in rules:
+            value = entities[rule.key]
+            if value is not None:
+                anomaly = self._advance(rule, value, event_type, record, entities, now)
+                if anomaly is not None:
+                    completed.append(anomaly)
+        return completed
+
+    def _bind(self, host, user, ip):
+        """Associe un compte connecté sur un hôte à l'IP d'origine de la connexion."""
+        sessions = self.sessions
+        key = (host, user)
+        if key in sessions:
+            sessions.move_to_end(key)
+        sessions[key] = ip
+        if len(sessions) > self.max_keys:
+            sessions.popitem(last=False)
+
+    def _advance(self, rule, value, event_type, record, entities, now):
+        """
+        Fait avancer l'automate d'une entité pour une règle.
+
+        Returns:
+            dict or None: Anomalie si la séquence vient d'être complétée
+        """
+        matches = rule.matches
+        match = matches.get(value)
+        if match is not None and now - match.started > rule.window:
+            del matches[value]
+            match = None
+        if match is None:
+            if event_type != rule.steps[0][0]:
+                return None
+            match = PartialMatch(now)
+            matches[value] = match
+            if len(matches) > self.max_keys:
+                matches.popitem(last=False)
+        else:
+            step_type = rule.steps[match.step][0]
+            if event_type != step_type:
+                return None
+            matches.move_to_end(value)
+
+        step_type, required = rule.steps[match.step]
+        if match.hits == 0:
+            match.examples.append(record.line)
+        match.hits += 1
+        match.last = now
+        if match.hits >= required:
+            match.step += 1
+            match.hits = 0
+        self._expire(rule, now)
+        if match.step < len(rule.steps):
+            return None
+        matches.pop(value, None)
+        return self._anomaly(rule, value, match, record, entities)
+
+    def _expire(self, rule, now):
+        """Oublie les correspondances partielles inactives depuis plus d'une fenêtre."""
+        matches = rule.matches
+        limit = now - rule.window
+        while matches:
+            value = next(iter(matches))
+            if matches[value].last >= limit:
+                break
+            del matches[value]
+
+    def _anomaly(self, rule, value, match, record, entities):
+        """Construit l'anomalie d'une séquence complète."""
+        chain = " → ".join(step if count == 1 else f"{step} (x{count})" for step, count in rule.steps)
+        subject = {"ip": f"depuis {value}", "user": f"sur le compte {value}", "host": f"sur l'hôte {value}"}[rule.key]
+        period = ""
+        if match.started and match.last:
+            period = f", du {format_epoch(match.started)} au {format_epoch(match.last)}"
+        ip = entities["ip"]
+        return {
+            "type": rule.name,
+            "entry": f"{chain} {subject}{period}",
+            "details": list(match.examples),
+            "pattern": rule.name,
+            "ips": [ip] if ip else [],
+            "timestamp": record.timestamp,
+            "host": record.host,
+            "program": record.program,
+            "user": entities["user"],
+            "first_seen": match.started,
+            "last_seen": match.last
+        }
+
+    def get_state(self):
+        """
+        Retourne l'état du moteur sous une forme sérialisable en JSON.
+
+        Returns:
+            dict: Horloge, correspondances partielles par règle et connexions associées
+        """
+        return {
+            "clock": self.clock,
+            "rules": {rule.name: [[value] + match.to_list() for value, match in rule.matches.items()]
+                      for rule in self.rules},
+            "sessions": [[host, user, ip] for (host, user), ip in self.sessions.items()]
+        }
+
+    def set_state(self, state):
+        """
+        Restaure l'état produit par ``get_state``.
+
+        Les correspondances des règles qui n'existent plus, ou dont les
+        étapes ne correspondent plus, sont ignorées.
+
+        Args:
+            state (dict): État du moteur
+        """
+        self.clock = state.get("clock", 0)
+        saved = state.get("rules", {})
+        for rule in self.rules:
+            rule.matches = OrderedDict()
+            for value, *data in saved.get(rule.name, []):
+                match = PartialMatch.from_list(data)
+                if match.step < len(rule.steps):
+                    rule.matches[value] = match
+        self.sessions = OrderedDict(((host, user), ip) for host, user, ip in state.get("sessions", []))
@@ -0,0 +1,526 @@
+"""
+Module du démon d'analyse de LogLens.
+
+Un processus de longue durée garde en mémoire, d'une requête à l'autre,
+les règles compilées, les compteurs de brute force par IP et par compte,
+les agrégats du résumé et les positions atteintes dans les fichiers déjà
+ingérés. Les tâches cron et les scripts d'orchestration (SOAR) lui
+envoient leurs requêtes sans payer le démarrage de l'interpréteur ni la
+reconstruction de cet état.
+
+L'API est en HTTP, sur un socket Unix (``curl --unix-socket``) ou sur un
+port local, et répond en JSON :
+
+- ``POST /ingest`` : lignes de log (``{"lines": [...]}``) ou fichier
+  (``{"path": ...}``, seules les lignes ajoutées depuis la requête
+  précédente sont lues) analysés dans l'état partagé ;
+- ``POST /analyze`` : analyse isolée de fichiers, sans toucher à l'état ;
+- ``GET /query`` : résumé de l'état, ou compteurs d'une IP ou d'un compte ;
+- ``GET /status``, ``POST /save``, ``POST /reset``.
+
+Le démon lit les fichiers qu'on lui désigne, aussi son accès est-il
+restreint : le socket Unix n'est accessible qu'à son propriétaire, le
+port HTTP exige un jeton (``Authorization: Bearer ...``) et un en-tête
+``Host`` local, les requêtes POST doivent être en JSON (un formulaire
+d'une page web ne peut donc pas les émettre), et seuls les fichiers
+situés sous les répertoires autorisés peuvent être lus.
+"""
+
+import hmac
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from . import parser
+from .checkpoint import StateFile, iter_new_lines
+from .detector import BRUTE_FORCE_THRESHOLD, BRUTE_FORCE_WINDOW, BRUTE_FORCE_MAX_KEYS
+from .inputs import expand_inputs
+from .pipeline import AnalysisPipeline
+from .record import RecordParser, to_records
+from .sinks import anomaly_record
+from .summarizer import SummaryAccumulator
+from .utils import log_info, log_error
+
+# Port HTTP local par défaut
+DEFAULT_PORT = 8514
+
+# Nombre maximal d'anomalies renvoyées par défaut dans une réponse
+DEFAULT_LIMIT = 100
+
+# Taille maximale du corps d'une requête (en octets)
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Variable d'environnement du jeton exigé sur le port HTTP
+TOKEN_ENV = "LOGLENS_DAEMON_TOKEN"
+
+# Types de log acceptés pour les lignes envoyées dans le corps d'une requête
+LINE_LOG_TYPES = ("syslog", "auth", "windows", "json", "generic")
+
+class AnalysisDaemon:
+    """
+    État d'analyse partagé par les requêtes du démon.
+
+    Les requêtes qui lisent ou modifient l'état partagé sont sérialisées ;
+    les analyses isolées (``analyze``) s'exécutent en parallèle des autres.
+    """
+
+    def __init__(self, threshold=BRUTE_FORCE_THRESHOLD, window=BRUTE_FORCE_WINDOW,
+                 max_keys=BRUTE_FORCE_MAX_KEYS, sketches=False, correlate=False, state_path=None,
+                 roots=None):
+        """
+        Args:
+            threshold (int): Nombre d'échecs signalant une attaque brute force
+            window (int): Fenêtre de détection du brute force en secondes
+            max_keys (int): Nombre maximal d'IPs et de comptes suivis
+            sketches (bool): Résumé en mémoire bornée
+            correlate (bool): Corréler les événements en attaques multi-étapes
+            state_path (str): Fichier d'état restauré au démarrage et
+                enregistré à l'arrêt (état en mémoire seulement si None)
+            roots (list): Répertoires sous lesquels les fichiers peuvent être
+                lus (aucun fichier si vide)
+        """
+        self.options = (threshold, window, max_keys, sketches, correlate)
+        self.state_file = StateFile(state_path)
+        self.analysis = AnalysisPipeline(*self.options)
+        if self.state_file.pipeline is not None:
+            self.analysis.set_state(self.state_file.pipeline)
+            log_info(f"État restauré depuis {state_path} ({self.analysis.entries} entrées)")
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.roots = [os.path.realpath(root) for root in roots or []]
+
+    def count_request(self):
+        """Compte une requête reçue."""
+        with self.lock:
+            self.requests += 1
+
+    def check_path(self, filepath):
+        """
+        Vérifie qu'un fichier se trouve sous un répertoire autorisé, liens
+        symboliques résolus.
+
+        Args:
+            filepath (str): Chemin demandé
+
+        Raises:
+            PermissionError: Si le fichier est hors des répertoires autorisés
+        """
+        real = os.path.realpath(filepath)
+        if not any(os.path.commonpath([root, real]) == root for root in self.roots):
+            raise PermissionError(f"chemin non autorisé: {filepath}")
+
+    def ingest_lines(self, lines, log_type="syslog", limit=DEFAULT_LIMIT):
+        """
+        Analyse des lignes de log dans l'état partagé.
+
+        Args:
+            lines (list): Lignes de texte brutes
+            log_type (str): Type de log des lignes (voir ``LINE_LOG_TYPES``)
+            limit (int): Nombre maximal d'anomalies renvoyées
+
+        Returns:
+            dict: Entrées pertinentes, anomalies et alertes de brute force
+
+        Raises:
+            ValueError: Si le type de log est inconnu ou si ``lines`` n'est
+                pas une liste de chaînes
+        """
+        if log_type not in LINE_LOG_TYPES:
+            raise ValueError(f"type de log inconnu: {log_type} (types : {', '.join(LINE_LOG_TYPES)})")
+        # Une chaîne serait lue caractère par caractère, un nombre ferait échouer le filtrage
+        if not isinstance(lines, list) or not all(isinstance(line, str) for line in lines):
+            raise ValueError("\"lines\" doit être une liste de chaînes")
+        parse = RecordParser(log_type).parse
+        with self.lock:
+            keywords = self.analysis.keywords
+            entries = map(parse, parser.filter_lines(lines, keywords))
+            return self._ingest(parser.relevant_messages(entries, log_type, keywords), limit)
+
+    def ingest_file(self, filepath, limit=DEFAULT_LIMIT):
+        """
+        Analyse dans l'état partagé les lignes ajoutées à un fichier depuis
+        son ingestion précédente (rotation comprise, voir ``iter_new_lines``).
+
+        Args:
+            filepath (str): Chemin du fichier de log
+            limit (int): Nombre maximal d'anomalies renvoyées
+
+        Returns:
+            dict: Entrées pertinentes, anomalies et alertes de brute force
+
+        Raises:
+            ValueError: Si le fichier n'est pas un log ligne à ligne
+            PermissionError: Si le fichier est hors des répertoires autorisés
+            OSError: Si le fichier ne peut pas être lu
+        """
+        self.check_path(filepath)
+        log_type = parser.detect_log_type(filepath)
+        if log_type in parser.RECORD_LOG_TYPES:
+            raise ValueError(f"{filepath} n'est pas un log ligne à ligne (EVTX, export journald)")
+        with self.lock:
+            lines = iter_new_lines(filepath, self.state_file, self.analysis.keywords)
+            entries = parser.relevant_messages(to_records(lines, log_type), log_type, self.analysis.keywords)
+            return self._ingest(entries, limit)
+
+    def _ingest(self, entries, limit):
+        """Analyse des entrées dans l'état partagé (verrou tenu)."""
+        start = self.analysis.entries
+        anomalies = []
+        alerts = []
+        count = 0
+        for anomaly in self.analysis.process_batch(entries):
+            if anomaly.get("alert"):
+                alerts.append(anomaly_record(anomaly))
+                continue
+            count += 1
+            if len(anomalies) < limit:
+                anomalies.append(anomaly_record(anomaly))
+        return {
+            "entries": self.analysis.entries - start,
+            "anomaly_count": count,
+            "anomalies": anomalies,
+            "alerts": alerts,
+        }
+
+    def analyze(self, paths, limit=DEFAULT_LIMIT):
+        """
+        Analyse des fichiers indépendamment de l'état partagé.
+
+        Args:
+            paths (list): Chemins, motifs glob ou répertoires
+            limit (int): Nombre maximal d'anomalies renvoyées
+
+        Returns:
+            dict: Fichiers analysés, entrées, anomalies et résumé
+
+        Raises:
+            ValueError: Si aucun fichier ne correspond
+            PermissionError: Si un chemin est hors des répertoires autorisés
+        """
+        for path in paths:
+            if not any(c in path for c in "*?["):
+                self.check_path(path)
+        logfiles = expand_inputs(paths)
+        # Les motifs glob et les liens symboliques peuvent mener hors des répertoires
+        for logfile in logfiles:
+            self.check_path(logfile)
+        if not logfiles:
+            raise ValueError(f"aucun fichier: {' '.join(paths)}")
+        analysis = AnalysisPipeline(*self.options)
+        anomalies = []
+        count = 0
+        for anomaly in analysis.process_files(logfiles, threads=1):
+            count += 1
+            if len(anomalies) < limit:
+                anomalies.append(anomaly_record(anomaly))
+        return {
+            "files": logfiles,
+            "entries": analysis.entries,
+            "anomaly_count": count,
+            "types": dict(analysis.accumulator.types),
+            "anomalies": anomalies,
+            "summary": analysis.summary(),
+        }
+
+    def query(self, ip=None, user=None, top=10):
+        """
+        Interroge l'état partagé.
+
+        Args:
+            ip (str): Adresse IP dont renvoyer les compteurs
+            user (str): Compte dont renvoyer les compteurs de brute force
+            top (int): Nombre d'IPs les plus actives renvoyées
+
+        Returns:
+            dict: Compteurs de l'IP ou du compte demandés, sinon agrégats,
+            attaques brute force en cours et résumé
+        """
+        with self.lock:
+            brute_force = self.analysis.detector.brute_force
+            if ip is not None or user is not None:
+                result = {}
+                if ip is not None:
+                    result["ip"] = ip
+                    result["anomalies"] = self.analysis.accumulator.estimate_ip(ip)
+                    result["brute_force"] = self._key_state(brute_force, ("ip", ip))
+                if user is not None:
+                    result["user"] = user
+                    result["user_brute_force"] = self._key_state(brute_force, ("user", user))
+                return result
+
+            # Les attaques brute force complètent une copie des agrégats, comme
+            # à la fin d'une analyse, sans figer l'état partagé
+            attacks = self.analysis.detector.brute_force_anomalies()
+            accumulator = SummaryAccumulator.from_state(self.analysis.accumulator.get_state())
+            accumulator.update(attacks)
+            return {
+                "entries": self.analysis.entries,
+                "anomaly_count": self.analysis.accumulator.total,
+                "types": dict(self.analysis.accumulator.types),
+                "top_ips": [[address, count] for address, count in accumulator.ip_counter.most_common(top)],
+                "brute_force": [{"ips": attack["ips"], "user": attack["user"], "attempts": attack["attempts"],
+                                 "first_seen": attack["first_seen"], "last_seen": attack["last_seen"]}
+                                for attack in attacks],
+                "summary": accumulator.render(),
+            }
+
+    @staticmethod
+    def _key_state(brute_force, key):
+        """Échecs d'authentification suivis pour une clé, None si elle n'est pas suivie."""
+        state = brute_force.keys.get(key) or brute_force.detections.get(key)
+        if state is None:
+            return None
+        return {"failures": state.count, "first_seen": state.first, "last_seen": state.last,
+                "detected": state.detected_at is not None}
+
+    def status(self):
+        """
+        Retourne l'état du démon.
+
+        Returns:
+            dict: Durée de fonctionnement, requêtes, entrées et fichiers suivis
+        """
+        with self.lock:
+            return {
+                "uptime": time.time() - self.started,
+                "requests": self.requests,
+                "entries": self.analysis.entries,
+                "anomaly_count": self.analysis.accumulator.total,
+                "tracked_keys": len(self.analysis.detector.brute_force.keys),
+                "files": sorted(self.state_file.inputs),
+                "state_file": self.state_file.path,
+            }
+
+    def save(self):
+        """
+        Enregistre l'état partagé et les positions des fichiers dans le fichier d'état.
+
+        Returns:
+            bool: False sans fichier d'état
+        """
+        with self.lock:
+            if self.state_file.path is None:
+                return False
+            self.state_file.pipeline = self.analysis.get_state()
+            self.state_file.save()
+            return True
+
+    def reset(self):
+        """Oublie l'état partagé et les positions des fichiers."""
+        with self.lock:
+            self.analysis = AnalysisPipeline(*self.options)
+            self.state_file.inputs = {}
+            self.state_file.pipeline = None
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """Requêtes HTTP du démon : routage, lecture du corps et réponse JSON."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "LogLens"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        daemon = self.server.analysis_daemon
+        daemon.count_request()
+        error = self._check_access(method)
+        if error is not None:
+            # Le corps n'est pas lu : la connexion ne peut pas servir d'autre requête
+            self.close_connection = True
+            self._respond(*error)
+            return
+        try:
+            body = self._read_body()
+            route = (method, url.path.rstrip("/") or "/")
+            if route == ("GET", "/status"):
+                result = daemon.status()
+            elif route == ("GET", "/query"):
+                result = daemon.query(params.get("ip"), params.get("user"), int(params.get("top", 10)))
+            elif route == ("POST", "/ingest"):
+                result = self._ingest(daemon, body, params)
+            elif route == ("POST", "/analyze"):
+                request = self._json(body)
+                paths = request.get("paths") or ([request["path"]] if request.get("path") else [])
+                result = daemon.analyze(paths, int(request.get("limit", DEFAULT_LIMIT)))
+            elif route == ("POST", "/save"):
+                result = {"saved": daemon.save()}
+            elif route == ("POST", "/reset"):
+                daemon.reset()
+                result = {"reset": True}
+            else:
+                self._respond(404, {"error": f"route inconnue: {method} {url.path}"})
+                return
+        except (ValueError, KeyError, TypeError) as e:
+            self._respond(400, {"error": str(e)})
+            return
+        except PermissionError as e:
+            self._respond(403, {"error": str(e)})
+            return
+        except OSError as e:
+            self._respond(400, {"error": f"lecture impossible: {str(e)}"})
+            return
+        except Exception as e:
+            log_error(f"Erreur lors de la requête {method} {url.path}: {str(e)}")
+            self._respond(500, {"error": str(e)})
+            return
+        self._respond(200, result)
+
+    def _check_access(self, method):
+        """
+        Contrôle d'accès : jeton, en-tête ``Host`` et type du corps.
+
+        Returns:
+            tuple: Code et réponse d'erreur, None si la requête est acceptée
+        """
+        server = self.server
+        if server.token is not None:
+            authorization = self.headers.get("Authorization", "")
+            if not hmac.compare_digest(authorization.encode("utf-8"), f"Bearer {server.token}".encode("utf-8")):
+                return 401, {"error": "jeton absent ou invalide"}
+        # Un nom de domaine qui se résout vers 127.0.0.1 (DNS rebinding) ne doit
+        # pas donner accès au port local depuis une page web
+        if server.allowed_hosts is not None and self.headers.get("Host", "").lower() not in server.allowed_hosts:
+            return 403, {"error": f"en-tête Host refusé: {self.headers.get('Host', '')}"}
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if method == "POST" and content_type != "application/json":
+            return 415, {"error": "corps JSON attendu (Content-Type: application/json)"}
+        return None
+
+    def _ingest(self, daemon, body, params):
+        """
+        Ingestion : fichier (``{"path": ...}``) ou lignes
+        (``{"lines": [...], "log_type": ...}``).
+        """
+        request = self._json(body)
+        limit = int(request.get("limit", params.get("limit", DEFAULT_LIMIT)))
+        if request.get("path"):
+            return daemon.ingest_file(request["path"], limit)
+        return daemon.ingest_lines(request.get("lines", []), request.get("log_type", "syslog"), limit)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_SIZE:
+            raise ValueError(f"corps de requête trop volumineux ({length} octets)")
+        return self.rfile.read(length) if length else b""
+
+    @staticmethod
+    def _json(body):
+        request = json.loads(body or b"{}")
+        if not isinstance(request, dict):
+            raise ValueError("objet JSON attendu")
+        return request
+
+    def _respond(self, code, result):
+        data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Une ligne par requête ralentirait les clients à haute fréquence
+        pass
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serveur HTTP sur un socket Unix, un fil par connexion."""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # Attributs lus par BaseHTTPRequestHandler
+        self.server_name = "localhost"
+        self.server_port = 0
+
+def _remove_stale_socket(path):
+    """Supprime un socket Unix laissé par une exécution précédente."""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+def _allowed_hosts(host, port):
+    """En-têtes ``Host`` acceptés sur le port HTTP : adresse d'écoute et noms locaux."""
+    names = {"localhost", "127.0.0.1", "[::1]", host.lower(), f"[{host.lower()}]"}
+    return {f"{name}:{port}" for name in names}
+
+def create_server(daemon, socket_path=None, host="127.0.0.1", port=DEFAULT_PORT, token=None):
+    """
+    Ouvre le serveur HTTP du démon.
+
+    Args:
+        daemon (AnalysisDaemon): État partagé servi
+        socket_path (str): Socket Unix (prioritaire sur host/port)
+        host (str): Adresse d'écoute HTTP
+        port (int): Port d'écoute HTTP
+        token (str): Jeton exigé des clients (obligatoire sur le port HTTP)
+
+    Returns:
+        socketserver.BaseServer: Serveur prêt à ``serve_forever``
+
+    Raises:
+        ValueError: Si le port HTTP est demandé sans jeton
+        OSError: Si l'adresse est déjà utilisée ou inaccessible
+    """
+    if socket_path is None and not token:
+        raise ValueError(f"l'écoute sur un port exige un jeton ({TOKEN_ENV}), sinon utilisez un socket Unix")
+    if socket_path is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("sockets Unix non disponibles sur cette plateforme")
+        _remove_stale_socket(socket_path)
+        # Socket accessible au seul propriétaire dès sa création
+        previous = os.umask(0o177)
+        try:
+            server = UnixHTTPServer(socket_path, DaemonRequestHandler)
+        finally:
+            os.umask(previous)
+    else:
+        server = ThreadingHTTPServer((host, port), DaemonRequestHandler)
+        server.daemon_threads = True
+    # Le socket Unix est protégé par ses permissions : pas de contrôle du Host
+    server.allowed_hosts = None if socket_path is not None else _allowed_hosts(host, server.server_address[1])
+    server.token = token or None
+    server.analysis_daemon = daemon
+    return server
+
+def run_daemon(daemon, server, socket_path=None):
+    """
+    Sert les requêtes jusqu'à Ctrl+C ou SIGTERM, puis enregistre l'état.
+
+    Args:
+        daemon (AnalysisDaemon): État partagé servi
+        server (socketserver.BaseServer): Serveur ouvert par ``create_server``
+        socket_path (str): Socket Unix à supprimer à l'arrêt
+    """
+    def stop(signum, frame):
+        # shutdown() attend la fin de serve_forever : depuis un autre fil
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    previous = signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        server.server_close()
+        if socket_path is not None:
+            _remove_stale_socket(socket_path)
+        if daemon.save():
+            log_info(f"État enregistré dans {daemon.state_file.path}")
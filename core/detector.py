@@ -6,7 +6,13 @@ et identifier les anomalies de sécurité potentielles.
 """
 
 import re
-from .utils import log_info
+from collections import OrderedDict, deque
+from functools import lru_cache
+from .matcher import InstrumentedMatcher, compile_patterns
+from .record import LogRecord, RecordParser
+from .stats import get_stats
+from .timestamps import format_epoch, hour_of_day
+from .utils import log_info, log_warning
 
 # Définition des patterns d'anomalies
 PATTERNS = {
@@ -58,91 +64,665 @@ PATTERNS = {
     ]
 }
 
-def detect_anomalies(logs):
+# Moteur de correspondance compilé, reconstruit si PATTERNS est modifié
+_matcher = None
+_matcher_key = None
+
+def get_matcher():
     """
-    Détecte les anomalies dans une liste d'entrées de logs.
+    Retourne le moteur de correspondance compilé à partir de PATTERNS.
+    
+    Returns:
+        PatternMatcher: Moteur compilé (mis en cache)
+    """
+    global _matcher, _matcher_key
+    key = tuple((category, tuple(patterns)) for category, patterns in PATTERNS.items())
+    if _matcher is None or key != _matcher_key:
+        _matcher = compile_patterns(PATTERNS)
+        _matcher_key = key
+    return _matcher
+
+# Catégorie utilisée pour le comptage des tentatives de brute force
+AUTH_FAILURE_TYPE = "Échec Auth"
+
+# Nombre d'échecs à partir duquel une IP ou un compte est signalé
+BRUTE_FORCE_THRESHOLD = 3
+
+# Durée (en secondes) dans laquelle les échecs doivent survenir
+BRUTE_FORCE_WINDOW = 600
+
+# Nombre maximal d'IPs et de comptes suivis simultanément (les moins
+# récemment vus sont oubliés au-delà)
+BRUTE_FORCE_MAX_KEYS = 100000
+
+# Nombre d'entrées conservées en exemple pour chaque attaque
+BRUTE_FORCE_EXAMPLES = 3
+
+# Événements Windows d'échec d'authentification (journaux EVTX), classés
+# d'après leur identifiant plutôt que d'après le texte de l'événement
+FAILED_LOGON_EVENT = 4625
+FAILURE_EVENTS = {FAILED_LOGON_EVENT, 4771, 4776}
+
+# Événement Windows d'ouverture de session réussie
+SUCCESSFUL_LOGON_EVENT = 4624
+
+# Type d'ouverture de session Bureau à distance (RDP)
+REMOTE_INTERACTIVE_LOGON = 10
+
+# Indices d'une connexion réussie, pour la détection des heures inhabituelles
+LOGIN_PATTERN = re.compile(r"accepted (?:password|publickey)|session opened|logged in|successful login|logon success", re.IGNORECASE)
+
+# Nombre de formes de lignes dont la classification est mémorisée
+DETECTION_CACHE_SIZE = 16384
+
+# Table de la forme d'une ligne : chaque chiffre devient 0 (les IPs, ports,
+# PIDs et horodatages ne distinguent plus les lignes)
+SHAPE_TABLE = bytes.maketrans(b"123456789", b"000000000")
+
+def line_shape(lowered):
+    """
+    Retourne la forme d'une ligne : la ligne en minuscules, chiffres remplacés par 0.
     
     Args:
-        logs (list): Liste d'entrées de logs à analyser
+        lowered (str): Entrée de log en minuscules
         
     Returns:
-        list: Liste des anomalies détectées avec leur type et l'entrée originale
+        bytes: Forme de la ligne (encodée en UTF-8)
     """
-    log_info(f"Recherche d'anomalies dans {len(logs)} entrées de logs")
-    anomalies = []
+    return lowered.encode("utf-8", "surrogatepass").translate(SHAPE_TABLE)
+
+def shapes_preserve_matches(patterns):
+    """
+    Indique si la classification d'une ligne se déduit de sa forme.
     
-    for entry in logs:
-        # Vérifier chaque type d'anomalie
-        for anomaly_type, patterns in PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, entry.lower()):
-                    anomalies.append({
-                        "type": anomaly_type,
-                        "entry": entry,
-                        "pattern": pattern
-                    })
-                    # Une fois qu'une anomalie est trouvée pour cette entrée, passer à la suivante
-                    break
+    Vrai si aucun pattern ne contient de chiffre : remplacer un chiffre par
+    0 ne peut alors ni créer ni empêcher une correspondance (``\\d``, ``\\w``
+    et ``.`` reconnaissent 0 comme tout autre chiffre).
+    
+    Args:
+        patterns (dict): Catégorie d'anomalie -> liste de regex
+        
+    Returns:
+        bool: True si la classification peut être mémorisée par forme
+    """
+    return not any(c.isdigit() for category_patterns in patterns.values()
+                   for pattern in category_patterns for c in pattern)
+
+def as_record(entry, records):
+    """
+    Retourne l'entrée sous forme structurée.
+    
+    Args:
+        entry (LogRecord or str): Entrée déjà structurée, ou ligne brute
+        records (RecordParser): Parser utilisé pour les lignes brutes
+        
+    Returns:
+        LogRecord: Entrée structurée
+    """
+    if isinstance(entry, LogRecord):
+        return entry
+    return records.parse(entry)
+
+def classify_event(record):
+    """
+    Classe un événement Windows d'après son identifiant.
+    
+    Args:
+        record (LogRecord): Événement lu dans un journal EVTX
+        
+    Returns:
+        str or None: Catégorie d'anomalie, None si l'événement n'est pas un échec
+    """
+    event_id = record.event_id
+    if event_id not in FAILURE_EVENTS:
+        return None
+    if event_id == 4776 and not record.status:
+        # 4776 est journalisé pour chaque validation, réussie (état 0) ou non
+        return None
+    if event_id == FAILED_LOGON_EVENT and record.logon_type == REMOTE_INTERACTIVE_LOGON:
+        return "Échec RDP"
+    return AUTH_FAILURE_TYPE
+
+class AttemptWindow:
+    """
+    État compact des échecs d'une IP ou d'un compte.
+    
+    Seuls les horodatages des derniers échecs (autant que le seuil) sont
+    conservés, dans un tampon circulaire, avec le nombre total d'échecs,
+    les premier et dernier horodatages et quelques exemples. ``reported``
+    est le nombre d'échecs au dernier signalement de la clé.
+    """
+    
+    __slots__ = ("count", "first", "last", "examples", "ring", "detected_at", "reported")
+    
+    def __init__(self, threshold):
+        self.count = 0
+        self.first = None
+        self.last = None
+        self.examples = []
+        # Horodatages des derniers échecs (horloge du flux si absent de l'entrée)
+        self.ring = deque(maxlen=threshold)
+        self.detected_at = None
+        self.reported = None
+    
+    def to_list(self):
+        """Sérialise l'état en liste (JSON)."""
+        return [self.count, self.first, self.last, self.examples,
+                list(self.ring), self.detected_at, self.reported]
+    
+    @classmethod
+    def from_list(cls, threshold, data):
+        """Restaure un état produit par ``to_list``."""
+        window = cls(threshold)
+        window.count, window.first, window.last, examples, ring, window.detected_at = data[:6]
+        # Points de reprise antérieurs au marqueur : détections déjà signalées
+        window.reported = data[6] if len(data) > 6 else window.count
+        window.examples = list(examples)
+        window.ring.extend(ring)
+        return window
+
+class BruteForceTracker:
+    """
+    Détection du brute force sur une fenêtre glissante.
+    
+    Une IP source ou un compte visé est signalé lorsqu'au moins ``threshold``
+    échecs surviennent en ``window`` secondes. L'état de chaque clé est un
+    tampon circulaire d'horodatages ; les clés inactives depuis plus d'une
+    fenêtre sont oubliées, et au-delà de ``max_keys`` clés suivies les
+    moins récemment vues le sont aussi. Les clés signalées sont conservées
+    jusqu'au rapport, elles aussi dans la limite de ``max_keys`` : au-delà,
+    les plus anciennes détections sont oubliées (et comptées dans ``evicted``).
+    
+    Les clés sont des tuples ("ip", adresse) ou ("user", compte).
+    """
+    
+    def __init__(self, threshold=BRUTE_FORCE_THRESHOLD, window=BRUTE_FORCE_WINDOW,
+                 max_keys=BRUTE_FORCE_MAX_KEYS):
+        """
+        Args:
+            threshold (int): Nombre d'échecs à partir duquel une clé est signalée
+            window (int): Durée de la fenêtre en secondes
+            max_keys (int): Nombre maximal de clés suivies simultanément
+        """
+        self.threshold = threshold
+        self.window = window
+        self.max_keys = max_keys
+        # Clés suivies, de la moins récemment vue à la plus récemment vue
+        self.keys = OrderedDict()
+        # Clés signalées, dans l'ordre de détection
+        self.detections = OrderedDict()
+        # Clés signalées oubliées faute de place
+        self.evicted = 0
+        # Dernier horodatage vu, utilisé pour les entrées sans horodatage
+        self.clock = 0
+    
+    def _get(self, key):
+        """Retourne l'état d'une clé, créé si nécessaire, et le marque comme récent."""
+        state = self.keys.get(key)
+        if state is not None:
+            self.keys.move_to_end(key)
+            return state
+        state = self.detections.get(key) or AttemptWindow(self.threshold)
+        self.keys[key] = state
+        if len(self.keys) > self.max_keys:
+            self.keys.popitem(last=False)
+        return state
+    
+    def _expire(self):
+        """Oublie les clés dont le dernier échec est sorti de la fenêtre."""
+        keys = self.keys
+        limit = self.clock - self.window
+        while keys:
+            key = next(iter(keys))
+            if keys[key].ring[-1] >= limit:
+                break
+            del keys[key]
+    
+    def add(self, key, entry, timestamp=None):
+        """
+        Enregistre un échec d'authentification.
+        
+        Args:
+            key (tuple): ("ip", adresse) ou ("user", compte)
+            entry (str): Entrée de log correspondante
+            timestamp (int): Horodatage epoch de l'entrée, None s'il est inconnu
+            
+        Returns:
+            bool: True si la clé vient d'être signalée
+        """
+        if timestamp is not None:
+            self.clock = timestamp
+        now = self.clock
+        
+        state = self._get(key)
+        state.count += 1
+        if timestamp is not None:
+            if state.first is None:
+                state.first = timestamp
+            state.last = timestamp
+        if len(state.examples) < BRUTE_FORCE_EXAMPLES:
+            state.examples.append(entry)
+        
+        ring = state.ring
+        ring.append(now)
+        detected = False
+        detections = self.detections
+        if (state.detected_at is None and len(ring) == self.threshold
+                and ring[-1] - ring[0] <= self.window):
+            state.detected_at = now
+            detections[key] = state
+            detected = True
+            if len(detections) > self.max_keys:
+                detections.popitem(last=False)
+                self.evicted += 1
+        
+        self._expire()
+        return detected
+    
+    def get_state(self):
+        """
+        Retourne l'état du tracker sous une forme sérialisable en JSON.
+        
+        Returns:
+            dict: État du tracker
+        """
+        states = dict(self.detections)
+        for key, state in self.keys.items():
+            states.setdefault(key, state)
+        return {
+            "threshold": self.threshold,
+            "window": self.window,
+            "clock": self.clock,
+            "evicted": self.evicted,
+            "keys": [[kind, value] + state.to_list() for (kind, value), state in states.items()],
+            "order": [[kind, value] for kind, value in self.keys]
+        }
+    
+    def set_state(self, state):
+        """
+        Restaure l'état produit par ``get_state``.
+        
+        Args:
+            state (dict): État du tracker
+        """
+        self.threshold = state.get("threshold", self.threshold)
+        self.window = state.get("window", self.window)
+        self.clock = state.get("clock", 0)
+        self.evicted = state.get("evicted", 0)
+        self.keys = OrderedDict()
+        self.detections = OrderedDict()
+        
+        states = {}
+        for kind, value, *data in state["keys"]:
+            window = AttemptWindow.from_list(self.threshold, data)
+            states[(kind, value)] = window
+            if window.detected_at is not None:
+                self.detections[(kind, value)] = window
+        for kind, value in state["order"]:
+            self.keys[(kind, value)] = states[(kind, value)]
+    
+    def anomalies(self):
+        """
+        Construit les anomalies des clés signalées.
+        
+        Returns:
+            list: Liste des anomalies de type brute force détectées
+        """
+        if self.evicted:
+            log_warning(f"{self.evicted} détection(s) de brute force oubliée(s) au-delà de "
+                        f"{self.max_keys} clés signalées")
+        return [self.anomaly(key) for key in self.detections]
+    
+    def mark_reported(self):
+        """
+        Marque les clés signalées comme rapportées avec leurs compteurs actuels.
+        
+        Une analyse reprise depuis un point de reprise ne rapporte ainsi que
+        les détections nouvelles ou dont les compteurs ont changé.
+        
+        Returns:
+            set: Clés nouvelles ou modifiées depuis le précédent marquage
+        """
+        changed = set()
+        for key, state in self.detections.items():
+            if state.reported != state.count:
+                state.reported = state.count
+                changed.add(key)
+        return changed
+    
+    def anomaly(self, key):
+        """
+        Construit l'anomalie de brute force d'une clé à partir de son état actuel.
+        
+        Args:
+            key (tuple): ("ip", adresse) ou ("user", compte)
+            
+        Returns:
+            dict: Anomalie de type brute force, avec le nombre d'essais, les
+            premier et dernier horodatages et le rythme des tentatives (par minute)
+        """
+        kind, value = key
+        state = self.detections[key]
+        
+        rate = None
+        details = f"{state.count} essais"
+        if state.first is not None and state.last > state.first:
+            # n essais couvrent n - 1 intervalles
+            rate = (state.count - 1) * 60.0 / (state.last - state.first)
+            pace = f"{rate:.1f}/min" if rate >= 1 else f"{rate * 60:.1f}/h"
+            details += f" du {format_epoch(state.first)} au {format_epoch(state.last)}, {pace}"
+        
+        if kind == "ip":
+            entry = f"Multiple tentatives d'authentification depuis {value} ({details})"
+        else:
+            entry = f"Multiple tentatives d'authentification sur le compte {value} ({details})"
+        
+        return {
+            "type": "Attaque Brute Force",
+            "entry": entry,
+            "details": list(state.examples),
+            "ips": [value] if kind == "ip" else [],
+            "user": value if kind == "user" else None,
+            "attempts": state.count,
+            "first_seen": state.first,
+            "last_seen": state.last,
+            "rate": rate
+        }
+
+class FailureRecorder:
+    """
+    Remplace le tracker lors de l'analyse d'une portion du flux.
+    
+    Les échecs d'authentification sont seulement enregistrés, dans l'ordre ;
+    ils sont rejoués dans le tracker de l'analyse principale, ce qui donne
+    exactement le résultat d'une analyse séquentielle.
+    """
+    
+    def __init__(self):
+        # Tuples (clé, entrée, horodatage)
+        self.events = []
+    
+    def add(self, key, entry, timestamp=None):
+        """
+        Enregistre un échec d'authentification.
+        
+        Returns:
+            bool: Toujours False (la détection a lieu lors du rejeu)
+        """
+        self.events.append((key, entry, timestamp))
+        return False
+
+class AnomalyDetector:
+    """
+    Détecteur en une seule passe.
+    
+    Chaque entrée est classée une seule fois ; ses champs (IP, compte,
+    horodatage) sont extraits une seule fois par le parser et le même
+    résultat alimente la liste d'anomalies et la détection du brute force.
+    """
+    
+    def __init__(self, threshold=BRUTE_FORCE_THRESHOLD, window=BRUTE_FORCE_WINDOW,
+                 max_keys=BRUTE_FORCE_MAX_KEYS):
+        """
+        Args:
+            threshold (int): Seuil de détection du brute force
+            window (int): Fenêtre de détection du brute force en secondes
+            max_keys (int): Nombre maximal d'IPs et de comptes suivis
+        """
+        self.matcher = get_matcher()
+        stats = get_stats()
+        if stats is not None:
+            self.matcher = InstrumentedMatcher(self.matcher, stats)
+        # Structuration des lignes brutes reçues sans passer par un parser de format
+        self.records = RecordParser()
+        self.brute_force = BruteForceTracker(threshold, window, max_keys)
+        if stats is not None:
+            self.brute_force.add = stats.timed_function(self.brute_force.add, "brute_force")
+        # Clés ayant atteint le seuil depuis le dernier appel à pop_brute_force_alerts
+        self.new_brute_force = []
+        
+        # Catégories classées avant "Échec Auth" : une entrée de ces catégories
+        # peut aussi être un échec d'authentification (les suivantes, non)
+        categories = list(PATTERNS)
+        if AUTH_FAILURE_TYPE in categories:
+            self._auth_shadowed = set(categories[:categories.index(AUTH_FAILURE_TYPE)])
+        else:
+            self._auth_shadowed = set()
+        
+        # Classification mémorisée par forme de ligne : les lignes ne différant
+        # que par leurs IPs, ports ou PIDs ne sont évaluées qu'une fois. Sous
+        # --stats, chaque entrée passe par les règles : leurs compteurs
+        # d'évaluations restent ceux d'une analyse sans cache
+        self.classify_shape = None
+        if stats is None and shapes_preserve_matches(PATTERNS):
+            self.classify_shape = lru_cache(maxsize=DETECTION_CACHE_SIZE)(self._classify_shape)
+    
+    def process(self, entry):
+        """
+        Classe une entrée de log et met à jour les compteurs de brute force.
+        
+        Args:
+            entry (LogRecord or str): Entrée de log structurée, ou ligne brute
+            
+        Returns:
+            dict or None: Anomalie détectée (avec son horodatage epoch, ou
+            None s'il est introuvable), None si l'entrée est normale
+        """
+        record = as_record(entry, self.records)
+        line = record.line
+        ips = record.ips
+        timestamp = record.timestamp
+        
+        if record.event_id is not None:
+            # Événement Windows : l'identifiant suffit, sans expression régulière
+            anomaly_type = classify_event(record)
+            if anomaly_type is None:
+                return None
+            pattern = f"EventID {record.event_id}"
+            self._count_failure(record)
+        else:
+            lowered = line.lower()
+            if self.classify_shape is not None:
+                match = self.classify_shape(line_shape(lowered))
             else:
-                # Continuer à la prochaine anomalie si aucun pattern ne correspond
+                match = self.classify(lowered)
+            if match is None:
+                # Aucune règle ne correspond : ce n'est pas non plus un échec d'authentification
+                return None
+            
+            anomaly_type, pattern, failure = match
+            if failure:
+                self._count_failure(record)
+        
+        return {
+            "type": anomaly_type,
+            "entry": line,
+            "pattern": pattern,
+            "ips": ips,
+            "timestamp": timestamp,
+            "host": record.host,
+            "program": record.program,
+            "user": record.user
+        }
+    
+    def classify(self, lowered):
+        """
+        Classe une entrée d'après son texte.
+        
+        Args:
+            lowered (str): Entrée de log en minuscules
+            
+        Returns:
+            tuple or None: (catégorie, pattern, échec d'authentification à
+            compter), None si aucune règle ne correspond
+        """
+        match = self.matcher.match_lower(lowered)
+        if match is None:
+            return None
+        anomaly_type, pattern = match
+        failure = (anomaly_type == AUTH_FAILURE_TYPE
+                   or (anomaly_type in self._auth_shadowed
+                       and self.matcher.matches_category(lowered, AUTH_FAILURE_TYPE)))
+        return anomaly_type, pattern, failure
+    
+    def _classify_shape(self, shape):
+        """Classe une forme de ligne (voir ``line_shape``), mémorisé par ``classify_shape``."""
+        return self.classify(shape.decode("utf-8", "surrogatepass"))
+    
+    def _count_failure(self, record):
+        """
+        Compte un échec d'authentification par IP source et par compte visé.
+        
+        Args:
+            record (LogRecord): Entrée de l'échec
+        """
+        line = record.line
+        timestamp = record.timestamp
+        ips = record.ips
+        if ips and self.brute_force.add(("ip", ips[0]), line, timestamp):
+            self.new_brute_force.append(("ip", ips[0]))
+        user = record.user
+        if user and self.brute_force.add(("user", user), line, timestamp):
+            self.new_brute_force.append(("user", user))
+    
+    def brute_force_anomalies(self):
+        """
+        Retourne les anomalies de brute force accumulées.
+        
+        Returns:
+            list: Liste des anomalies de type brute force détectées
+        """
+        return self.brute_force.anomalies()
+    
+    def pop_brute_force_alerts(self):
+        """
+        Retourne les anomalies de brute force des clés venant d'atteindre le seuil.
+        
+        Permet de signaler une attaque dès qu'elle est détectée lors d'une
+        analyse incrémentale, sans attendre la fin du flux.
+        
+        Returns:
+            list: Anomalies de brute force, une par IP ou compte nouvellement signalé
+        """
+        alerts = []
+        for key in self.new_brute_force:
+            if key not in self.brute_force.detections:
+                # Détection déjà oubliée (plus de max_keys détections dans le lot)
                 continue
-            # Sortir de la boucle des types d'anomalies si on a trouvé un match
-            break
+            alert = self.brute_force.anomaly(key)
+            alert["alert"] = True
+            alerts.append(alert)
+        self.new_brute_force = []
+        return alerts
+
+def iter_anomalies(logs):
+    """
+    Détecte les anomalies au fil de l'eau dans une séquence d'entrées.
     
-    # Recherche d'anomalies plus spécifiques
-    anomalies.extend(detect_brute_force(logs))
+    Les anomalies de chaque entrée sont produites dès qu'elles sont trouvées ;
+    les anomalies de brute force suivent une fois la séquence épuisée. Seuls
+    les compteurs de brute force sont conservés en mémoire.
     
-    return anomalies
+    Args:
+        logs (iterable): Entrées de logs à analyser (liste ou générateur)
+        
+    Yields:
+        dict: Anomalies détectées avec leur type et l'entrée originale
+    """
+    detector = AnomalyDetector()
+    count = 0
+    
+    for entry in logs:
+        count += 1
+        anomaly = detector.process(entry)
+        if anomaly is not None:
+            yield anomaly
+    
+    log_info(f"Recherche d'anomalies terminée sur {count} entrées de logs")
+    
+    # Les compteurs de brute force ont été alimentés pendant la même passe
+    for anomaly in detector.brute_force_anomalies():
+        yield anomaly
+
+def detect_anomalies(logs):
+    """
+    Détecte les anomalies dans une liste d'entrées de logs.
+    
+    Args:
+        logs (iterable): Entrées de logs à analyser
+        
+    Returns:
+        list: Liste des anomalies détectées avec leur type et l'entrée originale
+    """
+    return list(iter_anomalies(logs))
 
 def detect_brute_force(logs):
     """
     Détecte les tentatives de brute force en cherchant des échecs d'authentification répétés.
     
     Args:
-        logs (list): Liste d'entrées de logs à analyser
+        logs (iterable): Entrées de logs à analyser
         
     Returns:
         list: Liste des anomalies de type brute force détectées
     """
-    # Dictionnaire pour compter les tentatives par IP
-    ip_attempts = {}
+    matcher = get_matcher()
+    records = RecordParser()
+    tracker = BruteForceTracker()
     
-    # Regex pour extraire une IP
-    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-    
-    # Chercher les échecs d'authentification et extraire les IPs
+    # Chercher les échecs d'authentification, par IP source et par compte visé
     for entry in logs:
-        if any(re.search(pattern, entry.lower()) for pattern in PATTERNS["Échec Auth"]):
-            ip_match = re.search(ip_pattern, entry)
-            if ip_match:
-                ip = ip_match.group(0)
-                if ip not in ip_attempts:
-                    ip_attempts[ip] = []
-                ip_attempts[ip].append(entry)
-    
-    # Identifier les IPs avec plus de 3 tentatives (potentielle attaque de brute force)
-    brute_force_anomalies = []
-    for ip, attempts in ip_attempts.items():
-        if len(attempts) >= 3:
-            brute_force_anomalies.append({
-                "type": "Attaque Brute Force",
-                "entry": f"Multiple tentatives d'authentification depuis {ip} ({len(attempts)} essais)",
-                "details": attempts[:3]  # Inclure les 3 premières tentatives comme exemple
-            })
-    
-    return brute_force_anomalies
+        record = as_record(entry, records)
+        if record.event_id is not None:
+            failed = classify_event(record) is not None
+        else:
+            failed = matcher.matches_category(record.line.lower(), AUTH_FAILURE_TYPE)
+        if failed:
+            if record.ips:
+                tracker.add(("ip", record.ips[0]), record.line, record.timestamp)
+            if record.user:
+                tracker.add(("user", record.user), record.line, record.timestamp)
+    
+    # Clés ayant atteint le seuil d'échecs dans la fenêtre de détection
+    return tracker.anomalies()
 
 def detect_unusual_login_times(logs, normal_hours=(8, 18)):
     """
     Détecte les connexions à des heures inhabituelles.
     
     Args:
-        logs (list): Liste d'entrées de logs à analyser
+        logs (iterable): Entrées de logs à analyser
         normal_hours (tuple): Plage d'heures de bureau normales (début, fin)
         
     Returns:
         list: Liste des anomalies de connexion à des heures inhabituelles
     """
-    # Cette fonctionnalité nécessite une analyse plus avancée des timestamps
-    # et sera implémentée dans une version future
-    return []
+    start, end = normal_hours
+    records = RecordParser()
+    anomalies = []
+    
+    for entry in logs:
+        record = as_record(entry, records)
+        if record.event_id is not None:
+            if record.event_id != SUCCESSFUL_LOGON_EVENT:
+                continue
+            pattern = f"EventID {SUCCESSFUL_LOGON_EVENT}"
+        elif LOGIN_PATTERN.search(record.line) is None:
+            continue
+        else:
+            pattern = LOGIN_PATTERN.pattern
+        epoch = record.timestamp
+        if epoch is None or start <= hour_of_day(epoch) < end:
+            continue
+        anomalies.append({
+            "type": "Connexion Horaire Inhabituelle",
+            "entry": record.line,
+            "pattern": pattern,
+            "ips": record.ips,
+            "timestamp": epoch,
+            "host": record.host,
+            "program": record.program,
+            "user": record.user
+        })
+    
+    return anomalies
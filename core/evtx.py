@@ -0,0 +1,435 @@
+"""
+Module de lecture des journaux d'événements Windows au format EVTX.
+
+Lit directement le format binaire (en-tête de fichier, blocs de 64 Ko,
+enregistrements BinXML), sans export préalable par wevtutil ou PowerShell.
+Chaque modèle BinXML n'est parcouru qu'une fois : il est compilé en une
+table « champ → rang de substitution », mémorisée par GUID de modèle. Un
+événement ne coûte ensuite que la lecture de son tableau de substitutions,
+et seuls les champs utiles des identifiants suivis sont décodés.
+"""
+
+import struct
+from itertools import accumulate
+
+from .inputs import open_binary
+from .record import LogRecord
+from .timestamps import format_epoch
+from .utils import log_info, log_warning, log_error
+
+EVTX_MAGIC = b"ElfFile\x00"
+CHUNK_MAGIC = b"ElfChnk\x00"
+RECORD_MAGIC = b"\x2a\x2a\x00\x00"
+
+# Taille de l'en-tête de fichier et des blocs
+FILE_HEADER_SIZE = 4096
+CHUNK_SIZE = 65536
+
+# Position du premier enregistrement dans un bloc
+_RECORDS_START = 512
+
+# Événements lus (les autres sont ignorés dès la lecture de leur identifiant)
+EVENT_DESCRIPTIONS = {
+    4624: "An account was successfully logged on.",
+    4625: "An account failed to log on.",
+    4771: "Kerberos pre-authentication failed.",
+    4776: "The computer attempted to validate the credentials for an account."
+}
+
+# Différence entre l'epoch FILETIME (1601) et l'epoch Unix, en secondes
+_FILETIME_EPOCH = 11644473600
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+# Jetons BinXML (sans le drapeau 0x40 « suite »)
+_END_OF_STREAM = 0x00
+_OPEN_START_ELEMENT = 0x01
+_CLOSE_START_ELEMENT = 0x02
+_CLOSE_EMPTY_ELEMENT = 0x03
+_END_ELEMENT = 0x04
+_VALUE = 0x05
+_ATTRIBUTE = 0x06
+_CDATA = 0x07
+_CHAR_REF = 0x08
+_ENTITY_REF = 0x09
+_PI_TARGET = 0x0a
+_PI_DATA = 0x0b
+_TEMPLATE_INSTANCE = 0x0c
+_NORMAL_SUBSTITUTION = 0x0d
+_OPTIONAL_SUBSTITUTION = 0x0e
+_FRAGMENT_HEADER = 0x0f
+
+# Types de valeurs de substitution utilisés par les champs lus
+_TYPE_WSTRING = 0x01
+_TYPE_STRING = 0x02
+_INTEGER_TYPES = {value_type: struct.Struct(fmt) for value_type, fmt in {
+    0x03: "<b", 0x04: "<B", 0x05: "<h", 0x06: "<H", 0x07: "<i", 0x08: "<I",
+    0x09: "<q", 0x0a: "<Q", 0x0d: "<I", 0x10: "<Q", 0x14: "<I", 0x15: "<Q"
+}.items()}
+_TYPE_FILETIME = 0x11
+
+class EventRecord(LogRecord):
+    """
+    Événement Windows lu dans un fichier EVTX.
+
+    Les champs habituels (hôte, horodatage, IP source, compte) sont remplis
+    à la lecture ; la ligne est une représentation textuelle de l'événement
+    utilisée pour l'affichage et les rapports.
+    """
+
+    __slots__ = ("event_id", "logon_type", "status")
+
+    def __init__(self, event_id, timestamp, computer, user, ip, logon_type, status, record_id):
+        """
+        Args:
+            event_id (int): Identifiant de l'événement
+            timestamp (int): Horodatage epoch (UTC), None s'il est absent
+            computer (str): Ordinateur ayant enregistré l'événement
+            user (str): Compte visé, None s'il est absent
+            ip (str): Adresse source, None si absente
+            logon_type (int): Type d'ouverture de session, None s'il est absent
+            status (int): Code d'état (0 en cas de succès), None s'il est absent
+            record_id (int): Numéro de l'enregistrement dans le journal
+        """
+        parts = [format_epoch(timestamp) if timestamp is not None else "-", computer or "-",
+                 f"EventID {event_id}: {EVENT_DESCRIPTIONS.get(event_id, '')}"]
+        if user:
+            parts.append(f"Account Name: {user}")
+        if ip:
+            parts.append(f"Source Network Address: {ip}")
+        if logon_type is not None:
+            parts.append(f"Logon Type: {logon_type}")
+        if status is not None:
+            parts.append(f"Status: 0x{status:08X}")
+        parts.append(f"Record: {record_id}")
+        super().__init__(" ".join(parts))
+
+        self._host = computer
+        self._program = f"EventID {event_id}"
+        self._timestamp = timestamp
+        self._ips = [ip] if ip else []
+        self._user = user
+        self.event_id = event_id
+        self.logon_type = logon_type
+        self.status = status
+
+def is_evtx(filepath):
+    """
+    Indique si un fichier est un journal d'événements EVTX (compressé ou non).
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        bool: True si le fichier commence par la signature EVTX
+    """
+    try:
+        with open_binary(filepath) as f:
+            return f.read(len(EVTX_MAGIC)) == EVTX_MAGIC
+    except Exception:
+        return False
+
+def _name(chunk, offset):
+    """Lit une chaîne de nom BinXML (suivant, hash, longueur, UTF-16)."""
+    length = _U16.unpack_from(chunk, offset + 6)[0]
+    return chunk[offset + 8:offset + 8 + length * 2].decode("utf-16-le", errors="ignore")
+
+def _name_size(chunk, offset):
+    """Taille d'une chaîne de nom BinXML, terminateur compris."""
+    return 10 + _U16.unpack_from(chunk, offset + 6)[0] * 2
+
+def compile_template(chunk, pos, end):
+    """
+    Compile un modèle BinXML en table des champs substitués.
+
+    Les éléments ``<Data Name="X">`` sont nommés d'après leur attribut
+    ``Name`` ; les autres éléments et attributs d'après leur propre nom
+    (``EventID``, ``Computer``, ``SystemTime``...).
+
+    Args:
+        chunk (bytes): Bloc contenant le modèle
+        pos (int): Début des jetons du modèle dans le bloc
+        end (int): Fin des jetons du modèle
+
+    Returns:
+        dict: Nom du champ -> rang de la substitution
+    """
+    fields = {}
+    stack = []
+    attribute = None
+    while pos < end:
+        token = chunk[pos]
+        kind = token & 0x0f
+        if kind == _END_OF_STREAM:
+            break
+        elif kind == _OPEN_START_ELEMENT:
+            # Jeton, identifiant de dépendance, taille, position du nom
+            name_offset = _U32.unpack_from(chunk, pos + 7)[0]
+            pos += 15 if token & 0x40 else 11
+            if name_offset == pos:
+                pos += _name_size(chunk, pos)
+            stack.append([_name(chunk, name_offset), None])
+        elif kind == _CLOSE_START_ELEMENT:
+            pos += 1
+        elif kind == _CLOSE_EMPTY_ELEMENT or kind == _END_ELEMENT:
+            if stack:
+                stack.pop()
+            pos += 1
+        elif kind == _ATTRIBUTE:
+            name_offset = _U32.unpack_from(chunk, pos + 1)[0]
+            pos += 5
+            if name_offset == pos:
+                pos += _name_size(chunk, pos)
+            attribute = _name(chunk, name_offset)
+        elif kind == _VALUE:
+            value_type = chunk[pos + 1]
+            if value_type != _TYPE_WSTRING:
+                # Valeur littérale d'un autre type : non prévue dans les modèles
+                break
+            length = _U16.unpack_from(chunk, pos + 2)[0]
+            if attribute == "Name" and stack and stack[-1][0] == "Data":
+                stack[-1][1] = chunk[pos + 4:pos + 4 + length * 2].decode("utf-16-le", errors="ignore")
+            attribute = None
+            pos += 4 + length * 2
+        elif kind == _NORMAL_SUBSTITUTION or kind == _OPTIONAL_SUBSTITUTION:
+            index = _U16.unpack_from(chunk, pos + 1)[0]
+            if attribute is not None:
+                fields.setdefault(attribute, index)
+                attribute = None
+            elif stack:
+                element, data_name = stack[-1]
+                fields[data_name or element] = index
+            pos += 4
+        elif kind == _CDATA or kind == _PI_DATA:
+            pos += 3 + _U16.unpack_from(chunk, pos + 1)[0] * 2
+        elif kind == _CHAR_REF:
+            pos += 3
+        elif kind == _ENTITY_REF or kind == _PI_TARGET:
+            name_offset = _U32.unpack_from(chunk, pos + 1)[0]
+            pos += 5
+            if name_offset == pos:
+                pos += _name_size(chunk, pos)
+        elif kind == _FRAGMENT_HEADER:
+            pos += 4
+        else:
+            break
+    return fields
+
+def _decode(chunk, offset, size, value_type):
+    """
+    Décode une valeur de substitution.
+
+    Returns:
+        str, int or None: Valeur, None si son type n'est pas pris en charge
+    """
+    if size == 0:
+        return None
+    if value_type == _TYPE_WSTRING:
+        return chunk[offset:offset + size].decode("utf-16-le", errors="ignore").rstrip("\x00")
+    if value_type == _TYPE_STRING:
+        return chunk[offset:offset + size].decode("latin-1").rstrip("\x00")
+    if value_type == _TYPE_FILETIME:
+        return _U64.unpack_from(chunk, offset)[0] // 10000000 - _FILETIME_EPOCH
+    integer = _INTEGER_TYPES.get(value_type)
+    if integer is not None and integer.size == size:
+        return integer.unpack_from(chunk, offset)[0]
+    return None
+
+def _field(chunk, fields, values, name):
+    """
+    Décode un champ d'un enregistrement d'après la table de son modèle.
+
+    Returns:
+        str, int or None: Valeur, None si le modèle ne contient pas le champ
+    """
+    index = fields.get(name)
+    offsets, descriptors = values
+    if index is None or index >= len(offsets) - 1:
+        return None
+    # Descripteur : taille (16 bits), puis type (8 bits) et un octet nul
+    return _decode(chunk, offsets[index], descriptors[2 * index], descriptors[2 * index + 1] & 0xff)
+
+def _clean_user(value):
+    """Compte visé, None pour les valeurs vides ("-")."""
+    if not value or value == "-":
+        return None
+    return value
+
+def _clean_ip(value):
+    """Adresse source, sans préfixe IPv4 mappé, None pour les valeurs vides ("-", "::1")."""
+    if not value or value == "-" or value == "::1":
+        return None
+    if value.startswith("::ffff:"):
+        return value[7:]
+    return value
+
+class EvtxReader:
+    """
+    Lecteur en continu d'un fichier EVTX, bloc par bloc.
+
+    Les modèles compilés sont mémorisés pour tout le fichier ; au sein
+    d'un bloc, un modèle déjà vu est retrouvé par sa position.
+    """
+
+    def __init__(self, event_ids=None):
+        """
+        Args:
+            event_ids (iterable): Identifiants d'événements à produire
+                (par défaut ceux de ``EVENT_DESCRIPTIONS``)
+        """
+        self.event_ids = frozenset(event_ids if event_ids is not None else EVENT_DESCRIPTIONS)
+        # GUID du modèle et taille de ses données -> champs compilés
+        self.templates = {}
+        self.records = 0
+        self.skipped_chunks = 0
+
+    def read(self, stream):
+        """
+        Lit les événements suivis d'un flux EVTX.
+
+        Args:
+            stream (file): Flux binaire positionné au début du fichier
+
+        Yields:
+            EventRecord: Événements, dans l'ordre du fichier
+
+        Raises:
+            ValueError: Si le flux n'est pas un fichier EVTX
+        """
+        header = stream.read(FILE_HEADER_SIZE)
+        if header[:len(EVTX_MAGIC)] != EVTX_MAGIC:
+            raise ValueError("signature EVTX absente")
+
+        # Les blocs sont lus jusqu'à la fin du fichier : le nombre de blocs
+        # de l'en-tête n'est pas à jour dans un journal fermé brutalement
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if len(chunk) < CHUNK_SIZE:
+                break
+            if chunk[:len(CHUNK_MAGIC)] != CHUNK_MAGIC:
+                # Bloc jamais utilisé (fichier préalloué) ou endommagé
+                self.skipped_chunks += 1
+                continue
+            for record in self.read_chunk(chunk):
+                yield record
+
+    def read_chunk(self, chunk):
+        """
+        Lit les événements suivis d'un bloc de 64 Ko.
+
+        Args:
+            chunk (bytes): Bloc complet, en-tête compris
+
+        Yields:
+            EventRecord: Événements du bloc
+        """
+        free_space = min(_U32.unpack_from(chunk, 48)[0], CHUNK_SIZE)
+        templates = {}
+        event_ids = self.event_ids
+        pos = _RECORDS_START
+
+        while pos + 24 <= free_space:
+            if chunk[pos:pos + 4] != RECORD_MAGIC:
+                break
+            size = _U32.unpack_from(chunk, pos + 4)[0]
+            if size < 28 or pos + size > free_space:
+                break
+            record_pos = pos
+            pos += size
+
+            fields, values = self._substitutions(chunk, record_pos, templates)
+            if fields is None:
+                continue
+            self.records += 1
+
+            event_id = _field(chunk, fields, values, "EventID")
+            if event_id not in event_ids:
+                continue
+
+            timestamp = _field(chunk, fields, values, "SystemTime")
+            if timestamp is None:
+                timestamp = _U64.unpack_from(chunk, record_pos + 16)[0] // 10000000 - _FILETIME_EPOCH
+            yield EventRecord(
+                event_id, timestamp, _field(chunk, fields, values, "Computer"),
+                _clean_user(_field(chunk, fields, values, "TargetUserName")),
+                _clean_ip(_field(chunk, fields, values, "IpAddress")),
+                _field(chunk, fields, values, "LogonType"),
+                _field(chunk, fields, values, "Status"),
+                _U64.unpack_from(chunk, record_pos + 8)[0])
+
+    def _substitutions(self, chunk, pos, templates):
+        """
+        Lit le modèle et le tableau de substitutions d'un enregistrement.
+
+        Args:
+            chunk (bytes): Bloc contenant l'enregistrement
+            pos (int): Position de l'enregistrement dans le bloc
+            templates (dict): Modèles du bloc, par position
+
+        Returns:
+            tuple: (champs du modèle, (positions des valeurs, descripteurs)),
+            (None, None) si l'enregistrement n'est pas lisible
+        """
+        pos += 24
+        if chunk[pos] == _FRAGMENT_HEADER:
+            pos += 4
+        if chunk[pos] != _TEMPLATE_INSTANCE:
+            return None, None
+        definition = _U32.unpack_from(chunk, pos + 6)[0]
+        pos += 10
+
+        fields = templates.get(definition)
+        if fields is None:
+            if definition + 24 > CHUNK_SIZE:
+                return None, None
+            # En-tête du modèle : suivant, GUID (16 octets), taille des données
+            data_size = _U32.unpack_from(chunk, definition + 20)[0]
+            key = (chunk[definition + 4:definition + 20], data_size)
+            fields = self.templates.get(key)
+            if fields is None:
+                start = definition + 24
+                fields = compile_template(chunk, start, min(start + data_size, CHUNK_SIZE))
+                self.templates[key] = fields
+            templates[definition] = fields
+        if definition == pos:
+            # Modèle défini dans l'enregistrement : le sauter
+            pos += 24 + _U32.unpack_from(chunk, definition + 20)[0]
+
+        count = _U32.unpack_from(chunk, pos)[0]
+        pos += 4
+        offset = pos + count * 4
+        if offset > CHUNK_SIZE:
+            return None, None
+        # Les descripteurs sont lus d'un bloc ; les positions des valeurs
+        # s'en déduisent par somme cumulée des tailles
+        descriptors = struct.unpack_from(f"<{count * 2}H", chunk, pos)
+        values = (list(accumulate(descriptors[::2], initial=offset)), descriptors)
+        return fields, values
+
+def parse_evtx(filepath, event_ids=None):
+    """
+    Lit les événements d'authentification d'un journal EVTX.
+
+    Les fichiers compressés (gzip, bz2, xz) sont décompressés à la volée.
+
+    Args:
+        filepath (str): Chemin vers le fichier .evtx
+        event_ids (iterable): Identifiants d'événements à produire
+            (par défaut 4624, 4625, 4771 et 4776)
+
+    Yields:
+        EventRecord: Événements, au fil de la lecture
+    """
+    reader = EvtxReader(event_ids)
+    try:
+        with open_binary(filepath) as f:
+            for record in reader.read(f):
+                yield record
+    except (OSError, ValueError) as e:
+        log_error(f"Erreur lors de la lecture du journal EVTX {filepath}: {str(e)}")
+        return
+    if reader.skipped_chunks:
+        log_warning(f"{reader.skipped_chunks} blocs illisibles ignorés dans {filepath}")
+    log_info(f"{reader.records} événements lus dans {filepath}")
@@ -0,0 +1,254 @@
+"""
+Module de suivi en continu des fichiers de logs.
+
+Surveille un fichier à la manière de ``tail -F`` : seules les données
+ajoutées sont lues, et la rotation du fichier (nouveau fichier, troncature,
+copytruncate) est gérée. Les notifications inotify sont utilisées quand
+elles sont disponibles, avec un repli sur une scrutation périodique.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+
+from .utils import log_info, log_warning
+
+# Intervalle de scrutation (en secondes), aussi utilisé comme délai maximal
+# d'attente des notifications inotify
+POLL_INTERVAL = 0.5
+
+# Taille des blocs lus à chaque appel système
+READ_SIZE = 1024 * 1024
+
+# Constantes inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+               | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+class Inotify:
+    """
+    Accès minimal à inotify via ctypes, utilisé comme simple signal de réveil.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+
+    @classmethod
+    def create(cls, directory):
+        """
+        Crée une surveillance inotify sur un répertoire.
+
+        Le répertoire (et non le fichier) est surveillé afin de voir aussi
+        les créations et renommages liés à la rotation.
+
+        Args:
+            directory (str): Répertoire contenant le fichier suivi
+
+        Returns:
+            Inotify or None: Instance prête, ou None si inotify est indisponible
+        """
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+            return cls(fd)
+        except (OSError, AttributeError, TypeError):
+            return None
+
+    def wait(self, timeout):
+        """
+        Attend un événement ou l'expiration du délai, puis vide la file d'événements.
+
+        Args:
+            timeout (float): Délai maximal d'attente en secondes
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        """Ferme le descripteur inotify."""
+        os.close(self.fd)
+
+class FileFollower:
+    """
+    Lecture incrémentale d'un fichier de log avec gestion de la rotation.
+    """
+
+    def __init__(self, filepath, poll_interval=POLL_INTERVAL, from_start=False):
+        """
+        Args:
+            filepath (str): Chemin du fichier à suivre
+            poll_interval (float): Intervalle de scrutation en secondes
+            from_start (bool): Lire le contenu existant au lieu de partir de la fin
+        """
+        self.filepath = filepath
+        self.poll_interval = poll_interval
+        self.file = None
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+        # Données restant à lire après le dernier bloc (bloc plein)
+        self.pending = False
+
+        self._open(from_start)
+
+        directory = os.path.dirname(os.path.abspath(filepath))
+        self.inotify = Inotify.create(directory)
+        if self.inotify is None:
+            log_warning("inotify indisponible, suivi du fichier par scrutation périodique")
+
+    def _open(self, from_start):
+        """
+        Ouvre le fichier suivi, au début ou à la fin.
+
+        Args:
+            from_start (bool): Positionner la lecture au début du fichier
+        """
+        try:
+            f = open(self.filepath, "rb")
+        except OSError:
+            self.file = None
+            return
+
+        st = os.fstat(f.fileno())
+        self.file = f
+        self.inode = (st.st_dev, st.st_ino)
+        self.offset = 0 if from_start else st.st_size
+        self.partial = b""
+        f.seek(self.offset)
+
+    def _read_available(self):
+        """
+        Lit au plus READ_SIZE octets depuis la position courante.
+
+        Un bloc plein signale que d'autres données attendent (``pending``) :
+        elles sont lues aux appels suivants, sans attente, plutôt que d'être
+        accumulées en mémoire.
+
+        Returns:
+            bytes: Données lues
+        """
+        data = self.file.read(READ_SIZE)
+        self.offset += len(data)
+        self.pending = len(data) == READ_SIZE
+        return data
+
+    def _complete(self, data, final=False):
+        """
+        Retourne les lignes complètes des données, en conservant la ligne partielle.
+
+        Args:
+            data (bytes): Données nouvellement lues
+            final (bool): Considérer la ligne partielle comme terminée
+
+        Returns:
+            bytes: Lignes complètes, terminées par une fin de ligne
+        """
+        buffer = self.partial + data
+        if final:
+            self.partial = b""
+            if buffer and not buffer.endswith(b"\n"):
+                buffer += b"\n"
+            return buffer
+        cut = buffer.rfind(b"\n") + 1
+        self.partial = buffer[cut:]
+        return buffer[:cut]
+
+    def read_block(self):
+        """
+        Lit les lignes ajoutées depuis le dernier appel, au plus READ_SIZE
+        octets (plus la ligne partielle précédente), coupés en fin de ligne.
+
+        Les données restent en octets : le filtrage par mots-clés se fait
+        avant tout décodage.
+
+        Returns:
+            bytes: Nouvelles lignes complètes (vide si rien de nouveau)
+        """
+        if self.file is None:
+            # Fichier absent (entre deux rotations) : le lire dès sa création
+            self._open(True)
+            if self.file is None:
+                return b""
+
+        blocks = []
+        data = self._read_available()
+        if self.pending:
+            # Arriéré (--from-start, rafale d'écritures) : lot suivant au prochain appel
+            return self._complete(data)
+
+        try:
+            st = os.stat(self.filepath)
+        except OSError:
+            st = None
+
+        if st is not None and (st.st_dev, st.st_ino) != self.inode:
+            # Rotation : l'ancien fichier a été vidé ci-dessus, passer au nouveau
+            log_info(f"Rotation détectée, réouverture de {self.filepath}")
+            blocks.append(self._complete(data, final=True))
+            self.file.close()
+            self._open(True)
+            if self.file is None:
+                return b"".join(blocks)
+            data = self._read_available()
+        elif st is not None and st.st_size < self.offset:
+            # Troncature (copytruncate) : reprendre au début
+            log_info(f"Troncature détectée, relecture de {self.filepath} depuis le début")
+            blocks.append(self._complete(data, final=True))
+            self.file.seek(0)
+            self.offset = 0
+            data = self._read_available()
+
+        blocks.append(self._complete(data))
+        return b"".join(blocks)
+
+    def wait(self):
+        """Attend de nouvelles données (notification inotify ou délai de scrutation)."""
+        if self.inotify is not None:
+            self.inotify.wait(self.poll_interval)
+        else:
+            time.sleep(self.poll_interval)
+
+    def batches(self):
+        """
+        Produit indéfiniment les lots de lignes ajoutées au fichier, de
+        taille bornée : un arriéré est découpé en plusieurs lots.
+
+        Yields:
+            bytes: Lignes complètes ajoutées depuis le lot précédent
+        """
+        while True:
+            block = self.read_block()
+            if block:
+                yield block
+            elif not self.pending:
+                self.wait()
+
+    def close(self):
+        """Libère le fichier et la surveillance inotify."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,747 @@
+"""
+Module d'index annexe pour LogLens.
+
+Un fichier d'index (``<log>.llidx``) est construit une fois par fichier de
+log. Il associe à chaque IP, compte et catégorie d'anomalie la liste triée
+des positions (en octets) des lignes concernées, et découpe le fichier en
+blocs dont il retient l'horodatage. Une requête ne lit que les listes et
+les lignes utiles au lieu de reparcourir tout le fichier.
+
+Format (entiers little-endian, sections alignées sur 8 octets, lues
+directement par ``mmap``) :
+
+- en-tête ``_HEADER`` : identification du fichier source et position des sections ;
+- blocs temporels ``_BLOCK``, triés : (horodatage, position, année, mois) ;
+- répertoire des clés ``_KEY``, trié par clé : (position du nom, longueur,
+  rang de la première position, nombre de positions) ;
+- noms des clés (``ip:…``, ``user:…``, ``type:…``) ;
+- listes de positions (entiers non signés de 64 bits).
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from .checkpoint import hash_head
+from .detector import get_matcher
+from .inputs import INDEX_EXTENSION, is_compressed, open_binary
+from .parser import READ_BLOCK_SIZE, detect_log_type, filter_block_offsets
+from .record import IP_PATTERN, USER_PATTERN, WINDOWS_USER_PATTERN
+from .timestamps import TimestampParser
+from .utils import log_info, log_warning
+
+INDEX_MAGIC = b"LLIDX\x00\x00\x00"
+
+# Version du format des fichiers d'index
+INDEX_VERSION = 1
+
+# Taille (en octets du fichier source) couverte par un bloc temporel
+TIME_BLOCK_SIZE = 64 * 1024
+
+# Nombre de positions gardées en mémoire avant d'écrire une portion
+# intermédiaire de l'index (fusionnées à la fin de la construction)
+SPILL_POSITIONS = 8 * 1024 * 1024
+
+# magic, version, octets de l'empreinte, taille indexée, taille sur disque,
+# date de modification (ns), date de référence des années, empreinte du début,
+# nombre de blocs, position des blocs, nombre de clés, position du répertoire,
+# position des noms, position des listes
+_HEADER = struct.Struct("<8sIIQQqq32sQQQQQQ")
+_BLOCK = struct.Struct("<qQii")
+_KEY = struct.Struct("<IIQQ")
+
+# Horodatage des blocs précédant la première ligne datée
+_NO_TIME = -2 ** 63
+
+# Nombre de lignes essayées pour dater le début d'un bloc
+_BLOCK_PROBE_LINES = 16
+
+_IP_BYTES = re.compile(IP_PATTERN.pattern.encode())
+_USER_BYTES = re.compile(USER_PATTERN.pattern.encode())
+_WINDOWS_USER_BYTES = re.compile((USER_PATTERN.pattern + "|" + WINDOWS_USER_PATTERN.pattern).encode())
+
+def index_path(filepath, index_dir=None):
+    """
+    Retourne le chemin du fichier d'index d'un fichier de log.
+
+    Args:
+        filepath (str): Chemin du fichier de log
+        index_dir (str): Répertoire des index (à côté du fichier par défaut)
+
+    Returns:
+        str: Chemin du fichier d'index
+    """
+    if index_dir:
+        return os.path.join(index_dir, os.path.basename(filepath) + INDEX_EXTENSION)
+    return filepath + INDEX_EXTENSION
+
+def _align(position):
+    """Arrondit une position au multiple de 8 supérieur."""
+    return (position + 7) & ~7
+
+def _little_endian(offsets):
+    """Retourne une liste de positions dans l'ordre d'octets du format."""
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets
+
+class IndexBuilder:
+    """
+    Construction de l'index d'un flux, bloc de lignes par bloc de lignes.
+
+    Les IPs et les comptes sont recherchés directement dans les octets de
+    toutes les lignes ; les catégories d'anomalie sont celles des lignes
+    pertinentes, classées comme lors d'une analyse. Au-delà de
+    ``SPILL_POSITIONS`` positions, les listes sont écrites dans une portion
+    intermédiaire : la mémoire utilisée ne dépend pas de la taille du fichier.
+    """
+
+    def __init__(self, log_type="generic", reference=None, base=0):
+        """
+        Args:
+            log_type (str): Type de log ('syslog', 'auth', 'windows', 'generic')
+            reference (datetime): Date de référence pour déduire l'année des lignes syslog
+            base (int): Position du premier octet indexé
+        """
+        self.matcher = get_matcher()
+        self.timestamps = TimestampParser(reference)
+        self.reference = self.timestamps.reference
+        self.user_pattern = _WINDOWS_USER_BYTES if log_type == "windows" else _USER_BYTES
+        self.lists = {}
+        self.positions = 0
+        self.blocks = []
+        self.block_starts = []
+        self.clock = _NO_TIME
+        self._next_block = base
+        self.end = base
+        # Portions intermédiaires écrites sur disque
+        self.runs = []
+
+    def _add(self, key, offset):
+        """Ajoute une ligne à la liste d'une clé (une seule fois par ligne)."""
+        offsets = self.lists.get(key)
+        if offsets is None:
+            offsets = self.lists[key] = array("Q")
+        elif offsets[-1] == offset:
+            return
+        offsets.append(offset)
+        self.positions += 1
+
+    def feed(self, data, base):
+        """
+        Indexe un bloc de lignes complètes.
+
+        Args:
+            data (bytes): Lignes complètes, dans l'ordre du flux
+            base (int): Position du bloc dans le flux
+        """
+        add = self._add
+        rfind = data.rfind
+
+        for match in _IP_BYTES.finditer(data):
+            add(b"ip:" + match.group(), base + rfind(b"\n", 0, match.start()) + 1)
+        for match in self.user_pattern.finditer(data):
+            add(b"user:" + match.group(match.lastindex), base + rfind(b"\n", 0, match.start()) + 1)
+
+        match_lower = self.matcher.match_lower
+        for start, line in filter_block_offsets(data):
+            match = match_lower(line.lower())
+            if match is not None:
+                add(b"type:" + match[0].encode(), base + start)
+
+        self.end = base + len(data)
+        while self._next_block < self.end:
+            self._add_block(data, base)
+
+    def _add_block(self, data, base):
+        """
+        Ouvre un bloc temporel à la première ligne suivant ``_next_block``.
+
+        Le bloc est daté par sa première ligne datée. Les horodatages des
+        blocs sont rendus croissants (maximum courant) : un léger désordre
+        entre les lignes est absorbé par la marge d'un bloc des requêtes.
+        """
+        start = self._next_block - base
+        if start > 0 and data[start - 1:start] != b"\n":
+            start = data.find(b"\n", start) + 1
+            if start == 0:
+                # Le bloc commencera avec les données suivantes
+                self._next_block = self.end
+                return
+
+        timestamps = self.timestamps
+        year, month = timestamps.year or 0, timestamps.last_month or 0
+        epoch = None
+        line_start = start
+        for _ in range(_BLOCK_PROBE_LINES):
+            if line_start >= len(data):
+                break
+            line_end = data.find(b"\n", line_start)
+            if line_end == -1:
+                line_end = len(data)
+            epoch = timestamps.parse(data[line_start:min(line_end, line_start + 64)].decode("utf-8", errors="ignore"))
+            if epoch is not None:
+                break
+            line_start = line_end + 1
+
+        if epoch is not None and epoch > self.clock:
+            self.clock = epoch
+        self.blocks.append((self.clock, base + start, year, month))
+        self.block_starts.append(base + start)
+        self._next_block = base + start + TIME_BLOCK_SIZE
+
+    def spill_if_needed(self, path):
+        """
+        Écrit les listes en mémoire dans une portion intermédiaire si elles sont trop grandes.
+
+        Args:
+            path (str): Chemin de l'index final (les portions sont écrites à côté)
+        """
+        if self.positions < SPILL_POSITIONS:
+            return
+        run_path = f"{path}.{len(self.runs)}.tmp"
+        keys = sorted(self.lists)
+        _write_index(run_path, None, self.reference, self.end, [], keys,
+                     [len(self.lists[key]) for key in keys],
+                     lambda f, key: _little_endian(self.lists[key]).tofile(f))
+        self.runs.append(LogIndex(run_path))
+        self.lists = {}
+        self.positions = 0
+
+    def write(self, path, source):
+        """
+        Écrit l'index, en fusionnant les portions intermédiaires éventuelles.
+
+        Args:
+            path (str): Chemin du fichier d'index
+            source (dict): Identification du fichier source (``_source_signature``)
+        """
+        counts = {}
+        for run in self.runs:
+            for key, _, count in run.iter_keys():
+                counts[key] = counts.get(key, 0) + count
+        for key, offsets in self.lists.items():
+            counts[key] = counts.get(key, 0) + len(offsets)
+        keys = sorted(counts)
+
+        def write_postings(f, key):
+            # Les portions couvrent des plages successives du fichier : leurs
+            # listes mises bout à bout restent triées
+            for run in self.runs:
+                f.write(run.raw_postings(key))
+            offsets = self.lists.get(key)
+            if offsets is not None:
+                _little_endian(offsets).tofile(f)
+
+        try:
+            _write_index(path, source, self.reference, self.end, self.blocks, keys,
+                         [counts[key] for key in keys], write_postings)
+        finally:
+            for run in self.runs:
+                run.close()
+                os.remove(run.path)
+            self.runs = []
+
+    def postings(self, key):
+        """
+        Retourne les positions des lignes d'une clé.
+
+        Args:
+            key (bytes): Clé (``ip:…``, ``user:…``, ``type:…``)
+
+        Returns:
+            array: Positions triées
+        """
+        return self.lists.get(key, array("Q"))
+
+    @property
+    def block_count(self):
+        """Nombre de blocs temporels."""
+        return len(self.blocks)
+
+    def block(self, i):
+        """
+        Retourne le i-ème bloc temporel.
+
+        Returns:
+            tuple: (horodatage, position, année, mois)
+        """
+        return self.blocks[i]
+
+    def block_at(self, offset):
+        """
+        Retourne le bloc temporel contenant une position.
+
+        Returns:
+            tuple: Bloc temporel, None si la position précède le premier bloc
+        """
+        i = bisect_right(self.block_starts, offset) - 1
+        return self.blocks[i] if i >= 0 else None
+
+def _write_index(path, source, reference, size, blocks, keys, counts, write_postings):
+    """
+    Écrit un fichier d'index (via un fichier temporaire renommé).
+
+    Args:
+        path (str): Chemin du fichier d'index
+        source (dict): Identification du fichier source, None pour une portion intermédiaire
+        reference (datetime): Date de référence des années syslog
+        size (int): Nombre d'octets indexés
+        blocks (list): Blocs temporels
+        keys (list): Clés triées
+        counts (list): Nombre de positions de chaque clé
+        write_postings (callable): Écrit les positions d'une clé dans le fichier
+    """
+    source = source or {"head_size": 0, "disk_size": 0, "mtime_ns": 0, "head_hash": b""}
+    names = b"".join(keys)
+    blocks_offset = _HEADER.size
+    keys_offset = blocks_offset + len(blocks) * _BLOCK.size
+    names_offset = keys_offset + len(keys) * _KEY.size
+    postings_offset = _align(names_offset + len(names))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, source["head_size"], size,
+                             source["disk_size"], source["mtime_ns"], int(reference.timestamp()),
+                             source["head_hash"], len(blocks), blocks_offset, len(keys),
+                             keys_offset, names_offset, postings_offset))
+        for block in blocks:
+            f.write(_BLOCK.pack(*block))
+        name_position = 0
+        first = 0
+        for key, count in zip(keys, counts):
+            f.write(_KEY.pack(name_position, len(key), first, count))
+            name_position += len(key)
+            first += count
+        f.write(names)
+        f.write(b"\0" * (postings_offset - names_offset - len(names)))
+        for key in keys:
+            write_postings(f, key)
+    os.replace(tmp_path, path)
+
+def _source_signature(filepath, f):
+    """
+    Identifie un fichier source : taille, date de modification, empreinte du début.
+
+    Args:
+        filepath (str): Chemin du fichier
+        f (file): Fichier ouvert en mode binaire (décompressé)
+
+    Returns:
+        dict: Identification du fichier
+    """
+    st = os.stat(filepath)
+    head_hash, head_size = hash_head(f)
+    return {
+        "head_size": head_size,
+        "disk_size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "head_hash": bytes.fromhex(head_hash)
+    }
+
+class LogIndex:
+    """
+    Fichier d'index ouvert en lecture via ``mmap``.
+
+    Seules les pages utiles (en-tête, répertoire des clés parcouru par
+    dichotomie, listes demandées) sont lues depuis le disque.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Chemin du fichier d'index
+
+        Raises:
+            ValueError: Si le fichier n'est pas un index LogLens de cette version
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.head_size, self.end, self.disk_size, self.mtime_ns,
+             reference, self.head_hash, self.block_count, self.blocks_offset, self.key_count,
+             self.keys_offset, self.names_offset, self.postings_offset) = _HEADER.unpack_from(self._map)
+        except struct.error:
+            magic = version = None
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"{path} n'est pas un index LogLens (version {INDEX_VERSION})")
+        self.reference = datetime.fromtimestamp(reference)
+
+    def close(self):
+        """Libère la projection du fichier."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _key_at(self, i):
+        """Retourne (clé, rang de la première position, nombre de positions) de la i-ème clé."""
+        name_position, length, first, count = _KEY.unpack_from(self._map, self.keys_offset + i * _KEY.size)
+        start = self.names_offset + name_position
+        return self._map[start:start + length], first, count
+
+    def _find(self, key):
+        """Cherche une clé par dichotomie dans le répertoire."""
+        lo, hi = 0, self.key_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name, first, count = self._key_at(mid)
+            if name < key:
+                lo = mid + 1
+            elif name > key:
+                hi = mid
+            else:
+                return first, count
+        return None
+
+    def iter_keys(self):
+        """
+        Parcourt les clés de l'index, dans l'ordre.
+
+        Yields:
+            tuple: (clé, rang de la première position, nombre de positions)
+        """
+        for i in range(self.key_count):
+            yield self._key_at(i)
+
+    def raw_postings(self, key):
+        """
+        Retourne les positions d'une clé telles qu'enregistrées (octets little-endian).
+
+        Args:
+            key (bytes): Clé
+
+        Returns:
+            bytes: Positions encodées, vide si la clé est absente
+        """
+        found = self._find(key)
+        if found is None:
+            return b""
+        first, count = found
+        start = self.postings_offset + first * 8
+        return self._map[start:start + count * 8]
+
+    def postings(self, key):
+        """
+        Retourne les positions des lignes d'une clé.
+
+        Args:
+            key (bytes): Clé (``ip:…``, ``user:…``, ``type:…``)
+
+        Returns:
+            array: Positions triées
+        """
+        offsets = array("Q")
+        offsets.frombytes(self.raw_postings(key))
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        return offsets
+
+    def block(self, i):
+        """
+        Retourne le i-ème bloc temporel.
+
+        Returns:
+            tuple: (horodatage, position, année, mois)
+        """
+        return _BLOCK.unpack_from(self._map, self.blocks_offset + i * _BLOCK.size)
+
+    def block_at(self, offset):
+        """
+        Retourne le bloc temporel contenant une position.
+
+        Returns:
+            tuple: Bloc temporel, None si la position précède le premier bloc
+        """
+        i = _bisect_blocks(self, offset, 1, bisect_right) - 1
+        return self.block(i) if i >= 0 else None
+
+    def matches(self, filepath):
+        """
+        Indique si l'index correspond encore au fichier source.
+
+        Un fichier non compressé auquel des lignes ont été ajoutées reste
+        couvert : seule la fin non indexée est relue lors des requêtes.
+
+        Args:
+            filepath (str): Chemin du fichier de log
+
+        Returns:
+            bool: True si le début du fichier est inchangé et qu'il n'a pas été tronqué
+        """
+        try:
+            st = os.stat(filepath)
+            if is_compressed(filepath):
+                if st.st_size != self.disk_size or st.st_mtime_ns != self.mtime_ns:
+                    return False
+            elif st.st_size < self.end:
+                return False
+            with open_binary(filepath) as f:
+                head_hash, read = hash_head(f, self.head_size)
+        except OSError:
+            return False
+        return read == self.head_size and bytes.fromhex(head_hash) == self.head_hash
+
+def _read_lines(f, base, builder, final):
+    """
+    Indexe un flux binaire par grands blocs de lignes complètes.
+
+    Args:
+        f (file): Flux binaire positionné en ``base``
+        base (int): Position du début de la lecture
+        builder (IndexBuilder): Index en construction
+        final (bool): Indexer aussi une dernière ligne sans fin de ligne
+
+    Yields:
+        None: Après chaque bloc indexé (occasion d'écrire une portion intermédiaire)
+    """
+    carry = b""
+    while True:
+        block = f.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        data = carry + block if carry else block
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        builder.feed(data[:cut] if carry else data, base)
+        base += cut
+        yield
+    if carry and final:
+        builder.feed(carry, base)
+
+def build_index(filepath, index_dir=None):
+    """
+    Construit (ou reconstruit) l'index annexe d'un fichier de log.
+
+    Seules les lignes complètes d'un fichier non compressé sont indexées :
+    une ligne en cours d'écriture le sera lors des requêtes suivantes.
+
+    Args:
+        filepath (str): Chemin du fichier de log
+        index_dir (str): Répertoire des index (à côté du fichier par défaut)
+
+    Returns:
+        tuple: (chemin de l'index, nombre de clés, nombre de blocs temporels)
+    """
+    path = index_path(filepath, index_dir)
+    builder = IndexBuilder(detect_log_type(filepath))
+    log_info(f"Indexation du fichier: {filepath}")
+
+    with open_binary(filepath) as f:
+        source = _source_signature(filepath, f)
+        f.seek(0)
+        try:
+            for _ in _read_lines(f, 0, builder, is_compressed(filepath)):
+                builder.spill_if_needed(path)
+            builder.write(path, source)
+        except BaseException:
+            for run in builder.runs:
+                run.close()
+                os.remove(run.path)
+            raise
+
+    with LogIndex(path) as index:
+        return path, index.key_count, index.block_count
+
+def open_index(filepath, index_dir=None):
+    """
+    Ouvre l'index d'un fichier de log s'il existe et correspond au fichier.
+
+    Args:
+        filepath (str): Chemin du fichier de log
+        index_dir (str): Répertoire des index (à côté du fichier par défaut)
+
+    Returns:
+        LogIndex or None: Index ouvert, None s'il est absent ou périmé
+    """
+    path = index_path(filepath, index_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        index = LogIndex(path)
+    except (OSError, ValueError) as e:
+        log_warning(f"Index illisible {path}: {str(e)}")
+        return None
+    if not index.matches(filepath):
+        log_warning(f"Index périmé pour {filepath} : le fichier a été modifié depuis l'indexation")
+        index.close()
+        return None
+    return index
+
+def _bisect_blocks(part, value, field, bisect=bisect_left):
+    """
+    Recherche dichotomique sur un champ des blocs temporels (triés par position et par horodatage).
+
+    Args:
+        part (LogIndex or IndexBuilder): Index interrogé
+        value (int): Valeur cherchée
+        field (int): Champ comparé (0 : horodatage, 1 : position)
+        bisect (callable): ``bisect_left`` ou ``bisect_right``
+
+    Returns:
+        int: Rang d'insertion de la valeur
+    """
+    lo, hi = 0, part.block_count
+    right = bisect is bisect_right
+    while lo < hi:
+        mid = (lo + hi) // 2
+        current = part.block(mid)[field]
+        if current < value or (right and current == value):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def _time_range(part, since, until):
+    """
+    Calcule la plage d'octets pouvant contenir des lignes d'un intervalle de temps.
+
+    Un bloc de marge est ajouté de chaque côté pour les lignes légèrement
+    désordonnées.
+
+    Returns:
+        tuple: (rang du premier bloc, position de début, position de fin)
+    """
+    first = 0
+    if since is not None:
+        first = max(_bisect_blocks(part, since, 0) - 2, 0)
+    last = part.block_count
+    if until is not None:
+        last = _bisect_blocks(part, until, 0, bisect_right) + 1
+    if first >= part.block_count or first >= last:
+        return first, 0, 0
+    end = part.block(last)[1] if last < part.block_count else part.end
+    return first, part.block(first)[1], end
+
+def _contains(offsets, offset):
+    """Indique si une liste triée de positions contient une position."""
+    i = bisect_left(offsets, offset)
+    return i < len(offsets) and offsets[i] == offset
+
+def _query_part(part, f, keys, since, until):
+    """
+    Exécute une requête sur un index (fichier d'index, ou fin non indexée construite en mémoire).
+
+    Args:
+        part (LogIndex or IndexBuilder): Index de la plage interrogée
+        f (file): Fichier de log ouvert en mode binaire
+        keys (list): Clés dont toutes les lignes retenues doivent faire partie
+        since (int): Horodatage minimal, None si non borné
+        until (int): Horodatage maximal, None si non borné
+
+    Yields:
+        tuple: (position de la ligne, ligne)
+    """
+    timed = since is not None or until is not None
+    low = _NO_TIME if since is None else since
+    high = -_NO_TIME if until is None else until
+    timestamps = TimestampParser(part.reference)
+    if timed:
+        first, start, end = _time_range(part, since, until)
+        if start >= end:
+            return
+
+    if keys:
+        # Intersection à partir de la liste la plus courte
+        lists = sorted((part.postings(key) for key in keys), key=len)
+        shortest, others = lists[0], lists[1:]
+        begin = bisect_left(shortest, start) if timed else 0
+        stop = bisect_left(shortest, end) if timed else len(shortest)
+        for i in range(begin, stop):
+            offset = shortest[i]
+            if others and not all(_contains(other, offset) for other in others):
+                continue
+            f.seek(offset)
+            line = f.readline().decode("utf-8", errors="ignore").rstrip("\r\n")
+            if timed:
+                # L'année des lignes syslog est déduite depuis le début du bloc
+                _, _, year, month = part.block_at(offset)
+                timestamps.year = year or None
+                timestamps.last_month = month or None
+                epoch = timestamps.parse(line)
+                if epoch is None or not low <= epoch <= high:
+                    continue
+            yield offset, line
+        return
+
+    # Critère temporel seul : relire la plage, ligne par ligne
+    _, _, year, month = part.block(first)
+    timestamps.year = year or None
+    timestamps.last_month = month or None
+    f.seek(start)
+    offset = start
+    while offset < end:
+        raw = f.readline()
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="ignore").rstrip("\r\n")
+        if line:
+            epoch = timestamps.parse(line)
+            if epoch is not None and low <= epoch <= high:
+                yield offset, line
+        offset += len(raw)
+
+def query_index(index, filepath, ip=None, user=None, category=None, since=None, until=None):
+    """
+    Cherche les lignes d'un fichier de log correspondant à tous les critères donnés.
+
+    Les lignes sont lues directement à leur position ; les lignes ajoutées
+    au fichier depuis l'indexation sont indexées en mémoire puis interrogées
+    de la même façon.
+
+    Args:
+        index (LogIndex): Index du fichier (``open_index``)
+        filepath (str): Chemin du fichier de log
+        ip (str): Adresse IP présente dans la ligne
+        user (str): Compte visé
+        category (str): Catégorie d'anomalie de la ligne
+        since (int): Horodatage minimal (epoch)
+        until (int): Horodatage maximal (epoch)
+
+    Yields:
+        tuple: (position de la ligne, ligne), dans l'ordre du fichier
+
+    Raises:
+        ValueError: Si aucun critère n'est donné
+    """
+    keys = []
+    if ip:
+        keys.append(b"ip:" + ip.encode())
+    if user:
+        keys.append(b"user:" + user.encode())
+    if category:
+        keys.append(b"type:" + category.encode())
+    if not keys and since is None and until is None:
+        raise ValueError("Aucun critère de recherche")
+
+    with open_binary(filepath) as f:
+        for result in _query_part(index, f, keys, since, until):
+            yield result
+
+        if is_compressed(filepath) or os.path.getsize(filepath) <= index.end:
+            return
+        # Fin du fichier ajoutée depuis l'indexation
+        tail = IndexBuilder(detect_log_type(filepath), index.reference, index.end)
+        last = index.block_at(index.end)
+        if last is not None:
+            tail.timestamps.year = last[2] or None
+            tail.timestamps.last_month = last[3] or None
+        f.seek(index.end)
+        for _ in _read_lines(f, index.end, tail, False):
+            pass
+        for result in _query_part(tail, f, keys, since, until):
+            yield result
@@ -0,0 +1,165 @@
+"""
+Module de gestion des fichiers d'entrée pour LogLens.
+
+Résout les chemins, motifs glob et répertoires passés en ligne de commande,
+ordonne les jeux de fichiers issus d'une rotation (auth.log.14.gz ...
+auth.log.1, auth.log) du plus ancien au plus récent, et ouvre les fichiers
+compressés (gzip, bz2, xz) en décompression à la volée.
+"""
+
+import bz2
+import glob
+import gzip
+import io
+import lzma
+import os
+import re
+
+from .utils import log_warning
+
+# Taille des tampons de lecture (en octets)
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Signatures des formats compressés et fonctions d'ouverture associées
+COMPRESSION_FORMATS = [
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open)
+]
+
+# Extensions de compression retirées avant l'analyse du nom de fichier
+COMPRESSION_EXTENSIONS = (".gz", ".bz2", ".xz")
+
+# Extension des index annexes (ignorés lors de la résolution des entrées)
+INDEX_EXTENSION = ".llidx"
+
+# Suffixe de rotation : auth.log.1, auth.log.2.gz, auth.log-20240101.gz
+_ROTATION_SUFFIX = re.compile(r"[.-](\d+)$")
+
+def get_opener(filepath):
+    """
+    Détermine la fonction d'ouverture d'un fichier d'après sa signature.
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        function or None: Fonction d'ouverture du format compressé, None pour un fichier texte
+    """
+    with open(filepath, "rb") as f:
+        magic = f.read(6)
+    for signature, opener in COMPRESSION_FORMATS:
+        if magic.startswith(signature):
+            return opener
+    return None
+
+def is_compressed(filepath):
+    """
+    Indique si un fichier est compressé.
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        bool: True si le fichier est au format gzip, bz2 ou xz
+    """
+    return get_opener(filepath) is not None
+
+def open_binary(filepath):
+    """
+    Ouvre un fichier en lecture binaire, décompressé à la volée si nécessaire.
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        file: Flux binaire tamponné
+    """
+    opener = get_opener(filepath)
+    if opener is None:
+        return open(filepath, "rb", buffering=READ_BUFFER_SIZE)
+    return io.BufferedReader(opener(filepath, "rb"), buffer_size=READ_BUFFER_SIZE)
+
+def open_text(filepath):
+    """
+    Ouvre un fichier en lecture texte, décompressé à la volée si nécessaire.
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        file: Flux texte UTF-8 (caractères invalides ignorés)
+    """
+    return io.TextIOWrapper(open_binary(filepath), encoding="utf-8", errors="ignore")
+
+def rotation_age(filepath):
+    """
+    Estime l'ancienneté d'un fichier dans son jeu de rotation.
+
+    Le fichier courant vaut 0, auth.log.1 vaut 1, auth.log.2.gz vaut 2, etc.
+    Pour les suffixes datés (dateext), un fichier plus récent est plus jeune.
+
+    Args:
+        filepath (str): Chemin du fichier
+
+    Returns:
+        float: Ancienneté relative (plus grand = plus ancien)
+    """
+    name = os.path.basename(filepath)
+    for extension in COMPRESSION_EXTENSIONS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+            break
+
+    match = _ROTATION_SUFFIX.search(name)
+    if not match:
+        return 0
+    value = int(match.group(1))
+    if len(match.group(1)) == 8:
+        # Suffixe daté AAAAMMJJ : plus ancien que le fichier courant
+        return 1.0 - value / 100000000.0
+    return value
+
+def _chronological_key(filepath):
+    """
+    Clé de tri chronologique : les plus anciens fichiers de rotation d'abord,
+    puis la date de modification.
+    """
+    try:
+        mtime = os.path.getmtime(filepath)
+    except OSError:
+        mtime = 0
+    return (-rotation_age(filepath), mtime, filepath)
+
+def expand_inputs(paths):
+    """
+    Résout une liste de chemins, motifs glob et répertoires en fichiers.
+
+    Args:
+        paths (list): Chemins, motifs glob ou répertoires
+
+    Returns:
+        list: Fichiers existants, sans doublons, du plus ancien au plus récent
+    """
+    files = []
+    seen = set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            candidates = [os.path.join(path, name) for name in os.listdir(path)]
+        elif any(c in path for c in "*?["):
+            candidates = glob.glob(path)
+            if not candidates:
+                log_warning(f"Aucun fichier ne correspond au motif {path}")
+        else:
+            candidates = [path]
+
+        for candidate in candidates:
+            if not os.path.isfile(candidate) or candidate.endswith(INDEX_EXTENSION):
+                continue
+            key = os.path.abspath(candidate)
+            if key not in seen:
+                seen.add(key)
+                files.append(candidate)
+
+    return sorted(files, key=_chronological_key)
@@ -0,0 +1,167 @@
+"""
+Module de lecture des journaux systemd exportés.
+
+Reconnaît les deux formes d'export de journald : JSON, un objet par ligne
+(``journalctl -o json``, aussi produit par les moteurs de conteneurs), et
+le format d'export natif (``journalctl -o export``), des champs
+``NOM=valeur`` groupés par entrée et séparés par une ligne vide.
+
+Les lignes JSON sont structurées par ``RecordParser`` (type ``json``) ;
+ce module lit le format d'export, dont une entrée s'étend sur plusieurs
+lignes. Seuls les champs utiles sont conservés : les autres sont sautés
+sans être décodés.
+"""
+
+import struct
+import sys
+
+from .inputs import open_binary
+from .record import JournalRecord, RecordParser
+from .utils import log_info, log_error
+
+# Champs du format d'export conservés
+EXPORT_MESSAGE = b"MESSAGE"
+EXPORT_HOST = b"_HOSTNAME"
+EXPORT_PROGRAM = b"SYSLOG_IDENTIFIER"
+EXPORT_PID = b"_PID"
+EXPORT_REALTIME = b"__REALTIME_TIMESTAMP"
+EXPORT_FIELDS = frozenset((EXPORT_MESSAGE, EXPORT_HOST, EXPORT_PROGRAM, EXPORT_PID, EXPORT_REALTIME))
+
+# Premiers champs d'une entrée du format d'export
+_EXPORT_PREFIXES = (b"__CURSOR=", b"__REALTIME_TIMESTAMP=")
+
+_U64 = struct.Struct("<Q")
+
+def detect_format(filepath):
+    """
+    Reconnaît un journal exporté d'après sa première ligne non vide.
+
+    Args:
+        filepath (str): Chemin du fichier (compressé ou non)
+
+    Returns:
+        str or None: 'json' (un objet par ligne), 'journal' (format
+        d'export natif), None pour un log texte
+    """
+    try:
+        with open_binary(filepath) as f:
+            for _ in range(5):
+                line = f.readline(65536)
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith(_EXPORT_PREFIXES):
+                    return "journal"
+                if line[:1] == b"{" and line[-1:] == b"}":
+                    return "json"
+                return None
+    except Exception:
+        pass
+    return None
+
+def iter_export_entries(stream):
+    """
+    Lit les entrées d'un flux au format d'export de journald.
+
+    Les valeurs binaires (champ seul sur sa ligne, suivi de la taille sur
+    64 bits et des données) sont sautées sans lecture si le champ n'est
+    pas conservé.
+
+    Args:
+        stream (file): Flux binaire
+
+    Yields:
+        dict: Champs conservés de chaque entrée (noms et valeurs en octets)
+    """
+    entry = {}
+    readline = stream.readline
+    while True:
+        line = readline()
+        if not line:
+            break
+        if line == b"\n":
+            if entry:
+                yield entry
+                entry = {}
+            continue
+        equal = line.find(b"=")
+        if equal != -1:
+            name = line[:equal]
+            if name in EXPORT_FIELDS:
+                entry[name] = line[equal + 1:].rstrip(b"\n")
+            continue
+        # Valeur binaire : taille, données, fin de ligne
+        name = line.rstrip(b"\n")
+        header = stream.read(8)
+        if len(header) < 8:
+            break
+        size = _U64.unpack(header)[0]
+        if name in EXPORT_FIELDS:
+            entry[name] = stream.read(size)
+            stream.read(1)
+        elif stream.seekable():
+            stream.seek(size + 1, 1)
+        else:
+            stream.read(size + 1)
+    if entry:
+        yield entry
+
+def export_record(entry, records):
+    """
+    Crée l'enregistrement d'une entrée du format d'export.
+
+    Args:
+        entry (dict): Champs conservés de l'entrée
+        records (RecordParser): Parser JSON du flux
+
+    Returns:
+        JournalRecord: Entrée structurée, None si elle n'a pas de message
+    """
+    message = entry.get(EXPORT_MESSAGE)
+    if message is None:
+        return None
+    record = JournalRecord(message.decode("utf-8", errors="replace").strip(), records)
+    host = entry.get(EXPORT_HOST)
+    record._host = sys.intern(host.decode("utf-8", errors="replace")) if host else None
+    program = entry.get(EXPORT_PROGRAM)
+    if program:
+        record._program = sys.intern(program.decode("utf-8", errors="replace"))
+    pid = entry.get(EXPORT_PID)
+    if pid and pid.isdigit():
+        record._pid = int(pid)
+    realtime = entry.get(EXPORT_REALTIME)
+    record._timestamp = int(realtime) // 1000000 if realtime and realtime.isdigit() else None
+    return record
+
+def parse_export(filepath, keywords):
+    """
+    Lit les entrées pertinentes d'un journal au format d'export.
+
+    Seul le message est comparé aux mots-clés : les noms et les autres
+    champs de l'entrée ne la rendent pas pertinente.
+
+    Args:
+        filepath (str): Chemin du journal exporté (compressé ou non)
+        keywords (list): Mots-clés des entrées pertinentes, en octets minuscules
+
+    Yields:
+        JournalRecord: Entrées pertinentes, au fil de la lecture
+    """
+    records = RecordParser("json")
+    count = 0
+    try:
+        with open_binary(filepath) as f:
+            for entry in iter_export_entries(f):
+                count += 1
+                message = entry.get(EXPORT_MESSAGE)
+                if message is None:
+                    continue
+                lowered = message.lower()
+                if any(keyword in lowered for keyword in keywords):
+                    yield export_record(entry, records)
+    except OSError as e:
+        log_error(f"Erreur lors de la lecture du journal {filepath}: {str(e)}")
+        return
+    log_info(f"{count} entrées lues dans {filepath}")
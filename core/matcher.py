@@ -0,0 +1,321 @@
+"""
+Module de correspondance multi-patterns pour LogLens.
+
+Compile une seule fois l'ensemble des patterns d'anomalies en un moteur
+de correspondance : un préfiltre unique sur les littéraux obligatoires de
+chaque regex (à la manière d'Aho-Corasick), puis l'évaluation des seules
+regex candidates pour les lignes qui passent le préfiltre.
+"""
+
+import re
+from time import perf_counter_ns
+
+# Caractères ayant une signification particulière dans une regex
+_META_CHARS = set(".^$*+?{}[]|()\\")
+
+
+def extract_literals(pattern):
+    """
+    Extrait les littéraux obligatoires d'une regex simple.
+
+    Seules les regex composées de texte littéral et de jokers (``.*``,
+    ``.+``, etc.) sont décomposées ; pour toute construction plus complexe
+    (groupes, alternances, classes), aucun littéral n'est retourné et le
+    pattern sera toujours évalué.
+
+    Args:
+        pattern (str): Expression régulière à analyser
+
+    Returns:
+        list: Littéraux devant apparaître dans toute ligne correspondante
+    """
+    if any(c in pattern for c in "()|["):
+        return []
+
+    literals = []
+    current = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isalnum():
+                # Classe (\d, \s...) ou assertion (\b) : fin du littéral
+                literals.append("".join(current))
+                current = []
+            else:
+                current.append(escaped)
+            continue
+        if c in "*?+{":
+            # Le caractère précédent est quantifié : il n'est plus obligatoire
+            if current:
+                current.pop()
+            literals.append("".join(current))
+            current = []
+            if c == "{":
+                end = pattern.find("}", i)
+                i = end + 1 if end != -1 else len(pattern)
+                continue
+        elif c in _META_CHARS:
+            literals.append("".join(current))
+            current = []
+        else:
+            current.append(c)
+        i += 1
+    literals.append("".join(current))
+
+    return [literal for literal in literals if literal]
+
+
+def _build_trie_regex(literals):
+    """
+    Construit une regex factorisée en arbre de préfixes (trie) pour un
+    ensemble de littéraux.
+
+    Le moteur ``re`` de CPython ne factorise pas les alternances : à chaque
+    position, chaque branche serait essayée. Partager les préfixes réduit
+    le nombre de branches testées par caractère.
+
+    Args:
+        literals (iterable): Littéraux à reconnaître
+
+    Returns:
+        str: Expression régulière équivalente à l'alternance des littéraux
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for c in literal:
+            node = node.setdefault(c, {})
+        node[""] = {}
+
+    def to_regex(node):
+        branches = [re.escape(c) + to_regex(node[c]) for c in sorted(node) if c]
+        if not branches:
+            return ""
+        regex = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            regex = "(?:" + regex + ")?"
+        return regex
+
+    return to_regex(trie)
+
+
+class PatternMatcher:
+    """
+    Moteur de correspondance compilé à partir d'un dictionnaire de patterns.
+
+    Reproduit exactement la sémantique de la boucle d'origine : la première
+    catégorie (dans l'ordre du dictionnaire) dont un pattern correspond
+    l'emporte, et au sein de cette catégorie le premier pattern.
+    """
+
+    def __init__(self, patterns):
+        """
+        Args:
+            patterns (dict): Catégorie d'anomalie -> liste de regex
+        """
+        # Liste ordonnée des règles : (catégorie, pattern, regex, littéraux)
+        self.rules = []
+        for category, category_patterns in patterns.items():
+            for pattern in category_patterns:
+                self.rules.append((category, pattern, re.compile(pattern), extract_literals(pattern)))
+
+        # Littéral d'ancrage de chaque règle : le plus long de ses littéraux,
+        # remplacé par un autre ancrage qu'il contient le cas échéant (si
+        # "failed password" est présent, "failed" l'est aussi). Les ancrages
+        # restants ne sont jamais sous-chaînes les uns des autres.
+        anchors = sorted({max(literals, key=len) for _, _, _, literals in self.rules if literals}, key=len)
+        reduced = []
+        for anchor in anchors:
+            if not any(other in anchor for other in reduced):
+                reduced.append(anchor)
+
+        # Ancrage -> index des règles qu'il permet de sélectionner ; les
+        # règles sans littéral sont toujours candidates
+        self.anchor_rules = {anchor: [] for anchor in reduced}
+        self.always = []
+        for index, (_, _, _, literals) in enumerate(self.rules):
+            if not literals:
+                self.always.append(index)
+                continue
+            longest = max(literals, key=len)
+            for anchor in reduced:
+                if anchor in longest:
+                    self.anchor_rules[anchor].append(index)
+                    break
+
+        self.prefilter = re.compile(_build_trie_regex(reduced)) if reduced else None
+
+        # Regex fusionnée par catégorie, pour les tests ciblés
+        self.categories = {}
+        for category, category_patterns in patterns.items():
+            if category_patterns:
+                self.categories[category] = re.compile("|".join(f"(?:{p})" for p in category_patterns))
+
+    def match(self, text):
+        """
+        Cherche la première règle correspondant à une entrée de log.
+
+        Args:
+            text (str): Entrée de log brute
+
+        Returns:
+            tuple or None: (catégorie, pattern) de la première règle correspondante
+        """
+        return self.match_lower(text.lower())
+
+    def match_lower(self, lowered):
+        """
+        Variante de ``match`` pour une entrée déjà convertie en minuscules.
+
+        Args:
+            lowered (str): Entrée de log en minuscules
+
+        Returns:
+            tuple or None: (catégorie, pattern) de la première règle correspondante
+        """
+        candidates = None
+        if self.prefilter is not None:
+            search = self.prefilter.search
+            m = search(lowered)
+            if m is not None:
+                # Collecter toutes les occurrences d'ancrages, y compris
+                # chevauchantes, en reprenant la recherche après chaque début
+                candidates = []
+                while m is not None:
+                    candidates.extend(self.anchor_rules[m.group()])
+                    m = search(lowered, m.start() + 1)
+
+        if candidates is None:
+            if not self.always:
+                return None
+            candidates = self.always
+        elif self.always:
+            candidates.extend(self.always)
+
+        rules = self.rules
+        for index in sorted(set(candidates)) if len(candidates) > 1 else candidates:
+            category, pattern, regex, literals = rules[index]
+            if len(literals) > 1 and not all(literal in lowered for literal in literals):
+                continue
+            if regex.search(lowered):
+                return category, pattern
+        return None
+
+    def matches_category(self, lowered, category):
+        """
+        Indique si une entrée correspond à l'un des patterns d'une catégorie.
+
+        Args:
+            lowered (str): Entrée de log en minuscules
+            category (str): Catégorie d'anomalie
+
+        Returns:
+            bool: True si un pattern de la catégorie correspond
+        """
+        regex = self.categories.get(category)
+        return regex is not None and regex.search(lowered) is not None
+
+
+class InstrumentedMatcher(PatternMatcher):
+    """
+    Moteur de correspondance qui compte, pour chaque règle, les évaluations,
+    les correspondances et le temps passé (instrumentation ``--stats``).
+
+    Partage les règles compilées d'un moteur existant ; le préfiltre est
+    compté comme une pseudo-règle. Les résultats sont identiques à ceux du
+    moteur d'origine.
+    """
+
+    def __init__(self, matcher, stats):
+        """
+        Args:
+            matcher (PatternMatcher): Moteur compilé à instrumenter
+            stats (RunStats): Statistiques de l'exécution
+        """
+        self.__dict__.update(matcher.__dict__)
+        self.stats = stats
+        self.counters = [stats.rule(category, pattern) for category, pattern, _, _ in self.rules]
+
+    def match_lower(self, lowered):
+        """
+        Variante instrumentée de ``PatternMatcher.match_lower``.
+
+        Args:
+            lowered (str): Entrée de log en minuscules
+
+        Returns:
+            tuple or None: (catégorie, pattern) de la première règle correspondante
+        """
+        clock = perf_counter_ns
+        candidates = None
+        if self.prefilter is not None:
+            prefilter = self.stats.prefilter
+            start = clock()
+            search = self.prefilter.search
+            m = search(lowered)
+            if m is not None:
+                candidates = []
+                while m is not None:
+                    candidates.extend(self.anchor_rules[m.group()])
+                    m = search(lowered, m.start() + 1)
+            prefilter[0] += 1
+            prefilter[1] += candidates is not None
+            prefilter[2] += clock() - start
+
+        if candidates is None:
+            if not self.always:
+                return None
+            candidates = self.always
+        elif self.always:
+            candidates.extend(self.always)
+
+        rules = self.rules
+        counters = self.counters
+        for index in sorted(set(candidates)) if len(candidates) > 1 else candidates:
+            category, pattern, regex, literals = rules[index]
+            counter = counters[index]
+            start = clock()
+            found = ((len(literals) <= 1 or all(literal in lowered for literal in literals))
+                     and regex.search(lowered) is not None)
+            counter[0] += 1
+            counter[1] += found
+            counter[2] += clock() - start
+            if found:
+                return category, pattern
+        return None
+
+    def matches_category(self, lowered, category):
+        """
+        Variante instrumentée de ``PatternMatcher.matches_category``, comptée
+        comme une règle « catégorie: * ».
+
+        Args:
+            lowered (str): Entrée de log en minuscules
+            category (str): Catégorie d'anomalie
+
+        Returns:
+            bool: True si un pattern de la catégorie correspond
+        """
+        counter = self.stats.rule(category, "*")
+        start = perf_counter_ns()
+        found = PatternMatcher.matches_category(self, lowered, category)
+        counter[0] += 1
+        counter[1] += found
+        counter[2] += perf_counter_ns() - start
+        return found
+
+
+def compile_patterns(patterns):
+    """
+    Construit un moteur de correspondance à partir d'un dictionnaire de patterns.
+
+    Args:
+        patterns (dict): Catégorie d'anomalie -> liste de regex
+
+    Returns:
+        PatternMatcher: Moteur compilé
+    """
+    return PatternMatcher(patterns)
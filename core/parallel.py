@@ -0,0 +1,109 @@
+"""
+Module d'analyse parallèle pour LogLens.
+
+Découpe un fichier de log volumineux en plages d'octets alignées sur les
+fins de ligne, analyse chaque plage dans un processus distinct, puis
+restitue les résultats dans l'ordre du fichier.
+"""
+
+import mmap
+import os
+from multiprocessing import Pool
+
+from . import parser
+from .pipeline import analyze_entries
+from .record import to_records
+from .utils import log_info, log_error
+
+# Taille maximale d'une plage analysée par un processus (en octets)
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Nombre de plages par processus, pour équilibrer la charge
+CHUNKS_PER_WORKER = 4
+
+def split_file(filepath, parts):
+    """
+    Découpe un fichier en plages d'octets se terminant par une fin de ligne.
+
+    Args:
+        filepath (str): Chemin du fichier
+        parts (int): Nombre de plages souhaité
+
+    Returns:
+        list: Liste de tuples (début, fin) couvrant tout le fichier, dans l'ordre
+    """
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return []
+    if parts <= 1:
+        return [(0, size)]
+
+    ranges = []
+    with open(filepath, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            for i in range(1, parts):
+                target = max(size * i // parts, start)
+                newline = mm.find(b"\n", target)
+                if newline == -1:
+                    break
+                end = newline + 1
+                if end > start:
+                    ranges.append((start, end))
+                    start = end
+            if start < size:
+                ranges.append((start, size))
+
+    return ranges
+
+def analyze_chunk(task):
+    """
+    Analyse une plage d'octets d'un fichier de log (exécuté dans un processus).
+
+    Args:
+        task (tuple): (chemin du fichier, début, fin, type de log, résumé en mémoire bornée)
+
+    Returns:
+        tuple: (nombre d'entrées pertinentes, anomalies de la plage, agrégats
+        du résumé de la plage, échecs d'authentification de la plage)
+    """
+    filepath, start, end, log_type, sketches = task
+
+    with open(filepath, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+
+    entries = parser.relevant_messages(to_records(parser.filter_block(data), log_type), log_type)
+    return analyze_entries(entries, sketches)
+
+def iter_chunk_results(filepath, workers, sketches=False):
+    """
+    Analyse un fichier en parallèle et restitue les résultats dans l'ordre.
+
+    Args:
+        filepath (str): Chemin du fichier de log
+        workers (int): Nombre de processus
+        sketches (bool): Agrégats du résumé en mémoire bornée
+
+    Yields:
+        tuple: Résultat de ``analyze_chunk`` pour chaque plage, dans l'ordre du fichier
+    """
+    try:
+        size = os.path.getsize(filepath)
+    except OSError as e:
+        log_error(f"Erreur lors du parsing du fichier {filepath}: {str(e)}")
+        return
+
+    parts = max(workers * CHUNKS_PER_WORKER, -(-size // MAX_CHUNK_SIZE))
+    ranges = split_file(filepath, parts)
+    log_info(f"Analyse parallèle de {filepath}: {len(ranges)} plages sur {workers} processus")
+
+    if not ranges:
+        return
+
+    log_type = parser.detect_log_type(filepath)
+    tasks = [(filepath, start, end, log_type, sketches) for start, end in ranges]
+    with Pool(workers) as pool:
+        # imap conserve l'ordre des plages
+        for result in pool.imap(analyze_chunk, tasks):
+            yield result
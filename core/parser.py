@@ -7,7 +7,10 @@ de différents types de fichiers de logs.
 
 import os
 import re
-from datetime import datetime
+from . import evtx, journal
+from .inputs import open_binary, open_text
+from .record import to_records
+from .stats import get_stats
 from .utils import log_info, log_error
 
 # Mots-clés importants à identifier dans les logs
@@ -18,15 +21,26 @@ KEYWORDS = [
     "brute force", "connection", "authentication"
 ]
 
-def parse_log(filepath):
+# Taille des blocs lus lors du filtrage binaire (en octets)
+READ_BLOCK_SIZE = 1024 * 1024
+
+# Types de journaux lus entrée par entrée, et non ligne à ligne : ni
+# découpage en plages, ni suivi en continu, ni points de reprise, ni index
+RECORD_LOG_TYPES = ("evtx", "journal")
+
+def parse_log(filepath, keywords=None):
     """
     Parse un fichier de log et extrait les entrées pertinentes.
     
+    Les entrées sont produites au fil de la lecture : la mémoire utilisée
+    ne dépend pas de la taille du fichier.
+    
     Args:
         filepath (str): Chemin vers le fichier de log à analyser
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
         
     Returns:
-        list: Liste des entrées de log pertinentes
+        generator: Entrées de log pertinentes (LogRecord)
     """
     log_info(f"Analyse du fichier: {filepath}")
     
@@ -35,28 +49,47 @@ def parse_log(filepath):
     log_info(f"Type de log détecté: {log_type}")
     
     # Utiliser le parser approprié
-    if log_type == "syslog":
-        return parse_syslog(filepath)
+    if log_type in RECORD_LOG_TYPES:
+        if log_type == "evtx":
+            records = evtx.parse_evtx(filepath)
+        else:
+            records = journal.parse_export(filepath, _get_keyword_bytes(keywords))
+        # Lecture et structuration ne sont pas séparables : une seule étape
+        stats = get_stats()
+        return stats.timed_iter(records, "parse") if stats is not None else records
+    elif log_type == "json":
+        return parse_json_log(filepath, keywords)
+    elif log_type == "syslog":
+        return parse_syslog(filepath, keywords)
     elif log_type == "auth":
-        return parse_auth_log(filepath)
+        return parse_auth_log(filepath, keywords)
     elif log_type == "windows":
-        return parse_windows_event(filepath)
+        return parse_windows_event(filepath, keywords)
     else:
-        return parse_generic_log(filepath)
+        return parse_generic_log(filepath, keywords)
 
 def detect_log_type(filepath):
     """
     Détecte le type de log en fonction du nom du fichier.
     
+    Les journaux EVTX et les exports journald (JSON ou format d'export)
+    sont reconnus à leur contenu, quel que soit leur nom.
+    
     Args:
         filepath (str): Chemin vers le fichier de log
         
     Returns:
-        str: Type de log détecté ('syslog', 'auth', 'windows', 'generic')
+        str: Type de log détecté ('evtx', 'journal', 'json', 'syslog',
+        'auth', 'windows', 'generic')
     """
     filename = os.path.basename(filepath).lower()
     
-    if "syslog" in filename or "system" in filename:
+    if evtx.is_evtx(filepath):
+        return "evtx"
+    structured = journal.detect_format(filepath)
+    if structured is not None:
+        return structured
+    elif "syslog" in filename or "system" in filename:
         return "syslog"
     elif "auth" in filename or "secure" in filename:
         return "auth"
@@ -65,7 +98,7 @@ def detect_log_type(filepath):
     else:
         # Tenter de détecter par inspection du contenu
         try:
-            with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            with open_text(filepath) as f:
                 first_lines = [f.readline() for _ in range(5) if f.readline()]
                 content = "".join(first_lines)
                 
@@ -80,61 +113,290 @@ def detect_log_type(filepath):
         
         return "generic"
 
-def parse_generic_log(filepath):
+def parse_generic_log(filepath, keywords=None):
     """
     Parser générique pour tout type de fichier de log.
     
     Args:
         filepath (str): Chemin vers le fichier de log
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
         
     Returns:
-        list: Liste des entrées pertinentes
+        generator: Entrées pertinentes (LogRecord), en-tête syslog reconnu s'il est présent
+    """
+    return to_records(read_relevant_lines(filepath, keywords), "generic")
+
+def read_relevant_lines(filepath, keywords=None):
     """
-    entries = []
+    Lit les lignes pertinentes d'un fichier, sans les structurer.
     
+    Les fichiers compressés (gzip, bz2, xz) sont décompressés à la volée.
+    
+    Args:
+        filepath (str): Chemin vers le fichier de log
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Yields:
+        str: Lignes pertinentes, au fil de la lecture
+    """
     try:
-        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                line = line.strip()
-                if any(keyword in line.lower() for keyword in KEYWORDS):
-                    entries.append(line)
+        with open_binary(filepath) as f:
+            for line in iter_relevant_lines(f, keywords=keywords):
+                yield line
     except Exception as e:
         log_error(f"Erreur lors du parsing du fichier {filepath}: {str(e)}")
+
+def extend_keywords(keywords):
+    """
+    Retourne les mots-clés par défaut complétés, sans modifier KEYWORDS.
+    
+    Chaque analyse peut ainsi filtrer avec ses propres mots-clés sans
+    changer les entrées retenues par les autres.
+    
+    Args:
+        keywords (iterable): Mots-clés à ajouter (en minuscules)
+        
+    Returns:
+        list: KEYWORDS suivis des mots-clés absents, sans doublons
+    """
+    extended = list(KEYWORDS)
+    for keyword in keywords:
+        if keyword not in extended:
+            extended.append(keyword)
+    return extended
+
+def filter_lines(lines, keywords=None):
+    """
+    Filtre une séquence de lignes brutes et ne garde que les entrées pertinentes.
     
-    return entries
+    Utilisé pour les sources déjà découpées en lignes de texte ; les
+    fichiers sont filtrés directement en binaire par ``iter_relevant_lines``.
+    
+    Args:
+        lines (iterable): Lignes de texte brutes
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Yields:
+        str: Entrées pertinentes, sans espaces de début et de fin
+    """
+    if keywords is None:
+        keywords = KEYWORDS
+    for line in lines:
+        line = line.strip()
+        lowered = line.lower()
+        if any(keyword in lowered for keyword in keywords):
+            yield line
+
+def relevant_messages(records, log_type, keywords=None):
+    """
+    Ne garde que les entrées JSON dont le message contient un mot-clé.
+    
+    Le filtrage binaire voit l'objet JSON entier : un nom de champ ou un
+    autre champ contenant un mot-clé ne rend pas l'entrée pertinente. Comme
+    pour le format d'export, seul le message compte. Les autres types de
+    log, filtrés sur la ligne elle-même, sont retournés tels quels.
+    
+    Args:
+        records (iterable): Entrées déjà filtrées sur leur ligne brute
+        log_type (str): Type de log des entrées
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Returns:
+        iterable: Entrées pertinentes
+    """
+    if log_type != "json":
+        return records
+    if keywords is None:
+        keywords = KEYWORDS
+    # Les lignes qui ne sont pas des objets JSON (raw None) ont été filtrées en entier
+    return (record for record in records
+            if record.raw is None or any(keyword in record.line.lower() for keyword in keywords))
+
+# Mots-clés encodés, par liste de mots-clés
+_keyword_bytes = {}
+
+def _get_keyword_bytes(keywords=None):
+    """
+    Retourne les mots-clés encodés en octets (minuscules).
+    
+    Args:
+        keywords (list): Mots-clés (KEYWORDS si None)
+        
+    Returns:
+        list: Mots-clés encodés en UTF-8
+    """
+    key = tuple(KEYWORDS if keywords is None else keywords)
+    encoded = _keyword_bytes.get(key)
+    if encoded is None:
+        encoded = _keyword_bytes[key] = [keyword.lower().encode("utf-8") for keyword in key]
+    return encoded
 
-def parse_syslog(filepath):
+def _relevant_starts(data, keywords=None):
+    """
+    Retourne le début des lignes d'un bloc contenant au moins un mot-clé.
+    
+    Args:
+        data (bytes): Lignes complètes séparées par des fins de ligne
+        keywords (list): Mots-clés recherchés (KEYWORDS si None)
+        
+    Returns:
+        list: Positions de début de ligne, triées
+    """
+    lowered = data.lower()
+    find = lowered.find
+    rfind = lowered.rfind
+    
+    starts = set()
+    for keyword in _get_keyword_bytes(keywords):
+        i = find(keyword)
+        while i != -1:
+            starts.add(rfind(b"\n", 0, i) + 1)
+            end = find(b"\n", i)
+            if end == -1:
+                break
+            # Passer à la ligne suivante
+            i = find(keyword, end)
+    
+    return sorted(starts)
+
+def filter_block(data, keywords=None):
+    """
+    Extrait les entrées pertinentes d'un bloc d'octets composé de lignes entières.
+    
+    Le bloc est mis en minuscules une seule fois (ASCII) puis chaque mot-clé
+    y est recherché ; seules les lignes contenant un mot-clé sont décodées
+    et nettoyées. Les autres lignes ne deviennent jamais des chaînes Python.
+    
+    Args:
+        data (bytes): Lignes complètes séparées par des fins de ligne
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Yields:
+        str: Entrées pertinentes, dans l'ordre du bloc
+    """
+    for _, line in filter_block_offsets(data, keywords):
+        yield line
+
+def filter_block_offsets(data, keywords=None):
+    """
+    Comme ``filter_block``, avec la position de chaque entrée dans le bloc.
+    
+    Args:
+        data (bytes): Lignes complètes séparées par des fins de ligne
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Yields:
+        tuple: (position du début de ligne, entrée pertinente)
+    """
+    find = data.find
+    for start in _relevant_starts(data, keywords):
+        end = find(b"\n", start)
+        if end == -1:
+            end = len(data)
+        line = data[start:end].decode("utf-8", errors="ignore").strip()
+        if line:
+            yield start, line
+
+def iter_relevant_lines(stream, final=True, block_size=READ_BLOCK_SIZE, keywords=None):
+    """
+    Lit un flux binaire par grands blocs et produit ses entrées pertinentes.
+    
+    Args:
+        stream (file): Flux binaire
+        final (bool): Traiter aussi une dernière ligne sans fin de ligne ;
+            sinon elle n'est pas consommée (fichier encore en cours d'écriture)
+        block_size (int): Taille des blocs lus
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Yields:
+        str: Entrées pertinentes, dans l'ordre du flux
+        
+    Returns:
+        int: Nombre d'octets consommés (lignes complètes), valeur de retour
+        du générateur accessible via ``yield from``
+    """
+    consumed = 0
+    carry = b""
+    read = stream.read
+    def filter_lines(data):
+        return filter_block(data, keywords)
+    stats = get_stats()
+    if stats is not None:
+        read = stats.reader(read)
+        # Filtrage mesuré bloc par bloc : les entrées d'un bloc sont réunies en liste
+        filter_lines = stats.timed_function(lambda data: list(filter_block(data, keywords)), "filter")
+    
+    while True:
+        block = read(block_size)
+        if not block:
+            break
+        data = carry + block if carry else block
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        consumed += cut
+        for line in filter_lines(data[:cut] if carry else data):
+            yield line
+    
+    if carry and final:
+        consumed += len(carry)
+        for line in filter_lines(carry):
+            yield line
+    
+    return consumed
+
+def parse_syslog(filepath, keywords=None):
     """
     Parser spécifique pour les logs syslog.
     
     Args:
         filepath (str): Chemin vers le fichier syslog
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
         
     Returns:
-        list: Liste des entrées pertinentes
+        generator: Entrées pertinentes (LogRecord avec hôte, programme et PID)
     """
-    return parse_generic_log(filepath)  # Utilise le parser générique pour l'instant
+    return to_records(read_relevant_lines(filepath, keywords), "syslog")
 
-def parse_auth_log(filepath):
+def parse_auth_log(filepath, keywords=None):
     """
     Parser spécifique pour les logs d'authentification.
     
     Args:
         filepath (str): Chemin vers le fichier auth.log
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
+        
+    Returns:
+        generator: Entrées pertinentes (LogRecord avec IP source et compte visé)
+    """
+    return to_records(read_relevant_lines(filepath, keywords), "auth")
+
+def parse_json_log(filepath, keywords=None):
+    """
+    Parser spécifique pour les logs JSON (journald ``-o json``, conteneurs).
+    
+    Args:
+        filepath (str): Chemin vers le fichier de log JSON
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
         
     Returns:
-        list: Liste des entrées pertinentes
+        generator: Entrées pertinentes (JournalRecord : message extrait, autres
+        champs lus au premier accès)
     """
-    return parse_generic_log(filepath)  # Utilise le parser générique pour l'instant
+    return relevant_messages(to_records(read_relevant_lines(filepath, keywords), "json"), "json", keywords)
 
-def parse_windows_event(filepath):
+def parse_windows_event(filepath, keywords=None):
     """
     Parser spécifique pour les logs d'événements Windows.
     
     Args:
         filepath (str): Chemin vers le fichier d'événements Windows
+        keywords (list): Mots-clés des entrées pertinentes (KEYWORDS si None)
         
     Returns:
-        list: Liste des entrées pertinentes
+        generator: Entrées pertinentes (LogRecord avec identifiant d'événement,
+        compte et adresse source)
     """
-    return parse_generic_log(filepath)  # Utilise le parser générique pour l'instant
+    return to_records(read_relevant_lines(filepath, keywords), "windows")
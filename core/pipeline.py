@@ -0,0 +1,575 @@
+"""
+Module de pipeline d'analyse pour LogLens.
+
+Enchaîne parsing, détection d'anomalies et comptage du brute force en
+une seule passe sur les entrées d'un fichier de log, au fil de l'eau :
+seuls les compteurs agrégés sont conservés en mémoire.
+"""
+
+import threading
+from collections import deque
+from itertools import islice
+from queue import Queue, Full
+
+from . import parser
+from .correlation import Correlator, KEYWORDS as CORRELATION_KEYWORDS
+from .detector import (AnomalyDetector, FailureRecorder, BRUTE_FORCE_THRESHOLD,
+                       BRUTE_FORCE_WINDOW, BRUTE_FORCE_MAX_KEYS)
+from .record import RecordParser, to_records
+from .stats import get_stats
+from .summarizer import SummaryAccumulator
+from .templates import TemplateMiner
+from .utils import log_info, log_error
+
+# Nombre d'entrées par lot de résultats d'un fichier lu en parallèle
+FILE_BATCH_SIZE = 50000
+
+# Nombre de lots d'avance par fichier lu en parallèle (au-delà, sa lecture attend)
+FILE_QUEUE_SIZE = 2
+
+class AnalysisPipeline:
+    """
+    Pipeline parse → détection → brute force en une seule passe.
+
+    Chaque entrée est classée une seule fois ; le résultat alimente à la fois
+    le flux d'anomalies et la détection du brute force par IP et par compte. Les anomalies
+    ne sont pas conservées : seuls les agrégats nécessaires au résumé le sont.
+    """
+
+    def __init__(self, threshold=BRUTE_FORCE_THRESHOLD, window=BRUTE_FORCE_WINDOW,
+                 max_keys=BRUTE_FORCE_MAX_KEYS, sketches=False, correlate=False, templates=False):
+        """
+        Args:
+            threshold (int): Nombre d'échecs signalant une attaque brute force
+            window (int): Fenêtre de détection du brute force en secondes
+            max_keys (int): Nombre maximal d'IPs et de comptes suivis
+            sketches (bool): Résumé en mémoire bornée (voir ``SummaryAccumulator``)
+            correlate (bool): Corréler les événements en attaques multi-étapes
+                (voir ``Correlator``) ; les connexions réussies et les commandes
+                sudo sont alors ajoutées aux entrées pertinentes de ce pipeline
+            templates (bool): Regrouper les entrées en modèles de lignes (voir ``TemplateMiner``)
+        """
+        self.detector = AnomalyDetector(threshold, window, max_keys)
+        self.entries = 0
+
+        # Mots-clés des entrées pertinentes (KEYWORDS si None), propres au pipeline
+        self.keywords = None
+
+        # Corrélation séquentielle uniquement : les analyses parallèles ne la font pas
+        self.correlator = None
+        if correlate:
+            self.keywords = parser.extend_keywords(CORRELATION_KEYWORDS)
+            self.correlator = Correlator()
+
+        # Modèles de lignes, eux aussi extraits en séquentiel uniquement
+        self.miner = TemplateMiner() if templates else None
+
+        # Agrégats du résumé
+        self.accumulator = SummaryAccumulator(sketches)
+
+        # État à enregistrer dans un point de reprise, figé avant l'ajout des
+        # anomalies de brute force (recalculées à chaque exécution)
+        self._saved_state = None
+
+    def process(self, entries):
+        """
+        Analyse une séquence d'entrées de logs au fil de l'eau.
+
+        Args:
+            entries (iterable): Entrées de logs pertinentes (liste ou générateur)
+
+        Yields:
+            dict: Anomalies détectées, puis anomalies de brute force une fois
+            la séquence épuisée
+        """
+        for anomaly in self._analyze(entries):
+            yield anomaly
+
+        for anomaly in self._finish():
+            yield anomaly
+
+    def process_parallel(self, filepath, workers):
+        """
+        Analyse un fichier de log en parallèle sur plusieurs processus.
+
+        Le fichier est découpé en plages alignées sur les fins de ligne ; les
+        anomalies et échecs d'authentification de chaque plage sont fusionnés
+        dans l'ordre du fichier, ce qui donne le même résultat qu'une analyse
+        séquentielle.
+
+        Args:
+            filepath (str): Chemin vers le fichier de log à analyser
+            workers (int): Nombre de processus
+
+        Yields:
+            dict: Anomalies détectées, dans l'ordre du fichier
+        """
+        from .parallel import iter_chunk_results
+
+        log_info(f"Analyse du fichier: {filepath}")
+        return self._merge_results(iter_chunk_results(filepath, workers, self.accumulator.sketches))
+
+    def process_files(self, filepaths, threads=1):
+        """
+        Analyse plusieurs fichiers comme un seul flux, dans l'ordre donné.
+
+        Avec plusieurs threads, les fichiers sont lus et décompressés en
+        parallèle (voir ``iter_file_results``) ; les résultats sont fusionnés
+        dans l'ordre des fichiers et la détection du brute force couvre
+        l'ensemble des fichiers. La corrélation impose la lecture séquentielle.
+
+        Args:
+            filepaths (list): Fichiers à analyser, du plus ancien au plus récent
+            threads (int): Nombre de fichiers lus simultanément
+
+        Yields:
+            dict: Anomalies détectées, dans l'ordre des fichiers
+        """
+        if threads <= 1 or len(filepaths) <= 1 or self.correlator is not None:
+            entries = (entry for filepath in filepaths for entry in parser.parse_log(filepath, self.keywords))
+            return self.process(entries)
+
+        return self._merge_results(iter_file_results(filepaths, threads, self.accumulator.sketches))
+
+    def process_batch(self, entries):
+        """
+        Analyse un lot d'entrées dans le cadre d'une analyse incrémentale.
+
+        L'état du brute force est conservé d'un lot à l'autre : une attaque
+        répartie sur plusieurs lots est signalée dès que l'IP ou le compte
+        atteint le seuil dans la fenêtre de détection.
+
+        Args:
+            entries (iterable): Entrées de logs pertinentes du lot
+
+        Yields:
+            dict: Anomalies du lot, puis alertes de brute force nouvellement déclenchées
+        """
+        for anomaly in self._analyze(entries):
+            yield anomaly
+
+        # Les alertes ne sont pas comptées dans le résumé : les anomalies de
+        # brute force définitives le sont par finish(), avec les compteurs finaux
+        for alert in self.detector.pop_brute_force_alerts():
+            yield alert
+
+    def follow(self, filepath, poll_interval=None, from_start=False):
+        """
+        Suit un fichier de log et analyse chaque ajout au fil de l'eau.
+
+        Args:
+            filepath (str): Chemin du fichier à suivre
+            poll_interval (float): Intervalle de scrutation en secondes
+            from_start (bool): Analyser aussi le contenu existant
+
+        Yields:
+            list: Anomalies de chaque lot de lignes ajoutées (lot éventuellement vide)
+        """
+        from .follow import FileFollower, POLL_INTERVAL
+
+        follower = FileFollower(filepath, poll_interval or POLL_INTERVAL, from_start)
+        log_type = parser.detect_log_type(filepath)
+        records = RecordParser(log_type)
+        log_info(f"Suivi du fichier: {filepath}")
+        try:
+            for block in follower.batches():
+                entries = map(records.parse, parser.filter_block(block, self.keywords))
+                yield list(self.process_batch(parser.relevant_messages(entries, log_type, self.keywords)))
+        finally:
+            follower.close()
+
+    def finish(self):
+        """
+        Termine une analyse incrémentale.
+
+        Returns:
+            list: Anomalies de brute force définitives, comptées dans le résumé
+        """
+        return list(self._finish())
+
+    def run(self, entries):
+        """
+        Analyse une séquence d'entrées de logs.
+
+        Args:
+            entries (iterable): Entrées de logs pertinentes
+
+        Returns:
+            list: Anomalies détectées, suivies des anomalies de brute force
+        """
+        return list(self.process(entries))
+
+    def process_file(self, filepath):
+        """
+        Analyse un fichier de log au fil de la lecture.
+
+        Args:
+            filepath (str): Chemin vers le fichier de log à analyser
+
+        Yields:
+            dict: Anomalies détectées
+        """
+        return self.process(parser.parse_log(filepath, self.keywords))
+
+    def analyze_file(self, filepath):
+        """
+        Analyse un fichier de log complet.
+
+        Args:
+            filepath (str): Chemin vers le fichier de log à analyser
+
+        Returns:
+            list: Anomalies détectées, suivies des anomalies de brute force
+        """
+        return list(self.process_file(filepath))
+
+    def summary(self):
+        """
+        Génère le résumé à partir des agrégats accumulés.
+
+        Returns:
+            str: Résumé formaté des anomalies
+        """
+        return self.accumulator.render()
+
+    def process_checkpointed(self, filepaths, state_file):
+        """
+        Analyse uniquement les données ajoutées depuis la dernière exécution.
+
+        L'état enregistré (compteurs de brute force, agrégats du résumé) est
+        restauré puis complété ; les points de reprise sont enregistrés une
+        fois le flux épuisé.
+
+        Args:
+            filepaths (list): Fichiers à analyser, du plus ancien au plus récent
+            state_file (StateFile): Fichier d'état des points de reprise
+
+        Yields:
+            dict: Nouvelles anomalies, puis anomalies de brute force nouvelles
+            ou dont les compteurs ont changé depuis l'exécution précédente
+        """
+        from .checkpoint import iter_new_lines
+
+        if state_file.pipeline is not None:
+            self.set_state(state_file.pipeline)
+
+        def new_entries():
+            for filepath in filepaths:
+                log_info(f"Analyse du fichier: {filepath}")
+                try:
+                    lines = iter_new_lines(filepath, state_file, self.keywords)
+                    log_type = parser.detect_log_type(filepath)
+                    entries = parser.relevant_messages(to_records(lines, log_type), log_type, self.keywords)
+                    for entry in entries:
+                        yield entry
+                except OSError as e:
+                    log_error(f"Erreur lors du parsing du fichier {filepath}: {str(e)}")
+
+        for anomaly in self.process(new_entries()):
+            yield anomaly
+
+        state_file.pipeline = self.get_state()
+        state_file.save()
+
+    def get_state(self):
+        """
+        Retourne l'état de l'analyse sous une forme sérialisable en JSON.
+
+        Les anomalies de brute force ne font pas partie de l'état : elles sont
+        recalculées à partir des compteurs cumulés.
+
+        Returns:
+            dict: État de l'analyse
+        """
+        if self._saved_state is not None:
+            return self._saved_state
+        return self._current_state()
+
+    def set_state(self, state):
+        """
+        Restaure un état produit par ``get_state``.
+
+        Args:
+            state (dict): État de l'analyse
+        """
+        self.entries = state["entries"]
+        self.accumulator = SummaryAccumulator.from_state(state)
+        self.detector.brute_force.set_state(state["brute_force"])
+        if self.correlator is not None and "correlation" in state:
+            self.correlator.set_state(state["correlation"])
+        self._saved_state = None
+
+    def _current_state(self):
+        """
+        Capture l'état courant de l'analyse.
+
+        Returns:
+            dict: État de l'analyse
+        """
+        state = {"entries": self.entries}
+        state.update(self.accumulator.get_state())
+        state["brute_force"] = self.detector.brute_force.get_state()
+        if self.correlator is not None:
+            state["correlation"] = self.correlator.get_state()
+        return state
+
+    def _analyze(self, entries):
+        """
+        Analyse des entrées une à une (modèles, détection, corrélation), sans
+        terminer l'analyse.
+
+        Args:
+            entries (iterable): Entrées de logs pertinentes
+
+        Yields:
+            dict: Anomalies détectées et attaques corrélées, comptées dans le résumé
+        """
+        process, record = self._stages()
+        start = self.entries
+
+        correlate = self._correlate_stage()
+        mine = self._template_stage()
+
+        for entry in entries:
+            self.entries += 1
+            if mine is not None:
+                mine(entry)
+            anomaly = process(entry)
+            if anomaly is not None:
+                record(anomaly)
+                yield anomaly
+            if correlate is not None:
+                for attack in correlate(entry, anomaly):
+                    record(attack)
+                    yield attack
+        self._count_kept(start)
+
+    def _stages(self):
+        """
+        Retourne les fonctions de détection et d'agrégation d'une entrée,
+        mesurées si l'instrumentation est active.
+
+        Returns:
+            tuple: (détection, agrégation)
+        """
+        process = self.detector.process
+        record = self._record
+        stats = get_stats()
+        if stats is not None:
+            process = stats.timed_function(process, "detect")
+            record = stats.timed_function(record, "aggregate")
+        return process, record
+
+    def _correlate_stage(self):
+        """
+        Retourne la fonction de corrélation d'une entrée, mesurée si
+        l'instrumentation est active.
+
+        Returns:
+            callable: ``Correlator.observe``, None sans corrélation
+        """
+        if self.correlator is None:
+            return None
+        stats = get_stats()
+        if stats is not None:
+            return stats.timed_function(self.correlator.observe, "correlate")
+        return self.correlator.observe
+
+    def _template_stage(self):
+        """
+        Retourne la fonction d'extraction du modèle d'une entrée, mesurée si
+        l'instrumentation est active.
+
+        Returns:
+            callable: ``TemplateMiner.add``, None sans extraction de modèles
+        """
+        if self.miner is None:
+            return None
+        stats = get_stats()
+        if stats is not None:
+            return stats.timed_function(self.miner.add, "templates")
+        return self.miner.add
+
+    def _count_kept(self, start):
+        """Ajoute aux statistiques les entrées analysées depuis ``start``."""
+        stats = get_stats()
+        if stats is not None:
+            stats.lines_kept += self.entries - start
+
+    def _merge_results(self, results):
+        """
+        Fusionne, dans l'ordre, des résultats produits par ``analyze_entries``.
+
+        Args:
+            results (iterable): Tuples (entrées, anomalies, agrégats du résumé,
+                échecs d'authentification)
+
+        Yields:
+            dict: Anomalies détectées, puis anomalies de brute force
+        """
+        brute_force = self.detector.brute_force
+
+        for count, anomalies, accumulator, failures in results:
+            self.entries += count
+            # Agrégats déjà calculés par la portion : pas de second passage
+            self.accumulator.merge(accumulator)
+            for anomaly in anomalies:
+                yield anomaly
+            # Rejouer les échecs dans l'ordre du flux : les fenêtres à cheval
+            # sur deux portions sont détectées comme en séquentiel
+            for key, entry, timestamp in failures:
+                brute_force.add(key, entry, timestamp)
+
+        for anomaly in self._finish():
+            yield anomaly
+
+    def _finish(self):
+        """
+        Produit les anomalies de brute force une fois le flux épuisé.
+
+        Toutes les détections comptent dans le résumé, mais seules celles
+        qui sont nouvelles ou dont les compteurs ont changé depuis l'état
+        restauré sont produites.
+
+        Yields:
+            dict: Anomalies de brute force
+        """
+        brute_force = self.detector.brute_force
+        anomalies = brute_force.anomalies()
+        changed = brute_force.mark_reported()
+        self._saved_state = self._current_state()
+        for key, anomaly in zip(brute_force.detections, anomalies):
+            self._record(anomaly)
+            if key in changed:
+                yield anomaly
+
+        log_info(f"{self.accumulator.total} anomalies détectées dans {self.entries} entrées de logs")
+
+    def _record(self, anomaly):
+        """
+        Met à jour les agrégats du résumé pour une anomalie.
+
+        Args:
+            anomaly (dict): Anomalie détectée
+        """
+        self.accumulator.add(anomaly)
+
+def analyze_entries(entries, sketches=False):
+    """
+    Analyse une portion indépendante du flux (plage de fichier, fichier).
+
+    Le résultat peut être fusionné avec ceux des portions voisines par
+    ``AnalysisPipeline`` comme si tout avait été analysé séquentiellement.
+
+    Args:
+        entries (iterable): Entrées de logs pertinentes
+        sketches (bool): Agrégats du résumé en mémoire bornée
+
+    Returns:
+        tuple: (nombre d'entrées, anomalies de la portion, agrégats du résumé
+        de la portion, échecs d'authentification à rejouer dans l'ordre)
+    """
+    detector = AnomalyDetector()
+    detector.brute_force = FailureRecorder()
+    anomalies = []
+    accumulator = SummaryAccumulator(sketches)
+    count = 0
+
+    for entry in entries:
+        count += 1
+        anomaly = detector.process(entry)
+        if anomaly is not None:
+            anomalies.append(anomaly)
+            accumulator.add(anomaly)
+
+    return count, anomalies, accumulator, detector.brute_force.events
+
+def analyze_batches(entries, sketches=False, size=FILE_BATCH_SIZE):
+    """
+    Analyse une séquence d'entrées par lots indépendants.
+
+    Args:
+        entries (iterable): Entrées de logs pertinentes
+        sketches (bool): Agrégats du résumé en mémoire bornée
+        size (int): Nombre d'entrées par lot
+
+    Yields:
+        tuple: Résultat de ``analyze_entries`` pour chaque lot, dans l'ordre
+    """
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, size))
+        if not batch:
+            return
+        yield analyze_entries(batch, sketches)
+
+def iter_file_results(filepaths, threads, sketches=False):
+    """
+    Analyse plusieurs fichiers sur des threads et restitue les résultats dans l'ordre.
+
+    Au plus ``threads`` fichiers sont en cours d'analyse ; chacun transmet
+    ses résultats par lots d'au plus FILE_BATCH_SIZE entrées, dans une file
+    de FILE_QUEUE_SIZE lots. La mémoire reste ainsi bornée quels que soient
+    le nombre et la taille des fichiers.
+
+    Args:
+        filepaths (list): Fichiers à analyser, du plus ancien au plus récent
+        threads (int): Nombre de fichiers lus simultanément
+        sketches (bool): Agrégats du résumé en mémoire bornée
+
+    Yields:
+        tuple: Résultat de ``analyze_entries`` pour chaque lot, dans l'ordre des fichiers
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Arrêt des lectures en cours si le flux n'est pas consommé jusqu'au bout
+    cancelled = threading.Event()
+
+    def put(results, item):
+        while not cancelled.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def analyze_path(filepath, results):
+        try:
+            for result in analyze_batches(parser.parse_log(filepath), sketches, FILE_BATCH_SIZE):
+                if not put(results, result):
+                    return
+        finally:
+            put(results, None)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        def submit(filepath):
+            results = Queue(FILE_QUEUE_SIZE)
+            return executor.submit(analyze_path, filepath, results), results
+
+        remaining = iter(filepaths)
+        running = deque(submit(filepath) for filepath in islice(remaining, threads))
+        try:
+            while running:
+                future, results = running.popleft()
+                for result in iter(results.get, None):
+                    yield result
+                future.result()
+                for filepath in islice(remaining, 1):
+                    running.append(submit(filepath))
+        finally:
+            cancelled.set()
+
+def analyze_file(filepath):
+    """
+    Analyse un fichier de log en une seule passe.
+
+    Args:
+        filepath (str): Chemin vers le fichier de log à analyser
+
+    Returns:
+        tuple: (nombre d'entrées pertinentes, liste des anomalies)
+    """
+    pipeline = AnalysisPipeline()
+    anomalies = pipeline.analyze_file(filepath)
+    return pipeline.entries, anomalies
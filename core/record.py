@@ -0,0 +1,452 @@
+"""
+Module des enregistrements de logs structurés.
+
+Chaque ligne pertinente est découpée en champs (horodatage, hôte,
+programme, PID, message, IPs, compte), chacun extrait au plus une fois ;
+la détection et le résumé utilisent ensuite ces champs sans relancer
+d'expression régulière.
+"""
+
+import re
+import sys
+from json import JSONDecodeError
+from json.decoder import scanstring, JSONDecoder
+
+from .stats import get_stats
+from .timestamps import MONTHS, TimestampParser
+
+# Regex pour extraire une IP
+IP_PATTERN = re.compile(r'\b(?:\d{1,3}\.){3}\d{1,3}\b')
+
+# Compte visé par une authentification (syslog/auth)
+USER_PATTERN = re.compile(r"\bfor (?:invalid user |illegal user |user )?'?([^\s;']+)|\buser=([^\s;]+)")
+
+# Champs des journaux d'événements Windows exportés en texte
+WINDOWS_USER_PATTERN = re.compile(r"Account Name:\s*([^\s-][^\s]*)")
+WINDOWS_IP_PATTERN = re.compile(r"(?:Source Network Address|Client Address):\s*(?:::ffff:)?((?:\d{1,3}\.){3}\d{1,3})")
+WINDOWS_HOST_PATTERN = re.compile(r"(?:Computer|Workstation Name):\s*([^\s-][^\s]*)")
+WINDOWS_EVENT_PATTERN = re.compile(r"Event ID:?\s*(\d+)")
+
+_DIGITS = "0123456789"
+
+# Champs lus dans les entrées JSON (journald ``-o json``, moteurs de
+# conteneurs) : le premier nom présent dans l'objet est retenu
+JSON_MESSAGE_FIELDS = ('"MESSAGE"', '"message"', '"log"', '"msg"')
+JSON_HOST_FIELDS = ('"_HOSTNAME"', '"hostname"', '"host"')
+JSON_PROGRAM_FIELDS = ('"SYSLOG_IDENTIFIER"', '"_COMM"')
+JSON_PID_FIELDS = ('"_PID"', '"SYSLOG_PID"')
+JSON_TIME_FIELDS = ('"time"', '"timestamp"', '"@timestamp"')
+
+# Horodatage journald, en microsecondes depuis l'epoch
+JSON_REALTIME_FIELD = '"__REALTIME_TIMESTAMP"'
+
+_JSON_SPACES = " \t\r\n"
+_JSON_NUMBER_END = re.compile(r"[^0-9+\-.eE]")
+_json_decoder = JSONDecoder()
+
+def extract_user(text):
+    """
+    Extrait le compte visé par une authentification.
+
+    Args:
+        text (str): Entrée ou message de log
+
+    Returns:
+        str or None: Nom du compte, None s'il est introuvable
+    """
+    match = USER_PATTERN.search(text)
+    if match is None:
+        return None
+    return match.group(1) or match.group(2)
+
+# Valeur d'un champ pas encore extrait
+_UNSET = object()
+
+def _json_value(text, pos):
+    """
+    Lit la valeur JSON commençant à une position donnée.
+
+    Les chaînes sans échappement sont simplement découpées ; les autres
+    valeurs sont décodées par le décodeur JSON, à partir de cette position.
+
+    Returns:
+        str, int or None: Valeur (un tableau d'octets, forme journald des
+        messages non UTF-8, est décodé en texte), None si elle est illisible
+    """
+    first = text[pos:pos + 1]
+    try:
+        if first == '"':
+            end = text.find('"', pos + 1)
+            if end != -1 and text.find("\\", pos + 1, end) == -1:
+                return text[pos + 1:end]
+            return scanstring(text, pos + 1)[0]
+        if first and first in "-0123456789":
+            match = _JSON_NUMBER_END.search(text, pos + 1)
+            number = text[pos:match.start() if match else len(text)]
+            return int(number) if number.lstrip("-").isdigit() else None
+        value = _json_decoder.raw_decode(text, pos)[0]
+    except (JSONDecodeError, ValueError):
+        return None
+    if isinstance(value, list) and value:
+        if all(isinstance(item, int) for item in value):
+            return bytes(item & 0xff for item in value).decode("utf-8", errors="replace")
+        # Champ journald à plusieurs valeurs : la première est retenue
+        return value[0] if isinstance(value[0], str) else None
+    return value if isinstance(value, str) else None
+
+def json_field(text, names):
+    """
+    Extrait un champ d'un objet JSON sans décoder l'objet entier.
+
+    Le nom du champ est recherché directement dans le texte, puis seule sa
+    valeur est décodée. Un nom n'est retenu que s'il suit ``{`` ou ``,`` :
+    le même texte à l'intérieur d'une valeur n'est pas confondu avec un champ.
+
+    Args:
+        text (str): Objet JSON sur une ligne
+        names (tuple): Noms du champ, entre guillemets, par ordre de préférence
+
+    Returns:
+        str, int or None: Valeur du premier champ présent, None si aucun ne l'est
+    """
+    for name in names:
+        i = text.find(name)
+        while i != -1:
+            before = i - 1
+            while before >= 0 and text[before] in _JSON_SPACES:
+                before -= 1
+            pos = i + len(name)
+            if before >= 0 and text[before] in "{,":
+                while text[pos:pos + 1] in (" ", "\t"):
+                    pos += 1
+                if text[pos:pos + 1] == ":":
+                    pos += 1
+                    while text[pos:pos + 1] in (" ", "\t"):
+                        pos += 1
+                    return _json_value(text, pos)
+            i = text.find(name, pos)
+    return None
+
+class LogRecord:
+    """
+    Entrée de log structurée.
+
+    Les champs sont extraits au premier accès, chacun une seule fois, par
+    le parser du format de la ligne : les lignes écartées par la détection
+    ne paient que la création de l'objet. Le message n'est pas copié :
+    seule sa position dans la ligne est conservée. Les noms d'hôte et de
+    programme, très répétitifs, sont internés.
+    """
+
+    __slots__ = ("line", "_parser", "_host", "_program", "_pid", "_start",
+                 "_timestamp", "_ips", "_user")
+
+    # Identifiant d'événement Windows, renseigné par le lecteur EVTX
+    event_id = None
+
+    def __init__(self, line, parser=None):
+        """
+        Args:
+            line (str): Ligne de log complète
+            parser (RecordParser): Parser du format de la ligne (générique par défaut)
+        """
+        self.line = line
+        self._parser = parser or _default_parser
+        self._host = _UNSET
+        self._program = None
+        self._pid = None
+        self._start = 0
+        self._timestamp = _UNSET
+        self._ips = _UNSET
+        self._user = _UNSET
+
+    def _split(self):
+        """Découpe l'en-tête de la ligne (hôte, programme, PID, message)."""
+        if self._host is _UNSET:
+            self._parser.split(self)
+
+    @property
+    def host(self):
+        """Hôte émetteur, None s'il est inconnu."""
+        self._split()
+        return self._host
+
+    @property
+    def program(self):
+        """Programme émetteur (identifiant d'événement pour Windows), None s'il est inconnu."""
+        self._split()
+        return self._program
+
+    @property
+    def pid(self):
+        """PID du programme émetteur, None s'il est inconnu."""
+        self._split()
+        return self._pid
+
+    @property
+    def message(self):
+        """Message de l'entrée, sans l'en-tête syslog."""
+        self._split()
+        return self.line[self._start:] if self._start else self.line
+
+    @property
+    def timestamp(self):
+        """Horodatage epoch de l'entrée, None s'il est introuvable."""
+        if self._timestamp is _UNSET:
+            self._timestamp = self._parser.timestamps.parse(self.line)
+        return self._timestamp
+
+    @property
+    def ips(self):
+        """Adresses IP du message, dans l'ordre (l'IP source en premier)."""
+        if self._ips is _UNSET:
+            self._split()
+            if self._ips is _UNSET:
+                self._ips = IP_PATTERN.findall(self.message)
+        return self._ips
+
+    @property
+    def ip(self):
+        """IP source de l'entrée, None si absente."""
+        ips = self.ips
+        return ips[0] if ips else None
+
+    @property
+    def user(self):
+        """Compte visé par l'entrée, None s'il est introuvable."""
+        if self._user is _UNSET:
+            self._split()
+            if self._user is _UNSET:
+                self._user = extract_user(self.message)
+        return self._user
+
+    def __str__(self):
+        return self.line
+
+    def __repr__(self):
+        return f"LogRecord({self.line!r})"
+
+class JournalRecord(LogRecord):
+    """
+    Entrée de log lue dans un objet JSON (journald, moteurs de conteneurs).
+
+    Seul le message est extrait à la création : c'est lui que voient la
+    détection et les rapports, jamais les noms des champs. Les autres
+    champs (hôte, programme, PID, horodatage) sont lus dans l'objet au
+    premier accès.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, line, parser, raw=None):
+        """
+        Args:
+            line (str): Message de l'entrée
+            parser (RecordParser): Parser JSON du flux
+            raw (str): Objet JSON d'origine, None pour une ligne de texte
+                ou une entrée dont les champs sont déjà renseignés
+        """
+        super().__init__(line, parser)
+        self.raw = raw
+
+    @property
+    def timestamp(self):
+        """Horodatage epoch de l'entrée, None s'il est introuvable."""
+        if self._timestamp is _UNSET:
+            self._split()
+            if self._timestamp is _UNSET:
+                self._timestamp = self._parser.timestamps.parse(self.line)
+        return self._timestamp
+
+    def __repr__(self):
+        return f"JournalRecord({self.line!r})"
+
+class RecordParser:
+    """
+    Parser des lignes d'un type de log donné en ``LogRecord``.
+
+    Une instance par flux : l'extracteur d'horodatages qu'elle contient
+    déduit l'année des lignes syslog dans l'ordre du flux.
+    """
+
+    def __init__(self, log_type="generic"):
+        """
+        Args:
+            log_type (str): Type de log ('syslog', 'auth', 'windows', 'json', 'generic')
+        """
+        self.log_type = log_type
+        self.timestamps = TimestampParser()
+        if log_type == "windows":
+            self.split = self.split_windows
+        elif log_type == "json":
+            self.parse = self.parse_json
+            self.split = self.split_json
+        else:
+            # Les lignes génériques sont découpées comme du syslog si elles
+            # commencent par un horodatage
+            self.split = self.split_syslog
+
+    def parse(self, line):
+        """
+        Crée l'enregistrement d'une ligne.
+
+        Args:
+            line (str): Ligne de log
+
+        Returns:
+            LogRecord: Entrée structurée
+        """
+        return LogRecord(line, self)
+
+    def parse_json(self, line):
+        """
+        Crée l'enregistrement d'une ligne JSON, d'après son seul message.
+
+        Les lignes qui ne sont pas des objets JSON, ou dont aucun champ
+        message n'est reconnu, sont prises telles quelles comme du texte.
+
+        Args:
+            line (str): Ligne de log
+
+        Returns:
+            JournalRecord: Entrée structurée
+        """
+        if line[:1] == "{":
+            message = json_field(line, JSON_MESSAGE_FIELDS)
+            if message is not None:
+                return JournalRecord(message.strip(), self, line)
+        return JournalRecord(line, self)
+
+    def _header_end(self, line):
+        """
+        Retourne la position de fin de l'horodatage en tête de ligne.
+
+        Returns:
+            int: Position de l'espace suivant l'horodatage, -1 si la ligne
+            ne commence pas par un horodatage syslog ou ISO-8601
+        """
+        first = line[:1]
+        if first and first in _DIGITS:
+            # ISO-8601 / RFC 5424 : horodatage d'un seul tenant
+            if line[4:5] == "-" and line[10:11] in ("T", " "):
+                return line.find(" ", 19)
+            return -1
+        if line[3:4] != " " or line[:3] not in MONTHS:
+            return -1
+        end = 14 if line[5:6] == " " and line[4:5] != " " else 15
+        return end if line[end:end + 1] == " " else -1
+
+    def split_syslog(self, record):
+        """
+        Découpe l'en-tête d'une ligne syslog (RFC 3164 ou horodatage ISO-8601).
+
+        Format : ``<horodatage> <hôte> <programme>[<pid>]: <message>``. Une
+        ligne sans cet en-tête est entièrement considérée comme le message.
+
+        Args:
+            record (LogRecord): Enregistrement à compléter
+        """
+        line = record.line
+        record._host = None
+        end = self._header_end(line)
+        if end == -1:
+            return
+
+        host_end = line.find(" ", end + 1)
+        if host_end == -1:
+            return
+        record._host = sys.intern(line[end + 1:host_end])
+
+        tag_end = line.find(": ", host_end + 1)
+        tag = line[host_end + 1:tag_end] if tag_end != -1 else ""
+        if not tag or " " in tag:
+            # Pas d'étiquette programme[pid] : le message suit l'hôte
+            record._start = host_end + 1
+            return
+
+        bracket = tag.find("[")
+        if bracket != -1 and tag.endswith("]"):
+            pid_text = tag[bracket + 1:-1]
+            if pid_text.isdigit():
+                record._pid = int(pid_text)
+            tag = tag[:bracket]
+        record._program = sys.intern(tag)
+        record._start = tag_end + 2
+
+    def split_windows(self, record):
+        """
+        Extrait les champs d'une ligne d'un journal d'événements Windows exporté en texte.
+
+        Le programme est l'identifiant d'événement ; l'adresse source et le
+        compte sont lus dans leurs champs dédiés.
+
+        Args:
+            record (LogRecord): Enregistrement à compléter
+        """
+        line = record.line
+        ips = IP_PATTERN.findall(line)
+        match = WINDOWS_IP_PATTERN.search(line)
+        if match and ips and ips[0] != match.group(1):
+            # L'adresse source passe en premier
+            ips.remove(match.group(1))
+            ips.insert(0, match.group(1))
+        record._ips = ips
+
+        match = WINDOWS_USER_PATTERN.search(line)
+        record._user = match.group(1) if match else extract_user(line)
+        match = WINDOWS_HOST_PATTERN.search(line)
+        record._host = sys.intern(match.group(1)) if match else None
+        match = WINDOWS_EVENT_PATTERN.search(line)
+        record._program = sys.intern("EventID " + match.group(1)) if match else None
+
+    def split_json(self, record):
+        """
+        Lit les champs d'une entrée JSON (hôte, programme, PID, horodatage).
+
+        L'horodatage journald ``__REALTIME_TIMESTAMP`` est préféré aux
+        horodatages textuels (``time``, ``timestamp``). Les IPs et le compte
+        restent extraits du message.
+
+        Args:
+            record (JournalRecord): Enregistrement à compléter
+        """
+        raw = record.raw
+        if raw is None:
+            self.split_syslog(record)
+            return
+
+        host = json_field(raw, JSON_HOST_FIELDS)
+        record._host = sys.intern(host) if host else None
+        program = json_field(raw, JSON_PROGRAM_FIELDS)
+        record._program = sys.intern(program) if program else None
+        pid = json_field(raw, JSON_PID_FIELDS)
+        if pid is not None and str(pid).isdigit():
+            record._pid = int(pid)
+
+        realtime = json_field(raw, (JSON_REALTIME_FIELD,))
+        if realtime is not None and str(realtime).isdigit():
+            record._timestamp = int(realtime) // 1000000
+        else:
+            text = json_field(raw, JSON_TIME_FIELDS)
+            record._timestamp = self.timestamps.parse(text) if isinstance(text, str) else None
+
+# Parser des enregistrements créés sans parser explicite
+_default_parser = RecordParser()
+
+def to_records(lines, log_type="generic"):
+    """
+    Convertit une séquence de lignes en enregistrements structurés.
+
+    Args:
+        lines (iterable): Lignes pertinentes
+        log_type (str): Type de log
+
+    Yields:
+        LogRecord: Entrées structurées
+    """
+    parse = RecordParser(log_type).parse
+    stats = get_stats()
+    if stats is not None:
+        parse = stats.timed_function(parse, "parse")
+    for line in lines:
+        yield parse(line)
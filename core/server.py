@@ -0,0 +1,446 @@
+"""
+Module de réception syslog réseau pour LogLens.
+
+Écoute en UDP et en TCP (RFC 3164 et RFC 5424 ; en TCP, messages
+préfixés par leur longueur ou séparés par des fins de ligne, RFC 6587)
+et analyse les messages reçus sans passer par un fichier.
+
+Les messages sont regroupés en micro-lots d'octets : chaque lot est
+filtré par mots-clés d'un seul tenant, comme un bloc de fichier, et seuls
+les messages pertinents sont décodés et structurés. Les lots attendent
+la détection dans une file bornée : en TCP, une file pleine suspend la
+lecture de la connexion (contrôle de flux de TCP) ; en UDP, qui n'en a
+pas, les messages sont abandonnés et comptés.
+"""
+
+import asyncio
+import os
+import signal
+import socket
+import time
+
+from . import parser
+from .record import RecordParser
+from .utils import log_info, log_warning
+
+# Port syslog non privilégié par défaut
+DEFAULT_PORT = 5514
+
+# Nombre maximal de messages d'un micro-lot
+BATCH_SIZE = 1024
+
+# Délai maximal avant l'envoi d'un micro-lot incomplet (en secondes)
+BATCH_DELAY = 0.05
+
+# Nombre maximal de micro-lots en attente de détection
+QUEUE_SIZE = 256
+
+# Taille des lectures sur une connexion TCP
+READ_SIZE = 256 * 1024
+
+# Longueur maximale d'un message préfixé par sa longueur (RFC 6587)
+MAX_MESSAGE_SIZE = 64 * 1024
+
+# Tampon de réception UDP demandé au noyau (plafonné par net.core.rmem_max
+# sous Linux) : il absorbe les datagrammes arrivés pendant l'analyse d'un lot
+UDP_RECEIVE_BUFFER = 32 * 1024 * 1024
+
+_DIGITS = frozenset(b"0123456789")
+
+def udp_kernel_drops(sock):
+    """
+    Nombre de datagrammes abandonnés par le noyau faute de place dans le
+    tampon de réception d'un socket UDP.
+
+    Args:
+        sock (socket.socket): Socket UDP
+
+    Returns:
+        int: Datagrammes abandonnés, None si le noyau ne les expose pas
+        (hors Linux)
+    """
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+    except OSError:
+        return None
+    for path in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(path, encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) > 12 and fields[9] == inode:
+                        return int(fields[12])
+        except (OSError, StopIteration, ValueError):
+            continue
+    return None
+
+def normalize_message(message):
+    """
+    Convertit un message syslog reçu en ligne de log au format syslog.
+
+    La priorité ``<PRI>`` est retirée ; un en-tête RFC 5424 (version,
+    horodatage ISO-8601, hôte, application, PID, identifiant, données
+    structurées) devient ``<horodatage> <hôte> <application>[<pid>]: <message>``,
+    forme comprise par ``RecordParser``. Un message RFC 3164 est déjà sous
+    cette forme.
+
+    Args:
+        message (str): Message syslog tel que reçu (une ligne)
+
+    Returns:
+        str: Ligne de log
+    """
+    if message[:1] == "<":
+        end = message.find(">", 1, 5)
+        if end != -1 and message[1:end].isdigit():
+            message = message[end + 1:]
+    if message[:2] != "1 ":
+        return message
+
+    # RFC 5424 : VERSION HORODATAGE HÔTE APPLICATION PID ID-MESSAGE DONNÉES MESSAGE
+    fields = message.split(" ", 6)
+    if len(fields) < 7:
+        return message
+    _, timestamp, host, app, procid, _, rest = fields
+    if rest[:1] == "[":
+        # Données structurées : éléments [...] successifs, "]" échappé par "\"
+        pos = 0
+        while rest[pos:pos + 1] == "[":
+            end = rest.find("]", pos)
+            while end != -1 and rest[end - 1] == "\\":
+                end = rest.find("]", end + 1)
+            if end == -1:
+                pos = len(rest)
+                break
+            pos = end + 1
+        text = rest[pos + 1:]
+    elif rest[:1] == "-":
+        text = rest[2:]
+    else:
+        text = rest
+    if text[:1] == "﻿":
+        text = text[1:]
+
+    if timestamp == "-":
+        return text
+    tag = ""
+    if app != "-":
+        tag = f"{app}[{procid}]: " if procid != "-" else f"{app}: "
+    return f"{timestamp} {host} {tag}{text}"
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    """Réception UDP par la boucle d'événements, lorsqu'elle ne permet pas ``add_reader`` (Windows)."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def datagram_received(self, data, addr):
+        self.server.add_datagram(data)
+
+class SyslogServer:
+    """
+    Serveur syslog UDP/TCP alimentant un pipeline d'analyse.
+
+    Les anomalies de chaque micro-lot sont transmises à ``on_anomalies``
+    dès la fin de sa détection. Les compteurs (messages reçus, abandonnés,
+    lots, anomalies) sont consultables pendant et après l'exécution.
+    """
+
+    def __init__(self, analysis, on_anomalies, host="0.0.0.0", udp_port=DEFAULT_PORT, tcp_port=DEFAULT_PORT,
+                 batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE):
+        """
+        Args:
+            analysis (AnalysisPipeline): Pipeline dont l'état est conservé entre les lots
+            on_anomalies (callable): Appelé avec la liste des anomalies de chaque lot
+            host (str): Adresse d'écoute
+            udp_port (int): Port UDP, None pour ne pas écouter en UDP
+            tcp_port (int): Port TCP, None pour ne pas écouter en TCP
+            batch_size (int): Nombre maximal de messages d'un micro-lot
+            queue_size (int): Nombre maximal de micro-lots en attente
+        """
+        self.analysis = analysis
+        self.on_anomalies = on_anomalies
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.records = RecordParser("syslog")
+
+        self.received = 0
+        self.dropped = 0
+        self.batches = 0
+        self.anomalies = 0
+        self.connections = 0
+
+        self._queue = None
+        self._pending = []
+        self._stopping = None
+        self._udp_socket = None
+        self._kernel_drops = 0
+
+    def add_datagram(self, data):
+        """
+        Ajoute un message UDP au micro-lot en cours.
+
+        Args:
+            data (bytes): Datagramme reçu
+        """
+        # Une fin de ligne interne découperait le message en deux lignes
+        self._pending.append(data.rstrip(b"\r\n\x00").replace(b"\n", b" "))
+        if len(self._pending) >= self.batch_size:
+            self._flush_pending()
+
+    def _read_datagrams(self):
+        """
+        Lit les datagrammes en attente sur le socket UDP, jusqu'à un micro-lot.
+
+        Un réveil de la boucle d'événements ne lit qu'un datagramme avec
+        ``create_datagram_endpoint`` ; les lire ici par lots divise d'autant
+        le coût de la boucle par message.
+        """
+        recv = self._udp_socket.recv
+        add = self.add_datagram
+        for _ in range(self.batch_size):
+            try:
+                data = recv(MAX_MESSAGE_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # Erreur ICMP remontée par le socket : le datagramme suivant est lisible
+                continue
+            add(data)
+
+    async def _listen_udp(self, loop):
+        """
+        Ouvre le socket UDP.
+
+        Returns:
+            callable: Fermeture du socket
+        """
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+        except OSError:
+            pass
+        sock.bind((self.host, self.udp_port))
+        sock.setblocking(False)
+        self._udp_socket = sock
+        try:
+            loop.add_reader(sock, self._read_datagrams)
+        except NotImplementedError:
+            transport, _ = await loop.create_datagram_endpoint(lambda: _UDPProtocol(self), sock=sock)
+            return transport.close
+
+        def close():
+            loop.remove_reader(sock)
+            sock.close()
+        return close
+
+    def _flush_pending(self):
+        """Envoie le micro-lot UDP en cours ; abandonné si la file est pleine."""
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+        self.received += len(pending)
+        try:
+            self._queue.put_nowait(b"\n".join(pending))
+        except asyncio.QueueFull:
+            self.dropped += len(pending)
+
+    async def _flush_periodically(self):
+        """Envoie les micro-lots UDP incomplets après ``BATCH_DELAY``."""
+        while True:
+            await asyncio.sleep(BATCH_DELAY)
+            self._flush_pending()
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Lit une connexion TCP et met ses messages en file.
+
+        Le cadrage est reconnu au premier octet : un chiffre annonce des
+        messages préfixés par leur longueur, sinon les messages sont séparés
+        par des fins de ligne ; un message sans fin de ligne au-delà de
+        ``MAX_MESSAGE_SIZE`` est abandonné jusqu'à sa prochaine fin de ligne.
+        La mise en file attend si la file est pleine.
+        """
+        self.connections += 1
+        buffer = b""
+        octet_counting = None
+        # Message trop long en cours d'abandon, jusqu'à sa fin de ligne
+        discarding = False
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buffer = buffer + data if buffer else data
+                if octet_counting is None:
+                    octet_counting = buffer[0] in _DIGITS
+                if octet_counting:
+                    messages, buffer = self._split_counted(buffer)
+                    if messages is None:
+                        log_warning("Connexion syslog fermée : longueur de message invalide")
+                        break
+                    if not messages:
+                        continue
+                    block = b"\n".join(message.replace(b"\n", b" ") for message in messages)
+                    count = len(messages)
+                else:
+                    if discarding:
+                        newline = buffer.find(b"\n")
+                        if newline == -1:
+                            buffer = b""
+                            continue
+                        buffer = buffer[newline + 1:]
+                        discarding = False
+                    cut = buffer.rfind(b"\n") + 1
+                    if cut == 0:
+                        if len(buffer) > MAX_MESSAGE_SIZE:
+                            buffer = b""
+                            discarding = True
+                            self.dropped += 1
+                        continue
+                    block, buffer = buffer[:cut], buffer[cut:]
+                    count = block.count(b"\n")
+                self.received += count
+                await self._queue.put(block)
+            if buffer and not octet_counting:
+                self.received += 1
+                await self._queue.put(buffer)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _split_counted(buffer):
+        """
+        Découpe les messages complets préfixés par leur longueur (``LONGUEUR MESSAGE``).
+
+        Returns:
+            tuple: (messages complets, reste du tampon) ; messages à None si
+            une longueur est invalide
+        """
+        messages = []
+        pos = 0
+        size = len(buffer)
+        while pos < size:
+            space = buffer.find(b" ", pos, pos + 8)
+            if space == -1:
+                if size - pos >= 8:
+                    return None, b""
+                break
+            length = buffer[pos:space]
+            if not length.isdigit() or int(length) > MAX_MESSAGE_SIZE:
+                return None, b""
+            end = space + 1 + int(length)
+            if end > size:
+                break
+            messages.append(buffer[space + 1:end].rstrip(b"\r\n\x00"))
+            pos = end
+        return messages, buffer[pos:]
+
+    async def _consume(self):
+        """Analyse les micro-lots dans l'ordre de la file."""
+        normalize = normalize_message
+        parse = self.records.parse
+        analysis = self.analysis
+        while True:
+            block = await self._queue.get()
+            if block is None:
+                break
+            entries = (parse(normalize(line)) for line in parser.filter_block(block, analysis.keywords))
+            anomalies = list(analysis.process_batch(entries))
+            self.batches += 1
+            if anomalies:
+                self.anomalies += len(anomalies)
+                self.on_anomalies(anomalies)
+
+    async def serve(self, stop_event=None):
+        """
+        Écoute jusqu'à l'arrêt, puis analyse les micro-lots restants.
+
+        SIGTERM demande l'arrêt, comme ``stop`` (fil principal, hors Windows).
+
+        Args:
+            stop_event (asyncio.Event): Arrêt demandé (attente indéfinie si None)
+        """
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self.queue_size)
+        self._stopping = stop_event or asyncio.Event()
+        consumer = asyncio.create_task(self._consume())
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+        tasks = []
+        close_udp = None
+        tcp_server = None
+
+        try:
+            if self.udp_port is not None:
+                close_udp = await self._listen_udp(loop)
+                tasks.append(asyncio.create_task(self._flush_periodically()))
+                log_info(f"Écoute syslog UDP sur {self.host}:{self.udp_port}")
+            if self.tcp_port is not None:
+                tcp_server = await asyncio.start_server(self._handle_connection, self.host, self.tcp_port)
+                log_info(f"Écoute syslog TCP sur {self.host}:{self.tcp_port}")
+            await self._stopping.wait()
+        finally:
+            if close_udp is not None:
+                self._kernel_drops = udp_kernel_drops(self._udp_socket) or 0
+                close_udp()
+            if tcp_server is not None:
+                tcp_server.close()
+            for task in tasks:
+                task.cancel()
+            self._flush_pending()
+            await self._queue.put(None)
+            await consumer
+
+    def stop(self):
+        """Demande l'arrêt du serveur (depuis la boucle d'événements)."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    def counters(self):
+        """
+        Retourne les compteurs du serveur.
+
+        Les abandons comprennent les datagrammes UDP perdus par le noyau
+        (tampon de réception plein), lorsque le système les expose.
+
+        Returns:
+            dict: Messages reçus et abandonnés, lots analysés, anomalies, connexions TCP
+        """
+        kernel_drops = self._kernel_drops
+        if self._udp_socket is not None and self._udp_socket.fileno() != -1:
+            kernel_drops = udp_kernel_drops(self._udp_socket) or 0
+        return {
+            "received": self.received,
+            "dropped": self.dropped + kernel_drops,
+            "batches": self.batches,
+            "anomalies": self.anomalies,
+            "connections": self.connections,
+        }
+
+def run_server(server):
+    """
+    Exécute un serveur syslog jusqu'à Ctrl+C.
+
+    Args:
+        server (SyslogServer): Serveur à exécuter
+
+    Returns:
+        float: Durée d'écoute en secondes
+    """
+    started = time.monotonic()
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    return time.monotonic() - started
@@ -0,0 +1,244 @@
+"""
+Module des sorties d'anomalies pour LogLens.
+
+Chaque sortie reçoit les anomalies au fil de l'analyse et les écrit à
+travers un grand tampon : console (avec un nombre maximal de lignes
+affichées), rapport Markdown, NDJSON et CSV. Les formats NDJSON et CSV
+ne contiennent que les anomalies, sans bannière ni résumé : ils peuvent
+alimenter directement un autre outil, y compris par la sortie standard.
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+# Taille du tampon d'écriture des sorties (en octets)
+BUFFER_SIZE = 1024 * 1024
+
+# Formats de sortie des fichiers, et extensions associées
+OUTPUT_FORMATS = ("markdown", "ndjson", "csv")
+FORMAT_EXTENSIONS = {
+    ".json": "ndjson",
+    ".jsonl": "ndjson",
+    ".ndjson": "ndjson",
+    ".csv": "csv",
+}
+
+# Formats lisibles par une machine : ni bannière ni résumé
+MACHINE_FORMATS = ("ndjson", "csv")
+
+# Champs d'une anomalie écrits en NDJSON et en CSV
+ANOMALY_FIELDS = ("type", "timestamp", "host", "program", "user", "ips", "pattern", "entry", "alert")
+
+# Longueur des entrées affichées en console
+CONSOLE_ENTRY_WIDTH = 100
+
+def detect_format(path):
+    """
+    Déduit le format d'une sortie de l'extension de son fichier.
+
+    Args:
+        path (str): Chemin du fichier de sortie (``-`` pour la sortie standard)
+
+    Returns:
+        str: 'ndjson', 'csv', ou 'markdown' par défaut ; 'ndjson' pour la
+        sortie standard
+    """
+    if path == "-":
+        return "ndjson"
+    return FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "markdown")
+
+def open_stream(path, newline=None):
+    """
+    Ouvre un fichier de sortie, ou la sortie standard, avec un grand tampon.
+
+    Args:
+        path (str): Chemin du fichier, ``-`` pour la sortie standard
+        newline (str): Traduction des fins de ligne (``""`` pour le CSV)
+
+    Returns:
+        file: Flux texte UTF-8 tamponné
+    """
+    if path != "-":
+        return open(path, "w", encoding="utf-8", buffering=BUFFER_SIZE, newline=newline)
+    sys.stdout.flush()
+    try:
+        fileno = sys.stdout.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return sys.stdout
+    return open(fileno, "w", encoding="utf-8", buffering=BUFFER_SIZE, newline=newline, closefd=False)
+
+def anomaly_record(anomaly):
+    """
+    Champs d'une anomalie écrits en NDJSON, sérialisables en JSON.
+
+    Args:
+        anomaly (dict): Anomalie détectée
+
+    Returns:
+        dict: Champs de ``ANOMALY_FIELDS``, ``alert`` booléen
+    """
+    record = {field: anomaly.get(field) for field in ANOMALY_FIELDS}
+    record["alert"] = bool(record["alert"])
+    return record
+
+class AnomalySink:
+    """
+    Sortie d'anomalies tamponnée.
+
+    Les sous-classes implémentent ``write`` ; ``close`` termine la sortie
+    avec le résumé si le format en comporte un.
+    """
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream (file): Flux texte ouvert par ``open_stream``
+        """
+        self.stream = stream
+        self.count = 0
+
+    def write(self, anomaly):
+        """
+        Écrit une anomalie.
+
+        Args:
+            anomaly (dict): Anomalie détectée
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """Vide le tampon (fin d'un lot en suivi continu)."""
+        self.stream.flush()
+
+    def close(self, summary=None):
+        """
+        Termine la sortie.
+
+        Args:
+            summary (str): Résumé automatique, écrit si le format en comporte un
+        """
+        if self.stream in (sys.stdout, sys.stderr):
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+class ConsoleSink(AnomalySink):
+    """
+    Affichage des anomalies en console, une ligne courte par anomalie.
+
+    Au-delà de ``max_display`` lignes, les anomalies ne sont plus que
+    comptées : le terminal ne ralentit plus l'analyse.
+    """
+
+    def __init__(self, max_display=None, stream=None):
+        """
+        Args:
+            max_display (int): Nombre maximal d'anomalies affichées (toutes si None)
+            stream (file): Flux de sortie (sortie standard tamponnée par défaut)
+        """
+        super().__init__(stream if stream is not None else open_stream("-"))
+        self.max_display = max_display
+        self.started = False
+
+    def start(self):
+        """Affiche l'en-tête de la liste des anomalies."""
+        if not self.started:
+            self.started = True
+            # Les messages déjà affichés par print() précèdent la liste
+            sys.stdout.flush()
+            self.stream.write("\n[🧿] Anomalies détectées :\n")
+
+    def write(self, anomaly):
+        self.count += 1
+        if self.max_display is not None and self.count > self.max_display:
+            return
+        if not self.started:
+            self.start()
+        self.stream.write(f" - {anomaly['type']} | {anomaly['entry'][:CONSOLE_ENTRY_WIDTH]}\n")
+
+    def close(self, summary=None):
+        hidden = self.count - self.max_display if self.max_display is not None else 0
+        if hidden > 0:
+            self.stream.write(f" ... {hidden} anomalie(s) non affichée(s) (--max-display {self.max_display})\n")
+        super().close()
+
+class MarkdownSink(AnomalySink):
+    """
+    Rapport Markdown : liste des anomalies puis résumé automatique.
+
+    Les alertes de brute force du suivi continu ne sont pas écrites : les
+    attaques y figurent avec leurs compteurs finaux.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.stream.write("# Rapport LogLens\n\n")
+        self.stream.write("## Anomalies détectées\n\n")
+
+    def write(self, anomaly):
+        if anomaly.get("alert"):
+            return
+        self.count += 1
+        self.stream.write(f"- **{anomaly['type']}**: {anomaly['entry']}\n")
+
+    def close(self, summary=None):
+        if summary is not None:
+            self.stream.write("\n## Résumé automatique\n\n")
+            self.stream.write(summary)
+        super().close()
+
+class NDJSONSink(AnomalySink):
+    """Un objet JSON par anomalie et par ligne, sans résumé."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    def write(self, anomaly):
+        self.count += 1
+        self.stream.write(self._dumps(anomaly_record(anomaly)))
+        self.stream.write("\n")
+
+class CSVSink(AnomalySink):
+    """Une ligne CSV par anomalie, précédée d'une ligne d'en-tête, sans résumé."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._writer = csv.writer(stream)
+        self._writer.writerow(ANOMALY_FIELDS)
+
+    def write(self, anomaly):
+        self.count += 1
+        ips = anomaly.get("ips")
+        self._writer.writerow((
+            anomaly["type"], anomaly.get("timestamp"), anomaly.get("host"), anomaly.get("program"),
+            anomaly.get("user"), " ".join(ips) if ips else "", anomaly.get("pattern"), anomaly["entry"],
+            int(bool(anomaly.get("alert")))))
+
+_SINKS = {
+    "markdown": MarkdownSink,
+    "ndjson": NDJSONSink,
+    "csv": CSVSink,
+}
+
+def open_sink(path, output_format=None):
+    """
+    Ouvre une sortie fichier (ou la sortie standard) dans le format demandé.
+
+    Args:
+        path (str): Chemin du fichier, ``-`` pour la sortie standard
+        output_format (str): 'markdown', 'ndjson' ou 'csv' (déduit de
+            l'extension si None)
+
+    Returns:
+        AnomalySink: Sortie ouverte
+
+    Raises:
+        OSError: Si le fichier ne peut pas être créé
+    """
+    output_format = output_format or detect_format(path)
+    stream = open_stream(path, newline="" if output_format == "csv" else None)
+    return _SINKS[output_format](stream)
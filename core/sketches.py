@@ -0,0 +1,433 @@
+"""
+Module de structures probabilistes à mémoire bornée pour LogLens.
+
+Sur un hôte exposé, les IPs sources se comptent par millions : compter
+chacune exactement coûte une entrée de dictionnaire par IP. Les
+structures de ce module occupent une mémoire fixe, quel que soit le
+nombre de clés, avec une erreur bornée et documentée :
+
+- ``SpaceSaving`` : les clés les plus fréquentes (top-K). Chaque compte
+  est surestimé d'au plus ``total / capacity`` ; toute clé plus fréquente
+  que ce seuil est présente.
+- ``HyperLogLog`` : nombre de clés distinctes, erreur relative typique
+  ``1.04 / sqrt(2 ** precision)`` (1,6 % en précision 12, 4 Ko).
+- ``CountMinSketch`` : nombre d'occurrences de n'importe quelle clé,
+  surestimé d'au plus ``e / width * total`` avec une probabilité
+  ``1 - exp(-depth)``.
+
+Toutes se combinent avec ``merge`` (processus, fichiers, exécutions
+successives) et s'enregistrent en JSON avec ``get_state`` / ``from_state``.
+Le hachage (BLAKE2b) ne dépend pas de ``PYTHONHASHSEED`` : un état
+enregistré reste valide d'une exécution à l'autre.
+"""
+
+import base64
+import heapq
+import math
+import sys
+from array import array
+from hashlib import blake2b
+
+# Nombre de clés suivies par défaut pour le top-K
+TOP_CAPACITY = 1000
+
+# Précision par défaut de HyperLogLog (2 ** 12 registres d'un octet)
+HLL_PRECISION = 12
+
+# Dimensions par défaut du count-min (4 x 2048 compteurs de 64 bits, 64 Ko)
+CMS_WIDTH = 2048
+CMS_DEPTH = 4
+
+_MASK_32 = 0xFFFFFFFF
+
+def hash64(key):
+    """
+    Hachage stable d'une clé sur 64 bits.
+
+    Args:
+        key (str): Clé à hacher
+
+    Returns:
+        int: Empreinte de la clé, identique d'une exécution à l'autre
+    """
+    return int.from_bytes(blake2b(key.encode("utf-8", errors="replace"), digest_size=8).digest(), "little")
+
+def _encode_array(values):
+    """Encode un tableau d'entiers en base64 (petit-boutiste)."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+def _decode_array(typecode, text):
+    """Décode un tableau produit par ``_encode_array``."""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+class SpaceSaving:
+    """
+    Clés les plus fréquentes d'un flux (algorithme Space-Saving).
+
+    Au plus ``capacity`` clés sont suivies. Une clé nouvelle remplace la
+    moins fréquente et hérite de son compte, conservé comme erreur : le
+    compte d'une clé est surestimé d'au plus ``error``, lui-même borné par
+    ``total / capacity``.
+
+    Offre les opérations de ``Counter`` utilisées par le résumé
+    (``update``, ``most_common``, ``items``).
+    """
+
+    def __init__(self, capacity=TOP_CAPACITY):
+        """
+        Args:
+            capacity (int): Nombre maximal de clés suivies
+        """
+        self.capacity = capacity
+        self.total = 0
+        # Clé -> [compte, erreur], dans l'ordre d'apparition
+        self.counts = {}
+        # Tas des (compte, ordre, clé), mis à jour paresseusement : un compte
+        # périmé est corrigé lorsqu'il arrive au sommet
+        self._heap = []
+        self._order = 0
+
+    def add(self, key, count=1):
+        """
+        Compte une ou plusieurs occurrences d'une clé.
+
+        Args:
+            key (str): Clé observée
+            count (int): Nombre d'occurrences
+        """
+        self.total += count
+        counter = self.counts.get(key)
+        if counter is not None:
+            counter[0] += count
+            return
+        error = 0
+        if len(self.counts) >= self.capacity:
+            error = self._evict()
+        self.counts[key] = [error + count, error]
+        self._order += 1
+        heapq.heappush(self._heap, (error + count, self._order, key))
+
+    def _evict(self):
+        """Retire la clé de plus petit compte et retourne ce compte."""
+        heap = self._heap
+        while True:
+            count, order, key = heap[0]
+            current = self.counts[key][0]
+            if current == count:
+                heapq.heappop(heap)
+                del self.counts[key]
+                return count
+            heapq.heapreplace(heap, (current, order, key))
+
+    def update(self, keys):
+        """
+        Compte une séquence de clés, ou les comptes d'un dictionnaire.
+
+        Args:
+            keys (iterable or dict): Clés observées, ou clé -> nombre d'occurrences
+        """
+        add = self.add
+        if isinstance(keys, dict):
+            for key, count in keys.items():
+                add(key, count)
+        else:
+            for key in keys:
+                add(key)
+
+    def merge(self, other):
+        """
+        Ajoute les comptes d'un autre top-K de même capacité.
+
+        Une clé absente d'un côté y compte pour le plus petit compte suivi
+        s'il est plein (elle a pu être évincée) : les comptes restent des
+        surestimations et la borne d'erreur ``total / capacity`` tient.
+
+        Args:
+            other (SpaceSaving): Top-K à ajouter
+
+        Returns:
+            SpaceSaving: Le top-K courant, complété
+
+        Raises:
+            ValueError: Si les capacités diffèrent
+        """
+        if other.capacity != self.capacity:
+            raise ValueError("Fusion de top-K de capacités différentes")
+        floor = self._floor()
+        other_floor = other._floor()
+        merged = {}
+        for key, (count, error) in self.counts.items():
+            other_count, other_error = other.counts.get(key, (other_floor, other_floor))
+            merged[key] = [count + other_count, error + other_error]
+        for key, (count, error) in other.counts.items():
+            if key not in merged:
+                merged[key] = [count + floor, error + floor]
+        kept = sorted(merged, key=lambda key: merged[key][0], reverse=True)[:self.capacity]
+        kept = set(kept)
+        self.counts = {key: counter for key, counter in merged.items() if key in kept}
+        self.total += other.total
+        self._rebuild()
+        return self
+
+    def _floor(self):
+        """Compte minimal d'une clé non suivie (0 tant que le top-K n'est pas plein)."""
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def _rebuild(self):
+        self._heap = []
+        for order, (key, (count, _)) in enumerate(self.counts.items()):
+            self._heap.append((count, order, key))
+        heapq.heapify(self._heap)
+        self._order = len(self._heap)
+
+    def top(self, n=None):
+        """
+        Retourne les clés les plus fréquentes.
+
+        Args:
+            n (int): Nombre de clés (toutes si None)
+
+        Returns:
+            list: Tuples (clé, compte estimé, erreur maximale), par compte
+            décroissant puis ordre d'apparition
+        """
+        items = sorted(self.counts.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, count, error) for key, (count, error) in items[:n]]
+
+    def most_common(self, n=None):
+        """Comme ``Counter.most_common`` : tuples (clé, compte estimé)."""
+        return [(key, count) for key, count, _ in self.top(n)]
+
+    def items(self):
+        """Paires (clé, compte estimé), dans l'ordre d'apparition."""
+        return [(key, counter[0]) for key, counter in self.counts.items()]
+
+    def error_bound(self):
+        """Surestimation maximale d'un compte : ``total / capacity``."""
+        return self.total / self.capacity
+
+    def __len__(self):
+        return len(self.counts)
+
+    def get_state(self):
+        """
+        Retourne le top-K sous une forme sérialisable en JSON.
+
+        Returns:
+            dict: Capacité, total et comptes
+        """
+        return {"capacity": self.capacity, "total": self.total,
+                "counts": [[key, count, error] for key, (count, error) in self.counts.items()]}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restaure un top-K produit par ``get_state``.
+
+        Args:
+            state (dict): État du top-K
+
+        Returns:
+            SpaceSaving: Top-K restauré
+        """
+        sketch = cls(state["capacity"])
+        sketch.total = state["total"]
+        sketch.counts = {key: [count, error] for key, count, error in state["counts"]}
+        sketch._rebuild()
+        return sketch
+
+class HyperLogLog:
+    """
+    Estimation du nombre de clés distinctes (HyperLogLog).
+
+    Occupe ``2 ** precision`` octets ; l'erreur relative typique est
+    ``1.04 / sqrt(2 ** precision)``. Les petits effectifs sont estimés par
+    comptage linéaire, exact à quelques unités près.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        """
+        Args:
+            precision (int): Nombre de bits d'index des registres (4 à 16)
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f"Précision HyperLogLog invalide: {precision}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._shift = 64 - precision
+        self._mask = (1 << self._shift) - 1
+
+    def add(self, key):
+        """
+        Observe une clé.
+
+        Args:
+            key (str): Clé observée
+        """
+        h = hash64(key)
+        index = h >> self._shift
+        # Rang du premier bit à 1 dans les bits restants
+        rank = self._shift - (h & self._mask).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, keys):
+        """Observe une séquence de clés."""
+        for key in keys:
+            self.add(key)
+
+    def count(self):
+        """
+        Estime le nombre de clés distinctes observées.
+
+        Returns:
+            int: Estimation
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Comptage linéaire pour les petits effectifs
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def relative_error(self):
+        """Erreur relative typique (écart-type) de l'estimation."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def merge(self, other):
+        """
+        Ajoute les clés observées par un autre HyperLogLog de même précision.
+
+        Args:
+            other (HyperLogLog): Estimateur à ajouter
+
+        Returns:
+            HyperLogLog: L'estimateur courant, complété
+
+        Raises:
+            ValueError: Si les précisions diffèrent
+        """
+        if other.precision != self.precision:
+            raise ValueError("Fusion de HyperLogLog de précisions différentes")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def get_state(self):
+        """Retourne l'estimateur sous une forme sérialisable en JSON."""
+        return {"precision": self.precision,
+                "registers": base64.b64encode(bytes(self.registers)).decode("ascii")}
+
+    @classmethod
+    def from_state(cls, state):
+        """Restaure un estimateur produit par ``get_state``."""
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray(base64.b64decode(state["registers"]))
+        return sketch
+
+class CountMinSketch:
+    """
+    Nombre d'occurrences de n'importe quelle clé (count-min).
+
+    Chaque clé incrémente un compteur par ligne ; l'estimation est le plus
+    petit de ces compteurs. Elle n'est jamais inférieure au compte exact et
+    le dépasse d'au plus ``e / width * total`` avec une probabilité
+    ``1 - exp(-depth)``.
+    """
+
+    def __init__(self, width=CMS_WIDTH, depth=CMS_DEPTH):
+        """
+        Args:
+            width (int): Compteurs par ligne
+            depth (int): Nombre de lignes (fonctions de hachage), 16 au plus
+        """
+        if not 1 <= depth <= 16:
+            raise ValueError(f"Profondeur de count-min invalide: {depth}")
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.table = array("Q", bytes(8 * width * depth))
+
+    def _cells(self, key):
+        """Index des compteurs d'une clé, un par ligne (32 bits d'empreinte par ligne)."""
+        h = int.from_bytes(blake2b(key.encode("utf-8", errors="replace"), digest_size=4 * self.depth).digest(),
+                           "little")
+        width = self.width
+        return [row * width + ((h >> (32 * row)) & _MASK_32) % width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        """
+        Compte une ou plusieurs occurrences d'une clé.
+
+        Args:
+            key (str): Clé observée
+            count (int): Nombre d'occurrences
+        """
+        self.total += count
+        table = self.table
+        for cell in self._cells(key):
+            table[cell] += count
+
+    def update(self, keys):
+        """Compte une séquence de clés."""
+        for key in keys:
+            self.add(key)
+
+    def estimate(self, key):
+        """
+        Estime le nombre d'occurrences d'une clé.
+
+        Args:
+            key (str): Clé recherchée
+
+        Returns:
+            int: Estimation, jamais inférieure au compte exact
+        """
+        table = self.table
+        return min(table[cell] for cell in self._cells(key))
+
+    def error_bound(self):
+        """Surestimation maximale (avec probabilité ``1 - exp(-depth)``)."""
+        return math.e / self.width * self.total
+
+    def merge(self, other):
+        """
+        Ajoute les comptes d'un autre count-min de mêmes dimensions.
+
+        Args:
+            other (CountMinSketch): Count-min à ajouter
+
+        Returns:
+            CountMinSketch: Le count-min courant, complété
+
+        Raises:
+            ValueError: Si les dimensions diffèrent
+        """
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Fusion de count-min de dimensions différentes")
+        self.table = array("Q", map(int.__add__, self.table, other.table))
+        self.total += other.total
+        return self
+
+    def get_state(self):
+        """Retourne le count-min sous une forme sérialisable en JSON."""
+        return {"width": self.width, "depth": self.depth, "total": self.total,
+                "table": _encode_array(self.table)}
+
+    @classmethod
+    def from_state(cls, state):
+        """Restaure un count-min produit par ``get_state``."""
+        sketch = cls(state["width"], state["depth"])
+        sketch.total = state["total"]
+        sketch.table = _decode_array("Q", state["table"])
+        return sketch
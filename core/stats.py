@@ -0,0 +1,329 @@
+"""
+Module d'instrumentation de LogLens.
+
+Mesure, pour une exécution, le temps réel et le temps CPU de chaque étape
+(lecture, filtrage par mots-clés, structuration, détection, brute force,
+agrégats), les volumes lus et gardés, et pour chaque règle de ``PATTERNS``
+le nombre d'évaluations, de correspondances et le temps cumulé.
+
+Désactivée, l'instrumentation ne coûte rien : les étapes ne sont
+enveloppées de chronomètres que si ``enable`` a été appelée avant
+l'analyse. Les temps sont exclusifs : une étape imbriquée dans une autre
+(le brute force dans la détection, la lecture dans le filtrage) est
+décomptée de l'étape englobante.
+
+Un profileur par échantillonnage optionnel relève la pile d'appels à
+intervalle régulier de temps CPU et l'écrit au format « piles repliées »
+(une ligne ``f1;f2;f3 nombre`` par pile), lu par flamegraph.pl et speedscope.
+"""
+
+import atexit
+import json
+import os
+import signal
+import time
+
+# Étapes mesurées, dans l'ordre du pipeline
+STAGES = ("read", "filter", "parse", "detect", "brute_force", "correlate", "templates", "aggregate")
+
+STAGE_LABELS = {
+    "read": "Lecture (E/S, décompression)",
+    "filter": "Filtre par mots-clés",
+    "parse": "Structuration des entrées",
+    "detect": "Détection (règles, champs)",
+    "brute_force": "Brute force",
+    "correlate": "Corrélation multi-étapes",
+    "templates": "Extraction de modèles",
+    "aggregate": "Agrégats du résumé",
+}
+
+# Intervalle par défaut du profileur par échantillonnage (secondes de CPU)
+PROFILE_INTERVAL = 0.005
+
+# Instrumentation de l'exécution en cours, None si désactivée
+_current = None
+
+def enable():
+    """
+    Active l'instrumentation pour les analyses qui suivent.
+
+    Returns:
+        RunStats: Statistiques de l'exécution
+    """
+    global _current
+    _current = RunStats()
+    return _current
+
+def get_stats():
+    """
+    Retourne l'instrumentation active.
+
+    Returns:
+        RunStats or None: Statistiques de l'exécution, None si désactivée
+    """
+    return _current
+
+class RunStats:
+    """
+    Statistiques d'une exécution : étapes, volumes et règles.
+
+    Les chronomètres sont tenus sur une pile : le temps d'une étape
+    imbriquée est ajouté à celui de l'étape englobante comme temps « enfant »,
+    puis retranché de son temps propre.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        # Étape -> [temps réel, temps CPU, appels]
+        self.stages = {stage: [0.0, 0.0, 0] for stage in STAGES}
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.lines_kept = 0
+        # Règle (catégorie, pattern) -> [évaluations, correspondances, nanosecondes]
+        self.rules = {}
+        self.prefilter = [0, 0, 0]
+        self._children = []
+        self.profiler = None
+
+    def _enter(self):
+        self._children.append([0.0, 0.0])
+
+    def _leave(self, stage, wall, cpu):
+        children = self._children.pop()
+        totals = self.stages[stage]
+        totals[0] += wall - children[0]
+        totals[1] += cpu - children[1]
+        totals[2] += 1
+        if self._children:
+            parent = self._children[-1]
+            parent[0] += wall
+            parent[1] += cpu
+
+    def timed_function(self, function, stage):
+        """
+        Enveloppe une fonction dont chaque appel est compté dans une étape.
+
+        Args:
+            function (callable): Fonction mesurée
+            stage (str): Étape à laquelle imputer le temps
+
+        Returns:
+            callable: Fonction mesurée, mêmes arguments et résultat
+        """
+        perf_counter = time.perf_counter
+        process_time = time.process_time
+        enter = self._enter
+        leave = self._leave
+
+        def timed(*args):
+            enter()
+            wall, cpu = perf_counter(), process_time()
+            try:
+                return function(*args)
+            finally:
+                leave(stage, perf_counter() - wall, process_time() - cpu)
+        return timed
+
+    def timed_iter(self, iterable, stage):
+        """
+        Enveloppe un itérateur dont chaque élément produit est compté dans une étape.
+
+        Args:
+            iterable (iterable): Itérateur mesuré
+            stage (str): Étape à laquelle imputer le temps
+
+        Yields:
+            object: Éléments de l'itérateur
+        """
+        iterator = iter(iterable)
+        perf_counter = time.perf_counter
+        process_time = time.process_time
+        while True:
+            self._enter()
+            wall, cpu = perf_counter(), process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._leave(stage, perf_counter() - wall, process_time() - cpu)
+                return
+            self._leave(stage, perf_counter() - wall, process_time() - cpu)
+            yield item
+
+    def reader(self, read):
+        """
+        Enveloppe la lecture d'un flux binaire : temps de lecture, octets et lignes lus.
+
+        Args:
+            read (callable): Méthode ``read`` du flux
+
+        Returns:
+            callable: Lecture mesurée
+        """
+        timed = self.timed_function(read, "read")
+
+        def counted(*args):
+            data = timed(*args)
+            self.bytes_read += len(data)
+            self.lines_read += data.count(b"\n")
+            return data
+        return counted
+
+    def rule(self, category, pattern):
+        """Compteurs d'une règle : [évaluations, correspondances, nanosecondes]."""
+        key = (category, pattern)
+        counters = self.rules.get(key)
+        if counters is None:
+            counters = self.rules[key] = [0, 0, 0]
+        return counters
+
+    def start_profiler(self, path, interval=PROFILE_INTERVAL):
+        """
+        Démarre le profileur par échantillonnage.
+
+        Args:
+            path (str): Fichier des piles repliées écrit par ``stop_profiler``
+            interval (float): Intervalle d'échantillonnage en secondes de CPU
+
+        Returns:
+            bool: False si la plateforme ne dispose pas de SIGPROF
+        """
+        if not hasattr(signal, "setitimer") or not hasattr(signal, "SIGPROF"):
+            return False
+        self.profiler = StackSampler(path, interval)
+        self.profiler.start()
+        # Ne pas laisser la minuterie armée si l'analyse est interrompue
+        atexit.register(self.stop_profiler)
+        return True
+
+    def stop_profiler(self):
+        """
+        Arrête le profileur et écrit les piles relevées.
+
+        Returns:
+            int: Nombre d'échantillons écrits (0 sans profileur)
+        """
+        if self.profiler is None:
+            return 0
+        samples = self.profiler.stop()
+        self.profiler = None
+        return samples
+
+    def to_dict(self):
+        """
+        Retourne les statistiques sous une forme sérialisable en JSON.
+
+        Returns:
+            dict: Durées totales, étapes, volumes et règles (triées par temps décroissant)
+        """
+        wall = time.perf_counter() - self.started
+        cpu = time.process_time() - self.started_cpu
+        measured = sum(totals[0] for totals in self.stages.values())
+        rules = [{"category": category, "pattern": pattern, "evaluations": counters[0],
+                  "hits": counters[1], "seconds": counters[2] / 1e9}
+                 for (category, pattern), counters in self.rules.items()]
+        rules.sort(key=lambda rule: rule["seconds"], reverse=True)
+        return {
+            "wall": wall,
+            "cpu": cpu,
+            "stages": {stage: {"wall": totals[0], "cpu": totals[1], "calls": totals[2]}
+                       for stage, totals in self.stages.items()},
+            # Sortie console, rapport, base, et tout ce qui n'est pas une étape
+            "other_wall": max(wall - measured, 0.0),
+            "bytes_read": self.bytes_read,
+            "lines_read": self.lines_read,
+            "lines_kept": self.lines_kept,
+            "bytes_per_sec": self.bytes_read / wall if wall > 0 else 0.0,
+            "prefilter": {"evaluations": self.prefilter[0], "hits": self.prefilter[1],
+                          "seconds": self.prefilter[2] / 1e9},
+            "rules": rules,
+        }
+
+    def render(self, limit=15):
+        """
+        Met en forme les statistiques en tableau.
+
+        Args:
+            limit (int): Nombre de règles affichées (les plus coûteuses)
+
+        Returns:
+            str: Tableau des étapes, des volumes et des règles
+        """
+        data = self.to_dict()
+        wall = data["wall"] or 1e-9
+        lines = [f"{'Étape':<32} {'réel (s)':>10} {'CPU (s)':>10} {'part':>7}"]
+        for stage in STAGES:
+            totals = data["stages"][stage]
+            if totals["calls"]:
+                lines.append(f"{STAGE_LABELS[stage]:<32} {totals['wall']:>10.3f} {totals['cpu']:>10.3f} "
+                             f"{totals['wall'] / wall:>7.1%}")
+        lines.append(f"{'Autres (sortie, rapport...)':<32} {data['other_wall']:>10.3f} {'':>10} "
+                     f"{data['other_wall'] / wall:>7.1%}")
+        lines.append(f"{'Total':<32} {data['wall']:>10.3f} {data['cpu']:>10.3f}")
+        lines.append("")
+        lines.append(f"Lignes lues : {data['lines_read']}, gardées : {data['lines_kept']}, "
+                     f"octets lus : {data['bytes_read']} ({data['bytes_per_sec'] / 1024 ** 2:.1f} Mo/s)")
+
+        prefilter = data["prefilter"]
+        if data["rules"] or prefilter["evaluations"]:
+            lines.append("")
+            lines.append(f"{'Règle':<48} {'évaluations':>12} {'corresp.':>10} {'temps (s)':>10}")
+            lines.append(f"{'(préfiltre des littéraux)':<48} {prefilter['evaluations']:>12} "
+                         f"{prefilter['hits']:>10} {prefilter['seconds']:>10.3f}")
+            for rule in data["rules"][:limit]:
+                name = f"{rule['category']}: {rule['pattern']}"
+                if len(name) > 48:
+                    name = name[:47] + "…"
+                lines.append(f"{name:<48} {rule['evaluations']:>12} {rule['hits']:>10} {rule['seconds']:>10.3f}")
+        return "\n".join(lines)
+
+    def to_json(self):
+        """Statistiques en JSON indenté."""
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+class StackSampler:
+    """
+    Profileur par échantillonnage sur SIGPROF (temps CPU du processus).
+
+    À chaque signal, la pile du fil principal est relevée et comptée ; les
+    piles sont écrites au format replié, de la racine vers la feuille.
+    """
+
+    def __init__(self, path, interval=PROFILE_INTERVAL):
+        """
+        Args:
+            path (str): Fichier de sortie des piles repliées
+            interval (float): Intervalle d'échantillonnage en secondes de CPU
+        """
+        self.path = path
+        self.interval = interval
+        self.stacks = {}
+        self._previous = None
+
+    def _sample(self, signum, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        key = ";".join(reversed(names))
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def start(self):
+        """Installe le gestionnaire de SIGPROF et démarre la minuterie."""
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        """
+        Arrête la minuterie et écrit les piles relevées.
+
+        Returns:
+            int: Nombre d'échantillons
+        """
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._previous or signal.SIG_DFL)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        return sum(self.stacks.values())
@@ -0,0 +1,294 @@
+"""
+Module de stockage SQLite des résultats pour LogLens.
+
+Chaque exécution enregistre ses anomalies, ses détections de brute force
+et ses agrégats dans une base locale : l'historique de plusieurs
+exécutions et de plusieurs hôtes s'interroge ensuite sans relire les logs.
+Une détection de brute force est identifiée par son IP ou son compte et
+son premier échec : signalée de nouveau, elle est mise à jour.
+
+Les écritures sont groupées par lots, chacun dans une seule transaction,
+et faites par un thread dédié (le module ``sqlite3`` libère le GIL pendant
+les requêtes) : l'enregistrement ne ralentit pas l'analyse. La base est en
+mode WAL, ce qui permet de la lire pendant une analyse.
+"""
+
+import queue
+import socket
+import sqlite3
+import threading
+import time
+
+from .utils import log_info, log_error
+
+# Version du schéma de la base
+SCHEMA_VERSION = 2
+
+# Nombre d'anomalies écrites par transaction
+BATCH_SIZE = 5000
+
+# Nombre de lots en attente d'écriture avant de bloquer l'analyse
+MAX_PENDING_BATCHES = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started INTEGER NOT NULL,
+    finished INTEGER,
+    hostname TEXT,
+    files TEXT,
+    entries INTEGER,
+    anomalies INTEGER
+);
+CREATE TABLE IF NOT EXISTS anomalies (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    type TEXT NOT NULL,
+    ts INTEGER,
+    ip TEXT,
+    user TEXT,
+    host TEXT,
+    program TEXT,
+    entry TEXT
+);
+CREATE TABLE IF NOT EXISTS brute_force (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    ip TEXT,
+    user TEXT,
+    attempts INTEGER,
+    first_seen INTEGER,
+    last_seen INTEGER,
+    rate REAL,
+    entry TEXT
+);
+CREATE TABLE IF NOT EXISTS run_types (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, type)
+);
+CREATE INDEX IF NOT EXISTS anomalies_type_ip_ts ON anomalies (type, ip, ts);
+CREATE INDEX IF NOT EXISTS brute_force_last_seen ON brute_force (last_seen);
+"""
+
+# Une détection de brute force par IP ou compte et premier échec : une
+# analyse reprise (--state) met à jour la détection au lieu de la dupliquer.
+# Les valeurs absentes (NULL) sont distinctes dans un index unique SQLite,
+# d'où les ifnull.
+_BRUTE_FORCE_KEY = "ifnull(ip, ''), ifnull(user, ''), ifnull(first_seen, -1)"
+
+_BRUTE_FORCE_INDEX = f"CREATE UNIQUE INDEX IF NOT EXISTS brute_force_key ON brute_force ({_BRUTE_FORCE_KEY})"
+
+# Migration du schéma 1 : ne garder que la dernière version de chaque détection
+_DEDUPLICATE_BRUTE_FORCE = (f"DELETE FROM brute_force WHERE id NOT IN "
+                            f"(SELECT MAX(id) FROM brute_force GROUP BY {_BRUTE_FORCE_KEY})")
+
+_INSERT_ANOMALY = ("INSERT INTO anomalies (run_id, type, ts, ip, user, host, program, entry) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_BRUTE_FORCE = ("INSERT INTO brute_force (run_id, ip, user, attempts, first_seen, last_seen, rate, entry) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                       f"ON CONFLICT ({_BRUTE_FORCE_KEY}) DO UPDATE SET attempts = excluded.attempts, "
+                       "last_seen = excluded.last_seen, rate = excluded.rate, entry = excluded.entry")
+
+def connect(path):
+    """
+    Ouvre la base de stockage, créée si nécessaire.
+
+    Args:
+        path (str): Chemin du fichier SQLite
+
+    Returns:
+        sqlite3.Connection: Connexion en mode WAL
+    """
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # En mode WAL, NORMAL ne perd au pire que les dernières transactions
+    # en cas de coupure de courant, sans corrompre la base
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.executescript(_SCHEMA)
+        if version < 2:
+            conn.execute(_DEDUPLICATE_BRUTE_FORCE)
+        conn.execute(_BRUTE_FORCE_INDEX)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+class AnomalyStore:
+    """
+    Enregistrement des résultats d'une exécution dans la base SQLite.
+
+    Les anomalies sont accumulées en lots transmis au thread d'écriture ;
+    ``close`` attend l'écriture des derniers lots.
+    """
+
+    def __init__(self, path, files=None):
+        """
+        Args:
+            path (str): Chemin du fichier SQLite
+            files (list): Fichiers analysés par l'exécution
+        """
+        self.path = path
+        self.conn = connect(path)
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started, hostname, files) VALUES (?, ?, ?)",
+                (int(time.time()), socket.gethostname(), "\n".join(files or [])))
+        self.run_id = cursor.lastrowid
+        self.count = 0
+        self._anomalies = []
+        self._brute_force = []
+        self._queue = queue.Queue(MAX_PENDING_BATCHES)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_batches, name="loglens-store", daemon=True)
+        self._writer.start()
+
+    def add(self, anomaly):
+        """
+        Ajoute une anomalie au lot en cours.
+
+        Args:
+            anomaly (dict): Anomalie détectée (les alertes de suivi en continu sont ignorées)
+        """
+        if anomaly.get("alert"):
+            return
+        self.count += 1
+        ips = anomaly.get("ips")
+        ip = ips[0] if ips else None
+        if anomaly["type"] == "Attaque Brute Force":
+            self._brute_force.append((self.run_id, ip, anomaly.get("user"), anomaly.get("attempts"),
+                                      anomaly.get("first_seen"), anomaly.get("last_seen"),
+                                      anomaly.get("rate"), anomaly["entry"]))
+        else:
+            self._anomalies.append((self.run_id, anomaly["type"], anomaly.get("timestamp"), ip,
+                                    anomaly.get("user"), anomaly.get("host"), anomaly.get("program"),
+                                    anomaly["entry"]))
+            if len(self._anomalies) >= BATCH_SIZE:
+                self.flush()
+
+    def flush(self):
+        """Transmet le lot en cours au thread d'écriture."""
+        if self._anomalies or self._brute_force:
+            self._queue.put((self._anomalies, self._brute_force))
+            self._anomalies = []
+            self._brute_force = []
+
+    def _write_batches(self):
+        """Boucle du thread d'écriture : un lot par transaction."""
+        conn = self.conn
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            if self._error is not None:
+                # Après une erreur, les lots restants sont ignorés
+                continue
+            anomalies, brute_force = batch
+            try:
+                with conn:
+                    conn.executemany(_INSERT_ANOMALY, anomalies)
+                    conn.executemany(_INSERT_BRUTE_FORCE, brute_force)
+            except sqlite3.Error as e:
+                self._error = e
+
+    def close(self, pipeline=None):
+        """
+        Écrit les derniers lots et les agrégats de l'exécution, puis ferme la base.
+
+        Args:
+            pipeline (AnalysisPipeline): Pipeline dont les agrégats sont enregistrés
+        """
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        if self._error is not None:
+            log_error(f"Erreur lors de l'enregistrement dans {self.path}: {str(self._error)}")
+
+        try:
+            with self.conn:
+                entries = pipeline.entries if pipeline is not None else None
+                self.conn.execute("UPDATE runs SET finished = ?, entries = ?, anomalies = ? WHERE id = ?",
+                                  (int(time.time()), entries, self.count, self.run_id))
+                if pipeline is not None:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO run_types (run_id, type, count) VALUES (?, ?, ?)",
+                        [(self.run_id, t, count) for t, count in pipeline.accumulator.types.items()])
+        except sqlite3.Error as e:
+            log_error(f"Erreur lors de l'enregistrement dans {self.path}: {str(e)}")
+        finally:
+            self.conn.close()
+        log_info(f"{self.count} anomalies enregistrées dans {self.path}")
+
+def _period_clause(column, since, until, host=None):
+    """
+    Construit la clause WHERE d'une période (et d'un hôte) pour une colonne d'horodatage.
+
+    Returns:
+        tuple: (clause SQL, paramètres)
+    """
+    conditions = []
+    params = []
+    if since is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(until)
+    if host is not None:
+        conditions.append("host = ?")
+        params.append(host)
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+def count_by_type(conn, since=None, until=None, host=None):
+    """
+    Compte les anomalies par catégorie sur une période.
+
+    Args:
+        conn (sqlite3.Connection): Base de stockage
+        since (int): Horodatage minimal (epoch), None si non borné
+        until (int): Horodatage maximal (epoch), None si non borné
+        host (str): Hôte émetteur des lignes, None pour tous les hôtes
+
+    Returns:
+        list: Paires (catégorie, nombre), de la plus fréquente à la moins fréquente
+    """
+    where, params = _period_clause("ts", since, until, host)
+    return conn.execute(f"SELECT type, COUNT(*) AS n FROM anomalies{where} "
+                        "GROUP BY type ORDER BY n DESC, type", params).fetchall()
+
+def top_ips(conn, since=None, until=None, host=None, limit=10):
+    """
+    Retourne les IPs à l'origine du plus grand nombre d'anomalies sur une période.
+
+    Args:
+        conn (sqlite3.Connection): Base de stockage
+        since (int): Horodatage minimal (epoch), None si non borné
+        until (int): Horodatage maximal (epoch), None si non borné
+        host (str): Hôte émetteur des lignes, None pour tous les hôtes
+        limit (int): Nombre d'IPs retournées
+
+    Returns:
+        list: Tuples (IP, nombre d'anomalies, nombre d'hôtes visés, dernier horodatage)
+    """
+    where, params = _period_clause("ts", since, until, host)
+    where += " AND ip IS NOT NULL" if where else " WHERE ip IS NOT NULL"
+    return conn.execute(f"SELECT ip, COUNT(*) AS n, COUNT(DISTINCT host), MAX(ts) FROM anomalies{where} "
+                        "GROUP BY ip ORDER BY n DESC, ip LIMIT ?", params + [limit]).fetchall()
+
+def brute_force_history(conn, since=None, until=None, limit=10):
+    """
+    Retourne les détections de brute force les plus récentes sur une période.
+
+    Args:
+        conn (sqlite3.Connection): Base de stockage
+        since (int): Horodatage minimal (epoch), None si non borné
+        until (int): Horodatage maximal (epoch), None si non borné
+        limit (int): Nombre de détections retournées
+
+    Returns:
+        list: Tuples (IP, compte, nombre d'essais, premier et dernier horodatages)
+    """
+    where, params = _period_clause("last_seen", since, until)
+    return conn.execute(f"SELECT ip, user, attempts, first_seen, last_seen FROM brute_force{where} "
+                        "ORDER BY last_seen DESC LIMIT ?", params + [limit]).fetchall()
@@ -7,69 +7,287 @@ et générer des résumés compréhensibles en langage naturel.
 
 from collections import Counter
 import re
-from datetime import datetime
+from .sketches import CountMinSketch, HyperLogLog, SpaceSaving
+from .timestamps import TimestampParser
 from .utils import log_info
 
+# Regex pour extraire une IP
+IP_PATTERN = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
+
+# Extracteur d'horodatages partagé (cache des préfixes déjà analysés)
+_timestamp_parser = TimestampParser()
+
+class SummaryAccumulator:
+    """
+    Agrégats du résumé, tenus à jour anomalie par anomalie.
+    
+    Chaque anomalie est comptée en temps constant ; la liste des anomalies
+    n'est jamais conservée. Deux accumulateurs (processus, fichiers,
+    exécutions successives) se combinent avec ``merge`` : fusionner dans
+    l'ordre du flux donne le même résumé qu'une analyse séquentielle, y
+    compris l'ordre des types et le départage des IPs ex aequo.
+    
+    En mode ``sketches``, la mémoire ne dépend plus du nombre d'IPs : les
+    IPs et comptes principaux sont suivis par Space-Saving, le nombre
+    d'IPs sources distinctes par type par HyperLogLog et le nombre
+    d'anomalies de n'importe quelle IP par un count-min (voir ``sketches``).
+    """
+    
+    def __init__(self, sketches=False):
+        """
+        Args:
+            sketches (bool): Compter les IPs avec des structures à mémoire bornée
+        """
+        self.sketches = sketches
+        self.total = 0
+        # Nombre d'anomalies par type, dans l'ordre d'apparition
+        self.types = {}
+        # Descriptions des attaques brute force, dans l'ordre de détection
+        self.brute_force_entries = []
+        # Nombre d'anomalies impliquant chaque IP (exact, ou top-K estimé)
+        self.ip_counter = SpaceSaving() if sketches else Counter()
+        # Structures à mémoire bornée, en mode sketches uniquement
+        self.user_counter = SpaceSaving() if sketches else None
+        self.ip_estimates = CountMinSketch() if sketches else None
+        self.distinct_sources = {}
+    
+    def add(self, anomaly):
+        """
+        Compte une anomalie.
+        
+        Args:
+            anomaly (dict): Anomalie détectée
+        """
+        self.total += 1
+        t = anomaly["type"]
+        self.types[t] = self.types.get(t, 0) + 1
+        if t == "Attaque Brute Force":
+            self.brute_force_entries.append(anomaly["entry"])
+        ips = extract_ips(anomaly)
+        self.ip_counter.update(ips)
+        if self.sketches:
+            self.ip_estimates.update(ips)
+            if ips:
+                sources = self.distinct_sources.get(t)
+                if sources is None:
+                    sources = self.distinct_sources[t] = HyperLogLog()
+                sources.update(ips)
+            user = anomaly.get("user")
+            if user:
+                self.user_counter.add(user)
+    
+    def update(self, anomalies):
+        """
+        Compte une séquence d'anomalies.
+        
+        Args:
+            anomalies (iterable): Anomalies détectées (liste ou générateur)
+        """
+        add = self.add
+        for anomaly in anomalies:
+            add(anomaly)
+    
+    def merge(self, other):
+        """
+        Ajoute les agrégats d'un autre accumulateur, qui suit celui-ci dans le flux.
+        
+        Args:
+            other (SummaryAccumulator): Agrégats d'une portion suivante
+            
+        Returns:
+            SummaryAccumulator: L'accumulateur courant, complété
+            
+        Raises:
+            ValueError: Si un seul des deux accumulateurs est en mode sketches
+        """
+        if other.sketches != self.sketches:
+            raise ValueError("Fusion d'agrégats exacts et d'agrégats estimés")
+        self.total += other.total
+        for t, count in other.types.items():
+            self.types[t] = self.types.get(t, 0) + count
+        self.brute_force_entries.extend(other.brute_force_entries)
+        if self.sketches:
+            self.ip_counter.merge(other.ip_counter)
+            self.user_counter.merge(other.user_counter)
+            self.ip_estimates.merge(other.ip_estimates)
+            for t, sources in other.distinct_sources.items():
+                if t in self.distinct_sources:
+                    self.distinct_sources[t].merge(sources)
+                else:
+                    self.distinct_sources[t] = HyperLogLog.from_state(sources.get_state())
+        else:
+            self.ip_counter.update(other.ip_counter)
+        return self
+    
+    def estimate_ip(self, ip):
+        """
+        Nombre d'anomalies impliquant une IP, même hors du top-K.
+        
+        Args:
+            ip (str): Adresse IP
+            
+        Returns:
+            int: Compte exact, ou estimation par excès en mode sketches
+        """
+        if self.sketches:
+            return self.ip_estimates.estimate(ip)
+        return self.ip_counter[ip]
+    
+    def render(self):
+        """
+        Met en forme le résumé.
+        
+        Returns:
+            str: Résumé formaté des anomalies
+        """
+        if not self.sketches:
+            return render_summary(self.types, self.brute_force_entries, self.ip_counter, self.total)
+        distinct = {t: sources.count() for t, sources in self.distinct_sources.items()}
+        return render_summary(self.types, self.brute_force_entries, self.ip_counter, self.total,
+                              users=self.user_counter, distinct=distinct,
+                              ip_error=self.ip_counter.error_bound())
+    
+    def get_state(self):
+        """
+        Retourne les agrégats sous une forme sérialisable en JSON.
+        
+        Returns:
+            dict: Agrégats du résumé
+        """
+        state = {
+            "anomaly_count": self.total,
+            "types": dict(self.types),
+            "brute_force_entries": list(self.brute_force_entries),
+            # Liste de paires : l'ordre d'insertion départage les IPs ex aequo
+            "ip_counter": [[ip, count] for ip, count in self.ip_counter.items()]
+        }
+        if self.sketches:
+            state["ip_counter"] = self.ip_counter.get_state()
+            state["sketches"] = {
+                "users": self.user_counter.get_state(),
+                "ip_estimates": self.ip_estimates.get_state(),
+                "distinct_sources": {t: sources.get_state() for t, sources in self.distinct_sources.items()}
+            }
+        return state
+    
+    @classmethod
+    def from_state(cls, state):
+        """
+        Restaure des agrégats produits par ``get_state``.
+        
+        Args:
+            state (dict): Agrégats du résumé
+            
+        Returns:
+            SummaryAccumulator: Accumulateur restauré, dans le mode de l'état
+        """
+        sketches = state.get("sketches")
+        accumulator = cls(sketches is not None)
+        accumulator.total = state["anomaly_count"]
+        accumulator.types = dict(state["types"])
+        accumulator.brute_force_entries = list(state["brute_force_entries"])
+        if sketches is None:
+            accumulator.ip_counter = Counter(dict(state["ip_counter"]))
+        else:
+            accumulator.ip_counter = SpaceSaving.from_state(state["ip_counter"])
+            accumulator.user_counter = SpaceSaving.from_state(sketches["users"])
+            accumulator.ip_estimates = CountMinSketch.from_state(sketches["ip_estimates"])
+            accumulator.distinct_sources = {t: HyperLogLog.from_state(sources)
+                                            for t, sources in sketches["distinct_sources"].items()}
+        return accumulator
+
 def generate_summary(anomalies):
     """
     Génère un résumé en langage naturel des anomalies détectées.
     
     Args:
-        anomalies (list): Liste des anomalies détectées
+        anomalies (iterable): Anomalies détectées (liste ou générateur)
         
     Returns:
         str: Résumé formaté des anomalies
     """
-    log_info(f"Génération d'un résumé pour {len(anomalies)} anomalies")
+    accumulator = SummaryAccumulator()
+    accumulator.update(anomalies)
+    log_info(f"Génération d'un résumé pour {accumulator.total} anomalies")
+    return accumulator.render()
+
+def extract_ips(anomaly):
+    """
+    Retourne les adresses IP impliquées dans une anomalie.
     
-    if not anomalies:
+    Args:
+        anomaly (dict): Anomalie détectée
+        
+    Returns:
+        list: Adresses IP trouvées dans l'entrée
+    """
+    # Les IPs sont extraites une seule fois par le détecteur
+    ips = anomaly.get("ips")
+    if ips is None:
+        ips = re.findall(IP_PATTERN, anomaly.get("entry", ""))
+    return ips
+
+def render_summary(types, brute_force_entries, ip_counter, total, users=None, distinct=None, ip_error=None):
+    """
+    Met en forme le résumé à partir de compteurs agrégés.
+    
+    Ne nécessite pas la liste des anomalies : les compteurs peuvent être
+    tenus à jour au fil de l'analyse d'un flux.
+    
+    Args:
+        types (dict): Nombre d'anomalies par type, dans l'ordre d'apparition
+        brute_force_entries (list): Descriptions des attaques brute force
+        ip_counter (Counter or SpaceSaving): Nombre d'anomalies impliquant chaque IP
+        total (int): Nombre total d'anomalies
+        users (SpaceSaving): Comptes les plus visés (résumé estimé uniquement)
+        distinct (dict): Nombre estimé d'IPs sources distinctes par type
+        ip_error (float): Surestimation maximale des comptes par IP, si estimés
+        
+    Returns:
+        str: Résumé formaté des anomalies
+    """
+    if not total:
         return "Aucune anomalie critique détectée dans la période analysée."
 
     # Début du résumé
-    summary = "Résumé des événements critiques :\n\n"
-    
-    # Compter les types d'anomalies
-    types = {}
-    for a in anomalies:
-        t = a["type"]
-        types[t] = types.get(t, 0) + 1
+    parts = ["Résumé des événements critiques :\n\n"]
     
     # Ajouter les statistiques par type
     for k, v in types.items():
-        summary += f"- {v} événement(s) de type '{k}' détecté(s).\n"
+        parts.append(f"- {v} événement(s) de type '{k}' détecté(s).\n")
     
     # Ajouter des sections plus détaillées pour certains types d'anomalies
     if "Attaque Brute Force" in types:
-        summary += "\nDétail des attaques brute force :\n"
-        for a in anomalies:
-            if a["type"] == "Attaque Brute Force":
-                summary += f"- {a['entry']}\n"
+        parts.append("\nDétail des attaques brute force :\n")
+        for entry in brute_force_entries:
+            parts.append(f"- {entry}\n")
     
     # Ajouter une section sur les IPs suspectes
-    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-    ips = []
-    
-    for a in anomalies:
-        entry = a.get("entry", "")
-        ip_matches = re.findall(ip_pattern, entry)
-        ips.extend(ip_matches)
-    
-    if ips:
-        # Compter les occurrences de chaque IP
-        ip_counter = Counter(ips)
-        
+    if ip_counter:
         # Ajouter les IPs avec le plus d'occurrences
-        summary += "\nAdresses IP suspectes :\n"
+        parts.append("\nAdresses IP suspectes :\n")
         for ip, count in ip_counter.most_common(5):
-            summary += f"- {ip} : impliquée dans {count} événement(s)\n"
+            parts.append(f"- {ip} : impliquée dans {count} événement(s)\n")
+        if ip_error:
+            parts.append(f"  (comptes estimés, surestimés d'au plus {ip_error:.0f})\n")
+    
+    if users:
+        parts.append("\nComptes les plus visés (estimation) :\n")
+        for user, count in users.most_common(5):
+            parts.append(f"- {user} : visé par {count} événement(s)\n")
+    
+    if distinct:
+        parts.append("\nIPs sources distinctes (estimation) :\n")
+        for t, count in distinct.items():
+            parts.append(f"- '{t}' : environ {count} IP(s) distincte(s)\n")
     
     # Ajouter une conclusion
-    if len(anomalies) > 10:
-        summary += "\nConclusion : Activité suspecte significative détectée, une investigation approfondie est recommandée.\n"
-    elif len(anomalies) > 0:
-        summary += "\nConclusion : Activité suspecte détectée, une surveillance accrue est recommandée.\n"
+    if total > 10:
+        parts.append("\nConclusion : Activité suspecte significative détectée, une investigation approfondie est recommandée.\n")
+    elif total > 0:
+        parts.append("\nConclusion : Activité suspecte détectée, une surveillance accrue est recommandée.\n")
     
-    return summary
+    return "".join(parts)
 
 def generate_advanced_summary(anomalies):
     """
@@ -92,42 +310,16 @@ def extract_timestamp(log_entry):
     """
     Tente d'extraire un timestamp d'une entrée de log.
     
+    Délègue au module ``timestamps`` (formats syslog, ISO-8601, Apache CLF
+    et Windows, année déduite pour syslog).
+    
     Args:
         log_entry (str): Entrée de log
         
     Returns:
         datetime or None: Objet datetime si un timestamp est trouvé, None sinon
     """
-    # Formats de timestamp courants dans les logs
-    timestamp_patterns = [
-        # May 16 14:32:41
-        r'(\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})',
-        # 2023-05-16 14:32:41
-        r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})',
-        # 16/May/2023:14:32:41
-        r'(\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2})'
-    ]
-    
-    for pattern in timestamp_patterns:
-        match = re.search(pattern, log_entry)
-        if match:
-            timestamp_str = match.group(1)
-            # Tenter de convertir en datetime
-            try:
-                # Format dépend du pattern trouvé
-                if 'May' in timestamp_str and ':' not in timestamp_str.split()[1]:
-                    # May 16 14:32:41
-                    return datetime.strptime(timestamp_str, '%b %d %H:%M:%S')
-                elif '-' in timestamp_str:
-                    # 2023-05-16 14:32:41
-                    return datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                elif '/' in timestamp_str:
-                    # 16/May/2023:14:32:41
-                    return datetime.strptime(timestamp_str, '%d/%b/%Y:%H:%M:%S')
-            except ValueError:
-                continue
-    
-    return None
+    return _timestamp_parser.parse_datetime(log_entry)
 
 def format_time_summary(anomalies):
     """
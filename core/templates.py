@@ -0,0 +1,198 @@
+"""
+Module d'extraction de modèles de lignes de LogLens.
+
+Regroupe les entrées en modèles (« Connection closed by <*> port <*>
+[preauth] ») à la manière de Drain : les jetons contenant un chiffre sont
+masqués d'emblée, puis un arbre de profondeur fixe (nombre de jetons,
+premiers jetons) mène à quelques modèles candidats ; la ligne rejoint le
+plus proche s'il partage assez de jetons, dont les différences deviennent
+des variables, sinon elle crée un nouveau modèle.
+
+Les lignes de même forme (voir ``detector.line_shape``) ont le même
+modèle : le modèle de chaque forme est mémorisé, et l'arbre n'est
+parcouru qu'une fois par forme. Les modèles les plus rares sont souvent
+les plus intéressants à lire.
+"""
+
+from collections import OrderedDict
+from .detector import line_shape
+from .record import LogRecord
+
+# Variable d'un modèle
+WILDCARD = "<*>"
+
+# Profondeur de l'arbre : nombre de jetons, puis TEMPLATE_DEPTH - 2 premiers jetons
+TEMPLATE_DEPTH = 4
+
+# Part minimale de jetons identiques pour rejoindre un modèle existant
+TEMPLATE_SIMILARITY = 0.5
+
+# Nombre maximal d'enfants d'un nœud de l'arbre (au-delà, les jetons sont des variables)
+TEMPLATE_MAX_CHILDREN = 100
+
+# Nombre maximal de modèles (les lignes d'une forme nouvelle sont ensuite comptées à part)
+MAX_TEMPLATES = 10000
+
+# Nombre de formes dont le modèle est mémorisé
+SHAPE_CACHE_SIZE = 16384
+
+class Template:
+    """Modèle de lignes : jetons (variables masquées) et nombre de lignes."""
+
+    __slots__ = ("id", "tokens", "count")
+
+    def __init__(self, template_id, tokens):
+        self.id = template_id
+        self.tokens = tokens
+        self.count = 0
+
+    @property
+    def text(self):
+        """Texte du modèle."""
+        return " ".join(self.tokens)
+
+def tokenize(entry):
+    """
+    Découpe le message d'une entrée en jetons, ceux contenant un chiffre masqués.
+
+    Le programme émetteur, s'il est connu, est le premier jeton.
+
+    Args:
+        entry (LogRecord or str): Entrée de log
+
+    Returns:
+        list: Jetons
+    """
+    if isinstance(entry, LogRecord):
+        message = entry.message
+        program = entry.program
+    else:
+        message = entry
+        program = None
+    tokens = [WILDCARD if any(c.isdigit() for c in token) else token for token in message.split()]
+    if program is not None:
+        tokens.insert(0, f"{program}:")
+    return tokens
+
+class TemplateMiner:
+    """
+    Extraction de modèles en ligne, à la manière de Drain.
+    """
+
+    def __init__(self, depth=TEMPLATE_DEPTH, similarity=TEMPLATE_SIMILARITY,
+                 max_children=TEMPLATE_MAX_CHILDREN, max_templates=MAX_TEMPLATES):
+        """
+        Args:
+            depth (int): Profondeur de l'arbre
+            similarity (float): Part minimale de jetons identiques pour rejoindre un modèle
+            max_children (int): Nombre maximal d'enfants d'un nœud
+            max_templates (int): Nombre maximal de modèles
+        """
+        self.depth = depth
+        self.similarity = similarity
+        self.max_children = max_children
+        self.max_templates = max_templates
+        # Nombre de jetons -> arbre des premiers jetons -> liste de modèles
+        self.root = {}
+        self.templates = []
+        # Lignes non rattachées, une fois MAX_TEMPLATES modèles créés
+        self.overflow = 0
+        # Forme de ligne -> modèle, de la moins récemment vue à la plus récemment vue
+        self.shapes = OrderedDict()
+
+    def add(self, entry):
+        """
+        Compte une entrée dans son modèle.
+
+        Args:
+            entry (LogRecord or str): Entrée de log
+
+        Returns:
+            Template: Modèle de l'entrée, None si le nombre maximal de modèles est atteint
+        """
+        line = entry.line if isinstance(entry, LogRecord) else entry
+        shape = line_shape(line.lower())
+        shapes = self.shapes
+        template = shapes.get(shape)
+        if template is not None:
+            shapes.move_to_end(shape)
+        else:
+            template = self.add_tokens(tokenize(entry))
+            if template is None:
+                self.overflow += 1
+                return None
+            shapes[shape] = template
+            if len(shapes) > SHAPE_CACHE_SIZE:
+                shapes.popitem(last=False)
+        template.count += 1
+        return template
+
+    def add_tokens(self, tokens):
+        """
+        Rattache une suite de jetons à un modèle, créé si nécessaire.
+
+        Args:
+            tokens (list): Jetons de l'entrée (voir ``tokenize``)
+
+        Returns:
+            Template: Modèle des jetons (sans compter l'entrée), None si le
+            nombre maximal de modèles est atteint
+        """
+        node = self.root.setdefault(len(tokens), {})
+        for token in tokens[:self.depth - 2]:
+            child = node.get(token)
+            if child is None:
+                if token != WILDCARD and len(node) >= self.max_children:
+                    token = WILDCARD
+                child = node.get(token)
+                if child is None:
+                    child = node[token] = {}
+            node = child
+        leaf = node.setdefault(None, [])
+
+        best = None
+        best_score = -1
+        for template in leaf:
+            same = sum(1 for a, b in zip(template.tokens, tokens) if a == b)
+            if same > best_score:
+                best, best_score = template, same
+        if best is not None and tokens and best_score >= self.similarity * len(tokens):
+            best.tokens = [a if a == b else WILDCARD for a, b in zip(best.tokens, tokens)]
+            return best
+
+        if len(self.templates) >= self.max_templates:
+            return None
+        template = Template(len(self.templates), list(tokens))
+        self.templates.append(template)
+        leaf.append(template)
+        return template
+
+    def rare(self, limit=10):
+        """
+        Retourne les modèles les plus rares.
+
+        Args:
+            limit (int): Nombre maximal de modèles retournés
+
+        Returns:
+            list: Modèles, du moins fréquent au plus fréquent (les plus anciens d'abord à égalité)
+        """
+        return sorted(self.templates, key=lambda template: template.count)[:limit]
+
+    def render(self, limit=10):
+        """
+        Met en forme le rapport des modèles les plus rares.
+
+        Args:
+            limit (int): Nombre maximal de modèles affichés
+
+        Returns:
+            str: Rapport des modèles rares
+        """
+        total = sum(template.count for template in self.templates) + self.overflow
+        parts = [f"{len(self.templates)} modèle(s) pour {total} entrée(s) pertinente(s).\n"]
+        for template in self.rare(limit):
+            parts.append(f"- {template.count} × {template.text}\n")
+        if self.overflow:
+            parts.append(f"({self.overflow} entrée(s) au-delà de {self.max_templates} modèles non rattachées)\n")
+        return "".join(parts)
@@ -0,0 +1,388 @@
+"""
+Module d'extraction des horodatages pour LogLens.
+
+Reconnaît les formats syslog (RFC 3164), ISO-8601 / RFC 5424, Apache CLF
+et les exports d'événements Windows par lecture à positions fixes, sans
+``strptime``. Les préfixes déjà vus (jusqu'à la minute) sont mémorisés :
+les nombreuses lignes d'une même minute ne coûtent qu'une recherche dans
+un dictionnaire et la lecture des secondes. L'année absente des lignes syslog est déduite, y compris
+lors du passage de décembre à janvier.
+
+Les horodatages sans fuseau horaire sont interprétés comme UTC : l'epoch
+obtenu reflète l'heure affichée dans le log.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+# Nombre maximal de préfixes mémorisés avant réinitialisation du cache
+CACHE_SIZE = 65536
+
+_MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun",
+                "jul", "aug", "sep", "oct", "nov", "dec"]
+
+# Abréviations de mois reconnues (minuscules, capitalisées, majuscules)
+MONTHS = {}
+for _number, _name in enumerate(_MONTH_NAMES, 1):
+    MONTHS[_name] = _number
+    MONTHS[_name.capitalize()] = _number
+    MONTHS[_name.upper()] = _number
+
+_DIGITS = "0123456789"
+
+# Repérage d'un horodatage ailleurs qu'en début de ligne (ligne préfixée)
+_SEARCH_PATTERN = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}"
+    r"|\b[A-Za-z]{3} [ \d]?\d \d{2}:\d{2}:\d{2}"
+    r"|\b\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}:\d{2}"
+)
+
+# Export Windows : 5/16/2023 2:32:41 PM (heure sur 12 ou 24 heures)
+_WINDOWS_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{2}):(\d{2})(?: ([AP]M))?")
+
+_EPOCH = datetime(1970, 1, 1)
+
+def days_from_civil(year, month, day):
+    """
+    Calcule le nombre de jours écoulés depuis le 1er janvier 1970.
+
+    Args:
+        year (int): Année
+        month (int): Mois (1-12)
+        day (int): Jour du mois
+
+    Returns:
+        int: Nombre de jours depuis l'epoch Unix
+    """
+    year -= month <= 2
+    era = (year if year >= 0 else year - 399) // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def _clock(s, pos):
+    """
+    Lit une heure HH:MM:SS à une position fixe.
+
+    Returns:
+        int or None: Nombre de secondes depuis minuit, None si invalide
+    """
+    if s[pos + 2:pos + 3] != ":" or s[pos + 5:pos + 6] != ":":
+        return None
+    try:
+        hour = int(s[pos:pos + 2])
+        minute = int(s[pos + 3:pos + 5])
+        second = int(s[pos + 6:pos + 8])
+    except ValueError:
+        return None
+    if hour > 23 or minute > 59 or second > 60:
+        return None
+    return hour * 3600 + minute * 60 + second
+
+def _zone_offset(s, pos):
+    """
+    Lit un décalage horaire (Z, +hh:mm, +hhmm) après des fractions de seconde éventuelles.
+
+    Returns:
+        int: Décalage en secondes par rapport à UTC (0 si absent)
+    """
+    if s[pos:pos + 1] == ".":
+        pos += 1
+        while pos < len(s) and s[pos] in _DIGITS:
+            pos += 1
+    sign = s[pos:pos + 1]
+    if sign == "+" or sign == "-":
+        zone = s[pos + 1:pos + 6].replace(":", "")
+        if len(zone) >= 4 and zone[:4].isdigit():
+            offset = int(zone[:2]) * 3600 + int(zone[2:4]) * 60
+            return offset if sign == "+" else -offset
+    return 0
+
+class TimestampParser:
+    """
+    Extracteur d'horodatages avec cache des préfixes et déduction de l'année.
+
+    Une instance suit l'ordre des lignes d'un flux : l'année des lignes
+    syslog est initialisée d'après la date de référence, puis incrémentée
+    lorsque les mois repassent de décembre à janvier.
+    """
+
+    def __init__(self, reference=None):
+        """
+        Args:
+            reference (datetime): Date de référence pour déduire l'année
+                des lignes syslog (maintenant par défaut)
+        """
+        self.reference = reference or datetime.now()
+        self.year = None
+        self.last_month = None
+        self.cache = {}
+        self.month_starts = {}
+
+    def _month_start(self, year, month):
+        """Epoch du premier jour d'un mois, mémorisé."""
+        key = (year, month)
+        start = self.month_starts.get(key)
+        if start is None:
+            start = days_from_civil(year, month, 1) * 86400
+            self.month_starts[key] = start
+        return start
+
+    def _remember(self, key, value):
+        """Mémorise un préfixe analysé, en bornant la taille du cache."""
+        if len(self.cache) >= CACHE_SIZE:
+            self.cache.clear()
+        self.cache[key] = value
+
+    def _infer_year(self, month):
+        """
+        Déduit l'année d'une ligne syslog d'après le mois de la ligne précédente.
+
+        Args:
+            month (int): Mois de la ligne
+
+        Returns:
+            int: Année déduite
+        """
+        if self.year is None:
+            # Un mois nettement postérieur à la date de référence appartient
+            # à l'année précédente (log de décembre lu en janvier)
+            self.year = self.reference.year
+            if month > self.reference.month + 1:
+                self.year -= 1
+        elif month < self.last_month - 6:
+            self.year += 1
+        elif month > self.last_month + 6:
+            self.year -= 1
+        self.last_month = month
+        return self.year
+
+    def _syslog(self, s):
+        """Mmm dd HH:MM:SS (jour complété par une espace ou non)."""
+        cached = self.cache.get(s[:12])
+        if cached is None:
+            month = MONTHS.get(s[:3])
+            if month is None or s[3:4] != " ":
+                return None
+            if s[4:5] == " ":
+                day_text, pos = s[5:6], 7
+            elif s[5:6] == " ":
+                day_text, pos = s[4:5], 6
+            else:
+                day_text, pos = s[4:6], 7
+            if not day_text.isdigit() or s[pos - 1:pos] != " ":
+                return None
+            day = int(day_text)
+            seconds = _clock(s, pos)
+            if seconds is None or not 1 <= day <= 31:
+                return None
+            cached = (month, (day - 1) * 86400 + seconds - seconds % 60, pos + 6)
+            self._remember(s[:12], cached)
+
+        month, offset, pos = cached
+        second = s[pos:pos + 2]
+        if not second.isdigit() or s[pos - 1:pos] != ":":
+            return None
+        if month == self.last_month:
+            year = self.year
+        else:
+            year = self._infer_year(month)
+        return self._month_start(year, month) + offset + int(second)
+
+    def _iso(self, s):
+        """YYYY-MM-DD[T ]HH:MM:SS[.fff][Z|±hh:mm]."""
+        epoch = self.cache.get(s[:16])
+        if epoch is None:
+            key = s[:19]
+            if (len(key) < 19 or key[4] != "-" or key[7] != "-"
+                    or key[10] not in "T " or not key[:4].isdigit()):
+                return None
+            try:
+                month = int(key[5:7])
+                day = int(key[8:10])
+            except ValueError:
+                return None
+            seconds = _clock(key, 11)
+            if seconds is None or not 1 <= month <= 12 or not 1 <= day <= 31:
+                return None
+            epoch = days_from_civil(int(key[:4]), month, day) * 86400 + seconds - seconds % 60
+            self._remember(s[:16], epoch)
+        second = s[17:19]
+        if not second.isdigit() or s[16:17] != ":":
+            return None
+        epoch += int(second)
+        if len(s) > 19:
+            epoch -= _zone_offset(s, 19)
+        return epoch
+
+    def _clf(self, s):
+        """Apache CLF : dd/Mmm/YYYY:HH:MM:SS ±hhmm (après le crochet)."""
+        epoch = self.cache.get(s[:17])
+        if epoch is None:
+            key = s[:20]
+            if len(key) < 20 or key[2] != "/" or key[6] != "/" or key[11] != ":":
+                return None
+            month = MONTHS.get(key[3:6])
+            if month is None or not key[:2].isdigit() or not key[7:11].isdigit():
+                return None
+            seconds = _clock(key, 12)
+            if seconds is None:
+                return None
+            epoch = days_from_civil(int(key[7:11]), month, int(key[:2])) * 86400 + seconds - seconds % 60
+            self._remember(s[:17], epoch)
+        second = s[18:20]
+        if not second.isdigit() or s[17:18] != ":":
+            return None
+        epoch += int(second)
+        if len(s) > 21:
+            epoch -= _zone_offset(s, 21)
+        return epoch
+
+    def _windows(self, s):
+        """Export Windows : M/D/YYYY h:mm:ss [AM|PM]."""
+        match = _WINDOWS_PATTERN.match(s)
+        if match is None:
+            return None
+        key = match.group(0)
+        epoch = self.cache.get(key)
+        if epoch is None:
+            month, day, year, hour, minute, second, period = match.groups()
+            month, day, hour = int(month), int(day), int(hour)
+            if period:
+                hour = hour % 12 + (12 if period == "PM" else 0)
+            if not 1 <= month <= 12 or not 1 <= day <= 31 or hour > 23:
+                return None
+            epoch = (days_from_civil(int(year), month, day) * 86400
+                     + hour * 3600 + int(minute) * 60 + int(second))
+            self._remember(key, epoch)
+        return epoch
+
+    def _parse_at(self, s):
+        """Analyse un horodatage placé en début de chaîne."""
+        first = s[:1]
+        if first and first in _DIGITS:
+            if s[4:5] == "-":
+                return self._iso(s)
+            return self._windows(s)
+        return self._syslog(s)
+
+    def parse(self, entry):
+        """
+        Extrait l'horodatage d'une entrée de log.
+
+        Le début de la ligne (après une priorité syslog ``<PRI>`` et la
+        version RFC 5424 éventuelles) est essayé en premier, puis un
+        horodatage CLF entre crochets, puis un horodatage placé plus loin
+        dans la ligne.
+
+        Args:
+            entry (str): Entrée de log
+
+        Returns:
+            int or None: Secondes depuis l'epoch Unix, None si aucun horodatage
+        """
+        s = entry
+        if s[:1] == "<":
+            end = s.find(">", 1, 6)
+            if end != -1:
+                s = s[end + 1:]
+                if s[:2] == "1 ":
+                    s = s[2:]
+
+        epoch = self._parse_at(s)
+        if epoch is not None:
+            return epoch
+
+        bracket = entry.find("[")
+        if bracket != -1:
+            epoch = self._clf(entry[bracket + 1:bracket + 27])
+            if epoch is not None:
+                return epoch
+
+        match = _SEARCH_PATTERN.search(entry)
+        if match is not None and match.start() > 0:
+            return self._parse_at(entry[match.start():])
+        return None
+
+    def parse_datetime(self, entry):
+        """
+        Extrait l'horodatage d'une entrée sous forme de datetime.
+
+        Args:
+            entry (str): Entrée de log
+
+        Returns:
+            datetime or None: Date et heure (UTC, sans fuseau), None si aucun horodatage
+        """
+        epoch = self.parse(entry)
+        if epoch is None:
+            return None
+        return _EPOCH + timedelta(seconds=epoch)
+
+# Durées relatives acceptées comme bornes : 30m, 12h, 7d, 2w
+_DURATION_PATTERN = re.compile(r"(\d+)([smhdw])")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def now_epoch():
+    """
+    Retourne l'heure locale courante selon la convention des horodatages extraits.
+
+    Returns:
+        int: Heure locale affichée, en secondes depuis l'epoch Unix
+    """
+    return int((datetime.now() - _EPOCH).total_seconds())
+
+def parse_time_bound(text):
+    """
+    Convertit une borne de recherche temporelle en horodatage epoch.
+
+    Args:
+        text (str): Epoch, date ISO-8601 (AAAA-MM-JJ), date et heure
+            (AAAA-MM-JJ HH:MM[:SS], fuseau optionnel) ou durée écoulée
+            depuis maintenant (30m, 12h, 7d, 2w)
+
+    Returns:
+        int: Secondes depuis l'epoch Unix (heure sans fuseau lue comme UTC)
+
+    Raises:
+        ValueError: Si la date n'est pas reconnue
+    """
+    text = text.strip()
+    if text.isdigit():
+        return int(text)
+    match = _DURATION_PATTERN.fullmatch(text)
+    if match:
+        return now_epoch() - int(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    if len(text) == 10:
+        text += " 00:00:00"
+    elif len(text) == 16:
+        text += ":00"
+    epoch = TimestampParser().parse(text)
+    if epoch is None:
+        raise ValueError(f"Date non reconnue: {text}")
+    return epoch
+
+def hour_of_day(epoch):
+    """
+    Retourne l'heure (0-23) d'un horodatage.
+
+    Args:
+        epoch (int): Secondes depuis l'epoch Unix
+
+    Returns:
+        int: Heure affichée dans le log
+    """
+    return epoch // 3600 % 24
+
+def format_epoch(epoch):
+    """
+    Formate un horodatage epoch pour l'affichage.
+
+    Args:
+        epoch (int): Secondes depuis l'epoch Unix
+
+    Returns:
+        str: Date et heure au format AAAA-MM-JJ HH:MM:SS
+    """
+    return (_EPOCH + timedelta(seconds=epoch)).strftime("%Y-%m-%d %H:%M:%S")
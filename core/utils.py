@@ -9,14 +9,8 @@ import sys
 import logging
 from datetime import datetime
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+# Format des messages de log
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 logger = logging.getLogger('LogLens')
 
@@ -58,6 +52,22 @@ def log_error(message):
     """
     logger.error(message)
 
+def configure_logging(stream=None, level=logging.INFO):
+    """
+    Configure l'affichage des messages de log.
+    
+    Appelée par le point d'entrée de la ligne de commande : importer
+    ``core`` ne modifie pas la configuration du logging de l'application
+    qui l'utilise. Un nouvel appel remplace la configuration précédente.
+    
+    Args:
+        stream (file): Flux des messages (sortie standard par défaut ; la
+            sortie d'erreur lorsque la sortie standard transporte des
+            données NDJSON ou CSV)
+        level (int): Niveau minimal des messages affichés
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=stream or sys.stdout, force=True)
+
 def get_timestamp():
     """
     Retourne l'horodatage actuel au format ISO.
@@ -8,7 +8,8 @@ et génère un résumé en langage naturel des événements critiques.
 
 import sys
 import os
-from core import parser, detector, summarizer
+from core import (parser, detector, pipeline, checkpoint, inputs, index, store, stats, sinks,
+                  timestamps, utils)
 import argparse
 
 def banner():
@@ -22,60 +23,660 @@ def banner():
     print("╰───────────────────────────────────────────╯")
     print("\n")
 
+def add_detection_arguments(parser_cli):
+    """
+    Ajoute les options de détection (brute force, résumé, corrélation) à une ligne de commande.
+
+    Args:
+        parser_cli (ArgumentParser): Analyseur de la commande
+    """
+    group = parser_cli.add_argument_group("détection")
+    group.add_argument("--bf-threshold", type=int, default=detector.BRUTE_FORCE_THRESHOLD,
+                       help="Nombre d'échecs d'authentification signalant un brute force "
+                            f"(défaut: {detector.BRUTE_FORCE_THRESHOLD})")
+    group.add_argument("--bf-window", type=int, default=detector.BRUTE_FORCE_WINDOW,
+                       help="Fenêtre (en secondes) dans laquelle ces échecs doivent survenir "
+                            f"(défaut: {detector.BRUTE_FORCE_WINDOW})")
+    group.add_argument("--bf-max-keys", type=int, default=detector.BRUTE_FORCE_MAX_KEYS,
+                       help="Nombre maximal d'IPs et de comptes suivis en mémoire "
+                            f"(défaut: {detector.BRUTE_FORCE_MAX_KEYS})")
+    group.add_argument("--sketches", action="store_true",
+                       help="Résumé en mémoire bornée : IPs et comptes principaux, IPs distinctes estimées")
+    group.add_argument("--correlate", action="store_true",
+                       help="Corréler les événements en attaques multi-étapes (scan, échecs, connexion, sudo)")
+
+def add_alert_arguments(parser_cli):
+    """
+    Ajoute les options d'alerte (webhook, Slack, email) à une ligne de commande.
+
+    Args:
+        parser_cli (ArgumentParser): Analyseur de la commande
+    """
+    group = parser_cli.add_argument_group("alertes")
+    group.add_argument("--alert-webhook", action="append", default=[], metavar="URL",
+                       help="Envoyer les alertes en JSON à ce webhook (répétable)")
+    group.add_argument("--alert-slack", metavar="URL", help="Envoyer les alertes à ce webhook entrant Slack")
+    group.add_argument("--alert-email", action="append", default=[], metavar="ADRESSE",
+                       help="Envoyer les alertes par email à cette adresse (répétable)")
+    group.add_argument("--smtp-host", default="localhost", help="Serveur SMTP des alertes email (défaut: localhost)")
+    group.add_argument("--smtp-port", type=int, default=25, help="Port SMTP (défaut: 25)")
+    group.add_argument("--smtp-starttls", action="store_true", help="Chiffrer la session SMTP par STARTTLS")
+    group.add_argument("--smtp-user",
+                       help="Compte SMTP ; mot de passe lu dans la variable LOGLENS_SMTP_PASSWORD")
+    group.add_argument("--alert-from", default="loglens@localhost",
+                       help="Expéditeur des alertes email (défaut: loglens@localhost)")
+    group.add_argument("--alert-types",
+                       help="Catégories alertées, séparées par des virgules, ou 'all' "
+                            "(défaut: brute force, élévation de privilèges, injection SQL, scan de ports, DNS, RDP, "
+                            "attaques corrélées)")
+    group.add_argument("--alert-window", type=float, default=300,
+                       help="Fenêtre (en secondes) de regroupement des alertes identiques (défaut: 300)")
+    group.add_argument("--alert-rate", type=float, default=30,
+                       help="Nombre maximal d'envois par minute et par destination (défaut: 30)")
+
+def open_alerts(args, out):
+    """
+    Démarre l'envoi des alertes si une destination est configurée.
+
+    Args:
+        args (Namespace): Arguments de la ligne de commande (voir ``add_alert_arguments``)
+        out (file): Flux des messages d'erreur
+
+    Returns:
+        AlertDispatcher: Répartiteur démarré, ou None sans destination
+    """
+    if not (args.alert_webhook or args.alert_slack or args.alert_email):
+        return None
+    # http.client et smtplib ne sont chargés que si des alertes sont configurées
+    from core import alerts
+
+    options = {"rate_per_minute": args.alert_rate}
+    try:
+        destinations = [alerts.WebhookDestination(url, **options) for url in args.alert_webhook]
+        if args.alert_slack:
+            destinations.append(alerts.WebhookDestination(args.alert_slack, slack=True, **options))
+    except ValueError as e:
+        print(f"[❌] Erreur: {str(e)}", file=out)
+        sys.exit(1)
+    if args.alert_email:
+        destinations.append(alerts.EmailDestination(args.alert_email, args.smtp_host, args.smtp_port,
+                                                    args.alert_from, args.smtp_starttls, args.smtp_user,
+                                                    os.environ.get("LOGLENS_SMTP_PASSWORD"), **options))
+    types = alerts.DEFAULT_ALERT_TYPES
+    if args.alert_types:
+        types = None if args.alert_types == "all" else [t.strip() for t in args.alert_types.split(",")]
+    return alerts.AlertDispatcher(destinations, types, args.alert_window)
+
+def close_alerts(dispatcher, out):
+    """
+    Envoie les alertes en attente et affiche le bilan des envois.
+
+    Args:
+        dispatcher (AlertDispatcher): Répartiteur démarré par ``open_alerts``
+        out (file): Flux des messages
+    """
+    counters = dispatcher.close()
+    print(f"[✓] {counters['submitted']} alerte(s) proposée(s), {counters['coalesced']} regroupée(s), "
+          f"{counters['dropped']} abandonnée(s).", file=out)
+    for name, sent in counters["destinations"].items():
+        print(f"    {name} : {sent['sent']} envoyée(s) en {sent['batches']} envoi(s), "
+              f"{sent['failed']} en échec, {sent['dropped']} abandonnée(s)", file=out)
+
+def follow_log(args, analysis, console, outputs, anomaly_store, dispatcher=None):
+    """
+    Suit le fichier de log et affiche les anomalies au fil des ajouts.
+    
+    Args:
+        args (Namespace): Arguments de la ligne de commande
+        analysis (AnalysisPipeline): Pipeline dont l'état est conservé entre les lots
+        console (ConsoleSink): Affichage en console, ou None
+        outputs (list): Sorties fichier ouvertes (rapport, NDJSON, CSV)
+        anomaly_store (AnomalyStore): Base d'historique ouverte, ou None
+        dispatcher (AlertDispatcher): Envoi des alertes, ou None
+        
+    Returns:
+        int: Nombre d'anomalies affichées
+    """
+    if console:
+        print("[👁] Suivi en continu, Ctrl+C pour arrêter.")
+        console.start()
+    sinks = ([console] if console else []) + outputs
+    anomaly_count = 0
+    try:
+        for batch in analysis.follow(args.logfile[0], args.poll_interval, args.from_start):
+            for a in batch:
+                anomaly_count += 1
+                for sink in sinks:
+                    sink.write(a)
+                if anomaly_store:
+                    anomaly_store.add(a)
+                if dispatcher:
+                    dispatcher.submit(a)
+            if batch:
+                for sink in sinks:
+                    sink.flush()
+    except KeyboardInterrupt:
+        if console:
+            console.flush()
+            print("\n[✓] Suivi interrompu.")
+    
+    # Les attaques brute force définitives, avec leurs compteurs finaux,
+    # complètent les sorties fichier
+    for a in analysis.finish():
+        for sink in outputs:
+            sink.write(a)
+        if anomaly_store:
+            anomaly_store.add(a)
+        if dispatcher:
+            dispatcher.submit(a)
+    
+    return anomaly_count
+
+def index_command(argv):
+    """
+    Sous-commande ``index`` : construit l'index annexe de fichiers de logs.
+    
+    Args:
+        argv (list): Arguments suivant le nom de la sous-commande
+    """
+    parser_cli = argparse.ArgumentParser(prog="loglens.py index",
+                                         description="Construit l'index annexe de fichiers de logs")
+    parser_cli.add_argument("logfile", nargs="+",
+                            help="Fichier(s) de log à indexer : chemins, motifs glob ou répertoires")
+    parser_cli.add_argument("--index-dir",
+                            help="Répertoire des index (à côté de chaque fichier par défaut)")
+    args = parser_cli.parse_args(argv)
+    
+    logfiles = inputs.expand_inputs(args.logfile)
+    if not logfiles:
+        print(f"[❌] Erreur: Le fichier {' '.join(args.logfile)} n'existe pas.")
+        sys.exit(1)
+    
+    for logfile in logfiles:
+        if parser.detect_log_type(logfile) in parser.RECORD_LOG_TYPES:
+            print(f"[❌] {logfile} n'est pas un log ligne à ligne (EVTX, export journald) : il n'est pas indexé")
+            continue
+        try:
+            path, keys, blocks = index.build_index(logfile, args.index_dir)
+        except OSError as e:
+            print(f"[❌] Erreur lors de l'indexation de {logfile}: {str(e)}")
+            continue
+        print(f"[✓] {logfile} indexé ({keys} clés, {blocks} blocs) : {path}")
+
+def query_command(argv):
+    """
+    Sous-commande ``query`` : affiche les lignes correspondant aux critères, via l'index.
+    
+    Args:
+        argv (list): Arguments suivant le nom de la sous-commande
+    """
+    parser_cli = argparse.ArgumentParser(prog="loglens.py query",
+                                         description="Interroge l'index de fichiers de logs")
+    parser_cli.add_argument("logfile", nargs="+",
+                            help="Fichier(s) de log indexés : chemins, motifs glob ou répertoires")
+    parser_cli.add_argument("--ip", help="Lignes contenant cette adresse IP")
+    parser_cli.add_argument("--user", help="Lignes visant ce compte")
+    parser_cli.add_argument("--type", help="Lignes de cette catégorie d'anomalie (ex. \"Échec Auth\")")
+    parser_cli.add_argument("--since", help="Lignes postérieures à cette date (AAAA-MM-JJ [HH:MM[:SS]], epoch ou durée : 7d, 12h)")
+    parser_cli.add_argument("--until", help="Lignes antérieures à cette date (AAAA-MM-JJ [HH:MM[:SS]], epoch ou durée : 7d, 12h)")
+    parser_cli.add_argument("--limit", type=int, help="Nombre maximal de lignes affichées")
+    parser_cli.add_argument("--index-dir",
+                            help="Répertoire des index (à côté de chaque fichier par défaut)")
+    args = parser_cli.parse_args(argv)
+    
+    try:
+        since = timestamps.parse_time_bound(args.since) if args.since else None
+        until = timestamps.parse_time_bound(args.until) if args.until else None
+    except ValueError as e:
+        parser_cli.error(str(e))
+    if not (args.ip or args.user or args.type or args.since or args.until):
+        parser_cli.error("indiquer au moins un critère (--ip, --user, --type, --since, --until)")
+    if args.type and args.type not in detector.PATTERNS:
+        parser_cli.error(f"catégorie inconnue: {args.type} (catégories : {', '.join(detector.PATTERNS)})")
+    
+    logfiles = inputs.expand_inputs(args.logfile)
+    if not logfiles:
+        print(f"[❌] Erreur: Le fichier {' '.join(args.logfile)} n'existe pas.")
+        sys.exit(1)
+    
+    found = 0
+    for logfile in logfiles:
+        log_index = index.open_index(logfile, args.index_dir)
+        if log_index is None:
+            print(f"[❌] Aucun index à jour pour {logfile} : lancer d'abord « loglens.py index {logfile} »")
+            continue
+        with log_index:
+            for _, line in index.query_index(log_index, logfile, args.ip, args.user, args.type, since, until):
+                if args.limit is not None and found >= args.limit:
+                    break
+                found += 1
+                print(line if len(logfiles) == 1 else f"{logfile}: {line}")
+    
+    print(f"\n[✓] {found} lignes trouvées.")
+
+def history_command(argv):
+    """
+    Sous-commande ``history`` : synthèse des anomalies enregistrées par ``--store``.
+    
+    Args:
+        argv (list): Arguments suivant le nom de la sous-commande
+    """
+    parser_cli = argparse.ArgumentParser(prog="loglens.py history",
+                                         description="Interroge l'historique des anomalies enregistrées")
+    parser_cli.add_argument("--store", required=True, help="Base SQLite alimentée par --store")
+    parser_cli.add_argument("--since", default="7d",
+                            help="Début de la période (AAAA-MM-JJ [HH:MM[:SS]], epoch ou durée ; défaut: 7d)")
+    parser_cli.add_argument("--until", help="Fin de la période (AAAA-MM-JJ [HH:MM[:SS]], epoch ou durée)")
+    parser_cli.add_argument("--host", help="Limiter aux lignes émises par cet hôte")
+    parser_cli.add_argument("--top", type=int, default=10, help="Nombre d'IPs affichées (défaut: 10)")
+    args = parser_cli.parse_args(argv)
+    
+    try:
+        since = timestamps.parse_time_bound(args.since) if args.since else None
+        until = timestamps.parse_time_bound(args.until) if args.until else None
+    except ValueError as e:
+        parser_cli.error(str(e))
+    if not os.path.exists(args.store):
+        print(f"[❌] Erreur: La base {args.store} n'existe pas.")
+        sys.exit(1)
+    
+    conn = store.connect(args.store)
+    try:
+        print("[🧿] Anomalies par catégorie :")
+        for anomaly_type, count in store.count_by_type(conn, since, until, args.host):
+            print(f" - {anomaly_type} : {count}")
+        
+        print("\n[🌐] IPs les plus actives :")
+        for ip, count, hosts, last in store.top_ips(conn, since, until, args.host, args.top):
+            print(f" - {ip} : {count} anomalies sur {hosts} hôte(s), dernière le {timestamps.format_epoch(last)}")
+        
+        print("\n[🔐] Attaques brute force :")
+        for ip, user, attempts, first, last in store.brute_force_history(conn, since, until, args.top):
+            target = f"depuis {ip}" if ip else f"sur le compte {user}"
+            period = f" du {timestamps.format_epoch(first)} au {timestamps.format_epoch(last)}" if first else ""
+            print(f" - {target} : {attempts} essais{period}")
+    finally:
+        conn.close()
+
+def serve_command(argv):
+    """
+    Sous-commande ``serve`` : reçoit les logs syslog par le réseau et les analyse au fil de l'eau.
+
+    Args:
+        argv (list): Arguments suivant le nom de la sous-commande
+    """
+    # asyncio n'est chargé que pour cette sous-commande
+    from core import server
+    
+    parser_cli = argparse.ArgumentParser(prog="loglens.py serve",
+                                         description="Reçoit et analyse les logs syslog (UDP/TCP, RFC 3164/5424)")
+    parser_cli.add_argument("--host", default="0.0.0.0", help="Adresse d'écoute (défaut: 0.0.0.0)")
+    parser_cli.add_argument("--udp", type=int, metavar="PORT",
+                            help=f"Port UDP (défaut: {server.DEFAULT_PORT} si ni --udp ni --tcp)")
+    parser_cli.add_argument("--tcp", type=int, metavar="PORT",
+                            help=f"Port TCP (défaut: {server.DEFAULT_PORT} si ni --udp ni --tcp)")
+    parser_cli.add_argument("--batch-size", type=int, default=server.BATCH_SIZE,
+                            help=f"Nombre maximal de messages d'un lot analysé (défaut: {server.BATCH_SIZE})")
+    parser_cli.add_argument("--queue-size", type=int, default=server.QUEUE_SIZE,
+                            help="Nombre maximal de lots en attente avant de ralentir TCP "
+                                 f"et d'abandonner en UDP (défaut: {server.QUEUE_SIZE})")
+    parser_cli.add_argument("--output",
+                            help="Fichier de sortie : rapport Markdown, ou NDJSON/CSV selon l'extension "
+                                 "ou --format ; '-' pour la sortie standard (optionnel)")
+    parser_cli.add_argument("--format", choices=sinks.OUTPUT_FORMATS,
+                            help="Format de --output (défaut: déduit de l'extension, sinon markdown)")
+    parser_cli.add_argument("--max-display", type=int,
+                            help="Nombre maximal d'anomalies affichées en console (défaut: toutes)")
+    add_detection_arguments(parser_cli)
+    parser_cli.add_argument("--store",
+                            help="Base SQLite où enregistrer les anomalies (historique, voir la sous-commande history)")
+    add_alert_arguments(parser_cli)
+    args = parser_cli.parse_args(argv)
+    if args.udp is None and args.tcp is None:
+        args.udp = args.tcp = server.DEFAULT_PORT
+
+    output_format = (args.format or sinks.detect_format(args.output)) if args.output else None
+    quiet = args.output == "-"
+    out = sys.stderr if quiet else sys.stdout
+    if quiet:
+        utils.configure_logging(sys.stderr)
+    else:
+        banner()
+
+    outputs = []
+    if args.output:
+        try:
+            outputs.append(sinks.open_sink(args.output, output_format))
+        except Exception as e:
+            print(f"[❌] Erreur lors de l'enregistrement du rapport: {str(e)}", file=out)
+    console = None if quiet else sinks.ConsoleSink(args.max_display)
+    anomaly_store = None
+    if args.store:
+        try:
+            anomaly_store = store.AnomalyStore(args.store, [f"syslog://{args.host}"])
+        except Exception as e:
+            print(f"[❌] Erreur lors de l'ouverture de la base {args.store}: {str(e)}", file=out)
+    dispatcher = open_alerts(args, out)
+    all_sinks = ([console] if console else []) + outputs
+
+    def write_batch(anomalies):
+        for a in anomalies:
+            for sink in all_sinks:
+                sink.write(a)
+            if anomaly_store:
+                anomaly_store.add(a)
+            if dispatcher:
+                dispatcher.submit(a)
+        for sink in all_sinks:
+            sink.flush()
+
+    analysis = pipeline.AnalysisPipeline(args.bf_threshold, args.bf_window, args.bf_max_keys, args.sketches,
+                                         args.correlate)
+    syslog = server.SyslogServer(analysis, write_batch, args.host, args.udp, args.tcp,
+                                 args.batch_size, args.queue_size)
+    print("[👁] Réception syslog en continu, Ctrl+C pour arrêter.", file=out)
+    try:
+        elapsed = server.run_server(syslog)
+    except OSError as e:
+        print(f"[❌] Erreur: Écoute impossible sur {args.host}: {str(e)}", file=out)
+        sys.exit(1)
+    if console:
+        console.flush()
+        print("\n[✓] Réception interrompue.")
+
+    for a in analysis.finish():
+        for sink in outputs:
+            sink.write(a)
+        if anomaly_store:
+            anomaly_store.add(a)
+        if dispatcher:
+            dispatcher.submit(a)
+    if anomaly_store:
+        anomaly_store.close(analysis)
+
+    report = analysis.summary() if not quiet or output_format not in sinks.MACHINE_FORMATS else None
+    counters = syslog.counters()
+    if console:
+        console.close()
+        print(f"\n[✓] {counters['received']} messages reçus en {elapsed:.0f} s, "
+              f"{counters['dropped']} abandonnés, {counters['connections']} connexion(s) TCP.")
+        print(f"[✓] {analysis.entries} entrées pertinentes extraites.")
+        print(f"[✓] {counters['anomalies']} anomalies détectées.")
+        print("\n[🧠] Résumé automatique :")
+        print(report)
+    else:
+        print(f"[✓] {counters['received']} messages reçus, {counters['dropped']} abandonnés.", file=out)
+
+    for sink in outputs:
+        try:
+            sink.close(report)
+            if console:
+                print(f"\n[✓] Rapport enregistré dans {args.output}")
+        except Exception as e:
+            print(f"[❌] Erreur lors de l'enregistrement du rapport: {str(e)}", file=out)
+
+    if dispatcher:
+        close_alerts(dispatcher, out)
+
+def daemon_command(argv):
+    """
+    Sous-commande ``daemon`` : garde l'état d'analyse en mémoire et répond aux requêtes HTTP/JSON.
+
+    Args:
+        argv (list): Arguments suivant le nom de la sous-commande
+    """
+    from core import daemon
+
+    parser_cli = argparse.ArgumentParser(prog="loglens.py daemon",
+                                         description="Démon d'analyse : état chaud, API JSON locale")
+    parser_cli.add_argument("--socket", help="Socket Unix d'écoute (prioritaire sur --host/--port)")
+    parser_cli.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute HTTP (défaut: 127.0.0.1)")
+    parser_cli.add_argument("--port", type=int, default=daemon.DEFAULT_PORT,
+                            help=f"Port d'écoute HTTP (défaut: {daemon.DEFAULT_PORT})")
+    parser_cli.add_argument("--state",
+                            help="Fichier d'état restauré au démarrage et enregistré à l'arrêt (et par POST /save)")
+    parser_cli.add_argument("--allow-root", action="append", default=[], metavar="DIR",
+                            help="Répertoire dont les fichiers peuvent être lus par /ingest et /analyze "
+                                 "(répétable, aucun par défaut)")
+    add_detection_arguments(parser_cli)
+    args = parser_cli.parse_args(argv)
+
+    # Jeton lu dans l'environnement, pour ne pas l'exposer dans la liste des processus
+    token = os.environ.get(daemon.TOKEN_ENV)
+    if args.socket is None and not token:
+        print(f"[❌] Erreur: L'écoute sur un port exige un jeton dans {daemon.TOKEN_ENV}, "
+              "ou utilisez --socket")
+        sys.exit(1)
+
+    state = daemon.AnalysisDaemon(args.bf_threshold, args.bf_window, args.bf_max_keys, args.sketches,
+                                  args.correlate, args.state, args.allow_root)
+    try:
+        http_server = daemon.create_server(state, args.socket, args.host, args.port, token)
+    except OSError as e:
+        print(f"[❌] Erreur: Écoute impossible sur {args.socket or f'{args.host}:{args.port}'}: {str(e)}")
+        sys.exit(1)
+
+    print(f"[👁] Démon à l'écoute sur {args.socket or f'http://{args.host}:{args.port}'}, Ctrl+C pour arrêter.")
+    daemon.run_daemon(state, http_server, args.socket)
+    print(f"\n[✓] Démon arrêté après {state.requests} requêtes.")
+
+# Sous-commandes, reconnues en premier argument
+COMMANDS = {
+    "index": index_command,
+    "query": query_command,
+    "history": history_command,
+    "serve": serve_command,
+    "daemon": daemon_command
+}
+
+# Sous-commandes qui affichent elles-mêmes la bannière (sortie standard éventuellement réservée aux données)
+QUIET_COMMANDS = ("serve",)
+
 def main():
     """Fonction principale du programme"""
-    # Afficher la bannière
-    banner()
+    utils.configure_logging()
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        if sys.argv[1] not in QUIET_COMMANDS:
+            banner()
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+        return
     
     # Configurer les arguments de la ligne de commande
     parser_cli = argparse.ArgumentParser(description="LogLens - Auditeur IA de logs")
-    parser_cli.add_argument("--logfile", required=True, help="Fichier de log à analyser")
+    parser_cli.add_argument("--logfile", required=True, nargs="+",
+                            help="Fichier(s) de log à analyser : chemins, motifs glob ou répertoires, "
+                                 "compressés ou non (gzip, bz2, xz)")
     parser_cli.add_argument("--verbose", action="store_true", help="Mode verbeux avec plus de détails")
-    parser_cli.add_argument("--output", help="Fichier de sortie pour le rapport (optionnel)")
+    parser_cli.add_argument("--output",
+                            help="Fichier de sortie : rapport Markdown, ou NDJSON/CSV selon l'extension "
+                                 "ou --format ; '-' pour la sortie standard (optionnel)")
+    parser_cli.add_argument("--format", choices=sinks.OUTPUT_FORMATS,
+                            help="Format de --output (défaut: déduit de l'extension, sinon markdown)")
+    parser_cli.add_argument("--max-display", type=int,
+                            help="Nombre maximal d'anomalies affichées en console (défaut: toutes)")
+    parser_cli.add_argument("--workers", type=int, default=1,
+                            help="Nombre de processus pour analyser le fichier en parallèle (défaut: 1)")
+    parser_cli.add_argument("--threads", type=int, default=4,
+                            help="Nombre de fichiers lus simultanément avec plusieurs entrées (défaut: 4)")
+    parser_cli.add_argument("--follow", action="store_true",
+                            help="Suivre le fichier en continu et analyser les lignes ajoutées")
+    parser_cli.add_argument("--from-start", action="store_true",
+                            help="Avec --follow, analyser aussi le contenu déjà présent")
+    parser_cli.add_argument("--poll-interval", type=float, default=0.5,
+                            help="Avec --follow, intervalle de scrutation en secondes (défaut: 0.5)")
+    parser_cli.add_argument("--state",
+                            help="Fichier d'état : reprendre l'analyse là où la précédente s'est arrêtée")
+    add_detection_arguments(parser_cli)
+    parser_cli.add_argument("--templates", type=int, nargs="?", const=10, metavar="N",
+                            help="Regrouper les entrées en modèles de lignes et afficher les N plus rares (défaut: 10)")
+    parser_cli.add_argument("--store",
+                            help="Base SQLite où enregistrer les anomalies (historique, voir la sous-commande history)")
+    parser_cli.add_argument("--stats", nargs="?", const="table", choices=("table", "json"),
+                            help="Afficher les temps par étape et par règle en fin d'analyse (table ou json)")
+    parser_cli.add_argument("--profile-stacks", metavar="FICHIER",
+                            help="Échantillonner les piles d'appels dans FICHIER (format flamegraph)")
+    add_alert_arguments(parser_cli)
     args = parser_cli.parse_args()
 
-    # Vérifier si le fichier de log existe
-    if not os.path.exists(args.logfile):
-        print(f"[❌] Erreur: Le fichier {args.logfile} n'existe pas.")
+    # Données sur la sortie standard : ni bannière, ni console, ni résumé
+    output_format = (args.format or sinks.detect_format(args.output)) if args.output else None
+    quiet = args.output == "-"
+    out = sys.stderr if quiet else sys.stdout
+    if quiet:
+        utils.configure_logging(sys.stderr)
+    else:
+        banner()
+
+    # Résoudre les fichiers de log (motifs, répertoires, jeux de rotation)
+    logfiles = inputs.expand_inputs(args.logfile)
+    if not logfiles:
+        print(f"[❌] Erreur: Le fichier {' '.join(args.logfile)} n'existe pas.", file=out)
+        sys.exit(1)
+    if args.follow and len(logfiles) > 1:
+        print("[❌] Erreur: --follow ne peut suivre qu'un seul fichier.", file=out)
+        sys.exit(1)
+    has_records = any(parser.detect_log_type(logfile) in parser.RECORD_LOG_TYPES for logfile in logfiles)
+    if has_records and (args.follow or args.state):
+        print("[❌] Erreur: --follow et --state ne s'appliquent qu'aux logs ligne à ligne, "
+              "pas aux journaux EVTX ni aux exports journald.", file=out)
         sys.exit(1)
 
-    print(f"[🔍] Analyse du fichier: {args.logfile}")
+    if len(logfiles) == 1:
+        print(f"[🔍] Analyse du fichier: {logfiles[0]}", file=out)
+    else:
+        print(f"[🔍] Analyse de {len(logfiles)} fichiers, du plus ancien au plus récent :", file=out)
+        for logfile in logfiles:
+            print(f"    {logfile}", file=out)
     
-    # Analyser le fichier de log
-    entries = parser.parse_log(args.logfile)
-    print(f"[✓] {len(entries)} entrées pertinentes extraites.")
+    # Instrumentation : les étapes ne sont mesurées que dans ce processus
+    run_stats = None
+    if args.stats or args.profile_stacks:
+        run_stats = stats.enable()
+        if args.workers > 1 or (args.threads > 1 and len(logfiles) > 1):
+            print("[⏱] --stats : analyse séquentielle, sans --workers ni --threads.", file=out)
+            args.workers = 1
+            args.threads = 1
+        if args.profile_stacks and not run_stats.start_profiler(args.profile_stacks):
+            print("[❌] --profile-stacks n'est pas disponible sur cette plateforme.", file=out)
+
+    # La corrélation et les modèles suivent l'ordre du flux : pas de portions analysées à part
+    if args.correlate or args.templates:
+        if args.workers > 1:
+            option = "--correlate" if args.correlate else "--templates"
+            print(f"[🔍] {option} : analyse séquentielle, sans --workers.", file=out)
+        args.workers = 1
+        args.threads = 1
+
+    # --workers découpe un seul fichier ligne à ligne, non compressé, lu en entier
+    if args.workers > 1:
+        reason = None
+        if args.follow or args.state:
+            reason = "--follow" if args.follow else "--state"
+        elif len(logfiles) > 1:
+            reason = "plusieurs fichiers, lus sur --threads"
+        elif inputs.is_compressed(logfiles[0]):
+            reason = "fichier compressé"
+        elif has_records:
+            reason = "journal EVTX ou export journald"
+        if reason is not None:
+            print(f"[🔍] --workers ignoré ({reason}).", file=out)
+            args.workers = 1
     
-    # Détecter les anomalies
-    anomalies = detector.detect_anomalies(entries)
-    print(f"[✓] {len(anomalies)} anomalies détectées.")
+    # Ouvrir les sorties dès le départ : les anomalies y sont écrites au fil de l'eau
+    outputs = []
+    if args.output:
+        try:
+            outputs.append(sinks.open_sink(args.output, output_format))
+        except Exception as e:
+            print(f"[❌] Erreur lors de l'enregistrement du rapport: {str(e)}", file=out)
+    console = None if quiet else sinks.ConsoleSink(args.max_display)
     
-    # Générer un résumé
-    report = summarizer.generate_summary(anomalies)
+    anomaly_store = None
+    if args.store:
+        try:
+            anomaly_store = store.AnomalyStore(args.store, logfiles)
+        except Exception as e:
+            print(f"[❌] Erreur lors de l'ouverture de la base {args.store}: {str(e)}", file=out)
+    dispatcher = open_alerts(args, out)
     
-    # Afficher les résultats
-    if anomalies:
-        print("\n[🧿] Anomalies détectées :")
-        for a in anomalies:
-            print(f" - {a['type']} | {a['entry'][:100]}")
+    # Analyser le fichier et détecter les anomalies en une seule passe, en
+    # affichant chaque anomalie dès qu'elle est trouvée
+    analysis = pipeline.AnalysisPipeline(args.bf_threshold, args.bf_window, args.bf_max_keys, args.sketches,
+                                         args.correlate, bool(args.templates))
+    anomaly_count = 0
+    if args.follow:
+        anomalies = []
+        anomaly_count = follow_log(args, analysis, console, outputs, anomaly_store, dispatcher)
+    elif args.state:
+        anomalies = analysis.process_checkpointed(logfiles, checkpoint.StateFile(args.state))
+    elif args.workers > 1:
+        anomalies = analysis.process_parallel(logfiles[0], args.workers)
     else:
-        print("\n[🧿] Aucune anomalie détectée.")
-
-    print("\n[🧠] Résumé automatique :")
-    print(report)
+        anomalies = analysis.process_files(logfiles, args.threads)
+    all_sinks = ([console] if console else []) + outputs
+    if len(all_sinks) == 1:
+        write = all_sinks[0].write
+    else:
+        def write(anomaly):
+            for sink in all_sinks:
+                sink.write(anomaly)
+    add = anomaly_store.add if anomaly_store else None
+    submit = dispatcher.submit if dispatcher else None
+    for a in anomalies:
+        anomaly_count += 1
+        write(a)
+        if add:
+            add(a)
+        if submit:
+            submit(a)
     
-    # Sauvegarder le rapport si demandé
-    if args.output:
+    if anomaly_store:
+        anomaly_store.close(analysis)
+    
+    # Générer un résumé à partir des agrégats (inutile pour une sortie machine)
+    report = analysis.summary() if not quiet or output_format not in sinks.MACHINE_FORMATS else None
+    
+    if console:
+        console.close()
+        if anomaly_count == 0 and not args.follow:
+            print("\n[🧿] Aucune anomalie détectée.")
+        
+        print(f"\n[✓] {analysis.entries} entrées pertinentes extraites.")
+        print(f"[✓] {anomaly_count} anomalies détectées.")
+        
+        print("\n[🧠] Résumé automatique :")
+        print(report)
+    
+    if analysis.miner is not None:
+        print("\n[🔍] Modèles de lignes les plus rares :", file=out)
+        print(analysis.miner.render(args.templates), file=out)
+    
+    # Finaliser les sorties fichier
+    for sink in outputs:
         try:
-            with open(args.output, 'w') as f:
-                f.write("# Rapport LogLens\n\n")
-                f.write("## Anomalies détectées\n\n")
-                for a in anomalies:
-                    f.write(f"- **{a['type']}**: {a['entry']}\n")
-                f.write("\n## Résumé automatique\n\n")
-                f.write(report)
-            print(f"\n[✓] Rapport enregistré dans {args.output}")
+            sink.close(report)
+            if console:
+                print(f"\n[✓] Rapport enregistré dans {args.output}")
         except Exception as e:
-            print(f"[❌] Erreur lors de l'enregistrement du rapport: {str(e)}")
+            print(f"[❌] Erreur lors de l'enregistrement du rapport: {str(e)}", file=out)
+    
+    # Envoyer les alertes en attente, avec les synthèses des regroupements
+    if dispatcher:
+        close_alerts(dispatcher, out)
+    
+    if run_stats is not None:
+        if run_stats.profiler is not None:
+            samples = run_stats.stop_profiler()
+            print(f"\n[✓] {samples} échantillons de piles enregistrés dans {args.profile_stacks}", file=out)
+        if args.stats:
+            print("\n[⏱] Statistiques d'exécution :", file=out)
+            print(run_stats.to_json() if args.stats == "json" else run_stats.render(), file=out)
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except BrokenPipeError:
+        # Sortie standard fermée par le lecteur (head, etc.) : arrêt silencieux
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
@@ -0,0 +1,76 @@
+"""
+Configuration commune des tests de LogLens.
+
+Fournit un générateur de logs auth/syslog déterministe couvrant toutes
+les catégories d'anomalies, des attaques brute force et des lignes sans
+rapport.
+"""
+
+import os
+import random
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MESSAGES = [
+    "sshd[{pid}]: Failed password for invalid user {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Failed password for {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Accepted password for {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Connection closed by {ip} port {port} [preauth]",
+    "sshd[{pid}]: error: maximum authentication attempts exceeded for {user} from {ip} port {port}",
+    "login[{pid}]: pam_unix(login:auth): authentication failure; logname= uid=0 euid=0 tty=tty1 ruser= rhost={ip} user={user}",
+    "rdp[{pid}]: RDP login failed for {user} from {ip}",
+    "xrdp[{pid}]: remote desktop session denied for {user}",
+    "named[{pid}]: DNS query flagged suspicious for host{port}.example.com from {ip}",
+    "named[{pid}]: unresolved hostname srv{port}.corp",
+    "kernel: [UFW BLOCK] firewall block IN=eth0 SRC={ip} DST=10.0.0.1 DPT={port}",
+    "kernel: dropped packet from {ip}",
+    "sudo[{pid}]:    {user} : TTY=pts/0 ; PWD=/home/{user} ; USER=root ; COMMAND=/bin/bash",
+    "app[{pid}]: possible privilege escalation by {user}",
+    "portsentry[{pid}]: port scan detected from {ip}",
+    "ids[{pid}]: sequential ports probed by {ip}",
+    "webapp[{pid}]: SQL injection attempt from {ip}: ' OR 1=1 --",
+    "webapp[{pid}]: invalid SQL in request from {ip}",
+    "CRON[{pid}]: pam_unix(cron:session): session opened for user root by (uid=0)",
+    "systemd[1]: Started Session {pid} of user {user}.",
+]
+
+USERS = ["root", "admin", "alice", "bob", "oracle", "test", "élodie"]
+
+def generate_lines(count, seed=1, start=1715869961):
+    """
+    Génère des lignes de log syslog déterministes.
+
+    Args:
+        count (int): Nombre de lignes
+        seed (int): Graine du générateur
+        start (int): Horodatage epoch de la première ligne
+
+    Returns:
+        list: Lignes, sans fin de ligne
+    """
+    rng = random.Random(seed)
+    lines = []
+    epoch = start
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    for _ in range(count):
+        epoch += rng.choice([0, 0, 1, 2, 5, 30])
+        t = time.gmtime(epoch)
+        prefix = f"{months[t.tm_mon - 1]} {t.tm_mday:2d} {t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d} server"
+        # Quelques IPs très actives, pour déclencher le brute force
+        ip = f"192.168.{rng.randint(0, 3)}.{rng.randint(1, 12)}" if rng.random() < 0.7 \
+            else f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+        message = rng.choice(MESSAGES).format(pid=rng.randint(100, 99999), user=rng.choice(USERS),
+                                              ip=ip, port=rng.randint(1024, 65535))
+        lines.append(f"{prefix} {message}")
+    return lines
+
+@pytest.fixture
+def auth_log(tmp_path):
+    """Fichier de log auth de 3000 lignes."""
+    path = tmp_path / "auth.log"
+    path.write_text("\n".join(generate_lines(3000)) + "\n", encoding="utf-8")
+    return str(path)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Générateur des journaux EVTX de test.
+
+Écrit des fichiers EVTX d'après la spécification du format (en-tête de
+fichier, blocs de 64 Ko, enregistrements BinXML avec modèles et tableau
+de substitutions), sans dépendre de Windows. Chaque identifiant
+d'événement a son modèle, défini dans le premier enregistrement de chaque
+bloc qui l'utilise puis référencé par sa position, comme dans un journal
+réel.
+
+Régénérer les fixtures :
+    python3 tests/fixtures/make_evtx.py
+"""
+
+import os
+import struct
+import zlib
+
+CHUNK_SIZE = 65536
+
+# Types de valeurs BinXML
+STRING = 0x01
+UINT8 = 0x04
+UINT16 = 0x06
+UINT32 = 0x08
+UINT64 = 0x0a
+HEX32 = 0x14
+HEX64 = 0x15
+FILETIME = 0x11
+SID = 0x13
+
+# Champs de la section System, substitués dans cet ordre
+SYSTEM_FIELDS = [("EventID", UINT16), ("Version", UINT8), ("Level", UINT8), ("Task", UINT16),
+                 ("Opcode", UINT8), ("Keywords", HEX64), ("SystemTime", FILETIME),
+                 ("EventRecordID", UINT64), ("ProcessID", UINT32), ("ThreadID", UINT32),
+                 ("Computer", STRING)]
+
+# Champs de la section EventData, par identifiant d'événement
+EVENT_FIELDS = {
+    4624: [("SubjectUserSid", SID), ("SubjectUserName", STRING), ("TargetUserName", STRING),
+           ("TargetDomainName", STRING), ("LogonType", UINT32), ("WorkstationName", STRING),
+           ("IpAddress", STRING), ("IpPort", STRING)],
+    4625: [("SubjectUserSid", SID), ("SubjectUserName", STRING), ("TargetUserName", STRING),
+           ("TargetDomainName", STRING), ("Status", HEX32), ("FailureReason", STRING),
+           ("SubStatus", HEX32), ("LogonType", UINT32), ("WorkstationName", STRING),
+           ("IpAddress", STRING), ("IpPort", STRING)],
+    4771: [("TargetUserName", STRING), ("TargetSid", SID), ("ServiceName", STRING),
+           ("TicketOptions", HEX32), ("Status", HEX32), ("PreAuthType", STRING),
+           ("IpAddress", STRING), ("IpPort", STRING)],
+    4776: [("PackageName", STRING), ("TargetUserName", STRING), ("Workstation", STRING),
+           ("Status", HEX32)],
+    4688: [("SubjectUserName", STRING), ("NewProcessName", STRING), ("CommandLine", STRING)],
+}
+
+# Événements de security.evtx : (identifiant, epoch, valeurs)
+SECURITY_EVENTS = [
+    (4625, 1715869961, {"TargetUserName": "admin", "LogonType": 3, "IpAddress": "10.0.0.5",
+                        "Status": 0xC000006D}),
+    (4625, 1715869962, {"TargetUserName": "admin", "LogonType": 10, "IpAddress": "10.0.0.5",
+                        "Status": 0xC000006D}),
+    (4688, 1715869963, {"SubjectUserName": "alice", "NewProcessName": "C:\\Windows\\System32\\cmd.exe"}),
+    (4624, 1715869964, {"TargetUserName": "alice", "LogonType": 10, "IpAddress": "10.0.0.9"}),
+    (4771, 1715869965, {"TargetUserName": "bob", "IpAddress": "::ffff:10.0.0.7", "Status": 0x18}),
+    (4776, 1715869966, {"TargetUserName": "svc_backup", "Status": 0}),
+    (4776, 1715869967, {"TargetUserName": "svc_backup", "Status": 0xC000006A}),
+    (4625, 1715869968, {"TargetUserName": "-", "LogonType": 3, "IpAddress": "-", "Status": 0xC000006D}),
+    (4625, 1715869969, {"TargetUserName": "admin", "LogonType": 3, "IpAddress": "10.0.0.5",
+                        "Status": 0xC000006D}),
+]
+
+def filetime(epoch):
+    """Convertit un epoch Unix en FILETIME (centaines de ns depuis 1601)."""
+    return (epoch + 11644473600) * 10000000
+
+def encode_value(value_type, value):
+    """
+    Encode une valeur de substitution.
+
+    Returns:
+        tuple: (type, octets), type nul pour une valeur absente
+    """
+    if value is None:
+        return 0x00, b""
+    if value_type == STRING:
+        return value_type, (value + "\0").encode("utf-16-le") if value else b""
+    if value_type == UINT8:
+        return value_type, struct.pack("<B", value)
+    if value_type == UINT16:
+        return value_type, struct.pack("<H", value)
+    if value_type in (UINT32, HEX32):
+        return value_type, struct.pack("<I", value)
+    if value_type in (UINT64, HEX64, FILETIME):
+        return value_type, struct.pack("<Q", value)
+    if value_type == SID:
+        return value_type, bytes([1, 1, 0, 0, 0, 0, 0, 5, 18, 0, 0, 0])
+    raise ValueError(f"type de valeur non pris en charge: {value_type}")
+
+class Chunk:
+    """Bloc en cours d'écriture : enregistrements, noms et modèles définis."""
+
+    def __init__(self):
+        self.buf = bytearray(512)
+        self.names = {}
+        self.templates = {}
+        self.first = None
+        self.last = None
+        self.last_offset = 0
+
+    def name(self, text, offset):
+        """
+        Position d'un nom dans le bloc, et ses octets s'il faut le définir à ``offset``.
+
+        Returns:
+            tuple: (position, octets à insérer, vides si le nom est déjà défini)
+        """
+        if text in self.names:
+            return self.names[text], b""
+        self.names[text] = offset
+        name_hash = 0
+        for c in text:
+            name_hash = (name_hash * 65599 + ord(c)) & 0xFFFFFFFF
+        return offset, struct.pack("<IHH", 0, name_hash & 0xFFFF, len(text)) + text.encode("utf-16-le") + b"\0\0"
+
+def build_template(chunk, base, tree):
+    """
+    Encode le corps BinXML d'un modèle.
+
+    Args:
+        chunk (Chunk): Bloc où les noms sont définis
+        base (int): Position du corps du modèle dans le bloc
+        tree (tuple): Élément racine (nom, attributs, enfants) ; une valeur
+            est une chaîne ou un tuple (rang de substitution, type)
+
+    Returns:
+        bytes: Corps du modèle
+    """
+    out = bytearray()
+
+    def emit_value(value):
+        if isinstance(value, str):
+            out.extend(bytes([0x05, STRING]) + struct.pack("<H", len(value)) + value.encode("utf-16-le"))
+        else:
+            index, value_type = value
+            # Substitution facultative (0x0e) pour les chaînes, normale (0x0d) sinon
+            out.extend(bytes([0x0e if value_type == STRING else 0x0d]) + struct.pack("<HB", index, value_type))
+
+    def emit_element(element):
+        name, attributes, children = element
+        start = len(out)
+        out.extend(bytes([0x41 if attributes else 0x01]) + struct.pack("<HI", 0xFFFF, 0))
+        offset, inline = chunk.name(name, base + len(out) + 4 + (4 if attributes else 0))
+        out.extend(struct.pack("<I", offset))
+        attributes_size = len(out)
+        if attributes:
+            out.extend(b"\0\0\0\0")
+        out.extend(inline)
+        attributes_start = len(out)
+        for i, (attribute, value) in enumerate(attributes):
+            out.append(0x46 if i < len(attributes) - 1 else 0x06)
+            offset, inline = chunk.name(attribute, base + len(out) + 4)
+            out.extend(struct.pack("<I", offset))
+            out.extend(inline)
+            emit_value(value)
+        if attributes:
+            struct.pack_into("<I", out, attributes_size, len(out) - attributes_start)
+        if children:
+            out.append(0x02)
+            for child in children:
+                if isinstance(child, tuple) and len(child) == 3:
+                    emit_element(child)
+                else:
+                    emit_value(child)
+            out.append(0x04)
+        else:
+            out.append(0x03)
+        struct.pack_into("<I", out, start + 3, len(out) - start - 7)
+
+    out.extend(b"\x0f\x01\x01\x00")
+    emit_element(tree)
+    out.append(0x00)
+    return bytes(out)
+
+def event_tree(data_fields):
+    """Arbre Event/System/EventData d'un modèle, substitutions numérotées."""
+    n = len(SYSTEM_FIELDS)
+    system = ("System", [], [
+        ("Provider", [("Name", "Microsoft-Windows-Security-Auditing")], []),
+        ("EventID", [], [(0, UINT16)]),
+        ("Version", [], [(1, UINT8)]),
+        ("Level", [], [(2, UINT8)]),
+        ("Task", [], [(3, UINT16)]),
+        ("Opcode", [], [(4, UINT8)]),
+        ("Keywords", [], [(5, HEX64)]),
+        ("TimeCreated", [("SystemTime", (6, FILETIME))], []),
+        ("EventRecordID", [], [(7, UINT64)]),
+        ("Correlation", [], []),
+        ("Execution", [("ProcessID", (8, UINT32)), ("ThreadID", (9, UINT32))], []),
+        ("Channel", [], ["Security"]),
+        ("Computer", [], [(10, STRING)]),
+        ("Security", [], []),
+    ])
+    data = ("EventData", [], [("Data", [("Name", name)], [(n + i, value_type)])
+                              for i, (name, value_type) in enumerate(data_fields)])
+    return ("Event", [("xmlns", "http://schemas.microsoft.com/win/2004/08/events/event")], [system, data])
+
+def write(path, events, computer="DC01.corp.local"):
+    """
+    Écrit un journal EVTX.
+
+    Args:
+        path (str): Fichier à écrire
+        events (list): Tuples (identifiant, epoch, valeurs des champs EventData)
+        computer (str): Ordinateur ayant enregistré les événements
+    """
+    chunks = []
+    chunk = Chunk()
+    record_id = 1
+    for event_id, epoch, values in events:
+        fields = EVENT_FIELDS[event_id]
+        substitutions = [encode_value(t, v) for t, v in [
+            (UINT16, event_id), (UINT8, 0), (UINT8, 0), (UINT16, 12544), (UINT8, 0),
+            (HEX64, 0x8010000000000000), (FILETIME, filetime(epoch)), (UINT64, record_id),
+            (UINT32, 636), (UINT32, 700), (STRING, computer)]]
+        substitutions += [encode_value(t, values.get(name)) for name, t in fields]
+
+        while True:
+            start = len(chunk.buf)
+            saved_names = dict(chunk.names)
+            body = bytearray(b"\x0f\x01\x01\x00")
+            defined = event_id not in chunk.templates
+            if defined:
+                definition = start + 24 + len(body) + 10
+                template = build_template(chunk, definition + 24, event_tree(fields))
+                guid = struct.pack("<I", event_id) + bytes(range(12))
+                body.extend(bytes([0x0c, 0x01]) + struct.pack("<II", event_id, definition))
+                body.extend(struct.pack("<I", 0) + guid + struct.pack("<I", len(template)) + template)
+            else:
+                body.extend(bytes([0x0c, 0x01]) + struct.pack("<II", event_id, chunk.templates[event_id]))
+            body.extend(struct.pack("<I", len(substitutions)))
+            for value_type, data in substitutions:
+                body.extend(struct.pack("<HBB", len(data), value_type, 0))
+            for value_type, data in substitutions:
+                body.extend(data)
+            size = 24 + len(body) + 4
+            if start + size <= CHUNK_SIZE:
+                break
+            # Bloc plein : l'enregistrement (et son modèle) va dans un nouveau bloc
+            chunk.names = saved_names
+            chunks.append(chunk)
+            chunk = Chunk()
+
+        if defined:
+            chunk.templates[event_id] = definition
+        chunk.buf.extend(struct.pack("<4sIQQ", b"\x2a\x2a\x00\x00", size, record_id, filetime(epoch))
+                         + bytes(body) + struct.pack("<I", size))
+        if chunk.first is None:
+            chunk.first = record_id
+        chunk.last = record_id
+        chunk.last_offset = start
+        record_id += 1
+    chunks.append(chunk)
+
+    header = bytearray(4096)
+    struct.pack_into("<8sQQQIHHHH", header, 0, b"ElfFile\0", 0, len(chunks) - 1, record_id,
+                     128, 1, 3, 4096, len(chunks))
+    struct.pack_into("<I", header, 124, zlib.crc32(bytes(header[:120])))
+    with open(path, "wb") as f:
+        f.write(header)
+        for chunk in chunks:
+            buf = chunk.buf
+            free = len(buf)
+            buf.extend(b"\0" * (CHUNK_SIZE - len(buf)))
+            struct.pack_into("<8sQQQQIII", buf, 0, b"ElfChnk\0", chunk.first, chunk.last,
+                             chunk.first, chunk.last, 128, chunk.last_offset, free)
+            struct.pack_into("<I", buf, 52, zlib.crc32(bytes(buf[512:free])))
+            struct.pack_into("<I", buf, 124, zlib.crc32(bytes(buf[:120]) + bytes(buf[128:512])))
+            f.write(buf)
+
+if __name__ == "__main__":
+    write(os.path.join(os.path.dirname(os.path.abspath(__file__)), "security.evtx"), SECURITY_EVENTS)
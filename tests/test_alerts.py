@@ -0,0 +1,147 @@
+"""
+Tests du répartiteur d'alertes contre un webhook local : regroupement par
+type et IP, envois par lots, et dépôt non bloquant lorsque le destinataire
+est lent.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core import alerts
+from core.alerts import AlertDispatcher, WebhookDestination
+
+BRUTE_FORCE = "Attaque Brute Force"
+
+class Receiver:
+    """Webhook local : enregistre le corps de chaque POST, après ouverture de ``gate``."""
+
+    def __init__(self):
+        self.posts = []
+        self.gate = threading.Event()
+        self.gate.set()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                receiver.gate.wait(30)
+                receiver.posts.append(json.loads(body))
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    def wait_posts(self, count, timeout=10):
+        deadline = time.monotonic() + timeout
+        while len(self.posts) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return len(self.posts) >= count
+
+    def alerts(self):
+        return [alert for post in self.posts for alert in post["alerts"]]
+
+    def close(self):
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def receiver():
+    receiver = Receiver()
+    yield receiver
+    receiver.close()
+
+def anomaly(ip, number=0, anomaly_type=BRUTE_FORCE):
+    return {"type": anomaly_type, "ips": [ip], "user": "root", "attempts": 5 + number,
+            "entry": f"Brute force {number} depuis {ip}"}
+
+def test_coalesced_by_type_and_ip(receiver, monkeypatch):
+    """20 000 répétitions d'une alerte : la première, puis une synthèse à la fermeture, en 2 POST."""
+    monkeypatch.setattr(alerts, "BATCH_DELAY", 0.05)
+    dispatcher = AlertDispatcher([WebhookDestination(receiver.url)], queue_size=20000)
+    for number in range(20000):
+        dispatcher.submit(anomaly("10.0.0.1", number))
+    assert receiver.wait_posts(1)
+    counters = dispatcher.close()
+
+    assert len(receiver.posts) == 2
+    first, summary = receiver.alerts()
+    assert (first["summary"], first["count"], first["entry"]) == (False, 1, "Brute force 0 depuis 10.0.0.1")
+    assert (summary["summary"], summary["count"]) == (True, 20000)
+    # La synthèse reprend la dernière occurrence
+    assert summary["entry"] == "Brute force 19999 depuis 10.0.0.1" and summary["attempts"] == 20004
+    assert summary["first_received"] == first["first_received"] <= summary["last_received"]
+    assert (counters["submitted"], counters["coalesced"], counters["dropped"]) == (20000, 19999, 0)
+    assert counters["destinations"]["127.0.0.1"] == {"sent": 2, "batches": 2, "dropped": 0, "failed": 0}
+
+def test_coalescing_keys(receiver):
+    """Chaque couple (type, IP) a sa propre alerte ; les catégories non alertées sont ignorées."""
+    dispatcher = AlertDispatcher([WebhookDestination(receiver.url)])
+    for _ in range(3):
+        dispatcher.submit(anomaly("10.0.0.1"))
+        dispatcher.submit(anomaly("10.0.0.2"))
+        dispatcher.submit(anomaly("10.0.0.1", anomaly_type="Injection SQL"))
+        dispatcher.submit(anomaly("10.0.0.1", anomaly_type="Échec Auth"))
+    dispatcher.close()
+
+    sent = sorted((alert["type"], alert["ips"][0], alert["summary"], alert["count"]) for alert in receiver.alerts())
+    assert sent == [(BRUTE_FORCE, "10.0.0.1", False, 1), (BRUTE_FORCE, "10.0.0.1", True, 3),
+                    (BRUTE_FORCE, "10.0.0.2", False, 1), (BRUTE_FORCE, "10.0.0.2", True, 3),
+                    ("Injection SQL", "10.0.0.1", False, 1), ("Injection SQL", "10.0.0.1", True, 3)]
+
+def test_batches_up_to_batch_size(receiver):
+    """Les alertes sont envoyées par lots d'au plus batch_size, dans l'ordre."""
+    dispatcher = AlertDispatcher([WebhookDestination(receiver.url, batch_size=10)], window=0)
+    for number in range(35):
+        dispatcher.submit(anomaly(f"10.0.0.{number}", number))
+    dispatcher.close()
+
+    assert [len(post["alerts"]) for post in receiver.posts] == [10, 10, 10, 5]
+    assert [alert["entry"] for alert in receiver.alerts()] == [
+        f"Brute force {number} depuis 10.0.0.{number}" for number in range(35)]
+    assert all(post["source"] == "loglens" for post in receiver.posts)
+
+def test_submit_does_not_block_on_slow_receiver(receiver):
+    """Tant que le destinataire ne répond pas, submit() reste immédiat ; tout est envoyé ensuite."""
+    receiver.gate.clear()
+    dispatcher = AlertDispatcher([WebhookDestination(receiver.url, batch_size=1, rate_per_minute=60000)],
+                                 window=0)
+    start = time.perf_counter()
+    for number in range(500):
+        dispatcher.submit(anomaly(f"10.0.{number // 256}.{number % 256}", number))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0
+    assert len(receiver.posts) == 0
+
+    receiver.gate.set()
+    counters = dispatcher.close()
+    assert len(receiver.alerts()) == 500
+    assert counters["destinations"]["127.0.0.1"]["sent"] == 500
+
+def test_full_queue_drops_instead_of_blocking(receiver):
+    """Une file pleine abandonne et compte les anomalies, sans attendre."""
+    receiver.gate.clear()
+    destination = WebhookDestination(receiver.url, batch_size=1, rate_per_minute=60000, queue_size=5)
+    dispatcher = AlertDispatcher([destination], window=0, queue_size=5)
+    start = time.perf_counter()
+    for number in range(5000):
+        dispatcher.submit(anomaly(f"10.0.{number // 256}.{number % 256}", number))
+    assert time.perf_counter() - start < 1.0
+    receiver.gate.set()
+    counters = dispatcher.close()
+    assert counters["dropped"] + counters["destinations"]["127.0.0.1"]["dropped"] > 0
+    assert counters["dropped"] + destination.dropped + destination.sent == 5000
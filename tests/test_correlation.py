@@ -0,0 +1,133 @@
+"""
+Tests de la corrélation multi-étapes : séquence complète depuis une IP,
+fenêtre de temps, éviction des entités les moins récentes et reprise d'une
+séquence en cours.
+"""
+
+import json
+
+from core.checkpoint import StateFile
+from core.correlation import LOGIN_TYPE, Correlator
+from core.detector import AUTH_FAILURE_TYPE
+from core.pipeline import AnalysisPipeline
+from core.record import RecordParser
+
+INTRUSION = "Intrusion Multi-étapes"
+
+ATTACK = [
+    "May 16 14:00:00 web01 kernel: [UFW] port scan detected from 203.0.113.9 on sequential ports",
+    "May 16 14:01:00 web01 sshd[10]: Failed password for bob from 203.0.113.9 port 4000 ssh2",
+    "May 16 14:01:10 web01 sshd[10]: Failed password for bob from 203.0.113.9 port 4001 ssh2",
+    "May 16 14:01:20 web01 sshd[10]: Failed password for bob from 203.0.113.9 port 4002 ssh2",
+    "May 16 14:02:00 web01 sshd[11]: Accepted password for bob from 203.0.113.9 port 4003 ssh2",
+    # Sans IP : rattachée à 203.0.113.9 par la connexion de bob sur web01
+    "May 16 14:03:00 web01 sudo:    bob : TTY=pts/0 ; PWD=/home/bob ; USER=root ; COMMAND=/bin/bash",
+]
+
+# Règle courte des tests unitaires : deux échecs puis une connexion, en une minute
+RULES = {"Test": {"key": "ip", "window": 60, "steps": [(AUTH_FAILURE_TYPE, 2), LOGIN_TYPE]}}
+
+def analyze(tmp_path, lines, name="auth.log"):
+    """Attaques multi-étapes d'un fichier de log analysé avec corrélation."""
+    path = tmp_path / name
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return [a for a in AnalysisPipeline(correlate=True).process_files([str(path)]) if a["type"] == INTRUSION]
+
+def failure_at(ip, minute, second=0):
+    """Échec d'authentification de bob depuis ``ip``, classé par le détecteur."""
+    return f"May 16 14:{minute:02d}:{second:02d} web01 sshd[1]: Failed password for bob from {ip} port 22 ssh2", \
+        {"type": AUTH_FAILURE_TYPE}
+
+def login_at(ip, minute, second=0):
+    """Connexion réussie de bob depuis ``ip`` (pas une anomalie)."""
+    return f"May 16 14:{minute:02d}:{second:02d} web01 sshd[2]: Accepted password for bob from {ip} port 22 ssh2", None
+
+def parse(lines):
+    """Entrées structurées de lignes syslog, comme les lit le pipeline."""
+    return map(RecordParser("syslog").parse, lines)
+
+def feed(correlator, events):
+    """Observe des événements (entrée, anomalie) ; retourne les séquences complétées."""
+    return [attack for entry, anomaly in events for attack in correlator.observe(entry, anomaly)]
+
+def test_multi_step_intrusion_from_one_ip(tmp_path):
+    """Scan, 3 échecs, connexion puis sudo depuis une IP : une intrusion multi-étapes."""
+    attacks = analyze(tmp_path, ATTACK)
+    assert len(attacks) == 1
+    attack = attacks[0]
+    assert attack["ips"] == ["203.0.113.9"] and attack["user"] == "bob" and attack["host"] == "web01"
+    assert attack["details"] == [ATTACK[0], ATTACK[1], ATTACK[4], ATTACK[5]]
+    assert attack["last_seen"] - attack["first_seen"] == 180
+    assert "depuis 203.0.113.9" in attack["entry"]
+
+def test_sudo_needs_session_of_same_ip(tmp_path):
+    """Un sudo d'un autre compte, ou sur un autre hôte, n'est pas rattaché à l'IP."""
+    other_user = ATTACK[-1].replace("bob", "alice")
+    other_host = ATTACK[-1].replace("web01", "db01")
+    assert analyze(tmp_path, ATTACK[:-1] + [other_user, other_host]) == []
+    # Une étape manquante (2 échecs seulement) ne complète pas la séquence
+    assert analyze(tmp_path, ATTACK[:2] + ATTACK[3:], "short.log") == []
+
+def test_sequence_past_window_restarts():
+    """Une séquence qui dépasse la fenêtre repart de sa première étape au lieu de se compléter."""
+    correlator = Correlator(RULES)
+    # Connexion plus d'une fenêtre après le début : pas d'attaque
+    events = [failure_at("10.0.0.1", 0), failure_at("10.0.0.1", 0, 30), login_at("10.0.0.1", 1, 10)]
+    assert feed(correlator, events) == []
+    assert "10.0.0.1" not in correlator.rules[0].matches
+
+    # Second échec hors fenêtre : il redevient le premier échec d'une nouvelle séquence
+    events = [failure_at("10.0.0.2", 5), failure_at("10.0.0.2", 6, 30), login_at("10.0.0.2", 6, 40)]
+    assert feed(correlator, events) == []
+    match = correlator.rules[0].matches["10.0.0.2"]
+    assert (match.step, match.hits) == (0, 1)
+    attacks = feed(correlator, [failure_at("10.0.0.2", 6, 50), login_at("10.0.0.2", 7)])
+    assert len(attacks) == 1
+    assert attacks[0]["last_seen"] - attacks[0]["first_seen"] == 30
+
+def test_max_keys_evicts_least_recently_seen():
+    """Au-delà de max_keys, l'entité la moins récemment vue est oubliée, pas la plus ancienne."""
+    correlator = Correlator(RULES, max_keys=2)
+    matches = correlator.rules[0].matches
+    feed(correlator, [failure_at("10.0.0.1", 0, 0), failure_at("10.0.0.2", 0, 1)])
+    # Un échec de plus rend 10.0.0.1 plus récente que 10.0.0.2
+    feed(correlator, [failure_at("10.0.0.1", 0, 2), failure_at("10.0.0.3", 0, 3)])
+    assert list(matches) == ["10.0.0.1", "10.0.0.3"]
+
+    # 10.0.0.2 repart de zéro : un nouvel échec ne suffit plus, et évince 10.0.0.1
+    assert feed(correlator, [failure_at("10.0.0.2", 0, 4), login_at("10.0.0.2", 0, 5)]) == []
+    assert list(matches) == ["10.0.0.3", "10.0.0.2"]
+    assert feed(correlator, [login_at("10.0.0.1", 0, 6)]) == []
+    assert len(feed(correlator, [failure_at("10.0.0.3", 0, 7), login_at("10.0.0.3", 0, 8)])) == 1
+
+    # Les connexions associées aux comptes sont bornées de même
+    for number in range(5):
+        correlator.observe(f"May 16 14:01:00 web01 sshd[2]: Accepted password for user{number} "
+                           f"from 10.1.0.{number} port 22 ssh2", None)
+    assert list(correlator.sessions) == [("web01", "user3"), ("web01", "user4")]
+
+def test_state_taken_mid_sequence(tmp_path):
+    """Un état pris en cours de séquence (connexion faite, sudo à venir) la complète à la reprise."""
+    expected = [a["entry"] for a in analyze(tmp_path, ATTACK)]
+
+    # Moteur seul : état enregistré en JSON, restauré dans un moteur neuf
+    analysis = AnalysisPipeline(correlate=True)
+    list(analysis.process_batch(parse(ATTACK[:-1])))
+    state = json.loads(json.dumps(analysis.correlator.get_state()))
+    assert state["sessions"] == [["web01", "bob", "203.0.113.9"]]
+    analysis.correlator = Correlator()
+    analysis.correlator.set_state(state)
+    attacks = [a for a in analysis.process_batch(parse(ATTACK[-1:])) if a["type"] == INTRUSION]
+    assert [a["entry"] for a in attacks] == expected
+
+    # Pipeline complet : deux exécutions reprises sur un fichier qui grandit
+    live = tmp_path / "auth.log.live"
+    state_path = str(tmp_path / "state.json")
+    found = []
+    for part in (ATTACK[:-1], ATTACK[-1:]):
+        with open(live, "a", encoding="utf-8") as f:
+            f.write("\n".join(part) + "\n")
+        run = AnalysisPipeline(correlate=True)
+        found += [a["entry"] for a in run.process_checkpointed([str(live)], StateFile(state_path))
+                  if a["type"] == INTRUSION]
+    assert found == expected
@@ -0,0 +1,139 @@
+"""
+Tests du démon d'analyse sur un port local : jeton, en-tête Host, corps
+JSON obligatoire, validation des lignes ingérées et répertoires autorisés.
+"""
+
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+from core.daemon import AnalysisDaemon, create_server
+
+TOKEN = "s3cret-token"
+
+FAILED_LINE = "May 16 14:32:41 web01 sshd[42]: Failed password for root from 10.0.0.1 port 22 ssh2"
+
+@pytest.fixture
+def dirs(tmp_path):
+    """Répertoire autorisé et répertoire extérieur, chacun avec un log."""
+    allowed = tmp_path / "allowed"
+    outside = tmp_path / "outside"
+    allowed.mkdir()
+    outside.mkdir()
+    (allowed / "auth.log").write_text(FAILED_LINE + "\n", encoding="utf-8")
+    (outside / "secret.log").write_text(FAILED_LINE + "\n", encoding="utf-8")
+    return allowed, outside
+
+@pytest.fixture
+def port(dirs):
+    """Démon servi sur un port libre, dans un fil, le temps d'un test."""
+    server = create_server(AnalysisDaemon(roots=[str(dirs[0])]), port=0, token=TOKEN)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def request(port, method, path, body=None, token=TOKEN, content_type="application/json", headers=None):
+    """Envoie une requête au démon ; retourne le code et la réponse JSON."""
+    sent = dict(headers or {})
+    if token is not None:
+        sent["Authorization"] = f"Bearer {token}"
+    if content_type is not None:
+        sent["Content-Type"] = content_type
+    data = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode("utf-8")
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request(method, path, body=data, headers=sent)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+def test_port_requires_token():
+    """L'écoute sur un port sans jeton est refusée."""
+    with pytest.raises(ValueError):
+        create_server(AnalysisDaemon(), port=0)
+
+@pytest.mark.parametrize("token", [None, "wrong", TOKEN + "x", ""])
+def test_bearer_token(port, token):
+    """Sans le jeton exact, les requêtes sont refusées."""
+    assert request(port, "GET", "/status", token=token)[0] == 401
+    assert request(port, "POST", "/ingest", {"lines": [FAILED_LINE]}, token=token)[0] == 401
+    status, result = request(port, "GET", "/status")
+    assert status == 200 and result["requests"] >= 3
+
+@pytest.mark.parametrize("host", ["evil.example", "evil.example:%d", "127.0.0.1", "localhost:1"])
+def test_foreign_host_rejected(port, host):
+    """Un en-tête Host autre que l'adresse locale et son port est refusé (DNS rebinding)."""
+    headers = {"Host": host % port if "%d" in host else host}
+    assert request(port, "GET", "/status", headers=headers)[0] == 403
+
+@pytest.mark.parametrize("host", ["localhost", "127.0.0.1", "LOCALHOST"])
+def test_local_host_accepted(port, host):
+    """Les noms locaux, avec le port d'écoute, sont acceptés."""
+    assert request(port, "GET", "/status", headers={"Host": f"{host}:{port}"})[0] == 200
+
+@pytest.mark.parametrize("content_type", [None, "application/x-www-form-urlencoded", "text/plain",
+                                          "multipart/form-data; boundary=x"])
+def test_post_requires_json(port, content_type):
+    """Un POST qui n'est pas en JSON (formulaire d'une page web) est refusé, et rien n'est ingéré."""
+    assert request(port, "POST", "/ingest", {"lines": [FAILED_LINE]}, content_type=content_type)[0] == 415
+    assert request(port, "POST", "/reset", content_type=content_type)[0] == 415
+    assert request(port, "GET", "/status")[1]["entries"] == 0
+
+def test_ingest_lines(port):
+    """Des lignes valides sont analysées dans l'état partagé."""
+    status, result = request(port, "POST", "/ingest", {"lines": [FAILED_LINE, "noise"]},
+                             content_type="application/json; charset=utf-8")
+    assert status == 200
+    assert result["entries"] == 1 and result["anomaly_count"] == 1
+
+@pytest.mark.parametrize("lines", [[1, 2], FAILED_LINE, [FAILED_LINE, None], {"a": FAILED_LINE}, 42])
+def test_ingest_rejects_invalid_lines(port, lines):
+    """``lines`` doit être une liste de chaînes : sinon 400, et rien n'est ingéré."""
+    status, result = request(port, "POST", "/ingest", {"lines": lines})
+    assert status == 400 and "lines" in result["error"]
+    assert request(port, "GET", "/status")[1]["entries"] == 0
+
+def test_allowed_file(port, dirs):
+    """Un fichier sous un répertoire autorisé est lu."""
+    path = str(dirs[0] / "auth.log")
+    assert request(port, "POST", "/ingest", {"path": path})[1]["entries"] == 1
+    assert request(port, "POST", "/analyze", {"paths": [str(dirs[0])]})[1]["files"] == [path]
+
+def escapes(allowed, outside):
+    """Chemins menant hors du répertoire autorisé : ``..``, motif glob et liens symboliques."""
+    os.symlink(outside / "secret.log", allowed / "link.log")
+    os.symlink(outside, allowed / "linked_dir")
+    return [
+        str(allowed / ".." / "outside" / "secret.log"),
+        str(allowed / "link.log"),
+        str(allowed / "linked_dir" / "secret.log"),
+        str(allowed / "linked_dir"),
+    ], [
+        str(allowed / ".." / "outside" / "*.log"),
+        str(allowed / ".." / "*" / "secret.log"),
+        str(allowed / "*.log"),
+        str(allowed / "linked_dir" / "*"),
+    ]
+
+def test_escapes_rejected(port, dirs):
+    """Aucun chemin ni motif ne donne accès à un fichier hors des répertoires autorisés."""
+    paths, patterns = escapes(*dirs)
+    for path in paths:
+        assert request(port, "POST", "/ingest", {"path": path})[0] == 403, path
+        assert request(port, "POST", "/analyze", {"path": path})[0] == 403, path
+    for pattern in patterns:
+        assert request(port, "POST", "/analyze", {"paths": [pattern]})[0] == 403, pattern
+    status = request(port, "GET", "/status")[1]
+    assert status["entries"] == 0 and status["files"] == []
+
+def test_no_roots_allows_no_file(dirs):
+    """Sans répertoire autorisé, aucun fichier n'est lu."""
+    with pytest.raises(PermissionError):
+        AnalysisDaemon().ingest_file(str(dirs[0] / "auth.log"))
@@ -0,0 +1,142 @@
+"""
+Tests du module de détection : moteur de correspondance, cache par forme
+de ligne et fenêtre du brute force.
+"""
+
+import re
+
+from conftest import generate_lines
+from core import detector, stats
+from core.detector import AnomalyDetector, BruteForceTracker
+
+# Lignes atypiques : plusieurs catégories, majuscules, Unicode, motifs à cheval
+EDGE_LINES = [
+    "sudo: command not found after failed password",
+    "FIREWALL: BLOCK from 1.2.3.4",
+    "rdp session invalid, rdp login FAILED twice",
+    "Échec: remote desktop access denied pour élodie",
+    "privilege escalation then sql injection attempt",
+    "malicious dns reply, dns flagged as malware",
+    "access denied to admin panel",
+    "unauthorized access as root by 10.0.0.7",
+    "multiple connection from 1.2.3.4 over 30 attempts",
+    "no matching credentials",
+    "nothing to see here",
+    "",
+    "İstanbul failed password",
+    "x" * 5000 + " failed password",
+]
+
+def reference_classify(line):
+    """Classification d'origine : chaque pattern de chaque catégorie, dans l'ordre."""
+    lowered = line.lower()
+    for anomaly_type, patterns in detector.PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, lowered):
+                return anomaly_type, pattern
+    return None
+
+def test_matcher_matches_reference():
+    """Le moteur compilé donne la même règle que l'évaluation pattern par pattern."""
+    matcher = detector.get_matcher()
+    for line in generate_lines(3000) + EDGE_LINES:
+        assert matcher.match(line) == reference_classify(line), line
+
+def test_detect_anomalies_matches_reference():
+    """detect_anomalies produit une anomalie par ligne classée, avec la règle d'origine."""
+    lines = generate_lines(2000, seed=7) + EDGE_LINES
+    anomalies = [a for a in detector.detect_anomalies(lines) if a["type"] != "Attaque Brute Force"]
+    expected = [(line,) + match for line in lines for match in [reference_classify(line)] if match]
+    assert [(a["entry"], a["type"], a["pattern"]) for a in anomalies] == expected
+
+def test_shape_cache_matches_uncached_classification():
+    """La classification mémorisée par forme est celle de la ligne elle-même."""
+    cached = AnomalyDetector()
+    uncached = AnomalyDetector()
+    uncached.classify_shape = None
+    assert cached.classify_shape is not None
+    lines = generate_lines(3000, seed=3) + EDGE_LINES + [
+        "May 16 10:00:01 h sshd[1]: Failed password for root from 10.0.0.1 port 22",
+        "May 16 10:00:02 h sshd[9]: Failed password for root from 10.0.0.9 port 99",
+    ]
+    for line in lines:
+        assert cached.process(line) == uncached.process(line), line
+    assert cached.brute_force_anomalies() == uncached.brute_force_anomalies()
+    # Les lignes de même forme partagent une seule évaluation
+    assert cached.classify_shape.cache_info().currsize < len(lines) / 2
+
+def test_shape_cache_disabled_for_patterns_with_digits():
+    """Un pattern contenant un chiffre désactive le cache par forme."""
+    assert detector.shapes_preserve_matches(detector.PATTERNS)
+    assert not detector.shapes_preserve_matches({"Test": [r"port 22\b"]})
+    assert not detector.shapes_preserve_matches({"Test": [r"error 0x0"]})
+
+def test_shape_cache_disabled_under_stats(monkeypatch):
+    """Sous --stats, chaque entrée est comptée dans les évaluations des règles."""
+    monkeypatch.setattr(stats, "_current", None)
+    run_stats = stats.enable()
+    instrumented = AnomalyDetector()
+    assert instrumented.classify_shape is None
+    lines = generate_lines(500, seed=5)
+    for line in lines:
+        instrumented.process(line)
+    assert run_stats.prefilter[0] == len(lines)
+
+def test_line_shape_masks_digits_only():
+    """Seuls les chiffres distinguent deux lignes de même forme."""
+    assert detector.line_shape("port 22 from 10.0.0.1") == detector.line_shape("port 99 from 47.8.3.6")
+    assert detector.line_shape("port 22") == detector.line_shape("port 47")
+    assert detector.line_shape("port 22") != detector.line_shape("port ab")
+
+def test_brute_force_window():
+    """Une clé est signalée au seuil atteint dans la fenêtre, pas au-delà."""
+    tracker = BruteForceTracker(threshold=3, window=60)
+    assert not tracker.add(("ip", "1.1.1.1"), "a", 0)
+    assert not tracker.add(("ip", "1.1.1.1"), "b", 30)
+    assert not tracker.add(("ip", "1.1.1.1"), "c", 61)
+    # Les trois derniers échecs (30, 61, 80) tiennent en 60 secondes
+    assert tracker.add(("ip", "1.1.1.1"), "d", 80)
+    assert not tracker.add(("ip", "1.1.1.1"), "e", 81)
+
+    anomaly = tracker.anomalies()[0]
+    assert anomaly["attempts"] == 5
+    assert anomaly["first_seen"] == 0 and anomaly["last_seen"] == 81
+    assert anomaly["ips"] == ["1.1.1.1"]
+
+def test_brute_force_rate():
+    """Le rythme compte les intervalles entre essais, pas les essais."""
+    tracker = BruteForceTracker(threshold=3, window=60)
+    for second in range(5):
+        tracker.add(("ip", "1.1.1.1"), "x", 600 + second)
+    for second in (0, 1, 2):
+        tracker.add(("user", "root"), "x", 900 + second)
+    rates = {tuple(a["ips"]) or a["user"]: a["rate"] for a in tracker.anomalies()}
+    assert rates == {("1.1.1.1",): 60.0, "root": 60.0}
+    assert "60.0/min" in tracker.anomalies()[0]["entry"]
+
+def test_brute_force_slow_attempts_not_detected():
+    """Des échecs espacés de plus d'une fenêtre ne sont jamais signalés."""
+    tracker = BruteForceTracker(threshold=3, window=60)
+    for i in range(20):
+        tracker.add(("user", "root"), "x", i * 61)
+    assert tracker.anomalies() == []
+
+def test_brute_force_state_roundtrip():
+    """Un tracker restauré poursuit la détection comme l'original."""
+    tracker = BruteForceTracker(threshold=3, window=60)
+    tracker.add(("ip", "1.1.1.1"), "a", 0)
+    tracker.add(("ip", "1.1.1.1"), "b", 10)
+    restored = BruteForceTracker(threshold=3, window=60)
+    restored.set_state(tracker.get_state())
+    assert restored.add(("ip", "1.1.1.1"), "c", 20)
+
+def test_brute_force_detections_are_bounded():
+    """Au-delà de max_keys détections, les plus anciennes sont oubliées."""
+    tracker = BruteForceTracker(threshold=2, window=60, max_keys=10)
+    for i in range(50):
+        tracker.add(("ip", f"10.0.0.{i}"), "x", i)
+        tracker.add(("ip", f"10.0.0.{i}"), "x", i)
+    assert len(tracker.detections) == 10
+    assert tracker.evicted == 40
+    assert [a["ips"][0] for a in tracker.anomalies()] == [f"10.0.0.{i}" for i in range(40, 50)]
+    assert len(tracker.get_state()["keys"]) <= 20
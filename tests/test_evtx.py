@@ -0,0 +1,119 @@
+"""
+Tests de la lecture native des journaux EVTX.
+
+Les journaux sont écrits par ``fixtures/make_evtx.py`` d'après la
+spécification du format ; ``fixtures/security.evtx`` en est une sortie
+versionnée.
+"""
+
+import gzip
+import os
+import shutil
+
+from fixtures import make_evtx
+from core import evtx, parser
+from core.detector import classify_event
+from core.pipeline import AnalysisPipeline
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "security.evtx")
+
+# (identifiant, epoch, compte, IPs, type d'ouverture de session, état, catégorie)
+EXPECTED = [
+    (4625, 1715869961, "admin", ["10.0.0.5"], 3, 0xC000006D, "Échec Auth"),
+    (4625, 1715869962, "admin", ["10.0.0.5"], 10, 0xC000006D, "Échec RDP"),
+    (4624, 1715869964, "alice", ["10.0.0.9"], 10, None, None),
+    (4771, 1715869965, "bob", ["10.0.0.7"], None, 0x18, "Échec Auth"),
+    (4776, 1715869966, "svc_backup", [], None, 0, None),
+    (4776, 1715869967, "svc_backup", [], None, 0xC000006A, "Échec Auth"),
+    (4625, 1715869968, None, [], 3, 0xC000006D, "Échec Auth"),
+    (4625, 1715869969, "admin", ["10.0.0.5"], 3, 0xC000006D, "Échec Auth"),
+]
+
+def read(path, event_ids=None):
+    return list(evtx.parse_evtx(path, event_ids))
+
+def test_fixture_is_current(tmp_path):
+    """La fixture versionnée correspond au générateur."""
+    path = tmp_path / "security.evtx"
+    make_evtx.write(str(path), make_evtx.SECURITY_EVENTS)
+    with open(FIXTURE, "rb") as f:
+        assert path.read_bytes() == f.read()
+
+def test_fields():
+    """Identifiant, horodatage, compte, IP, type de session et état de chaque événement suivi."""
+    records = read(FIXTURE)
+    assert [(r.event_id, r.timestamp, r.user, r.ips, r.logon_type, r.status, classify_event(r))
+            for r in records] == EXPECTED
+    assert {r.host for r in records} == {"DC01.corp.local"}
+    # L'événement 4688 (création de processus) n'est pas suivi par défaut
+    assert 4688 not in {r.event_id for r in records}
+
+def test_line_representation():
+    """La ligne affichée reprend les champs de l'événement."""
+    record = read(FIXTURE)[1]
+    assert record.line == ("2024-05-16 14:32:42 DC01.corp.local EventID 4625: An account failed to log on. "
+                           "Account Name: admin Source Network Address: 10.0.0.5 Logon Type: 10 "
+                           "Status: 0xC000006D Record: 2")
+
+def test_event_id_filter():
+    """Les identifiants demandés remplacent ceux suivis par défaut."""
+    records = read(FIXTURE, event_ids=[4688])
+    assert [(r.event_id, r.timestamp) for r in records] == [(4688, 1715869963)]
+
+def test_detected_by_content(tmp_path):
+    """Un journal EVTX est reconnu à son contenu, même compressé et mal nommé."""
+    path = tmp_path / "export.bin.gz"
+    with open(FIXTURE, "rb") as src, gzip.open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    assert parser.detect_log_type(str(path)) == "evtx"
+    assert [r.line for r in read(str(path))] == [r.line for r in read(FIXTURE)]
+
+def test_templates_compiled_once_across_chunks(tmp_path):
+    """Sur plusieurs blocs, chaque modèle n'est compilé qu'une fois."""
+    events = [(4625 if i % 3 else 4776, 1715869961 + i,
+               {"TargetUserName": f"user{i % 7}", "LogonType": 3, "IpAddress": f"10.0.{i % 5}.{i % 200}",
+                "Status": 0xC000006D}) for i in range(6000)]
+    path = str(tmp_path / "big.evtx")
+    make_evtx.write(path, events)
+    chunks = (os.path.getsize(path) - evtx.FILE_HEADER_SIZE) // evtx.CHUNK_SIZE
+    assert chunks >= 5
+
+    reader = evtx.EvtxReader()
+    with open(path, "rb") as f:
+        records = list(reader.read(f))
+    # Un modèle par identifiant et par disposition : sa taille dépend des noms
+    # déjà définis dans le bloc (défini en premier ou en second), pas du bloc
+    assert len(reader.templates) <= 4 < 2 * chunks
+    assert reader.records == 6000
+    assert [r.timestamp for r in records] == [e[1] for e in events]
+    assert [r.user for r in records] == [e[2]["TargetUserName"] for e in events]
+    # Les événements 4776 n'ont pas d'adresse source
+    assert [r.ips for r in records] == [[e[2]["IpAddress"]] if e[0] == 4625 else [] for e in events]
+
+def test_damaged_chunk_skipped(tmp_path):
+    """Un bloc à la signature invalide est ignoré, les suivants sont lus."""
+    events = [(4625, 1715869961 + i, {"TargetUserName": "admin", "IpAddress": "10.0.0.5", "LogonType": 3,
+                                      "Status": 0xC000006D}) for i in range(2000)]
+    path = tmp_path / "damaged.evtx"
+    make_evtx.write(str(path), events)
+    data = bytearray(path.read_bytes())
+    data[4096:4104] = b"\0" * 8
+    path.write_bytes(bytes(data))
+
+    reader = evtx.EvtxReader()
+    with open(path, "rb") as f:
+        records = list(reader.read(f))
+    assert reader.skipped_chunks == 1
+    assert 0 < len(records) < 2000
+    assert records[-1].timestamp == events[-1][1]
+
+def test_pipeline_brute_force():
+    """Les échecs d'une même IP et d'un même compte déclenchent le brute force."""
+    analysis = AnalysisPipeline(threshold=3)
+    anomalies = list(analysis.process_files([FIXTURE]))
+    types = [a["type"] for a in anomalies]
+    assert types.count("Échec Auth") == 5
+    assert types.count("Échec RDP") == 1
+    brute_force = [a for a in anomalies if a["type"] == "Attaque Brute Force"]
+    assert {(tuple(a["ips"]), a["user"], a["attempts"]) for a in brute_force} == {
+        (("10.0.0.5",), None, 3), ((), "admin", 3)}
@@ -0,0 +1,98 @@
+"""
+Tests du suivi en continu : ajouts, rotation, troncature et lots bornés.
+"""
+
+import os
+
+import pytest
+
+from core import follow
+from core.follow import FileFollower
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "auth.log"
+    path.write_bytes(b"")
+    return path
+
+def append(path, data):
+    with open(path, "ab") as f:
+        f.write(data)
+
+@pytest.fixture
+def follower(log_path):
+    follower = FileFollower(str(log_path), poll_interval=0.01)
+    yield follower
+    follower.close()
+
+def test_appended_lines(log_path, follower):
+    """Seules les lignes complètes ajoutées sont lues, la ligne partielle attend."""
+    append(log_path, b"first\nsec")
+    assert follower.read_block() == b"first\n"
+    assert follower.read_block() == b""
+    append(log_path, b"ond\nthird\n")
+    assert follower.read_block() == b"second\nthird\n"
+
+def test_starts_at_end_unless_from_start(log_path):
+    """Le contenu existant n'est lu qu'avec from_start."""
+    append(log_path, b"old\n")
+    tail = FileFollower(str(log_path))
+    whole = FileFollower(str(log_path), from_start=True)
+    try:
+        assert tail.read_block() == b""
+        assert whole.read_block() == b"old\n"
+    finally:
+        tail.close()
+        whole.close()
+
+def test_rotation(log_path, follower):
+    """Après un renommage, la fin de l'ancien fichier puis le nouveau sont lus."""
+    append(log_path, b"before\n")
+    assert follower.read_block() == b"before\n"
+    rotated = str(log_path) + ".1"
+    os.rename(log_path, rotated)
+    append(rotated, b"late write\nunterminated")
+    log_path.write_bytes(b"new file\n")
+    assert follower.read_block() == b"late write\nunterminated\nnew file\n"
+    append(log_path, b"next\n")
+    assert follower.read_block() == b"next\n"
+
+def test_file_recreated_later(log_path, follower):
+    """Entre le renommage et la recréation, rien n'est lu ; le nouveau fichier l'est en entier."""
+    os.rename(log_path, str(log_path) + ".1")
+    assert follower.read_block() == b""
+    log_path.write_bytes(b"recreated\n")
+    assert follower.read_block() == b"recreated\n"
+
+def test_truncation(log_path, follower):
+    """Un fichier tronqué (copytruncate) est relu depuis le début."""
+    append(log_path, b"a long line before truncation\n")
+    assert follower.read_block() == b"a long line before truncation\n"
+    with open(log_path, "wb") as f:
+        f.write(b"short\n")
+    assert follower.read_block() == b"short\n"
+    assert follower.offset == len(b"short\n")
+
+def test_backlog_read_in_bounded_batches(log_path, monkeypatch):
+    """Un arriéré est découpé en lots d'au plus READ_SIZE octets, sans attente entre eux."""
+    monkeypatch.setattr(follow, "READ_SIZE", 64)
+    content = b"".join(b"line %03d of the backlog\n" % i for i in range(100))
+    log_path.write_bytes(content)
+    follower = FileFollower(str(log_path), from_start=True)
+
+    def no_wait():
+        raise AssertionError("attente alors que des données restent à lire")
+
+    follower.wait = no_wait
+    blocks = []
+    try:
+        batches = follower.batches()
+        while sum(map(len, blocks)) < len(content):
+            blocks.append(next(batches))
+    finally:
+        follower.close()
+    assert b"".join(blocks) == content
+    # Un lot : au plus un bloc lu, plus la ligne partielle du précédent
+    longest_line = max(len(line) + 1 for line in content.splitlines())
+    assert max(map(len, blocks)) <= 64 + longest_line
+    assert len(blocks) >= len(content) // (64 + longest_line)
@@ -0,0 +1,167 @@
+"""
+Tests de l'index annexe : requêtes comparées à un parcours complet du
+fichier, fusion des portions intermédiaires, lignes ajoutées après
+l'indexation et index périmés.
+"""
+
+import pytest
+
+from conftest import generate_lines
+from core import index
+from core.detector import get_matcher
+from core.parser import filter_lines
+from core.record import IP_PATTERN, USER_PATTERN
+from core.timestamps import TimestampParser
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    """Log de 8000 lignes, découpé en blocs temporels de 16 Ko."""
+    monkeypatch.setattr(index, "TIME_BLOCK_SIZE", 16 * 1024)
+    path = tmp_path / "auth.log"
+    path.write_text("\n".join(generate_lines(8000, seed=5)) + "\n", encoding="utf-8")
+    return str(path)
+
+def scan(filepath, reference, ip=None, user=None, category=None, since=None, until=None):
+    """Parcours complet du fichier, ligne par ligne : résultat attendu d'une requête."""
+    matcher = get_matcher()
+    timestamps = TimestampParser(reference)
+    results = []
+    offset = 0
+    with open(filepath, "rb") as f:
+        for raw in f:
+            line = raw.decode("utf-8").rstrip("\n")
+            epoch = timestamps.parse(line)
+            keep = (ip is None or ip in [m.group() for m in IP_PATTERN.finditer(line)]) \
+                and (user is None or user in [m.group(m.lastindex) for m in USER_PATTERN.finditer(line)])
+            if keep and category is not None:
+                # Seules les lignes pertinentes sont classées, comme lors d'une analyse
+                match = matcher.match(line) if list(filter_lines([line])) else None
+                keep = match is not None and match[0] == category
+            if keep and (since is not None or until is not None):
+                keep = epoch is not None and (since is None or epoch >= since) and (until is None or epoch <= until)
+            if keep:
+                results.append((offset, line))
+            offset += len(raw)
+    return results
+
+def query(filepath, **criteria):
+    """Requête par l'index du fichier, construit au préalable."""
+    log_index = index.open_index(filepath)
+    assert log_index is not None
+    with log_index:
+        return list(index.query_index(log_index, filepath, **criteria)), log_index.reference
+
+def epochs(filepath, reference):
+    """Horodatages des lignes du fichier, dans l'ordre."""
+    timestamps = TimestampParser(reference)
+    with open(filepath, encoding="utf-8") as f:
+        return [epoch for epoch in map(timestamps.parse, f) if epoch is not None]
+
+def contents(path):
+    """Clés, listes de positions et blocs temporels d'un fichier d'index."""
+    with index.LogIndex(path) as log_index:
+        keys = [(key, log_index.postings(key).tolist()) for key, _, _ in log_index.iter_keys()]
+        return keys, [log_index.block(i) for i in range(log_index.block_count)], log_index.end
+
+def check_queries(filepath):
+    """Chaque type de critère, seul ou combiné, donne le résultat du parcours complet."""
+    reference = query(filepath, ip="192.168.1.5")[1]
+    times = epochs(filepath, reference)
+    since, until = times[len(times) // 3], times[2 * len(times) // 3]
+    cases = [
+        {"ip": "192.168.1.5"},
+        {"ip": "192.168.0.1"},
+        {"user": "root"},
+        {"user": "élodie"},
+        {"category": "Échec Auth"},
+        {"category": "Injection SQL"},
+        {"since": since},
+        {"until": until},
+        {"since": since, "until": until},
+        {"ip": "192.168.2.7", "since": since},
+        {"user": "admin", "category": "Échec Auth", "until": until},
+        {"ip": "192.168.3.3", "user": "bob"},
+        {"ip": "203.0.113.1"},
+    ]
+    for criteria in cases:
+        results, _ = query(filepath, **criteria)
+        assert results == scan(filepath, reference, **criteria), criteria
+        if criteria.get("ip") != "203.0.113.1":
+            assert results, criteria
+
+def test_queries_match_full_scan(log_file):
+    """--ip, --user, --type, --since et --until donnent les lignes d'un parcours complet."""
+    index.build_index(log_file)
+    check_queries(log_file)
+
+def test_query_without_criteria_rejected(log_file):
+    """Une requête sans critère est refusée."""
+    index.build_index(log_file)
+    with index.open_index(log_file) as log_index:
+        with pytest.raises(ValueError):
+            list(index.query_index(log_index, log_file))
+
+def test_spilled_runs_are_merged(log_file, tmp_path, monkeypatch):
+    """Avec des portions intermédiaires, l'index fusionné est celui d'une construction en mémoire."""
+    path, keys, blocks = index.build_index(log_file)
+    in_memory = contents(path)
+
+    runs = []
+    write_index = index._write_index
+
+    def spy(run_path, source, *args):
+        if source is None:
+            runs.append(run_path)
+        return write_index(run_path, source, *args)
+
+    monkeypatch.setattr(index, "_write_index", spy)
+    monkeypatch.setattr(index, "SPILL_POSITIONS", 500)
+    monkeypatch.setattr(index, "READ_BLOCK_SIZE", 32 * 1024)
+    assert index.build_index(log_file) == (path, keys, blocks)
+    assert len(runs) > 3
+    assert contents(path) == in_memory
+    # Les portions intermédiaires sont supprimées
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["auth.log", "auth.log" + index.INDEX_EXTENSION]
+    check_queries(log_file)
+
+def test_appended_lines_are_queried(log_file):
+    """Les lignes ajoutées après l'indexation figurent dans les résultats."""
+    index.build_index(log_file)
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("\n".join(generate_lines(1500, seed=6, start=1715869961 + 86400 * 3)) + "\n")
+        # Ligne en cours d'écriture : ignorée jusqu'à sa fin de ligne
+        f.write("May 20 08:00:00 server sshd[1]: Failed password for root from 192.168.1.5 port 22")
+
+    with index.open_index(log_file) as log_index:
+        indexed = log_index.end
+    results = query(log_file, ip="192.168.1.5")[0]
+    assert any(offset >= indexed for offset, _ in results)
+    assert not results[-1][1].startswith("May 20 08:00:00")
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert query(log_file, ip="192.168.1.5")[0][-1][1].startswith("May 20 08:00:00")
+    check_queries(log_file)
+
+def test_truncated_source_invalidates_index(log_file):
+    """Un fichier tronqué n'est plus couvert par son index."""
+    index.build_index(log_file)
+    with open(log_file, "rb+") as f:
+        f.truncate(1000)
+    assert index.open_index(log_file) is None
+
+def test_rewritten_source_invalidates_index(log_file):
+    """Un fichier réécrit (même taille, autre début) n'est plus couvert par son index."""
+    index.build_index(log_file)
+    with open(log_file, "rb+") as f:
+        data = f.read()
+        f.seek(0)
+        f.write(data[:10].upper() + data[10:])
+    assert index.open_index(log_file) is None
+
+def test_missing_or_foreign_index(log_file):
+    """Sans index, ou avec un fichier qui n'en est pas un, aucun index n'est ouvert."""
+    assert index.open_index(log_file) is None
+    with open(index.index_path(log_file), "wb") as f:
+        f.write(b"not an index")
+    assert index.open_index(log_file) is None
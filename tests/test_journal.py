@@ -0,0 +1,142 @@
+"""
+Tests de la lecture des journaux exportés : détection du format, champs
+JSON extraits sans décoder l'objet, format d'export natif et filtrage sur
+le seul message.
+"""
+
+import gzip
+import io
+import json
+import struct
+
+import pytest
+
+from core import journal, parser
+from core.pipeline import AnalysisPipeline
+from core.record import JSON_HOST_FIELDS, JSON_MESSAGE_FIELDS, json_field
+
+def export_entry(fields):
+    """Entrée au format d'export ; une valeur en octets est écrite sous forme binaire."""
+    data = b""
+    for name, value in fields:
+        if isinstance(value, bytes):
+            data += name.encode() + b"\n" + struct.pack("<Q", len(value)) + value + b"\n"
+        else:
+            data += f"{name}={value}\n".encode()
+    return data + b"\n"
+
+JSON_LINES = [
+    {"MESSAGE": "Failed password for root from 10.0.0.1 port 22 ssh2", "_HOSTNAME": "web01",
+     "SYSLOG_IDENTIFIER": "sshd", "_PID": "4242", "__REALTIME_TIMESTAMP": "1715869961123456"},
+    # Mots-clés dans un nom de champ et dans un autre champ, pas dans le message
+    {"MESSAGE": "Started Session 1 of user bob.", "_SYSTEMD_UNIT": "failed-units.service",
+     "error": "none", "_HOSTNAME": "web01"},
+    {"log": "connection refused by upstream\n", "stream": "stderr", "time": "2024-05-16T14:32:41Z"},
+    # Message binaire, décodé en UTF-8 ; retenu par le filtre des lignes grâce à un autre champ
+    {"MESSAGE": [70, 97, 105, 108, 101, 100, 32, 108, 111, 103, 105, 110, 32, 0xc3, 0xa9],
+     "_HOSTNAME": "db01", "_SYSTEMD_UNIT": "failed-login.service"},
+]
+
+@pytest.fixture
+def json_log(tmp_path):
+    path = tmp_path / "journal.json"
+    path.write_text("\n".join(json.dumps(line) for line in JSON_LINES) + "\nplain error line\n",
+                    encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def export_log(tmp_path):
+    path = tmp_path / "journal.export"
+    path.write_bytes(
+        export_entry([("__CURSOR", "s=1"), ("__REALTIME_TIMESTAMP", "1715869961000000"), ("_HOSTNAME", "web01"),
+                      ("SYSLOG_IDENTIFIER", "sshd"), ("_PID", "17"),
+                      ("MESSAGE", "Failed password for admin from 10.0.0.2 port 22 ssh2")])
+        + export_entry([("__CURSOR", "s=2"), ("_SYSTEMD_UNIT", "failed-units.service"),
+                        ("MESSAGE", "Started Session 2 of user bob."), ("COREDUMP", b"\0error\nbinary\0" * 50)])
+        + export_entry([("__CURSOR", "s=3"), ("_HOSTNAME", "db01"),
+                        ("MESSAGE", b"authentication failure\nfor user=oracle")])
+        # Dernière entrée sans ligne vide finale
+        + export_entry([("__CURSOR", "s=4"), ("MESSAGE", "access denied")])[:-1])
+    return str(path)
+
+def test_detect_format(tmp_path, json_log, export_log):
+    """Les exports sont reconnus à leur première ligne non vide, même compressés."""
+    assert journal.detect_format(json_log) == "json"
+    assert journal.detect_format(export_log) == "journal"
+    compressed = tmp_path / "export.gz"
+    with open(export_log, "rb") as src, gzip.open(compressed, "wb") as dst:
+        dst.write(b"\n\n" + src.read())
+    assert journal.detect_format(str(compressed)) == "journal"
+    text = tmp_path / "auth.log"
+    text.write_text("May 16 14:32:41 h sshd[1]: {not json}\n", encoding="utf-8")
+    assert journal.detect_format(str(text)) is None
+    assert journal.detect_format(str(tmp_path / "missing")) is None
+    assert parser.detect_log_type(export_log) == "journal"
+
+@pytest.mark.parametrize("text, names, expected", [
+    ('{"MESSAGE": "hello", "message": "other"}', JSON_MESSAGE_FIELDS, "hello"),
+    ('{"msg":"late","log":"first"}', JSON_MESSAGE_FIELDS, "first"),
+    # Le nom d'un champ cité dans une valeur n'est pas un champ
+    ('{"note": "\\"MESSAGE\\": fake", "MESSAGE": "real"}', JSON_MESSAGE_FIELDS, "real"),
+    ('{"x": "a, \\"host\\": \\"fake\\""}', JSON_HOST_FIELDS, None),
+    ('{ "host" :  "h1" }', JSON_HOST_FIELDS, "h1"),
+    ('{"MESSAGE": "tab\\there \\u00e9"}', JSON_MESSAGE_FIELDS, "tab\there é"),
+    ('{"_PID": 4242, "x": 1}', ('"_PID"',), 4242),
+    ('{"_PID": -1.5}', ('"_PID"',), None),
+    ('{"MESSAGE": [104, 105, 195, 169]}', JSON_MESSAGE_FIELDS, "hié"),
+    ('{"_HOSTNAME": ["a", "b"]}', JSON_HOST_FIELDS, "a"),
+    ('{"MESSAGE": null}', JSON_MESSAGE_FIELDS, None),
+    ('{"MESSAGE": "unterminated', JSON_MESSAGE_FIELDS, None),
+    ('{"other": 1}', JSON_MESSAGE_FIELDS, None),
+])
+def test_json_field(text, names, expected):
+    """Un champ est extrait du texte de l'objet, comme le donnerait json.loads."""
+    assert json_field(text, names) == expected
+
+def test_iter_export_entries_keeps_useful_fields():
+    """Seuls les champs conservés sont lus ; les valeurs binaires non conservées sont sautées."""
+    data = (export_entry([("__CURSOR", "s=1"), ("BLOB", b"\n\n=\0" * 10), ("MESSAGE", b"line1\nline2"),
+                          ("_PID", "9"), ("OTHER", "x")])
+            + export_entry([("MESSAGE", "second")]))
+    expected = [{b"MESSAGE": b"line1\nline2", b"_PID": b"9"}, {b"MESSAGE": b"second"}]
+    assert list(journal.iter_export_entries(io.BytesIO(data))) == expected
+
+    class Unseekable(io.BytesIO):
+        def seekable(self):
+            return False
+
+    assert list(journal.iter_export_entries(Unseekable(data))) == expected
+    # Une valeur binaire tronquée termine la lecture sans erreur
+    assert list(journal.iter_export_entries(io.BytesIO(b"MESSAGE=a\nBLOB\n\x05\0"))) == [{b"MESSAGE": b"a"}]
+
+def test_export_filtered_on_message(export_log):
+    """Seul le message rend une entrée pertinente ; les champs sont repris dans l'entrée."""
+    records = list(parser.parse_log(export_log))
+    assert [r.line for r in records] == ["Failed password for admin from 10.0.0.2 port 22 ssh2",
+                                        "authentication failure\nfor user=oracle", "access denied"]
+    first = records[0]
+    assert (first.host, first.program, first.pid, first.timestamp) == ("web01", "sshd", 17, 1715869961)
+    assert records[1].host == "db01" and records[1].timestamp is None
+
+def test_json_filtered_on_message(json_log):
+    """Comme pour le format d'export, les noms et les autres champs ne rendent pas une entrée pertinente."""
+    records = list(parser.parse_log(json_log))
+    assert [r.line for r in records] == ["Failed password for root from 10.0.0.1 port 22 ssh2",
+                                        "connection refused by upstream", "Failed login é",
+                                        "plain error line"]
+    first = records[0]
+    assert (first.host, first.program, first.pid, first.timestamp) == ("web01", "sshd", 4242, 1715869961)
+    assert first.ips == ["10.0.0.1"] and first.user == "root"
+    assert records[1].timestamp == 1715869961
+    assert records[2].host == "db01"
+
+def test_json_pipeline_counts_relevant_entries(json_log, tmp_path):
+    """Le nombre d'entrées pertinentes est celui des messages retenus, en lecture directe comme reprise."""
+    analysis = AnalysisPipeline()
+    list(analysis.process_files([json_log]))
+    assert analysis.entries == 4
+
+    from core.checkpoint import StateFile
+    resumed = AnalysisPipeline()
+    list(resumed.process_checkpointed([json_log], StateFile(str(tmp_path / "state.json"))))
+    assert resumed.entries == 4
@@ -0,0 +1,78 @@
+"""
+Tests du pipeline d'analyse : équivalence des analyses parallèles et
+séquentielles, reprise sur point de reprise.
+"""
+
+from core import parser, pipeline
+from core.checkpoint import StateFile
+from core.pipeline import AnalysisPipeline
+
+BRUTE_FORCE = "Attaque Brute Force"
+
+def run(method, *args, **kwargs):
+    """Analyse avec un pipeline neuf ; retourne (anomalies, entrées, résumé)."""
+    analysis = AnalysisPipeline()
+    anomalies = list(getattr(analysis, method)(*args, **kwargs))
+    return anomalies, analysis.entries, analysis.summary()
+
+def test_parallel_matches_sequential(auth_log):
+    """L'analyse multiprocessus donne exactement le résultat séquentiel."""
+    sequential = run("process_files", [auth_log])
+    assert any(a["type"] == BRUTE_FORCE for a in sequential[0])
+    assert run("process_parallel", auth_log, 3) == sequential
+
+def test_threaded_files_match_sequential(tmp_path, auth_log, monkeypatch):
+    """Plusieurs fichiers lus sur des threads, par petits lots, comme en séquentiel."""
+    lines = open(auth_log, encoding="utf-8").read().splitlines(keepends=True)
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"auth.log.{5 - i}"
+        path.write_text("".join(lines[i * 600:(i + 1) * 600]), encoding="utf-8")
+        paths.append(str(path))
+    monkeypatch.setattr(pipeline, "FILE_BATCH_SIZE", 97)
+    assert run("process_files", paths, threads=3) == run("process_files", paths, threads=1)
+
+def test_threaded_files_stop_early(tmp_path, auth_log):
+    """Abandonner le flux en cours de route arrête les lectures."""
+    paths = [auth_log] * 4
+    stream = AnalysisPipeline().process_files(paths, threads=2)
+    next(stream)
+    stream.close()
+
+def test_correlation_keywords_stay_per_pipeline(auth_log):
+    """Les mots-clés de la corrélation ne changent pas les entrées des autres pipelines."""
+    keywords = list(parser.KEYWORDS)
+    before = run("process_files", [auth_log])
+    correlated = AnalysisPipeline(correlate=True)
+    list(correlated.process_files([auth_log]))
+    assert parser.KEYWORDS == keywords
+    assert correlated.entries > before[1]
+    assert run("process_files", [auth_log]) == before
+
+def test_checkpoint_resume(tmp_path, auth_log):
+    """Deux exécutions reprises valent une analyse complète ; la troisième ne produit rien."""
+    full, entries, summary = run("process_files", [auth_log])
+
+    lines = open(auth_log, encoding="utf-8").read().splitlines(keepends=True)
+    path = tmp_path / "auth.log.live"
+    state_path = str(tmp_path / "state.json")
+    path.write_text("".join(lines[:1700]), encoding="utf-8")
+    first = run("process_checkpointed", [str(path)], StateFile(state_path))[0]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines[1700:]))
+    second, resumed_entries, resumed_summary = run("process_checkpointed", [str(path)], StateFile(state_path))
+
+    def regular(anomalies):
+        return [a for a in anomalies if a["type"] != BRUTE_FORCE]
+
+    assert regular(first) + regular(second) == regular(full)
+    assert resumed_entries == entries
+    assert resumed_summary == summary
+    # Les détections de brute force finales figurent parmi celles de la seconde exécution
+    final = {a["entry"] for a in full if a["type"] == BRUTE_FORCE}
+    assert final >= {a["entry"] for a in second if a["type"] == BRUTE_FORCE}
+    assert final - {a["entry"] for a in second} <= {a["entry"] for a in first}
+
+    third, _, third_summary = run("process_checkpointed", [str(path)], StateFile(state_path))
+    assert third == []
+    assert third_summary == summary
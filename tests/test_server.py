@@ -0,0 +1,125 @@
+"""
+Tests de la réception syslog : conversion des messages RFC 3164 et
+RFC 5424, et cadrage TCP (préfixe de longueur ou fin de ligne).
+"""
+
+import asyncio
+
+import pytest
+
+from core import server
+from core.record import RecordParser
+from core.server import SyslogServer, normalize_message
+
+@pytest.mark.parametrize("message, expected", [
+    # RFC 3164 : seule la priorité est retirée
+    ("<34>May 16 14:32:41 web01 sshd[42]: Failed password for root",
+     "May 16 14:32:41 web01 sshd[42]: Failed password for root"),
+    ("May 16 14:32:41 web01 sshd: no priority", "May 16 14:32:41 web01 sshd: no priority"),
+    ("<abc>not a priority", "<abc>not a priority"),
+    # RFC 5424
+    ("<165>1 2024-05-16T14:32:41.003Z web01 sshd 42 ID47 - Failed password for root",
+     "2024-05-16T14:32:41.003Z web01 sshd[42]: Failed password for root"),
+    ("<165>1 2024-05-16T14:32:41Z web01 sshd - - - no pid",
+     "2024-05-16T14:32:41Z web01 sshd: no pid"),
+    ("<165>1 2024-05-16T14:32:41Z web01 - - - - no application",
+     "2024-05-16T14:32:41Z web01 no application"),
+    ("<165>1 - web01 sshd 42 - - no timestamp", "no timestamp"),
+    ('<165>1 2024-05-16T14:32:41Z web01 app 7 ID [exampleSDID@32473 iut="3" eventSource="App"] access denied',
+     "2024-05-16T14:32:41Z web01 app[7]: access denied"),
+    ('<165>1 2024-05-16T14:32:41Z web01 app 7 ID [a@1 x="1"][b@1 y="2"] two elements',
+     "2024-05-16T14:32:41Z web01 app[7]: two elements"),
+    ('<165>1 2024-05-16T14:32:41Z web01 app 7 ID [a@1 x="va\\]lue" y="\\\\"] escaped bracket',
+     "2024-05-16T14:32:41Z web01 app[7]: escaped bracket"),
+    ('<165>1 2024-05-16T14:32:41Z web01 app 7 ID [a@1 x="1"]', "2024-05-16T14:32:41Z web01 app[7]: "),
+    ("<165>1 2024-05-16T14:32:41Z web01 app 7 ID -", "2024-05-16T14:32:41Z web01 app[7]: "),
+    ("<165>1 2024-05-16T14:32:41Z web01 app 7 ID - ﻿BOM message",
+     "2024-05-16T14:32:41Z web01 app[7]: BOM message"),
+    ("<165>1 2024-05-16T14:32:41Z web01 short", "1 2024-05-16T14:32:41Z web01 short"),
+])
+def test_normalize_message(message, expected):
+    """Un message reçu devient une ligne syslog lisible par RecordParser."""
+    assert normalize_message(message) == expected
+
+def test_normalized_rfc5424_is_parsed():
+    """Hôte, programme et PID d'un message RFC 5424 sont retrouvés après conversion."""
+    record = RecordParser("syslog").parse(
+        normalize_message("<34>1 2024-05-16T14:32:41Z web01 sshd 42 - - Failed password for root from 10.0.0.1"))
+    assert (record.host, record.program, record.pid) == ("web01", "sshd", 42)
+    assert record.timestamp is not None and record.ips == ["10.0.0.1"]
+
+def counted(message):
+    return b"%d %s" % (len(message), message)
+
+def test_split_counted_keeps_partial_message():
+    """Seuls les messages complets sont découpés ; la suite attend la lecture suivante."""
+    data = counted(b"first message") + counted(b"second\nline\r\n") + counted(b"third")
+    messages, rest = SyslogServer._split_counted(data[:-3])
+    assert messages == [b"first message", b"second\nline"]
+    assert rest == counted(b"third")[:-3]
+    messages, rest = SyslogServer._split_counted(rest + data[-3:])
+    assert (messages, rest) == ([b"third"], b"")
+    assert SyslogServer._split_counted(b"12") == ([], b"12")
+
+@pytest.mark.parametrize("data", [b"abc def", b"123456789 x", b"99999999", b"%d x" % (server.MAX_MESSAGE_SIZE + 1)])
+def test_split_counted_rejects_invalid_length(data):
+    """Une longueur non numérique, trop longue ou au-delà de MAX_MESSAGE_SIZE est refusée."""
+    assert SyslogServer._split_counted(data) == (None, b"")
+
+class _Writer:
+    def close(self):
+        pass
+
+def receive(chunks, monkeypatch, read_size=16):
+    """Blocs mis en file et compteurs d'une connexion TCP recevant ``chunks``, lus par ``read_size`` octets."""
+    monkeypatch.setattr(server, "READ_SIZE", read_size)
+    syslog = SyslogServer(None, None)
+
+    async def run():
+        syslog._queue = asyncio.Queue()
+        reader = asyncio.StreamReader()
+        for chunk in chunks:
+            reader.feed_data(chunk)
+        reader.feed_eof()
+        await syslog._handle_connection(reader, _Writer())
+        blocks = []
+        while not syslog._queue.empty():
+            blocks.append(syslog._queue.get_nowait())
+        return blocks
+
+    blocks = asyncio.run(run())
+    return blocks, syslog.received, syslog.dropped
+
+def test_octet_counted_connection(monkeypatch):
+    """Des messages coupés entre les lectures sont recomposés ; une fin de ligne interne devient un espace."""
+    messages = [b"<34>May 16 14:32:41 h sshd[1]: Failed password number %d" % i for i in range(10)]
+    messages.append(b"<34>May 16 14:32:41 h sshd[1]: multi\nline")
+    blocks, received, dropped = receive([b"".join(map(counted, messages))], monkeypatch, read_size=37)
+    assert b"\n".join(blocks).split(b"\n") == messages[:-1] + [b"<34>May 16 14:32:41 h sshd[1]: multi line"]
+    assert (received, dropped) == (11, 0)
+
+def test_octet_counted_invalid_length_closes(monkeypatch):
+    """Une longueur invalide ferme la connexion ; les messages des lectures précédentes sont gardés."""
+    blocks, received, _ = receive([counted(b"kept"), b"12x4 broken" + counted(b"lost")], monkeypatch, read_size=6)
+    assert blocks == [b"kept"]
+    assert received == 1
+
+def test_newline_framed_connection(monkeypatch):
+    """Messages séparés par des fins de ligne, coupés entre les lectures ; le dernier sans fin de ligne est gardé."""
+    data = b"".join(b"<34>May 16 14:32:41 h app: message %d\n" % i for i in range(20)) + b"last"
+    blocks, received, dropped = receive([data], monkeypatch, read_size=23)
+    assert b"".join(blocks) == data
+    assert (received, dropped) == (21, 0)
+
+def test_newline_oversized_message_discarded_to_next_newline(monkeypatch):
+    """Un message trop long est abandonné jusqu'à sa fin de ligne ; sa fin n'est pas lue comme un message."""
+    monkeypatch.setattr(server, "MAX_MESSAGE_SIZE", 100)
+    chunks = [b"before\n", b"x" * 150, b"y" * 150, b"tail of the long message\nafter\n"]
+    blocks, received, dropped = receive(chunks, monkeypatch, read_size=64)
+    assert b"".join(blocks) == b"before\nafter\n"
+    assert (received, dropped) == (2, 1)
+
+    # Message trop long jusqu'à la fin de la connexion : rien n'est mis en file
+    blocks, received, dropped = receive([b"ok\n", b"z" * 300], monkeypatch, read_size=64)
+    assert blocks == [b"ok\n"]
+    assert (received, dropped) == (1, 1)
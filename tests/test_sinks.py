@@ -0,0 +1,84 @@
+"""
+Tests des sorties d'anomalies : colonnes CSV, champs NDJSON et limite
+d'affichage de la console.
+"""
+
+import csv
+import json
+
+import pytest
+
+from core import sinks
+
+ANOMALIES = [
+    {"type": "Échec Auth", "timestamp": 1715869961, "host": "web01", "program": "sshd", "user": "root",
+     "ips": ["10.0.0.1", "10.0.0.2"], "pattern": "failed password",
+     "entry": 'Failed password for root from 10.0.0.1, "quoted"', "pid": 42},
+    {"type": "Attaque Brute Force", "ips": [], "user": "admin", "entry": "Brute force sur admin", "alert": True,
+     "attempts": 12},
+    {"type": "Activité Firewall", "entry": "UFW BLOCK\nsecond line"},
+]
+
+def write_all(sink, anomalies=ANOMALIES, summary=None):
+    for anomaly in anomalies:
+        sink.write(anomaly)
+    sink.close(summary)
+
+def test_detect_format():
+    """Le format se déduit de l'extension ; la sortie standard est en NDJSON."""
+    assert [sinks.detect_format(p) for p in ("out.CSV", "out.jsonl", "out.json", "out.md", "out", "-")] == [
+        "csv", "ndjson", "ndjson", "markdown", "markdown", "ndjson"]
+
+def test_csv_header_and_rows(tmp_path):
+    """Un en-tête, puis une ligne par anomalie : IPs séparées par des espaces, alerte à 0 ou 1."""
+    path = str(tmp_path / "anomalies.csv")
+    write_all(sinks.open_sink(path), summary="ignored")
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [
+        list(sinks.ANOMALY_FIELDS),
+        ["Échec Auth", "1715869961", "web01", "sshd", "root", "10.0.0.1 10.0.0.2", "failed password",
+         'Failed password for root from 10.0.0.1, "quoted"', "0"],
+        ["Attaque Brute Force", "", "", "", "admin", "", "", "Brute force sur admin", "1"],
+        ["Activité Firewall", "", "", "", "", "", "", "UFW BLOCK\nsecond line", "0"],
+    ]
+
+def test_ndjson_fields(tmp_path):
+    """Un objet par ligne, avec exactement les champs de ANOMALY_FIELDS et une alerte booléenne."""
+    path = str(tmp_path / "anomalies.ndjson")
+    write_all(sinks.open_sink(path), summary="ignored")
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == len(ANOMALIES)
+    for record, anomaly in zip(records, ANOMALIES):
+        assert list(record) == list(sinks.ANOMALY_FIELDS)
+        assert record["alert"] is bool(anomaly.get("alert"))
+        assert all(record[field] == anomaly.get(field) for field in sinks.ANOMALY_FIELDS if field != "alert")
+    assert "Échec Auth" in lines[0]
+
+def test_markdown_report(tmp_path):
+    """Le rapport Markdown omet les alertes et se termine par le résumé."""
+    path = str(tmp_path / "report.md")
+    sink = sinks.open_sink(path)
+    write_all(sink, summary="Résumé\n")
+    assert sink.count == 2
+    text = open(path, encoding="utf-8").read()
+    assert "Brute force sur admin" not in text
+    assert text.endswith("## Résumé automatique\n\nRésumé\n")
+
+@pytest.mark.parametrize("max_display, shown", [(None, 3), (5, 3), (3, 3), (2, 2), (0, 0)])
+def test_console_max_display(tmp_path, max_display, shown):
+    """Au-delà de --max-display, les anomalies sont comptées et leur nombre est affiché."""
+    path = tmp_path / "console.txt"
+    sink = sinks.ConsoleSink(max_display, open(path, "w", encoding="utf-8"))
+    write_all(sink)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert sink.count == len(ANOMALIES)
+    assert sum(line.startswith(" - ") for line in lines) == shown
+    hidden = len(ANOMALIES) - shown
+    if hidden:
+        assert lines[-1] == f" ... {hidden} anomalie(s) non affichée(s) (--max-display {max_display})"
+    else:
+        assert "non affichée" not in "".join(lines)
+    assert ("[🧿] Anomalies détectées :" in lines) == bool(shown)
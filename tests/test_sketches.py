@@ -0,0 +1,136 @@
+"""
+Tests des structures probabilistes : bornes d'erreur comparées aux comptes
+exacts, états enregistrés et fusions.
+"""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from core.sketches import CountMinSketch, HyperLogLog, SpaceSaving
+
+def zipf_keys(count, distinct, seed):
+    """Flux de clés de fréquences très inégales, comme des IPs sources."""
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, distinct + 1)]
+    return [f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+            for i in rng.choices(range(distinct), weights=weights, k=count)]
+
+def round_trip(sketch):
+    """Enregistre puis restaure une structure, en passant par JSON."""
+    return type(sketch).from_state(json.loads(json.dumps(sketch.get_state())))
+
+def check_space_saving(sketch, exact):
+    """Comptes surestimés d'au plus ``error`` <= total / capacity, clés fréquentes présentes."""
+    bound = sketch.error_bound()
+    assert sketch.total == sum(exact.values())
+    for key, count, error in sketch.top():
+        assert exact[key] <= count <= exact[key] + error
+        assert error <= bound
+    tracked = dict(sketch.items())
+    for key, count in exact.items():
+        if count > bound:
+            assert key in tracked
+
+def test_space_saving_error_bound():
+    """Le top-K respecte sa borne d'erreur et retrouve les clés les plus fréquentes."""
+    keys = zipf_keys(50000, 5000, seed=1)
+    exact = Counter(keys)
+    sketch = SpaceSaving(200)
+    sketch.update(keys)
+    assert len(sketch) == 200
+    check_space_saving(sketch, exact)
+    assert [key for key, _ in sketch.most_common(10)] == [key for key, _ in exact.most_common(10)]
+
+def test_space_saving_exact_below_capacity():
+    """Tant que la capacité n'est pas atteinte, les comptes sont exacts."""
+    sketch = SpaceSaving(10)
+    sketch.update(["a", "b", "a", "c", "a", "b"])
+    sketch.update({"d": 4})
+    assert sketch.top() == [("d", 4, 0), ("a", 3, 0), ("b", 2, 0), ("c", 1, 0)]
+
+def test_space_saving_state_and_merge():
+    """Un top-K restauré se comporte comme l'original ; la fusion garde la borne d'erreur."""
+    first, second = zipf_keys(20000, 3000, seed=2), zipf_keys(20000, 3000, seed=3)
+    left, right = SpaceSaving(150), SpaceSaving(150)
+    left.update(first)
+    right.update(second)
+
+    restored = round_trip(left)
+    assert restored.get_state() == left.get_state()
+    restored.update(second[:100])
+    left.update(second[:100])
+    assert restored.top() == left.top()
+
+    merged = round_trip(left).merge(round_trip(right))
+    exact = Counter(first + second[:100]) + Counter(second)
+    assert merged.total == left.total + right.total
+    assert len(merged) == 150
+    check_space_saving(merged, exact)
+
+def test_space_saving_merge_rejects_other_capacity():
+    """Deux top-K de capacités différentes ne se fusionnent pas."""
+    with pytest.raises(ValueError):
+        SpaceSaving(100).merge(SpaceSaving(200))
+
+@pytest.mark.parametrize("distinct", [50, 3000, 100000])
+def test_hyperloglog_error_bound(distinct):
+    """L'estimation reste à quatre écarts-types du nombre exact de clés distinctes."""
+    sketch = HyperLogLog(12)
+    sketch.update(f"key-{i}" for i in range(distinct))
+    # Doublons : sans effet sur l'estimation
+    sketch.update(f"key-{i}" for i in range(0, distinct, 7))
+    assert abs(sketch.count() - distinct) <= 4 * sketch.relative_error() * distinct + 1
+
+def test_hyperloglog_state_and_merge():
+    """La fusion estime l'union ; l'état restauré donne la même estimation."""
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(f"key-{i}" for i in range(30000))
+    right.update(f"key-{i}" for i in range(20000, 60000))
+    assert round_trip(left).count() == left.count()
+
+    merged = round_trip(left).merge(round_trip(right))
+    assert abs(merged.count() - 60000) <= 4 * merged.relative_error() * 60000
+    union = HyperLogLog()
+    union.update(f"key-{i}" for i in range(60000))
+    assert merged.registers == union.registers
+
+def test_hyperloglog_merge_rejects_other_precision():
+    """Deux HyperLogLog de précisions différentes ne se fusionnent pas."""
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
+
+def test_count_min_error_bound():
+    """Les estimations ne sont jamais sous le compte exact et restent sous la borne."""
+    keys = zipf_keys(50000, 5000, seed=4)
+    exact = Counter(keys)
+    sketch = CountMinSketch(width=512, depth=4)
+    sketch.update(keys)
+    bound = sketch.error_bound()
+    errors = [sketch.estimate(key) - count for key, count in exact.items()]
+    assert min(errors) >= 0
+    # Borne tenue avec une probabilité 1 - exp(-4) par clé
+    assert sum(error > bound for error in errors) <= 0.02 * len(errors)
+    assert sketch.estimate("absent") <= bound
+
+def test_count_min_state_and_merge():
+    """La fusion compte les deux flux ; l'état restauré donne les mêmes estimations."""
+    first, second = zipf_keys(10000, 2000, seed=5), zipf_keys(10000, 2000, seed=6)
+    left, right, whole = CountMinSketch(256, 3), CountMinSketch(256, 3), CountMinSketch(256, 3)
+    left.update(first)
+    right.update(second)
+    whole.update(first + second)
+
+    restored = round_trip(left)
+    assert all(restored.estimate(key) == left.estimate(key) for key in set(first))
+    merged = restored.merge(round_trip(right))
+    assert merged.total == whole.total
+    assert merged.table == whole.table
+
+@pytest.mark.parametrize("width, depth", [(1024, 4), (512, 3)])
+def test_count_min_merge_rejects_other_dimensions(width, depth):
+    """Deux count-min de dimensions différentes ne se fusionnent pas."""
+    with pytest.raises(ValueError):
+        CountMinSketch(512, 4).merge(CountMinSketch(width, depth))
@@ -0,0 +1,136 @@
+"""
+Tests de la base d'historique : détections de brute force mises à jour
+d'une exécution reprise à l'autre, migration du schéma et requêtes de
+``history``.
+"""
+
+import sqlite3
+
+from core import store
+from core.checkpoint import StateFile
+from core.pipeline import AnalysisPipeline
+
+BRUTE_FORCE = "Attaque Brute Force"
+
+def detection_key(row):
+    """Ordre des détections (IP, compte, premier échec), valeurs absentes comprises."""
+    return row[0] or "", row[1] or "", row[3] or -1
+
+def store_run(db_path, anomalies, analysis=None, files=None):
+    """Enregistre les anomalies d'une exécution comme le fait ``--store``."""
+    anomaly_store = store.AnomalyStore(db_path, files)
+    for anomaly in anomalies:
+        anomaly_store.add(anomaly)
+    anomaly_store.close(analysis)
+
+def brute_force_rows(db_path):
+    """Détections de brute force enregistrées, triées par IP, compte et premier échec."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT ip, user, attempts, first_seen, last_seen FROM brute_force "
+                            "ORDER BY ifnull(ip, ''), ifnull(user, ''), first_seen").fetchall()
+    finally:
+        conn.close()
+
+def test_resumed_runs_keep_one_row_per_detection(tmp_path, auth_log):
+    """Trois exécutions --state --store : une ligne par détection, aux compteurs finaux."""
+    full = AnalysisPipeline()
+    expected = sorted((((a["ips"] or [None])[0], a["user"], a["attempts"], a["first_seen"], a["last_seen"])
+                       for a in full.process_files([auth_log]) if a["type"] == BRUTE_FORCE), key=detection_key)
+    assert expected
+
+    lines = open(auth_log, encoding="utf-8").read().splitlines(keepends=True)
+    log_path = tmp_path / "auth.log.live"
+    log_path.write_text("", encoding="utf-8")
+    db_path = str(tmp_path / "history.db")
+    state_path = str(tmp_path / "state.json")
+    for part in (lines[:1000], lines[1000:2200], lines[2200:]):
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write("".join(part))
+        analysis = AnalysisPipeline()
+        anomalies = list(analysis.process_checkpointed([str(log_path)], StateFile(state_path)))
+        store_run(db_path, anomalies, analysis, [str(log_path)])
+
+    assert sorted(brute_force_rows(db_path), key=detection_key) == expected
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM runs WHERE finished IS NOT NULL").fetchone()[0] == 3
+    conn.close()
+
+def test_upsert_updates_detection(tmp_path):
+    """Une détection signalée de nouveau (même IP ou compte, même premier échec) est mise à jour."""
+    db_path = str(tmp_path / "history.db")
+    first = {"type": BRUTE_FORCE, "ips": ["10.0.0.1"], "user": None, "attempts": 5,
+             "first_seen": 100, "last_seen": 150, "rate": 4.8, "entry": "5 essais"}
+    account = dict(first, ips=[], user="root", first_seen=None, last_seen=None, rate=None)
+    store_run(db_path, [first, account])
+    store_run(db_path, [dict(first, attempts=9, last_seen=400, entry="9 essais"), dict(account, attempts=7)])
+    # Une nouvelle attaque de la même IP est une autre détection
+    store_run(db_path, [dict(first, first_seen=9000, last_seen=9100)])
+    assert brute_force_rows(db_path) == [
+        (None, "root", 7, None, None),
+        ("10.0.0.1", None, 9, 100, 400),
+        ("10.0.0.1", None, 5, 9000, 9100),
+    ]
+
+def test_schema_migration_removes_duplicates(tmp_path):
+    """Une base du schéma 1 perd ses doublons de détection, la plus récente est gardée."""
+    db_path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(store._SCHEMA)
+    conn.execute("INSERT INTO runs (id, started) VALUES (1, 0), (2, 0)")
+    conn.executemany("INSERT INTO brute_force (run_id, ip, user, attempts, first_seen, last_seen) "
+                     "VALUES (?, ?, ?, ?, ?, ?)",
+                     [(1, "10.0.0.1", None, 5, 100, 150), (1, None, "root", 6, None, None),
+                      (2, "10.0.0.1", None, 8, 100, 300), (2, None, "root", 9, None, None),
+                      (2, "10.0.0.2", None, 5, 100, 120)])
+    conn.execute("PRAGMA user_version=1")
+    conn.commit()
+    conn.close()
+
+    store.connect(db_path).close()
+    assert brute_force_rows(db_path) == [
+        (None, "root", 9, None, None),
+        ("10.0.0.1", None, 8, 100, 300),
+        ("10.0.0.2", None, 5, 100, 120),
+    ]
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == store.SCHEMA_VERSION
+    conn.close()
+
+def test_history_queries(tmp_path):
+    """Comptes par catégorie, IPs principales et brute force, par période et par hôte."""
+    db_path = str(tmp_path / "history.db")
+
+    def anomaly(anomaly_type, ts, ip, host):
+        return {"type": anomaly_type, "timestamp": ts, "ips": [ip] if ip else [], "host": host,
+                "entry": f"{anomaly_type} {ip}"}
+
+    store_run(db_path, [
+        anomaly("Échec Auth", 100, "10.0.0.1", "web"),
+        anomaly("Échec Auth", 200, "10.0.0.1", "db"),
+        anomaly("Échec Auth", 300, "10.0.0.2", "web"),
+        anomaly("Injection SQL", 400, "10.0.0.2", "web"),
+        anomaly("Activité Firewall", 500, None, "web"),
+        {"type": BRUTE_FORCE, "ips": ["10.0.0.1"], "attempts": 5, "first_seen": 100, "last_seen": 200,
+         "entry": "bf"},
+        {"type": BRUTE_FORCE, "ips": [], "user": "root", "attempts": 8, "first_seen": 150, "last_seen": 450,
+         "entry": "bf"},
+    ])
+    store_run(db_path, [anomaly("Échec Auth", 600, "10.0.0.3", "web"),
+                        {"type": "Échec Auth", "ips": ["10.0.0.3"], "alert": True, "entry": "alerte"}])
+
+    conn = store.connect(db_path)
+    try:
+        assert store.count_by_type(conn) == [("Échec Auth", 4), ("Activité Firewall", 1), ("Injection SQL", 1)]
+        assert store.count_by_type(conn, since=250, until=550) == [
+            ("Activité Firewall", 1), ("Injection SQL", 1), ("Échec Auth", 1)]
+        assert store.count_by_type(conn, host="db") == [("Échec Auth", 1)]
+
+        assert store.top_ips(conn) == [("10.0.0.1", 2, 2, 200), ("10.0.0.2", 2, 1, 400), ("10.0.0.3", 1, 1, 600)]
+        assert store.top_ips(conn, since=150, host="web", limit=1) == [("10.0.0.2", 2, 1, 400)]
+
+        assert store.brute_force_history(conn) == [(None, "root", 8, 150, 450), ("10.0.0.1", None, 5, 100, 200)]
+        assert store.brute_force_history(conn, until=300) == [("10.0.0.1", None, 5, 100, 200)]
+        assert store.brute_force_history(conn, limit=1) == [(None, "root", 8, 150, 450)]
+    finally:
+        conn.close()
@@ -0,0 +1,68 @@
+"""
+Tests des agrégats du résumé : la fusion de portions équivaut à une
+accumulation séquentielle.
+"""
+
+import pytest
+
+from conftest import generate_lines
+from core import detector
+from core.summarizer import SummaryAccumulator
+
+@pytest.fixture(scope="module")
+def anomalies():
+    """Anomalies d'un log généré, brute force compris."""
+    return detector.detect_anomalies(generate_lines(4000, seed=11))
+
+def split(items, parts):
+    """Découpe une liste en portions consécutives de tailles inégales."""
+    bounds = [0] + [len(items) * i * i // (parts * parts) for i in range(1, parts)] + [len(items)]
+    return [items[start:end] for start, end in zip(bounds, bounds[1:])]
+
+@pytest.mark.parametrize("parts", [2, 5])
+def test_merge_matches_sequential(anomalies, parts):
+    """Fusionner les portions dans l'ordre donne le résumé séquentiel."""
+    sequential = SummaryAccumulator()
+    sequential.update(anomalies)
+
+    merged = SummaryAccumulator()
+    for portion in split(anomalies, parts):
+        accumulator = SummaryAccumulator()
+        accumulator.update(portion)
+        merged.merge(accumulator)
+
+    assert merged.total == sequential.total
+    assert list(merged.types.items()) == list(sequential.types.items())
+    assert merged.brute_force_entries == sequential.brute_force_entries
+    assert merged.ip_counter == sequential.ip_counter
+    assert merged.render() == sequential.render()
+
+def test_merge_sketches_matches_sequential(anomalies):
+    """En mode sketches, la fusion donne les mêmes estimations."""
+    sequential = SummaryAccumulator(sketches=True)
+    sequential.update(anomalies)
+
+    merged = SummaryAccumulator(sketches=True)
+    for portion in split(anomalies, 4):
+        accumulator = SummaryAccumulator(sketches=True)
+        accumulator.update(portion)
+        merged.merge(accumulator)
+
+    assert merged.total == sequential.total
+    assert merged.types == sequential.types
+    for ip in {ip for a in anomalies for ip in a.get("ips", [])}:
+        assert merged.estimate_ip(ip) == sequential.estimate_ip(ip)
+    for t, sources in sequential.distinct_sources.items():
+        assert merged.distinct_sources[t].count() == sources.count()
+
+def test_merge_rejects_mixed_modes():
+    """Agrégats exacts et estimés ne se fusionnent pas."""
+    with pytest.raises(ValueError):
+        SummaryAccumulator().merge(SummaryAccumulator(sketches=True))
+
+def test_state_roundtrip(anomalies):
+    """Un accumulateur restauré depuis son état produit le même résumé."""
+    accumulator = SummaryAccumulator()
+    accumulator.update(anomalies)
+    restored = SummaryAccumulator.from_state(accumulator.get_state())
+    assert restored.render() == accumulator.render()
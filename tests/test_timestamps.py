@@ -0,0 +1,60 @@
+"""
+Tests de l'extraction des horodatages, comparée à ``datetime``.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.timestamps import TimestampParser, days_from_civil, format_epoch
+
+UTC = timezone.utc
+
+def epoch(*args, offset=0):
+    """Epoch d'une date UTC, décalée de ``offset`` secondes."""
+    return int(datetime(*args, tzinfo=UTC).timestamp()) - offset
+
+@pytest.mark.parametrize("line, expected", [
+    ("May 16 14:32:41 server sshd[1]: Failed password", epoch(2024, 5, 16, 14, 32, 41)),
+    ("May  6 04:02:09 server sshd[1]: x", epoch(2024, 5, 6, 4, 2, 9)),
+    ("<34>May 16 14:32:41 server su: x", epoch(2024, 5, 16, 14, 32, 41)),
+    ("2024-05-16T14:32:41Z host app: x", epoch(2024, 5, 16, 14, 32, 41)),
+    ("2024-05-16 14:32:41 host app: x", epoch(2024, 5, 16, 14, 32, 41)),
+    ("2024-05-16T14:32:41.123+02:00 host app: x", epoch(2024, 5, 16, 14, 32, 41, offset=7200)),
+    ("2024-05-16T14:32:41-05:30 host app: x", epoch(2024, 5, 16, 14, 32, 41, offset=-19800)),
+    ("<165>1 2024-05-16T14:32:41Z host app - - - x", epoch(2024, 5, 16, 14, 32, 41)),
+    ('10.0.0.1 - - [16/May/2024:14:32:41 +0200] "GET / HTTP/1.1" 401', epoch(2024, 5, 16, 14, 32, 41, offset=7200)),
+    ("5/16/2024 2:32:41 PM Security 4625 failure", epoch(2024, 5, 16, 14, 32, 41)),
+    ("12/1/2024 12:05:00 AM Security 4625 failure", epoch(2024, 12, 1, 0, 5, 0)),
+    ("prefix text 2024-02-29 23:59:59 leap", epoch(2024, 2, 29, 23, 59, 59)),
+    ("no timestamp here", None),
+    ("Foo 16 14:32:41 not a month", None),
+])
+def test_parse_matches_datetime(line, expected):
+    """Chaque format donne l'epoch calculé par datetime."""
+    parser = TimestampParser(reference=datetime(2024, 5, 20))
+    assert parser.parse(line) == expected
+
+def test_cached_prefix_reads_seconds():
+    """Les lignes d'une même minute, servies par le cache, gardent leurs secondes."""
+    parser = TimestampParser(reference=datetime(2024, 5, 20))
+    for second in range(60):
+        assert parser.parse(f"May 16 14:32:{second:02d} h x") == epoch(2024, 5, 16, 14, 32, second)
+
+def test_syslog_year_rollover():
+    """L'année des lignes syslog avance au passage de décembre à janvier."""
+    parser = TimestampParser(reference=datetime(2025, 1, 2))
+    assert parser.parse("Dec 31 23:59:59 h x") == epoch(2024, 12, 31, 23, 59, 59)
+    assert parser.parse("Jan  1 00:00:01 h x") == epoch(2025, 1, 1, 0, 0, 1)
+
+def test_days_from_civil_matches_datetime():
+    """Le calcul du jour correspond à datetime sur plusieurs siècles."""
+    day = datetime(1899, 1, 1)
+    while day.year < 2101:
+        assert days_from_civil(day.year, day.month, day.day) * 86400 == \
+            int(day.replace(tzinfo=UTC).timestamp())
+        day += timedelta(days=13)
+
+def test_format_epoch():
+    """Les epochs sont affichés en heure du log."""
+    assert format_epoch(epoch(2024, 5, 16, 14, 32, 41)) == "2024-05-16 14:32:41"